@@ -8,10 +8,12 @@ import pytz
 import utils.constants as CONSTANTS 
 from decimal import *
 from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 from utils.exchange_service import ExchangeService
 from utils.mongodb_service import MongoDBService
+from utils.ohlcv_ingestion import OhlcvIngester, CsvOhlcvIngester, OhlcvCheckpoints, backfill
+from utils.ohlcv_store import OhlcvStore
+from backtesting.data import export_mongo_to_store
 from utils.reconciliation import ReconciliationActions, reconcile_with_exchange, apply_reconciliation_to_db
 
 load_dotenv()
@@ -30,6 +32,29 @@ exchange_config = {
 }
 exchange_service = ExchangeService(exchange_config)
 
+OHLCV_TICKER_PAIRS = [
+    "LPT/USD",
+    "WCFG/USD",
+    "BNT/USD",
+    "ATOM/USD",
+    "SOL/USD",
+    "MANA/USD",
+    "OXT/USD",
+    "SNX/USD",
+    "AVAX/USD",
+    "DOGE/USD",
+    "ICP/USD",
+    "FIL/USD",
+    "ASM/USD",
+    "MATIC/USD",
+    "DOT/USD",
+    "AMP/USD",
+    "SHIB/USD",
+    "COMP/USD",
+    "IOTX/USD",
+    "BTC/USD"
+]
+
 
 def add_buy_orders(orders: str, ticker_pair: str):
     order_list = orders.split(",")
@@ -187,96 +212,82 @@ def reconcile_db_with_exchange(ticker_pairs: list, dry_run: bool):
     print(f"{ticker_pair} tickers applied recon: {','.join(tickers_applied_recon)}")
     print(f"{ticker_pair} total value of applied recon actions {total_recon_value}")
 
-def populate_ohlcv_data(ticker_pairs = [], timeframe="1m", since = ""):
+def parse_date_ms(date: str) -> int:
+    if not date:
+        return None
+    return int(datetime.fromisoformat(date).replace(tzinfo=timezone.utc).timestamp() * 1000)
 
-    if len(ticker_pairs) == 0:
-        ticker_pairs = [
-            "LPT/USD",
-            "WCFG/USD",
-            "BNT/USD",
-            "ATOM/USD",
-            "SOL/USD",
-            "MANA/USD",
-            "OXT/USD",
-            "SNX/USD",
-            "AVAX/USD",
-            "DOGE/USD",
-            "ICP/USD",
-            "FIL/USD",
-            "ASM/USD",
-            "MATIC/USD",
-            "DOT/USD",
-            "AMP/USD",
-            "SHIB/USD",
-            "COMP/USD",
-            "IOTX/USD",
-            "BTC/USD"
-        ]
+def populate_ohlcv_data(ticker_pairs = [], timeframe="1m", since = "", interval = 60, max_concurrent_requests = CONSTANTS.CONFIG_DEFAULT_MAX_CONCURRENT_REQUESTS):
 
-    collections_list = mongodb_service.get_collections_names()
-    if CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_COLLECTION not in collections_list:
-        print(f"creating ohlcv_data collection")
+    if len(ticker_pairs) == 0:
+        ticker_pairs = OHLCV_TICKER_PAIRS
 
-        indexes = [
-            [("timestamp", 1)],
-            [(CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD, 1)]
-        ]
-        mongodb_service.create_collection(CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_COLLECTION, {
-            "timeField": CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD,
-            "granularity": CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_GRANULARITY,
-            "metaField": CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD
-        }, 
-        indexes)    
+    ingester = OhlcvIngester(mongodb_service, exchange_service, timeframe, max_concurrent_requests)
+    ingester.ensure_collection()
 
+    since_ms = parse_date_ms(since)
 
     while True:
-        for ticker_pair in ticker_pairs:
-            ohlcv_data = []
-
-            most_recent_doc = mongodb_service.query(collection=CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_COLLECTION, 
-                                                filter_dict={"ticker": ticker_pair}, 
-                                                sort_field=CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD,
-                                                limit = 1)
-            if len(most_recent_doc) > 0:
-                most_recent_timestamp = most_recent_doc[0][CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD]
-                aware_datetime = most_recent_timestamp.replace(tzinfo=ZoneInfo('UTC'))
-
-                #wrapping in a Decimal first because timestamp() returns a .0 decimal even after casting to int()
-                epoch_timestamp = int(Decimal((aware_datetime.timestamp()*1000)))
-                ohlcv = exchange_service.execute_op(ticker_pair, op=CONSTANTS.OP_FETCH_OHLCV, params={"since": epoch_timestamp})
-            else:
-                ohlcv = exchange_service.execute_op(ticker_pair, op=CONSTANTS.OP_FETCH_OHLCV)
-
-            if ohlcv is None:
-                print(f"{ticker_pair}: error fetching ohlcv, skipping")
-                continue
+        started_at = time.time()
+        inserted = ingester.ingest(ticker_pairs, since_ms)
 
-            for candle in ohlcv:
-                timestamp = datetime.fromtimestamp(candle[0]/1000, timezone.utc)
-                candle_entries = mongodb_service.query(CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_COLLECTION, {"ticker": ticker_pair, "timestamp": timestamp})
-                if len(candle_entries) > 0:
-                    continue
+        elapsed = time.time() - started_at
+        total = sum(inserted.values())
+        for (ticker_pair, count) in inserted.items():
+            print(f"{ticker_pair}: inserted {count} records")
+        print(f"inserted {total} records for {len(ticker_pairs)} tickers in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} records/s)")
 
-                entry = {
-                    "timestamp": timestamp,
-                    "open": candle[1],
-                    "high": candle[2],
-                    "low": candle[3],
-                    "close": candle[4],
-                    "volume": candle[5],
-                    CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD: ticker_pair
-                }
+        # later passes resume from the newest stored candle of each ticker
+        since_ms = None
+        print(f"sleeping for {max(0, interval - elapsed):.0f} seconds")
+        time.sleep(max(0, interval - elapsed))
 
-                ohlcv_data.append(entry)
 
-            print(f"{ticker_pair}: inserting {len(ohlcv_data)} records")
-            if len(ohlcv_data) > 0:
-                mongodb_service.insert_many(CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_COLLECTION, ohlcv_data)
+def backfill_ohlcv_data(ticker_pairs: list, timeframes: list, since: str, until: str = "", output_dir: str = "",
+                        checkpoint_file: str = CONSTANTS.DEFAULT_OHLCV_BACKFILL_CHECKPOINT_FILE, page_limit: int = CONSTANTS.DEFAULT_OHLCV_BACKFILL_PAGE_LIMIT,
+                        max_concurrent_requests: int = CONSTANTS.CONFIG_DEFAULT_MAX_CONCURRENT_REQUESTS):
+    if len(ticker_pairs) == 0:
+        ticker_pairs = OHLCV_TICKER_PAIRS
 
-            time.sleep(1)
+    checkpoints = OhlcvCheckpoints(checkpoint_file)
+    ingesters = []
+    for timeframe in timeframes:
+        if output_dir:
+            ingesters.append(CsvOhlcvIngester(output_dir, exchange_service, timeframe, page_limit=page_limit, checkpoints=checkpoints))
+        else:
+            ingesters.append(OhlcvIngester(mongodb_service, exchange_service, timeframe, page_limit=page_limit, checkpoints=checkpoints))
+        ingesters[-1].ensure_collection()
+
+    started_at = time.time()
+    inserted = backfill(ingesters, ticker_pairs, parse_date_ms(since), parse_date_ms(until), max_concurrent_requests)
+
+    elapsed = time.time() - started_at
+    total = sum(inserted.values())
+    for ((ticker_pair, timeframe), count) in inserted.items():
+        print(f"{ticker_pair} {timeframe}: inserted {count} records")
+    print(f"inserted {total} records in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} records/s), progress saved to {checkpoint_file}")
+
+def export_ohlcv_data(ticker_pairs: list, timeframes: list, store_dir: str, since: str = "", until: str = ""):
+    if len(ticker_pairs) == 0:
+        ticker_pairs = OHLCV_TICKER_PAIRS
+
+    start = datetime.fromisoformat(since).replace(tzinfo=timezone.utc) if since else None
+    end = datetime.fromisoformat(until).replace(tzinfo=timezone.utc) if until else None
+
+    started_at = time.time()
+    total = 0
+    for timeframe in timeframes:
+        store = OhlcvStore(store_dir, timeframe)
+        for ticker_pair in ticker_pairs:
+            exported = export_mongo_to_store(mongodb_service, store, ticker_pair, start, end)
+            if exported is None:
+                print(f"{ticker_pair} {timeframe}: error exporting, skipping")
+                continue
+            print(f"{ticker_pair} {timeframe}: exported {exported} records")
+            total += exported
 
-        print(f"{ticker_pair}: sleeping for 200 seconds")
-        time.sleep(200)
+    elapsed = time.time() - started_at
+    print(f"exported {total} records to {store_dir} in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} records/s)")
 
 
 if __name__ == "__main__":
@@ -287,6 +298,16 @@ if __name__ == "__main__":
     argparser.add_argument("--lot_ids", help="comma separated lst of buy orders", default="")
     argparser.add_argument("--ticker_pairs", help="ticker pairs list")
     argparser.add_argument("--dry_run", help="dry run", default="True", type=str)
+    argparser.add_argument("--timeframe", help="candle timeframe for populate_ohlcv", default="1m")
+    argparser.add_argument("--since", help="ISO date (UTC) populate_ohlcv backfills from when a ticker has no newer candles stored", default="")
+    argparser.add_argument("--until", help="ISO date (UTC) backfill_ohlcv stops at, defaults to now", default="")
+    argparser.add_argument("--timeframes", help="comma separated timeframes for backfill_ohlcv", default="1m")
+    argparser.add_argument("--output_dir", help="directory backfill_ohlcv writes csv files to instead of mongo", default="")
+    argparser.add_argument("--store_dir", help="local candle store directory export_ohlcv writes to", default="")
+    argparser.add_argument("--checkpoint_file", help="backfill_ohlcv progress file, rerun with the same file to resume", default=CONSTANTS.DEFAULT_OHLCV_BACKFILL_CHECKPOINT_FILE)
+    argparser.add_argument("--page_limit", help="candles per backfill_ohlcv request", default=CONSTANTS.DEFAULT_OHLCV_BACKFILL_PAGE_LIMIT, type=int)
+    argparser.add_argument("--interval", help="seconds between populate_ohlcv passes", default=60, type=int)
+    argparser.add_argument("--max_concurrent_requests", help="tickers populate_ohlcv fetches at once", default=CONSTANTS.CONFIG_DEFAULT_MAX_CONCURRENT_REQUESTS, type=int)
 
     args = argparser.parse_args()
 
@@ -302,7 +323,21 @@ if __name__ == "__main__":
             ticker_pairs = args.ticker_pairs.split(",")
             reconcile_db_with_exchange(ticker_pairs, dry_run)
         if args.op == "populate_ohlcv":
-            populate_ohlcv_data()
+            ticker_pairs = args.ticker_pairs.split(",") if args.ticker_pairs else []
+            populate_ohlcv_data(ticker_pairs, args.timeframe, args.since, args.interval, args.max_concurrent_requests)
+        if args.op == "export_ohlcv":
+            if not args.store_dir:
+                print("export_ohlcv needs --store_dir")
+                exit(1)
+            ticker_pairs = args.ticker_pairs.split(",") if args.ticker_pairs else []
+            export_ohlcv_data(ticker_pairs, args.timeframes.split(","), args.store_dir, args.since, args.until)
+        if args.op == "backfill_ohlcv":
+            if not args.since:
+                print("backfill_ohlcv needs --since")
+                exit(1)
+            ticker_pairs = args.ticker_pairs.split(",") if args.ticker_pairs else []
+            backfill_ohlcv_data(ticker_pairs, args.timeframes.split(","), args.since, args.until, args.output_dir,
+                                args.checkpoint_file, args.page_limit, args.max_concurrent_requests)
     else:
         print("no op argument")
 
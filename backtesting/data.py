@@ -0,0 +1,148 @@
+import os
+import numpy as np
+import pandas as pd
+import utils.constants as CONSTANTS
+
+from datetime import datetime, timezone
+from pymongo import ASCENDING
+from utils.logger import logger
+from utils.ohlcv_ingestion import ohlcv_collection, to_epoch_ms
+from utils.ohlcv_store import OhlcvStore
+
+PRICE_COLUMNS = CONSTANTS.OHLCV_COLUMNS[1:]
+
+def load_ohlcv_from_mongo(mongodb_service, ticker_pair: str, start: datetime = None, end: datetime = None,
+                          collection: str = CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_COLLECTION) -> np.ndarray:
+    """
+    Returns the stored candles of a ticker pair from the ohlcv_data time-series
+    collection as an (n, 6) float64 array in ccxt column order, oldest first.
+    """
+    time_field = CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD
+    filter_dict = {
+        CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD: ticker_pair
+    }
+    if start is not None or end is not None:
+        filter_dict[time_field] = {}
+        if start is not None:
+            filter_dict[time_field]["$gte"] = start
+        if end is not None:
+            filter_dict[time_field]["$lt"] = end
+
+    projection = {"_id": 0, time_field: 1}
+    for column in PRICE_COLUMNS:
+        projection[column] = 1
+
+    docs = mongodb_service.query(collection, filter_dict, projection, sort_field=time_field, sort_direction=ASCENDING)
+    if docs is None:
+        logger.error(f"{ticker_pair}: unable to load stored ohlcv")
+        return None
+
+    ohlcv = np.empty((len(docs), len(CONSTANTS.OHLCV_COLUMNS)), dtype=np.float64)
+    for (idx, doc) in enumerate(docs):
+        ohlcv[idx, 0] = to_epoch_ms(doc[time_field])
+        for (column_idx, column) in enumerate(PRICE_COLUMNS, start=1):
+            ohlcv[idx, column_idx] = doc[column]
+
+    return ohlcv
+
+
+def export_mongo_to_store(mongodb_service, store: OhlcvStore, ticker_pair: str, start: datetime = None, end: datetime = None) -> int:
+    """
+    Copies a pair's candles of the store's timeframe from Mongo into the
+    store one month at a time, so memory stays bounded by a month of
+    candles.  Returns the number of candles new to the store, None on error.
+    """
+    collection = ohlcv_collection(store.timeframe)
+    time_field = CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD
+    if start is None:
+        docs = mongodb_service.query(collection, {CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD: ticker_pair}, {"_id": 0, time_field: 1},
+                                     sort_field=time_field, sort_direction=ASCENDING, limit=1)
+        if docs is None:
+            logger.error(f"{ticker_pair}: unable to read stored ohlcv")
+            return None
+        if len(docs) == 0:
+            return 0
+        start = docs[0][time_field]
+
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end is None:
+        end = datetime.now(timezone.utc)
+
+    exported = 0
+    month_start = datetime(start.year, start.month, 1, tzinfo=timezone.utc)
+    while month_start < end:
+        month_end = datetime(month_start.year + month_start.month // 12, month_start.month % 12 + 1, 1, tzinfo=timezone.utc)
+        ohlcv = load_ohlcv_from_mongo(mongodb_service, ticker_pair, max(start, month_start), min(end, month_end), collection)
+        if ohlcv is None:
+            return None
+
+        exported += store.write(ticker_pair, ohlcv)
+        month_start = month_end
+
+    return exported
+
+
+def load_ohlcv_from_file(path: str) -> dict[str, np.ndarray]:
+    """
+    Loads candles exported to CSV or Parquet, keyed by ticker pair.
+
+    The file needs the price columns plus either a time column in epoch
+    milliseconds or a timestamp column.  A ticker column splits the file by
+    pair, otherwise the pair comes from the file name, ATOM-USD.csv holding
+    ATOM/USD.  Parquet needs pyarrow or fastparquet installed.
+    """
+    if path.endswith(".parquet"):
+        candles_df = pd.read_parquet(path)
+    else:
+        candles_df = pd.read_csv(path, float_precision="round_trip")
+
+    if "time" not in candles_df.columns:
+        candles_df["time"] = pd.to_datetime(candles_df[CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD], utc=True).astype("int64") // 10**6
+
+    meta_field = CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD
+    if meta_field not in candles_df.columns:
+        ticker_pair = os.path.splitext(os.path.basename(path))[0].replace("-", "/")
+        candles_df[meta_field] = ticker_pair
+
+    ohlcv_by_pair = {}
+    for (ticker_pair, pair_df) in candles_df.groupby(meta_field, sort=False):
+        pair_df = pair_df.sort_values("time")
+        ohlcv_by_pair[ticker_pair] = pair_df[CONSTANTS.OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+
+    return ohlcv_by_pair
+
+
+def load_ohlcv_from_path(path: str) -> dict[str, np.ndarray]:
+    """
+    Loads a single export file, or every .csv/.parquet file in a directory.
+    """
+    if not os.path.isdir(path):
+        return load_ohlcv_from_file(path)
+
+    ohlcv_by_pair = {}
+    for file_name in sorted(os.listdir(path)):
+        if file_name.endswith(".csv") or file_name.endswith(".parquet"):
+            ohlcv_by_pair.update(load_ohlcv_from_file(os.path.join(path, file_name)))
+    return ohlcv_by_pair
+
+
+def resample_ohlcv(ohlcv: np.ndarray, timeframe_ms: int) -> np.ndarray:
+    """
+    Aggregates candles into timeframe candles stamped with the start of their
+    period, like the exchange serves them.
+    """
+    if len(ohlcv) == 0:
+        return ohlcv
+
+    buckets = ohlcv[:, 0] - ohlcv[:, 0] % timeframe_ms
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(ohlcv)])) - 1
+    return np.column_stack([
+        buckets[starts],
+        ohlcv[starts, 1],
+        np.maximum.reduceat(ohlcv[:, 2], starts),
+        np.minimum.reduceat(ohlcv[:, 3], starts),
+        ohlcv[ends, 4],
+        np.add.reduceat(ohlcv[:, 5], starts)
+    ])
@@ -0,0 +1,344 @@
+import time
+import ccxt
+import numpy as np
+import pandas as pd
+import utils.constants as CONSTANTS
+
+from collections import deque
+from decimal import Decimal
+from backtesting.data import resample_ohlcv
+from backtesting.fill_model import FillModel
+from backtesting.signals import SignalCursor, replay_strategies
+from utils.candle_frame import CandleFrame
+from utils.position_book import PositionBook
+from utils.streaming_indicators import StreamingIndicatorEngine
+from utils.strategies_enhanced import ScoringPlan, execute_strategies, init_strategies, init_strategies_overrides
+from utils.ticker_pipeline import TickerPipeline, compile_ticker_pipelines
+from utils.trade_ledger import TradeLedger
+from utils.trading import TradeAction, init_take_profits_config
+from utils.logger import logger
+
+# CryptoBot skips tickers with fewer candles than this
+MIN_CANDLES = 4
+
+class PairReplay:
+    """
+    One pair's stored candles replayed at the strategy timeframe.
+
+    Stored candles are usually 1m while strategies run on a coarser
+    timeframe, so every stored candle is one bot cycle: the strategies see
+    the closed timeframe candles plus the still-forming one built from the
+    stored candles so far, like a live fetch_ohlcv would return.  The window
+    is kept in a candle store style ring buffer with its own
+    StreamingIndicatorEngine, so latest_* indicators stay O(1) per step.
+    """
+
+    def __init__(self, ticker_pair: str, ohlcv: np.ndarray, timeframe_ms: int, max_candles: int):
+        self.ticker_pair = ticker_pair
+        self.max_candles = max_candles
+        self.timestamps = ohlcv[:, 0].astype(np.int64)
+
+        buckets = self.timestamps - self.timestamps % timeframe_ms
+        new_bucket = np.ones(len(buckets), dtype=bool)
+        new_bucket[1:] = buckets[1:] != buckets[:-1]
+        self.bucket_numbers = np.cumsum(new_bucket) - 1
+
+        grouped = pd.DataFrame(ohlcv[:, 1:], columns=CONSTANTS.OHLCV_COLUMNS[1:]).groupby(self.bucket_numbers)
+        self.forming = np.column_stack([
+            buckets.astype(np.float64),
+            grouped["open"].transform("first").to_numpy(),
+            grouped["high"].cummax().to_numpy(),
+            grouped["low"].cummin().to_numpy(),
+            ohlcv[:, 4],
+            grouped["volume"].cumsum().to_numpy()
+        ])
+
+        last_in_bucket = np.ones(len(buckets), dtype=bool)
+        last_in_bucket[:-1] = new_bucket[1:]
+        closed = self.forming[last_in_bucket]
+        self.closed_columns = [np.ascontiguousarray(closed[:, idx]) for idx in range(closed.shape[1])]
+
+        self.candles = deque(maxlen=max_candles)
+        self.streaming = StreamingIndicatorEngine(self.candles)
+        self.current_bucket = -1
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def step(self, idx: int) -> CandleFrame:
+        """
+        Advances to stored candle idx and returns the frame the bot would see.
+        Steps must be taken in order.
+        """
+        bucket = self.bucket_numbers[idx]
+        forming = self.forming[idx]
+        if bucket != self.current_bucket:
+            self.candles.append(forming.tolist())
+            self.current_bucket = bucket
+        else:
+            self.candles[-1] = forming.tolist()
+        self.streaming.sync()
+
+        start = max(0, bucket - self.max_candles + 1)
+        columns = {}
+        for (column_idx, name) in enumerate(CONSTANTS.OHLCV_COLUMNS):
+            columns[name] = np.concatenate((self.closed_columns[column_idx][start:bucket], forming[column_idx:column_idx + 1]))
+        return CandleFrame(columns, idx, self.streaming)
+
+
+class BacktestResult:
+    def __init__(self, starting_balance: float, trades: list, timestamps: np.ndarray, equity: np.ndarray, exposure: np.ndarray,
+                 open_cost: float, evaluations: int, elapsed: float):
+        self.starting_balance = starting_balance
+        self.trades = trades
+        self.timestamps = timestamps
+        self.equity = equity
+        self.exposure = exposure
+        self.open_cost = open_cost
+        self.evaluations = evaluations
+        self.elapsed = elapsed
+
+    def max_drawdown(self) -> float:
+        if len(self.equity) == 0:
+            return 0.0
+        peaks = np.maximum.accumulate(self.equity)
+        return float(np.max((peaks - self.equity) / peaks))
+
+    def summary(self) -> dict:
+        final_equity = self.starting_balance
+        final_exposure = 0.0
+        if len(self.equity) > 0:
+            final_equity = float(self.equity[-1])
+            final_exposure = float(self.exposure[-1])
+
+        sells = [trade for trade in self.trades if trade["side"] == "sell"]
+        pnl = final_equity - self.starting_balance
+        return {
+            "starting_balance": self.starting_balance,
+            "final_equity": final_equity,
+            "pnl": pnl,
+            "pnl_percent": pnl / self.starting_balance * 100,
+            "realized_pnl": sum(trade["realized_pnl"] for trade in sells),
+            "unrealized_pnl": final_exposure - self.open_cost,
+            "fees": sum(trade["fee"] for trade in self.trades),
+            "buys": len(self.trades) - len(sells),
+            "sells": len(sells),
+            "max_drawdown_percent": self.max_drawdown() * 100,
+            "max_exposure": float(np.max(self.exposure)) if len(self.exposure) > 0 else 0.0,
+            "evaluations": self.evaluations,
+            "elapsed_seconds": self.elapsed
+        }
+
+    def trades_df(self) -> pd.DataFrame:
+        return pd.DataFrame(self.trades)
+
+    def curves_df(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "time": self.timestamps,
+            "equity": self.equity,
+            "exposure": self.exposure
+        })
+
+
+class Backtester:
+    """
+    Replays stored candles through the same strategy stack as CryptoBot.
+
+    Every stored candle of every pair is one evaluate_ticker call, in time
+    order and then in the given pair order, against one shared balance:
+    the take-profit check first, then execute_strategies, then a buy if the
+    strategies say so and the ticker is not cooling down.  Take profits,
+    balance reservation, reinvestment and cooldowns go through the same
+    TradeLedger as CryptoBot, with the candle time as the clock.  Orders
+    fill through the FillModel, so nothing touches an exchange or Mongo.
+
+    Equity is cash plus open positions marked at the close; the curves are
+    sampled at every distinct candle time.
+
+    With vectorized set, the candles are first aggregated to the timeframe
+    and evaluated once per closed candle.  Strategies with batch signals
+    compute them over each pair's whole history up front and are replayed
+    from those, instead of recomputing their indicators on every step, which
+    is what makes parameter sweeps fast.  Position dependent strategies
+    still evaluate per step.
+    """
+
+    def __init__(self, config, fill_model: FillModel = None, timeframe: str = None, max_candles: int = None, vectorized: bool = False):
+        self.config = config
+        self.fill_model = fill_model if fill_model is not None else FillModel()
+        self.vectorized = vectorized
+
+        self.max_spend = Decimal(config[CONSTANTS.CONFIG_MAX_SPEND])
+        self.amount_per_transaction = Decimal(config[CONSTANTS.CONFIG_AMOUNT_PER_TRANSACTION])
+
+        self.reinvestment_percent = CONSTANTS.CONFIG_DEFAULT_REINVESTMENT_PERCENT
+        if CONSTANTS.CONFIG_REINVESTMENT_PERCENT in config:
+            self.reinvestment_percent = Decimal(config[CONSTANTS.CONFIG_REINVESTMENT_PERCENT]/100)
+
+        self.trade_cooldown_period = 10
+        if CONSTANTS.CONFIG_TRADE_COOLDOWN_PERIOD in config:
+            self.trade_cooldown_period = config[CONSTANTS.CONFIG_TRADE_COOLDOWN_PERIOD]
+
+        self.timeframe = timeframe
+        if self.timeframe is None:
+            self.timeframe = config.get(CONSTANTS.CONFIG_OHLCV_TIMEFRAME, CONSTANTS.CONFIG_DEFAULT_OHLCV_TIMEFRAME)
+
+        self.max_candles = max_candles
+        if self.max_candles is None:
+            self.max_candles = config.get(CONSTANTS.CONFIG_OHLCV_MAX_CANDLES, CONSTANTS.CONFIG_DEFAULT_OHLCV_MAX_CANDLES)
+
+        (self.take_profit_threshold, self.take_profit_evaluation_type) = init_take_profits_config(config.get(CONSTANTS.CONFIG_TAKE_PROFITS))
+
+        self.overrides: dict[str, dict[str, any]] = dict()
+        overrideable_attributes = set(CONSTANTS.CONFIG_OVERRIDEABLE_ATTRIBUTES)
+        for oc in config.get(CONSTANTS.CONFIG_OVERRIDES, []):
+            for ticker in oc[CONSTANTS.CONFIG_TICKERS]:
+                ticker_overrides = self.overrides.setdefault(ticker, dict())
+                for attribute in oc.keys():
+                    if attribute in overrideable_attributes:
+                        ticker_overrides[attribute] = oc[attribute]
+
+    def run(self, ohlcv_by_pair: dict[str, np.ndarray]) -> BacktestResult:
+        """
+        Runs a fresh backtest, strategies and balances start from scratch on
+        every call.
+        """
+        started_at = time.time()
+        self.strategies = init_strategies(self.config)
+        self.strategies_overrides = init_strategies_overrides(self.config)
+        self.position_book = PositionBook(None, None)
+        self.now = 0
+        self.ledger = TradeLedger(self.position_book, self.max_spend, lambda ticker_pair: self.pipelines[ticker_pair], clock=lambda: self.now / 1000)
+        self.cash = float(self.max_spend)
+        self.trades = []
+        self.evaluations = 0
+
+        timeframe_ms = ccxt.Exchange.parse_timeframe(self.timeframe) * 1000
+        if self.vectorized:
+            ohlcv_by_pair = {ticker_pair: resample_ohlcv(ohlcv, timeframe_ms) for (ticker_pair, ohlcv) in ohlcv_by_pair.items()}
+
+        replays = [PairReplay(ticker_pair, ohlcv, timeframe_ms, self.max_candles) for (ticker_pair, ohlcv) in ohlcv_by_pair.items() if len(ohlcv) > 0]
+
+        self.pair_strategies = {}
+        self.cursors = {}
+        if self.vectorized:
+            for replay in replays:
+                cursor = SignalCursor()
+                history = CandleFrame.from_ohlcv(np.column_stack(replay.closed_columns))
+                self.pair_strategies[replay.ticker_pair] = replay_strategies(replay.ticker_pair, self.strategies, self.strategies_overrides, history, cursor)
+                self.cursors[replay.ticker_pair] = cursor
+
+        defaults = TickerPipeline(self.take_profit_threshold,
+                                  self.take_profit_evaluation_type,
+                                  self.amount_per_transaction,
+                                  self.reinvestment_percent,
+                                  self.trade_cooldown_period)
+        self.pipelines = compile_ticker_pipelines([replay.ticker_pair for replay in replays], defaults, self.overrides, self.strategies, self.strategies_overrides)
+        for (ticker_pair, strategies) in self.pair_strategies.items():
+            # overrides are already resolved into the pair's replayed strategies
+            self.pipelines[ticker_pair].scoring_plan = ScoringPlan(ticker_pair, strategies)
+        if len(replays) == 0:
+            return BacktestResult(float(self.max_spend), [], np.empty(0), np.empty(0), np.empty(0), 0.0, 0, 0.0)
+
+        event_times = np.concatenate([replay.timestamps for replay in replays])
+        event_pairs = np.concatenate([np.full(len(replay), pair_idx) for (pair_idx, replay) in enumerate(replays)])
+        event_steps = np.concatenate([np.arange(len(replay)) for replay in replays])
+        order = np.lexsort((event_pairs, event_times))
+
+        # per pair shares held and last close, to mark positions to market
+        shares_held = np.zeros(len(replays))
+        last_close = np.zeros(len(replays))
+        market_value = 0.0
+
+        timestamps = []
+        equity = []
+        exposure = []
+        for event_idx in order:
+            now = int(event_times[event_idx])
+            if len(timestamps) > 0 and timestamps[-1] != now:
+                equity.append(self.cash + market_value)
+                exposure.append(market_value)
+            if len(timestamps) == 0 or timestamps[-1] != now:
+                timestamps.append(now)
+
+            pair_idx = event_pairs[event_idx]
+            replay = replays[pair_idx]
+            candles = replay.step(event_steps[event_idx])
+            if self.vectorized:
+                self.cursors[replay.ticker_pair].index = event_steps[event_idx]
+            close = candles["close"][-1]
+            if len(candles) >= MIN_CANDLES:
+                ticker_info = self.fill_model.get_ticker_info(replay.ticker_pair, float(close), now)
+                self.evaluate_ticker(replay.ticker_pair, candles, ticker_info, now)
+
+            totals = self.position_book.totals.get(replay.ticker_pair)
+            held = totals["filled"] if totals is not None else 0.0
+            market_value += held * close - shares_held[pair_idx] * last_close[pair_idx]
+            shares_held[pair_idx] = held
+            last_close[pair_idx] = close
+
+        equity.append(self.cash + market_value)
+        exposure.append(market_value)
+
+        open_cost = sum(totals["cost"] + totals["fee"] for totals in self.position_book.totals.values())
+        return BacktestResult(float(self.max_spend), self.trades, np.array(timestamps), np.array(equity), np.array(exposure),
+                              open_cost, self.evaluations, time.time() - started_at)
+
+    def evaluate_ticker(self, ticker_pair: str, candles: CandleFrame, ticker_info, now: int):
+        self.evaluations += 1
+        self.now = now
+        pipeline = self.pipelines[ticker_pair]
+
+        avg_position = self.position_book.get_avg_position(ticker_pair)
+        (profitable_positions_to_exit, trade_action) = self.ledger.evaluate(ticker_pair,
+                                                                            avg_position,
+                                                                            self.position_book.get_positions(ticker_pair),
+                                                                            ticker_info,
+                                                                            lambda: execute_strategies(ticker_pair,
+                                                                                                       self.strategies,
+                                                                                                       avg_position,
+                                                                                                       ticker_info,
+                                                                                                       candles,
+                                                                                                       self.strategies_overrides,
+                                                                                                       scoring_plan=pipeline.scoring_plan))
+        if profitable_positions_to_exit is not None:
+            self.sell(ticker_pair, ticker_info, profitable_positions_to_exit, now)
+        elif trade_action == TradeAction.BUY:
+            self.buy(ticker_pair, ticker_info, now)
+
+    def buy(self, ticker_pair: str, ticker_info, now: int):
+        amount = self.ledger.buy_amount(ticker_pair)
+        if amount is None:
+            return
+
+        order = self.fill_model.buy(ticker_pair, amount, ticker_info, now)
+        if order["filled"] <= 0:
+            return
+
+        self.ledger.reserve(ticker_pair, amount)
+        self.ledger.record_buy(order)
+        self.cash -= order["cost"] + order["fee"]["cost"]
+        self.record_trade(order, now, 0.0, 1)
+
+    def sell(self, ticker_pair: str, ticker_info, positions_to_exit, now: int):
+        shares = sum(position["filled"] for position in positions_to_exit)
+        order = self.fill_model.sell(ticker_pair, shares, ticker_info, now)
+        proceeds = self.ledger.record_sell(ticker_pair, order, positions_to_exit)
+
+        cost_basis = sum(position["cost"] + float(position["fee"]["cost"]) for position in positions_to_exit)
+        self.cash += float(proceeds)
+        self.record_trade(order, now, float(proceeds) - cost_basis, len(positions_to_exit))
+
+    def record_trade(self, order, now: int, realized_pnl: float, lots: int):
+        self.trades.append({
+            "time": now,
+            "ticker_pair": order["symbol"],
+            "side": order["side"],
+            "price": order["price"],
+            "shares": order["filled"],
+            "cost": order["cost"],
+            "fee": order["fee"]["cost"],
+            "lots": lots,
+            "realized_pnl": realized_pnl
+        })
+        logger.debug(f"{order['symbol']}: backtest {order['side']} of {order['filled']} at {order['price']}, lots: {lots}")
@@ -0,0 +1,80 @@
+from decimal import Decimal
+from utils.trading import round_down
+
+DEFAULT_FEE_RATE = 0.006
+DEFAULT_SLIPPAGE = 0.0
+DEFAULT_SPREAD = 0.0
+
+class FillModel:
+    """
+    Simulated exchange fills for backtests.
+
+    Quotes are derived from a candle close with a symmetric spread.  Orders
+    are placed the way CryptoBot places them (limit buys at the ask for
+    amount_per_transaction worth of shares, limit sells at the bid) and fill
+    completely on the candle they are placed on, moved against us by
+    slippage.  fee_rate is charged on the filled cost of both sides.  Orders
+    are ccxt shaped, including info.order_id and
+    info.total_value_after_fees, so they go through the same bookkeeping as
+    live orders.
+    """
+
+    def __init__(self, fee_rate: float = DEFAULT_FEE_RATE, slippage: float = DEFAULT_SLIPPAGE, spread: float = DEFAULT_SPREAD):
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.spread = spread
+        self.order_count = 0
+
+    def get_ticker_info(self, ticker_pair: str, close: float, timestamp: int):
+        half_spread = close * self.spread / 2
+        return {
+            "symbol": ticker_pair,
+            "timestamp": timestamp,
+            "last": close,
+            "close": close,
+            "bid": close - half_spread,
+            "ask": close + half_spread
+        }
+
+    def buy(self, ticker_pair: str, amount: Decimal, ticker_info, timestamp: int):
+        ask_price = Decimal(ticker_info["ask"])
+        shares = round_down(float(amount / ask_price))
+        price = ticker_info["ask"] * (1 + self.slippage)
+        return self.create_order(ticker_pair, "buy", shares, price, timestamp)
+
+    def sell(self, ticker_pair: str, shares: float, ticker_info, timestamp: int):
+        price = ticker_info["bid"] * (1 - self.slippage)
+        return self.create_order(ticker_pair, "sell", round_down(shares), price, timestamp)
+
+    def create_order(self, ticker_pair: str, side: str, shares: float, price: float, timestamp: int):
+        self.order_count += 1
+        order_id = f"backtest-{self.order_count}"
+        cost = shares * price
+        fee = cost * self.fee_rate
+
+        total_value_after_fees = cost + fee
+        if side == "sell":
+            total_value_after_fees = cost - fee
+
+        return {
+            "id": order_id,
+            "symbol": ticker_pair,
+            "timestamp": timestamp,
+            "type": "limit",
+            "side": side,
+            "status": "closed",
+            "price": price,
+            "average": price,
+            "amount": shares,
+            "filled": shares,
+            "remaining": 0.0,
+            "cost": cost,
+            "fee": {
+                "cost": fee,
+                "rate": self.fee_rate
+            },
+            "info": {
+                "order_id": order_id,
+                "total_value_after_fees": str(total_value_after_fees)
+            }
+        }
@@ -0,0 +1,98 @@
+import os
+import json
+import logging
+import argparse
+import pprint
+
+import utils.constants as CONSTANTS
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from backtesting.data import load_ohlcv_from_mongo, load_ohlcv_from_path
+from utils.ohlcv_store import OhlcvStore
+from backtesting.engine import Backtester
+from backtesting.fill_model import FillModel, DEFAULT_FEE_RATE, DEFAULT_SLIPPAGE, DEFAULT_SPREAD
+from utils.mongodb_service import MongoDBService
+from utils.logger import logger
+
+load_dotenv()
+
+def parse_date(value: str) -> datetime:
+    if not value:
+        return None
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+def supported_ticker_pairs(args, config) -> list:
+    ticker_pairs = [ticker_pair for ticker_pair in args.ticker_pairs.split(",") if ticker_pair]
+    if len(ticker_pairs) == 0 and not args.data and not args.store:
+        currency = config.get(CONSTANTS.CONFIG_CURRENCY, CONSTANTS.CONFIG_DEFAULT_CURRENCY)
+        blacklist = set(config.get(CONSTANTS.CONFIG_BLACKLISTED_CRYPTO_CURRENCIES, []))
+        ticker_pairs = [f"{ticker.upper()}/{currency.upper()}" for ticker in config[CONSTANTS.CONFIG_SUPPORTED_CRYPTO_CURRENCIES] if ticker not in blacklist]
+    return ticker_pairs
+
+
+def load_ohlcv(args, ticker_pairs: list) -> dict:
+    if args.store:
+        start = parse_date(args.start)
+        end = parse_date(args.end)
+        return OhlcvStore(args.store).read_all(ticker_pairs,
+                                                int(start.timestamp() * 1000) if start else None,
+                                                int(end.timestamp() * 1000) if end else None)
+
+    if args.data:
+        ohlcv_by_pair = load_ohlcv_from_path(args.data)
+        if len(ticker_pairs) > 0:
+            ohlcv_by_pair = {ticker_pair: ohlcv_by_pair[ticker_pair] for ticker_pair in ticker_pairs if ticker_pair in ohlcv_by_pair}
+
+        start = parse_date(args.start)
+        end = parse_date(args.end)
+        for (ticker_pair, ohlcv) in ohlcv_by_pair.items():
+            mask = ohlcv[:, 0] >= (start.timestamp() * 1000 if start else float("-inf"))
+            mask &= ohlcv[:, 0] < (end.timestamp() * 1000 if end else float("inf"))
+            ohlcv_by_pair[ticker_pair] = ohlcv[mask]
+        return ohlcv_by_pair
+
+    mongodb_service = MongoDBService(os.getenv("MONGO_CONNECTION_STRING"), CONSTANTS.DEFAULT_MONGO_DB_NAME)
+    ohlcv_by_pair = {}
+    for ticker_pair in ticker_pairs:
+        ohlcv = load_ohlcv_from_mongo(mongodb_service, ticker_pair, parse_date(args.start), parse_date(args.end))
+        if ohlcv is not None:
+            ohlcv_by_pair[ticker_pair] = ohlcv
+    return ohlcv_by_pair
+
+
+if __name__ == "__main__":
+
+    argparser = argparse.ArgumentParser(description="replay stored candles through the strategy stack")
+    argparser.add_argument("--config", help="bot config file", default="config_enhanced.json")
+    argparser.add_argument("--ticker_pairs", help="comma separated ticker pairs, defaults to the config's supported currencies", default="")
+    argparser.add_argument("--data", help="csv/parquet export file or directory, reads the ohlcv_data collection when omitted", default="")
+    argparser.add_argument("--store", help="local candle store directory written by admin/main.py --op export_ohlcv, read memory-mapped", default="")
+    argparser.add_argument("--start", help="ISO date to start from, UTC", default="")
+    argparser.add_argument("--end", help="ISO date to stop at, UTC", default="")
+    argparser.add_argument("--timeframe", help="strategy timeframe, defaults to the config's ohlcv_timeframe", default=None)
+    argparser.add_argument("--fee_rate", type=float, default=DEFAULT_FEE_RATE)
+    argparser.add_argument("--slippage", type=float, default=DEFAULT_SLIPPAGE)
+    argparser.add_argument("--spread", type=float, default=DEFAULT_SPREAD)
+    argparser.add_argument("--vectorized", help="evaluate closed timeframe candles from signals computed over the whole history", action="store_true")
+    argparser.add_argument("--output", help="directory to write trades.csv and curves.csv to", default="")
+    argparser.add_argument("--log_level", default="WARNING")
+
+    args = argparser.parse_args()
+    logger.setLevel(getattr(logging, args.log_level.upper()))
+
+    with open(args.config) as f:
+        config = json.load(f)
+
+    ohlcv_by_pair = load_ohlcv(args, supported_ticker_pairs(args, config))
+    print(f"loaded {sum(len(ohlcv) for ohlcv in ohlcv_by_pair.values())} candles for {len(ohlcv_by_pair)} ticker pairs")
+
+    backtester = Backtester(config, FillModel(args.fee_rate, args.slippage, args.spread), args.timeframe, vectorized=args.vectorized)
+    result = backtester.run(ohlcv_by_pair)
+    pprint.pprint(result.summary(), sort_dicts=False)
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        result.trades_df().to_csv(os.path.join(args.output, "trades.csv"), index=False)
+        result.curves_df().to_csv(os.path.join(args.output, "curves.csv"), index=False)
+        print(f"wrote trades and curves to {args.output}")
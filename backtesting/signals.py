@@ -0,0 +1,89 @@
+from decimal import Decimal
+from strategies.base_strategy import BaseStrategy, SIGNAL_ACTIONS
+from utils.trading import TradeAction
+
+class SignalCursor:
+    """
+    The candle index the replayed signals of one pair are read at.
+    """
+
+    def __init__(self):
+        self.index = 0
+
+
+class ReplayedSignalStrategy(BaseStrategy):
+    """
+    Stands in for a strategy during a vectorized backtest.  Its signals are
+    computed once over the pair's whole history and eval only looks up the
+    one at the cursor, applying prevent_loss like the strategy's own eval,
+    so execute_strategies combines them unchanged.
+    """
+
+    def __init__(self, strategy: BaseStrategy, signal_codes, cursor: SignalCursor):
+        self.strategy = strategy
+        self.name = strategy.name
+        self.priority = strategy.priority
+        self.prevent_loss = strategy.prevent_loss
+        self.enabled = strategy.enabled
+        self.normalization_factor = strategy.normalization_factor
+        # a lookup, but stateful stand-ins still have to see every cycle
+        self.eval_cost = 0
+        self.stateful = strategy.stateful
+        self.signal_codes = signal_codes
+        self.cursor = cursor
+
+    def eval(self, avg_position, candles, ticker_info):
+        action = SIGNAL_ACTIONS[self.signal_codes[self.cursor.index]]
+        if self.prevent_loss and action == TradeAction.SELL:
+            action = self.prevent_loss_eval(avg_position, ticker_info, action)
+        return action
+
+
+class ReplayedVolatilityStrategy(ReplayedSignalStrategy):
+    """
+    VolatilityAdjusted stand-in.  The scoring reads the multiplier before
+    this cycle's eval, so it is the one of the last evaluated candle.
+    """
+
+    def __init__(self, strategy: BaseStrategy, signal_codes, cursor: SignalCursor, multipliers):
+        super().__init__(strategy, signal_codes, cursor)
+        self.multipliers = multipliers
+        self.last_index = None
+
+    def eval(self, avg_position, candles, ticker_info):
+        self.last_index = self.cursor.index
+        return super().eval(avg_position, candles, ticker_info)
+
+    def get_volatility_multiplier(self, ticker):
+        if self.last_index is None:
+            return Decimal("1.0")
+        return Decimal(str(self.multipliers[self.last_index]))
+
+
+def replay_strategy(strategy: BaseStrategy, candles, cursor: SignalCursor) -> BaseStrategy:
+    """
+    Returns the stand-in for strategy over candles, or strategy itself when
+    it has no batch signals.
+    """
+    signal_codes = strategy.signals(candles)
+    if signal_codes is None:
+        return strategy
+
+    if hasattr(strategy, "volatility_multipliers"):
+        return ReplayedVolatilityStrategy(strategy, signal_codes, cursor, strategy.volatility_multipliers(candles))
+    return ReplayedSignalStrategy(strategy, signal_codes, cursor)
+
+
+def replay_strategies(ticker_pair: str, strategies: dict, strategies_overrides: dict, candles, cursor: SignalCursor) -> dict:
+    """
+    Builds the pair's strategies by priority with its overrides resolved and
+    every batchable strategy replaced by its stand-in.
+    """
+    pair_overrides = {}
+    if strategies_overrides is not None and ticker_pair in strategies_overrides:
+        pair_overrides = strategies_overrides[ticker_pair]
+
+    replayed = {}
+    for (priority, strategy_list) in strategies.items():
+        replayed[priority] = [replay_strategy(pair_overrides.get(strategy.name, strategy), candles, cursor) for strategy in strategy_list]
+    return replayed
@@ -0,0 +1,221 @@
+import os
+import copy
+import json
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+import utils.constants as CONSTANTS
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from backtesting.engine import Backtester
+from backtesting.fill_model import FillModel, DEFAULT_FEE_RATE, DEFAULT_SLIPPAGE, DEFAULT_SPREAD
+from utils.logger import logger
+
+SWEEP_METHOD_GRID = "grid"
+SWEEP_METHOD_RANDOM = "random"
+SWEEP_DEFAULT_SAMPLES = 50
+
+# summary fields kept per trial, the full trade lists stay in the workers
+RESULT_FIELDS = ["pnl", "pnl_percent", "max_drawdown_percent", "realized_pnl", "unrealized_pnl", "fees", "buys", "sells", "elapsed_seconds"]
+
+def apply_parameters(config, parameters: dict):
+    """
+    Returns a copy of config with every parameter set.  Parameters are keyed
+    by dotted paths into the config, with strategies addressed by name:
+    take_profits.threshold_percent or
+    strategies.RSI.parameters.overbought_signal_threshold.  Returns None if
+    a path points at a strategy that isn't configured.
+    """
+    config = copy.deepcopy(config)
+    for (path, value) in parameters.items():
+        keys = path.split(".")
+        node = config
+        for key in keys[:-1]:
+            if isinstance(node, list):
+                node = next((item for item in node if item.get(CONSTANTS.CONFIG_STRATEGY_NAME) == key), None)
+                if node is None:
+                    logger.error(f"sweep parameter {path}: no {key} configured")
+                    return None
+            else:
+                node = node.setdefault(key, {})
+        node[keys[-1]] = value
+    return config
+
+
+def build_trials(parameter_space: dict[str, list], method: str = SWEEP_METHOD_GRID, samples: int = SWEEP_DEFAULT_SAMPLES, seed: int = None) -> list[dict]:
+    """
+    Returns the parameter sets to backtest: every combination of the
+    values for a grid search, or samples distinct combinations drawn from
+    that grid for a random search.
+    """
+    paths = list(parameter_space.keys())
+    shape = tuple(len(parameter_space[path]) for path in paths)
+    total = int(np.prod(shape)) if len(shape) > 0 else 1
+
+    indices = np.arange(total)
+    if method == SWEEP_METHOD_RANDOM:
+        indices = np.sort(np.random.default_rng(seed).choice(total, size=min(samples, total), replace=False))
+    elif method != SWEEP_METHOD_GRID:
+        logger.error(f"unknown sweep method: {method}")
+        return []
+
+    trials = []
+    for combination in zip(*np.unravel_index(indices, shape)) if len(shape) > 0 else [()]:
+        trials.append({path: parameter_space[path][int(value_idx)] for (path, value_idx) in zip(paths, combination)})
+    return trials
+
+
+def rank_results(results: list[dict]) -> pd.DataFrame:
+    """
+    Highest PnL first, the shallower drawdown first among equal PnLs.
+    """
+    results_df = pd.DataFrame(results)
+    if len(results_df) == 0:
+        return results_df
+    return results_df.sort_values(["pnl", "max_drawdown_percent"], ascending=[False, True], kind="stable").reset_index(drop=True)
+
+
+class SharedOhlcv:
+    """
+    Every pair's candles packed into one shared memory block, so sweep
+    workers map them instead of receiving a pickled copy per trial.
+    """
+
+    def __init__(self, ohlcv_by_pair: dict[str, np.ndarray]):
+        columns = len(CONSTANTS.OHLCV_COLUMNS)
+        rows = sum(len(ohlcv) for ohlcv in ohlcv_by_pair.values())
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, rows * columns * 8))
+
+        packed = np.ndarray((rows, columns), dtype=np.float64, buffer=self.shm.buf)
+        self.layout = []
+        offset = 0
+        for (ticker_pair, ohlcv) in ohlcv_by_pair.items():
+            packed[offset:offset + len(ohlcv)] = ohlcv
+            self.layout.append((ticker_pair, offset, len(ohlcv)))
+            offset += len(ohlcv)
+        del packed
+
+    @staticmethod
+    def attach(name: str, layout: list):
+        """
+        Maps the block created by another process.  Returns the handle,
+        which has to outlive the arrays, and read-only arrays keyed by pair.
+        """
+        # pool workers share the creating process's resource tracker, which
+        # unlinks the block once in close
+        shm = shared_memory.SharedMemory(name=name)
+
+        rows = sum(pair_rows for (_, _, pair_rows) in layout)
+        packed = np.ndarray((rows, len(CONSTANTS.OHLCV_COLUMNS)), dtype=np.float64, buffer=shm.buf)
+        packed.flags.writeable = False
+        ohlcv_by_pair = {ticker_pair: packed[offset:offset + pair_rows] for (ticker_pair, offset, pair_rows) in layout}
+        return (shm, ohlcv_by_pair)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# per worker process state, set once by init_worker
+_worker = {}
+
+def init_worker(shm_name: str, layout: list, config, fill_model_args: tuple, timeframe: str, vectorized: bool, log_level: int):
+    logger.setLevel(log_level)
+    (shm, ohlcv_by_pair) = SharedOhlcv.attach(shm_name, layout)
+    _worker.update({
+        "shm": shm,
+        "ohlcv_by_pair": ohlcv_by_pair,
+        "config": config,
+        "fill_model_args": fill_model_args,
+        "timeframe": timeframe,
+        "vectorized": vectorized
+    })
+
+
+def run_trial(parameters: dict) -> dict:
+    config = apply_parameters(_worker["config"], parameters)
+    backtester = Backtester(config, FillModel(*_worker["fill_model_args"]), _worker["timeframe"], vectorized=_worker["vectorized"])
+    summary = backtester.run(_worker["ohlcv_by_pair"]).summary()
+
+    result = dict(parameters)
+    for field in RESULT_FIELDS:
+        result[field] = summary[field]
+    return result
+
+
+def run_sweep(config, ohlcv_by_pair: dict[str, np.ndarray], trials: list[dict], workers: int = None,
+              fill_model_args: tuple = (DEFAULT_FEE_RATE, DEFAULT_SLIPPAGE, DEFAULT_SPREAD), timeframe: str = None, vectorized: bool = False) -> pd.DataFrame:
+    """
+    Backtests every trial across a process pool and returns the ranked
+    results.  Trials are independent full backtests, so throughput scales
+    with the number of workers, which defaults to the core count.
+    """
+    for parameters in trials:
+        if apply_parameters(config, parameters) is None:
+            return None
+
+    shared_ohlcv = SharedOhlcv(ohlcv_by_pair)
+    try:
+        initargs = (shared_ohlcv.shm.name, shared_ohlcv.layout, config, fill_model_args, timeframe, vectorized, logger.level)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as executor:
+            results = []
+            for result in executor.map(run_trial, trials):
+                results.append(result)
+                logger.info(f"sweep trial {len(results)}/{len(trials)}: pnl {result['pnl']:.2f}, drawdown {result['max_drawdown_percent']:.2f}%")
+    finally:
+        shared_ohlcv.close()
+
+    return rank_results(results)
+
+
+if __name__ == "__main__":
+    from backtesting.main import load_ohlcv, supported_ticker_pairs
+
+    argparser = argparse.ArgumentParser(description="backtest a grid or random search of config parameters in parallel")
+    argparser.add_argument("--config", help="bot config file", default="config_enhanced.json")
+    argparser.add_argument("--sweep", help="sweep file with the method and the values to try per parameter path", required=True)
+    argparser.add_argument("--ticker_pairs", help="comma separated ticker pairs, defaults to the config's supported currencies", default="")
+    argparser.add_argument("--data", help="csv/parquet export file or directory, reads the ohlcv_data collection when omitted", default="")
+    argparser.add_argument("--store", help="local candle store directory written by admin/main.py --op export_ohlcv, read memory-mapped", default="")
+    argparser.add_argument("--start", help="ISO date to start from, UTC", default="")
+    argparser.add_argument("--end", help="ISO date to stop at, UTC", default="")
+    argparser.add_argument("--timeframe", help="strategy timeframe, defaults to the config's ohlcv_timeframe", default=None)
+    argparser.add_argument("--fee_rate", type=float, default=DEFAULT_FEE_RATE)
+    argparser.add_argument("--slippage", type=float, default=DEFAULT_SLIPPAGE)
+    argparser.add_argument("--spread", type=float, default=DEFAULT_SPREAD)
+    argparser.add_argument("--vectorized", help="evaluate closed timeframe candles from signals computed over the whole history", action="store_true")
+    argparser.add_argument("--workers", help="worker processes, defaults to the core count", type=int, default=None)
+    argparser.add_argument("--top", help="number of ranked results to print", type=int, default=20)
+    argparser.add_argument("--output", help="directory to write sweep.csv to", default="")
+    argparser.add_argument("--log_level", default="WARNING")
+
+    args = argparser.parse_args()
+    logger.setLevel(getattr(logging, args.log_level.upper()))
+
+    with open(args.config) as f:
+        config = json.load(f)
+    with open(args.sweep) as f:
+        sweep_config = json.load(f)
+
+    trials = build_trials(sweep_config["parameters"],
+                          sweep_config.get("method", SWEEP_METHOD_GRID),
+                          sweep_config.get("samples", SWEEP_DEFAULT_SAMPLES),
+                          sweep_config.get("seed"))
+
+    ohlcv_by_pair = load_ohlcv(args, supported_ticker_pairs(args, config))
+    print(f"loaded {sum(len(ohlcv) for ohlcv in ohlcv_by_pair.values())} candles for {len(ohlcv_by_pair)} ticker pairs, running {len(trials)} trials")
+
+    results_df = run_sweep(config, ohlcv_by_pair, trials, args.workers, (args.fee_rate, args.slippage, args.spread), args.timeframe, args.vectorized)
+    if results_df is None:
+        exit(1)
+
+    with pd.option_context("display.max_columns", None, "display.width", None):
+        print(results_df.head(args.top).to_string())
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        results_df.to_csv(os.path.join(args.output, "sweep.csv"), index=False)
+        print(f"wrote ranked results to {args.output}")
@@ -0,0 +1,78 @@
+import copy
+import json
+import logging
+import argparse
+import mongomock
+
+import utils.constants as CONSTANTS
+from crypto_bot import CryptoBot, CONFIG_FILE
+from utils.exchange_service import ExchangeService
+from benchmark.replay import RecordingExchangeClient, ReplayExchangeClient, benchmark
+from utils.logger import logger
+
+MONGOMOCK_CONNECTION_STRING = "mongomock://localhost"
+
+def benchmark_config(config, max_candles: int = None):
+    """
+    The bot config with orders filled by the paper exchange and no sleeps,
+    so neither recording nor replaying can trade or idle.
+    """
+    config = copy.deepcopy(config)
+    config[CONSTANTS.CONFIG_SLEEP_INTERVAL] = 0
+    config[CONSTANTS.CONFIG_DRY_RUN] = False
+    config[CONSTANTS.CONFIG_ASYNC_MODE] = False
+    config[CONSTANTS.CONFIG_EXCHANGE].setdefault(CONSTANTS.CONFIG_PAPER_TRADING, {})
+    if max_candles is not None:
+        config[CONSTANTS.CONFIG_OHLCV_MAX_CANDLES] = max_candles
+    return config
+
+
+def create_bot(config, exchange_client) -> CryptoBot:
+    return CryptoBot(MONGOMOCK_CONNECTION_STRING, config, exchange_client, mongomock.MongoClient())
+
+
+def record(config, path: str, cycles: int):
+    exchange_client = RecordingExchangeClient(ExchangeService._get_exchange(config[CONSTANTS.CONFIG_EXCHANGE]))
+    crypto_bot = create_bot(config, exchange_client)
+    crypto_bot.run(max_cycles=cycles)
+    exchange_client.save(path)
+    print(f"recorded {sum(len(responses) for responses in exchange_client.responses.values())} responses over {cycles} cycles to {path}")
+
+
+def replay(config, path: str, cycles: int) -> dict:
+    crypto_bot = create_bot(config, ReplayExchangeClient(path))
+    return benchmark(crypto_bot, cycles)
+
+
+def print_report(report: dict):
+    print(f"{report['cycles']} cycles, {report['tickers']} tickers in {report['elapsed_seconds']:.3f}s: "
+          f"{report['cycles_per_second']:.2f} cycles/s, {report['tickers_per_second']:.1f} tickers/s")
+    print(f"{'stage':<16}{'count':>8}{'total_ms':>12}{'mean_ms':>10}{'p50_ms':>10}{'p95_ms':>10}{'max_ms':>10}")
+    for (stage, stats) in sorted(report["stages"].items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"{stage:<16}{stats['count']:>8}{stats['total_ms']:>12.1f}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['max_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="record live market data once, then benchmark CryptoBot.run against the recording")
+    argparser.add_argument("--op", help="record or replay", choices=["record", "replay"], required=True)
+    argparser.add_argument("--config", help="bot config file", default=CONFIG_FILE)
+    argparser.add_argument("--recording", help="recorded responses file", default="market_recording.json")
+    argparser.add_argument("--cycles", help="passes over the supported tickers", type=int, default=3)
+    argparser.add_argument("--max_candles", help="overrides the config's ohlcv_max_candles", type=int, default=None)
+    argparser.add_argument("--output", help="file to write the replay report to as JSON", default="")
+    argparser.add_argument("--log_level", default="WARNING")
+
+    args = argparser.parse_args()
+    logger.setLevel(getattr(logging, args.log_level.upper()))
+
+    with open(args.config) as f:
+        config = benchmark_config(json.load(f), args.max_candles)
+
+    if args.op == "record":
+        record(config, args.recording, args.cycles)
+    else:
+        report = replay(config, args.recording, args.cycles)
+        print_report(report)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
@@ -0,0 +1,191 @@
+import copy
+import json
+import time
+import ccxt
+import numpy as np
+
+import utils.constants as CONSTANTS
+from ccxt import BadSymbol
+
+RECORDED_OPS = [CONSTANTS.OP_FETCH_TICKER, CONSTANTS.OP_FETCH_TICKERS, CONSTANTS.OP_FETCH_OHLCV]
+
+def response_key(op: str, symbols, timeframe: str = None) -> str:
+    if isinstance(symbols, (list, tuple)):
+        symbols = ",".join(sorted(symbols))
+    if timeframe is not None:
+        return f"{op}|{symbols}|{timeframe}"
+    return f"{op}|{symbols}"
+
+
+class RecordingExchangeClient:
+    """
+    Wraps a ccxt client and keeps every market data response, in call
+    order per key, to be written out with save.
+    """
+
+    def __init__(self, exchange_client):
+        self.exchange_client = exchange_client
+        self.has = exchange_client.has
+        self.rateLimit = getattr(exchange_client, "rateLimit", None)
+        self.options = getattr(exchange_client, "options", {})
+        self.responses: dict[str, list] = {}
+
+    def record(self, key: str, response):
+        self.responses.setdefault(key, []).append(copy.deepcopy(response))
+        return response
+
+    def fetch_ticker(self, symbol):
+        return self.record(response_key(CONSTANTS.OP_FETCH_TICKER, symbol), self.exchange_client.fetch_ticker(symbol))
+
+    def fetch_tickers(self, symbols=None):
+        return self.record(response_key(CONSTANTS.OP_FETCH_TICKERS, symbols), self.exchange_client.fetch_tickers(symbols))
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        return self.record(response_key(CONSTANTS.OP_FETCH_OHLCV, symbol, timeframe), self.exchange_client.fetch_ohlcv(symbol, timeframe, since, limit))
+
+    def save(self, path: str):
+        recording = {
+            "recorded_at": int(time.time() * 1000),
+            "has": {op: bool(self.has.get(op)) for op in RECORDED_OPS},
+            "responses": self.responses
+        }
+        with open(path, "w") as f:
+            json.dump(recording, f)
+
+
+class ReplayExchangeClient:
+    """
+    Serves a recording made by RecordingExchangeClient: each key's
+    responses in the order they were recorded, then its last one for every
+    further call.  Candle and ticker timestamps are shifted by whole
+    timeframes so the newest recorded candle is current again, otherwise
+    the candle store would find the candles stale and reload them every
+    cycle.  There's no rateLimit, so ExchangeService doesn't pace requests.
+    """
+
+    def __init__(self, path: str):
+        with open(path) as f:
+            recording = json.load(f)
+
+        self.has = recording["has"]
+        self.options = {}
+        self.responses: dict[str, list] = recording["responses"]
+        self.positions: dict[str, int] = {key: 0 for key in self.responses}
+        self.shift_timestamps(recording["recorded_at"])
+
+    def shift_timestamps(self, recorded_at: int):
+        ohlcv_keys = [key for key in self.responses if key.startswith(CONSTANTS.OP_FETCH_OHLCV)]
+        step_ms = max([ccxt.Exchange.parse_timeframe(key.split("|")[2]) * 1000 for key in ohlcv_keys], default=1)
+        newest = max([candle[0] for key in ohlcv_keys for response in self.responses[key] for candle in response], default=recorded_at)
+        offset = (int(time.time() * 1000) - newest) // step_ms * step_ms
+
+        for (key, responses) in self.responses.items():
+            for response in responses:
+                if key.startswith(CONSTANTS.OP_FETCH_OHLCV):
+                    for candle in response:
+                        candle[0] += offset
+                elif key.startswith(CONSTANTS.OP_FETCH_TICKERS):
+                    for ticker_info in response.values():
+                        if ticker_info.get("timestamp") is not None:
+                            ticker_info["timestamp"] += offset
+                elif response.get("timestamp") is not None:
+                    response["timestamp"] += offset
+
+    def replay(self, key: str):
+        if key not in self.responses:
+            raise BadSymbol(f"no recorded response for {key}")
+
+        responses = self.responses[key]
+        position = self.positions[key]
+        self.positions[key] = min(position + 1, len(responses) - 1)
+        return copy.deepcopy(responses[position])
+
+    def fetch_ticker(self, symbol):
+        return self.replay(response_key(CONSTANTS.OP_FETCH_TICKER, symbol))
+
+    def fetch_tickers(self, symbols=None):
+        return self.replay(response_key(CONSTANTS.OP_FETCH_TICKERS, symbols))
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        return self.replay(response_key(CONSTANTS.OP_FETCH_OHLCV, symbol, timeframe))
+
+
+class StageTimer:
+    """
+    Times calls to methods of the bot's objects, wrapped on the instances
+    so nothing is timed outside a benchmark.
+    """
+
+    def __init__(self):
+        self.samples: dict[str, list] = {}
+
+    def wrap(self, owner, name: str, stage):
+        """
+        stage is the stage name, or a function of the call's arguments returning it.
+        """
+        method = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stage_name = stage if isinstance(stage, str) else stage(*args, **kwargs)
+                self.samples.setdefault(stage_name, []).append(time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+
+    def summary(self) -> dict:
+        summary = {}
+        for (stage, samples) in self.samples.items():
+            samples_ms = np.array(samples) * 1000
+            summary[stage] = {
+                "count": len(samples_ms),
+                "total_ms": float(samples_ms.sum()),
+                "mean_ms": float(samples_ms.mean()),
+                "p50_ms": float(np.percentile(samples_ms, 50)),
+                "p95_ms": float(np.percentile(samples_ms, 95)),
+                "max_ms": float(samples_ms.max())
+            }
+        return summary
+
+
+def instrument(crypto_bot) -> StageTimer:
+    """
+    Times the stages of CryptoBot.run's per ticker loop.
+    """
+    stage_timer = StageTimer()
+
+    def exchange_stage(ticker_pair=None, op=None, params={}):
+        return "fetch" if op in RECORDED_OPS else "orders"
+
+    stage_timer.wrap(crypto_bot.exchange_service, "execute_op", exchange_stage)
+    stage_timer.wrap(crypto_bot.candle_store, "merge", "frame_build")
+    for name in ["get_positions", "get_avg_position", "get_lots"]:
+        stage_timer.wrap(crypto_bot.position_book, name, "position_query")
+    stage_timer.wrap(crypto_bot.ledger, "find_exits", "take_profit")
+    stage_timer.wrap(crypto_bot, "execute_strategies", "strategy_eval")
+    stage_timer.wrap(crypto_bot, "evaluate_ticker", "evaluate_ticker")
+    return stage_timer
+
+
+def benchmark(crypto_bot, cycles: int) -> dict:
+    """
+    Drives crypto_bot.run for cycles passes over its tickers and returns
+    throughput and per stage latencies.
+    """
+    stage_timer = instrument(crypto_bot)
+
+    start = time.perf_counter()
+    crypto_bot.run(max_cycles=cycles)
+    elapsed = time.perf_counter() - start
+
+    tickers = cycles * len(crypto_bot.supported_ticker_pairs)
+    return {
+        "cycles": cycles,
+        "tickers": tickers,
+        "elapsed_seconds": elapsed,
+        "cycles_per_second": cycles / elapsed,
+        "tickers_per_second": tickers / elapsed,
+        "stages": stage_timer.summary()
+    }
@@ -1,18 +1,26 @@
+import asyncio
 import json
 import os
 import time
-import pandas as pd
 import utils.constants as CONSTANTS
-import talib
+import utils.indicators as indicators
 from decimal import *
 from dotenv import load_dotenv
+from pymongo import ASCENDING
 
 from strategies.base_strategy import BaseStrategy
-from utils.trading import TradeAction, TakeProfitEvaluationType, find_profitable_trades, calculate_avg_position, round_down
+from utils.trading import TradeAction, init_take_profits_config, round_down, split_sold_positions
 from utils.mongodb_service import MongoDBService
+from utils.position_book import PositionBook
+from utils.trade_ledger import TradeLedger
 from utils.exchange_service import ExchangeService
+from utils.candle_store import CandleStore
+from utils.candle_frame import CandleFrame
+from utils.order_tracker import OrderTracker
+from utils.stage_metrics import StageMetrics, MetricsServer
 # from utils.strategies import execute_strategies, init_strategies, init_strategies_overrides
 from utils.strategies_enhanced import execute_strategies, init_strategies, init_strategies_overrides
+from utils.ticker_pipeline import TickerPipeline, compile_ticker_pipelines
 
 from utils.logger import logger
 
@@ -22,11 +30,15 @@ CONFIG_FILE = 'config_enhanced.json'
 
 class CryptoBot:
 
-    def __init__(self, db_connection_string):
-        with open(CONFIG_FILE) as f:
-            self.config = json.load(f)
-        
-        self.ticker_trades_cooldown_periods = {}
+    def __init__(self, db_connection_string, config = None, exchange_client = None, mongodb_client = None):
+        """
+        config defaults to CONFIG_FILE.  exchange_client and mongodb_client
+        replace the ccxt and pymongo clients, for replaying recorded markets.
+        """
+        self.config = config
+        if self.config is None:
+            with open(CONFIG_FILE) as f:
+                self.config = json.load(f)
 
         self.max_spend = Decimal(self.config[CONSTANTS.CONFIG_MAX_SPEND])
         self.amount_per_transaction = Decimal(self.config[CONSTANTS.CONFIG_AMOUNT_PER_TRANSACTION])
@@ -39,7 +51,6 @@ class CryptoBot:
         if CONSTANTS.CONFIG_REINVESTMENT_PERCENT in self.config:
             self.reinvestment_percent = Decimal(self.config[CONSTANTS.CONFIG_REINVESTMENT_PERCENT]/100)
 
-        self.remaining_balance = self.max_spend
         self.trade_cooldown_period = 10
         if CONSTANTS.CONFIG_TRADE_COOLDOWN_PERIOD in self.config:
             self.trade_cooldown_period = self.config[CONSTANTS.CONFIG_TRADE_COOLDOWN_PERIOD]
@@ -49,17 +60,17 @@ class CryptoBot:
             self.currency =self.config[CONSTANTS.CONFIG_CURRENCY]
 
         self.sleep_interval = CONSTANTS.CONFIG_DEFAULT_SLEEP_INTERVAL
-        if CONSTANTS.CONFIG_DEFAULT_SLEEP_INTERVAL in self.config:
+        if CONSTANTS.CONFIG_SLEEP_INTERVAL in self.config:
             self.sleep_interval = self.config[CONSTANTS.CONFIG_SLEEP_INTERVAL]
 
-        self.crypto_currency_sleep_interval = CONSTANTS.CONFIG_DEFAULT_CRYPTO_CURRENCY_SLEEP_INTERVAL
-        if CONSTANTS.CONFIG_CRYPTO_CURRENCY_SLEEP_INTERVAL in self.config:
-            self.crypto_currency_sleep_interval = self.config[CONSTANTS.CONFIG_CRYPTO_CURRENCY_SLEEP_INTERVAL]
-
         self.ohlcv_timeframe = CONSTANTS.CONFIG_DEFAULT_OHLCV_TIMEFRAME
         if CONSTANTS.CONFIG_OHLCV_TIMEFRAME in self.config:
             self.ohlcv_timeframe = self.config[CONSTANTS.CONFIG_OHLCV_TIMEFRAME]
 
+        self.ohlcv_max_candles = CONSTANTS.CONFIG_DEFAULT_OHLCV_MAX_CANDLES
+        if CONSTANTS.CONFIG_OHLCV_MAX_CANDLES in self.config:
+            self.ohlcv_max_candles = self.config[CONSTANTS.CONFIG_OHLCV_MAX_CANDLES]
+
         self.dynamic_timeframe = False
         if CONSTANTS.CONFIG_DYNAMIC_TIMEFRAME in self.config:
             self.dynamic_timeframe = self.config[CONSTANTS.CONFIG_DYNAMIC_TIMEFRAME]
@@ -74,53 +85,126 @@ class CryptoBot:
             self.crypto_blacklist = self.config[CONSTANTS.CONFIG_BLACKLISTED_CRYPTO_CURRENCIES]
 
         self.supported_crypto_list = list(set(self.crypto_whitelist).difference(self.crypto_blacklist))
+        self.supported_ticker_pairs = [self.get_ticker_pair(ticker) for ticker in self.supported_crypto_list]
+
+        self.async_mode = False
+        if CONSTANTS.CONFIG_ASYNC_MODE in self.config:
+            self.async_mode = self.config[CONSTANTS.CONFIG_ASYNC_MODE]
+
+        self.max_concurrent_requests = CONSTANTS.CONFIG_DEFAULT_MAX_CONCURRENT_REQUESTS
+        if CONSTANTS.CONFIG_MAX_CONCURRENT_REQUESTS in self.config:
+            self.max_concurrent_requests = self.config[CONSTANTS.CONFIG_MAX_CONCURRENT_REQUESTS]
 
         self.dry_run = False
         if CONSTANTS.CONFIG_DRY_RUN in self.config:
             self.dry_run = self.config[CONSTANTS.CONFIG_DRY_RUN]
 
+        # spans are no-ops unless stage_metrics is configured
+        self.stage_metrics = StageMetrics()
+        self.metrics_port = None
+        self.metrics_server = None
+        if CONSTANTS.CONFIG_STAGE_METRICS in self.config:
+            stage_metrics_config = self.config[CONSTANTS.CONFIG_STAGE_METRICS]
+            log_interval = CONSTANTS.CONFIG_DEFAULT_STAGE_METRICS_LOG_INTERVAL
+            if CONSTANTS.CONFIG_STAGE_METRICS_LOG_INTERVAL in stage_metrics_config:
+                log_interval = stage_metrics_config[CONSTANTS.CONFIG_STAGE_METRICS_LOG_INTERVAL]
+            if CONSTANTS.CONFIG_STAGE_METRICS_PORT in stage_metrics_config:
+                self.metrics_port = stage_metrics_config[CONSTANTS.CONFIG_STAGE_METRICS_PORT]
+            self.stage_metrics = StageMetrics(enabled=True, log_interval=log_interval)
+
         #TODO: Abstract mongodb service into a data_service
         db_config = self.config[CONSTANTS.CONFIG_DB]
         db_type = db_config[CONSTANTS.CONFIG_DB_TYPE] 
         self.mongodb_db_name = db_config[CONSTANTS.CONFIG_DB_NAME]
         self.current_positions_collection = db_config[CONSTANTS.CONFIG_DB_CURRENT_POSITIONS_COLLECTION]
         self.closed_positions_collection = db_config[CONSTANTS.CONFIG_DB_CLOSED_POSITIONS_COLLECTION]
-        self.mongodb_service = MongoDBService(db_connection_string, self.mongodb_db_name)
+        self.mongodb_service = MongoDBService(db_connection_string, self.mongodb_db_name, mongodb_client)
+        self.position_book = PositionBook(self.mongodb_service, self.current_positions_collection)
+        self.ledger = TradeLedger(self.position_book, self.max_spend, self.get_pipeline, stage_metrics=self.stage_metrics)
 
         exchange_config = self.config[CONSTANTS.CONFIG_EXCHANGE]
-        self.exchange_service = ExchangeService(exchange_config, self.dry_run)
+        self.exchange_service = ExchangeService(exchange_config, self.dry_run, exchange_client=exchange_client, stage_metrics=self.stage_metrics)
+        self.candle_store = CandleStore(self.exchange_service, self.ohlcv_max_candles, self.stage_metrics, self.exchange_service.clock)
+        self.order_tracker = OrderTracker(self.exchange_service,
+                                          self.exchange_service.limit_order_period_time_limit,
+                                          self.exchange_service.limit_order_num_periods_limit * self.exchange_service.limit_order_period_time_limit,
+                                          self.exchange_service.market_order_time_limit,
+                                          self.exchange_service.order_poll_initial_delay)
 
         self.init()
+        self.ensure_indexes()
+        self.position_book.load()
 
     def init(self):
         (self.take_profit_threshold, self.take_profit_evaluation_type) = self.init_take_profits_config(self.config[CONSTANTS.CONFIG_TAKE_PROFITS])
 
         self.strategies: dict[str, BaseStrategy] = init_strategies(self.config, self.mongodb_service)
         self.init_overrides()
+        # everything the loop reads per ticker, recompiled whenever init reloads the config
+        self.pipelines: dict[str, TickerPipeline] = self.compile_pipelines(self.supported_ticker_pairs)
+
+    def ensure_indexes(self):
+        """
+        Declares the indexes behind the per-cycle position queries, creates any
+        that are missing and logs which queries are index-backed.  Strategies
+        declare their own indexes when they are initialized.
+        """
+        self.mongodb_service.declare_index(self.current_positions_collection, [("symbol", ASCENDING)], "run: open positions by symbol")
+        self.mongodb_service.declare_index(self.current_positions_collection, [("id", ASCENDING)], "handle_sell_order: delete positions by id $in")
+        self.mongodb_service.declare_index(self.closed_positions_collection, [("sell_order.id", ASCENDING)], "apply_reconciliation_to_db: sell order by sell_order.id")
+
+        for entry in self.mongodb_service.ensure_indexes():
+            queries = ", ".join(entry["queries"])
+            if entry["status"] == "failed":
+                logger.error(f"{entry['collection']}: index {entry['name']} missing, NOT covered: {queries}")
+            else:
+                logger.info(f"{entry['collection']}: index {entry['name']} {entry['status']}, covers: {queries}")
 
     def init_take_profits_config(self, take_profits_config):
-
-        take_profit_threshold = CONSTANTS.DEFAULT_TAKE_PROFIT_THRESHOLD
-        take_profit_evaluation_type = CONSTANTS.DEFAULT_TAKE_PROFIT_EVALUATION_TYPE
-
-        if take_profits_config is not None:
-            if CONSTANTS.CONFIG_TAKE_PROFITS_THRESHOLD_PERCENT in take_profits_config:
-                take_profit_threshold = take_profits_config[CONSTANTS.CONFIG_TAKE_PROFITS_THRESHOLD_PERCENT]
-
-            if CONSTANTS.CONFIG_TAKE_PROFITS_EVALUATION_TYPE in take_profits_config:
-                take_profit_evaluation_type = take_profits_config[CONSTANTS.CONFIG_TAKE_PROFITS_EVALUATION_TYPE]
-
-        take_profit_threshold = Decimal(take_profit_threshold/100)
-        take_profit_evaluation_type = TakeProfitEvaluationType[take_profit_evaluation_type]
-
-        return (take_profit_threshold, take_profit_evaluation_type)
+        return init_take_profits_config(take_profits_config)
+
+    @property
+    def remaining_balance(self) -> Decimal:
+        return self.ledger.remaining_balance
+
+    @remaining_balance.setter
+    def remaining_balance(self, remaining_balance: Decimal):
+        self.ledger.remaining_balance = remaining_balance
+
+    def execute_strategies(self, ticker_pair: str, avg_position, ticker_info, candles: CandleFrame):
+        return execute_strategies(ticker_pair,
+                                  self.strategies,
+                                  avg_position,
+                                  ticker_info,
+                                  candles,
+                                  self.strategies_overrides,
+                                  stage_metrics=self.stage_metrics,
+                                  scoring_plan=self.get_pipeline(ticker_pair).scoring_plan)
+
+    def compile_pipelines(self, ticker_pairs: list) -> dict[str, TickerPipeline]:
+        """
+        Resolves the tickers' overrides into their TickerPipelines.
+        """
+        defaults = TickerPipeline(self.take_profit_threshold,
+                                  self.take_profit_evaluation_type,
+                                  self.amount_per_transaction,
+                                  self.reinvestment_percent,
+                                  self.trade_cooldown_period)
+        return compile_ticker_pipelines(ticker_pairs, defaults, self.overrides, self.strategies, self.strategies_overrides)
+
+    def get_pipeline(self, ticker_pair: str) -> TickerPipeline:
+        if ticker_pair not in self.pipelines:
+            # tickers outside supported_crypto_currencies are compiled the first time they're seen
+            self.pipelines.update(self.compile_pipelines([ticker_pair]))
+        return self.pipelines[ticker_pair]
 
     def init_overrides(self):
+        self.strategies_overrides: dict[str, dict[str, BaseStrategy]] = dict()
+        self.overrides: dict[str, dict[str, any]] = dict()
         if CONSTANTS.CONFIG_OVERRIDES not in self.config:
             return
         
-        self.strategies_overrides: dict[str, dict[str, BaseStrategy]] = init_strategies_overrides(self.config, self.mongodb_service)
-        self.overrides: dict[str, dict[str, any]] = dict()
+        self.strategies_overrides = init_strategies_overrides(self.config, self.mongodb_service)
 
         overrides_config = self.config[CONSTANTS.CONFIG_OVERRIDES]
         overrideable_attributes = set(CONSTANTS.CONFIG_OVERRIDEABLE_ATTRIBUTES)
@@ -141,98 +225,180 @@ class CryptoBot:
                     self.overrides[ticker][attribute] = oc[attribute]
                     logger.info(f"{ticker}: setting override for {attribute}: {oc[attribute]}")
                         
-    def run(self):
+    def run(self, max_cycles: int = None):
+        """
+        Runs until stopped, or for max_cycles passes over the supported tickers.
+        """
         idx = 0
         N = len(self.supported_crypto_list)
+        cycles = 0
         logger.info(f"Running for following cryto currencies: ${self.supported_crypto_list}")
+        self.start_metrics_server()
 
         while True:
 
             if idx == N:
                 logger.debug(f"heartbeat!")
+                self.log_metrics()
+                cycles += 1
+                if max_cycles is not None and cycles >= max_cycles:
+                    return
                 time.sleep(self.sleep_interval)
                 idx = 0
 
+            if idx == 0:
+                self.exchange_service.refresh_ticker_snapshot(self.supported_ticker_pairs)
+
+            with self.stage_metrics.span("order_poll"):
+                self.order_tracker.poll_if_due()
+
             ticker:str = self.supported_crypto_list[idx]
             idx += 1 
 
-            ticker_pair:str = "{}/{}".format(ticker.upper(), self.currency.upper())
+            ticker_pair:str = self.get_ticker_pair(ticker)
             
             timeframe = self.ohlcv_timeframe
             if self.dynamic_timeframe:
                 timeframe = self.get_optimal_timeframe(ticker_pair)
                 logger.info(f"{ticker_pair}: dynamic timeframe selected: {timeframe}")
 
-            ohlcv = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_OHLCV, params={"timeframe": timeframe})
-            if ohlcv == None or len(ohlcv) == 0:
-                logger.error(f"{ticker_pair}: unable to fetch ohlcv, skipping")
+            candles = self.candle_store.update(ticker_pair, timeframe)
+            if not self.has_enough_candles(ticker_pair, candles):
+                continue
+
+            with self.stage_metrics.span("positions", ticker_pair):
+                all_positions = self.position_book.get_positions(ticker_pair)
+
+            ticker_info = self.exchange_service.get_ticker_info(ticker_pair)
+            if ticker_info is None:
+                logger.error(f"{ticker_pair}: error fetching ticker_info, skipping")
                 continue
 
-            if len(ohlcv) < 4:
-                logger.warning(f"{ticker_pair}: not enough candles, candles len: {len(ohlcv)}, skipping")
+            with self.stage_metrics.span("evaluate_ticker", ticker_pair):
+                self.evaluate_ticker(ticker_pair, candles, all_positions, ticker_info)
+
+    async def run_async(self):
+        """
+        Async run mode: every cycle fans out the market data fetches for all
+        tickers at once, bounded by max_concurrent_requests and
+        the exchange client's own rate limiter.  Strategy evaluation and order
+        placement still happen one ticker at a time, in the order the data
+        arrives, so a cycle takes roughly as long as the slowest ticker fetch.
+        """
+        logger.info(f"Running async for following cryto currencies: ${self.supported_crypto_list}")
+        self.request_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        self.start_metrics_server()
+
+        try:
+            while True:
+                await self.run_cycle_async()
+                logger.debug(f"heartbeat!")
+                self.log_metrics()
+                await asyncio.sleep(self.sleep_interval)
+        finally:
+            await self.exchange_service.close_async()
+
+    async def run_cycle_async(self):
+        async with self.request_semaphore:
+            await self.exchange_service.refresh_ticker_snapshot_async(self.supported_ticker_pairs)
+
+        fetches = [asyncio.create_task(self.fetch_ticker_data_async(ticker_pair)) for ticker_pair in self.supported_ticker_pairs]
+
+        for fetch in asyncio.as_completed(fetches):
+            ticker_data = await fetch
+            with self.stage_metrics.span("order_poll"):
+                await self.order_tracker.poll_if_due_async()
+            if ticker_data is None:
                 continue
 
-            candles_df = pd.DataFrame(ohlcv, columns=['time', 'open', 'high', 'low', 'close', 'volume'])
+            # evaluate off the event loop so the remaining fetches keep progressing,
+            # but await each one so evaluation and order placement stay serialized
+            (ticker_pair, candles, ticker_info) = ticker_data
+            with self.stage_metrics.span("positions", ticker_pair):
+                all_positions = self.position_book.get_positions(ticker_pair)
+            with self.stage_metrics.span("evaluate_ticker", ticker_pair):
+                await asyncio.to_thread(self.evaluate_ticker, ticker_pair, candles, all_positions, ticker_info)
+
+    async def fetch_ticker_data_async(self, ticker_pair: str):
+        timeframe = self.ohlcv_timeframe
+        if self.dynamic_timeframe:
+            timeframe = await self.get_optimal_timeframe_async(ticker_pair)
+            logger.info(f"{ticker_pair}: dynamic timeframe selected: {timeframe}")
+
+        (candles, ticker_info) = await asyncio.gather(
+            self.update_candles_async(ticker_pair, timeframe),
+            self.get_ticker_info_async(ticker_pair)
+        )
+
+        if not self.has_enough_candles(ticker_pair, candles):
+            return None
 
-            take_profit_threshold = self.take_profit_threshold
-            take_profit_evaluation_type = self.take_profit_evaluation_type
+        if ticker_info is None:
+            logger.error(f"{ticker_pair}: error fetching ticker_info, skipping")
+            return None
 
-            if ticker_pair in self.overrides and CONSTANTS.CONFIG_TAKE_PROFITS in self.overrides[ticker_pair]:
-                (take_profit_threshold, take_profit_evaluation_type) = self.init_take_profits_config(self.overrides[ticker_pair][CONSTANTS.CONFIG_TAKE_PROFITS])
+        return (ticker_pair, candles, ticker_info)
 
-            ticker_filter = {
-                'symbol': ticker_pair
-            }
-            all_positions = self.mongodb_service.query(self.current_positions_collection, ticker_filter)
-            avg_position = calculate_avg_position(all_positions) 
+    async def update_candles_async(self, ticker_pair: str, timeframe: str):
+        async with self.request_semaphore:
+            return await self.candle_store.update_async(ticker_pair, timeframe)
 
-            ticker_info = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_TICKER)
-            if ticker_info is None:
-                logger.error(f"{ticker_pair}: error fetching ticker_info, skipping")
-                continue
-            
-            profitable_positions_to_exit = find_profitable_trades(ticker_pair, 
-                                                                  avg_position, 
-                                                                  all_positions, 
-                                                                  ticker_info, 
-                                                                  take_profit_threshold, 
-                                                                  take_profit_evaluation_type)
-            if profitable_positions_to_exit is not None:
-                logger.info(f"{ticker_pair}: number of profitable positions to exit: {len(profitable_positions_to_exit)}")
+    async def get_ticker_info_async(self, ticker_pair: str):
+        if ticker_pair in self.exchange_service.ticker_snapshot:
+            return self.exchange_service.ticker_snapshot[ticker_pair]
+
+        async with self.request_semaphore:
+            return await self.exchange_service.get_ticker_info_async(ticker_pair)
+
+    def get_ticker_pair(self, ticker: str) -> str:
+        return "{}/{}".format(ticker.upper(), self.currency.upper())
+
+    def has_enough_candles(self, ticker_pair: str, candles) -> bool:
+        if candles is None or len(candles) == 0:
+            logger.error(f"{ticker_pair}: unable to fetch ohlcv, skipping")
+            return False
+
+        if len(candles) < 4:
+            logger.warning(f"{ticker_pair}: not enough candles, candles len: {len(candles)}, skipping")
+            return False
+
+        return True
+
+    def evaluate_ticker(self, ticker_pair: str, candles: CandleFrame, all_positions, ticker_info):
+        if self.order_tracker.has_pending(ticker_pair):
+            # positions and balance for this ticker are settled once the order resolves
+            logger.info(f"{ticker_pair}: order pending, skipping evaluation")
+            return
+
+        with self.stage_metrics.span("positions", ticker_pair):
+            avg_position = self.position_book.get_avg_position(ticker_pair)
+
+        (profitable_positions_to_exit, trade_action) = self.ledger.evaluate(ticker_pair,
+                                                                            avg_position,
+                                                                            all_positions,
+                                                                            ticker_info,
+                                                                            lambda: self.execute_strategies(ticker_pair, avg_position, ticker_info, candles))
+        if profitable_positions_to_exit is not None:
+            logger.info(f"{ticker_pair}: number of profitable positions to exit: {len(profitable_positions_to_exit)}")
+            with self.stage_metrics.span("sell_order", ticker_pair):
                 self.handle_sell_order(ticker_pair, ticker_info, profitable_positions_to_exit)
-                continue
+            return
 
-            self.handle_cooldown(ticker_pair)
-            trade_action = execute_strategies(ticker_pair, 
-                                              self.strategies, 
-                                              avg_position, 
-                                              ticker_info, 
-                                              candles_df, 
-                                              self.strategies_overrides)
-            
-            if trade_action == TradeAction.BUY:
-                logger.info(f"{ticker_pair}: BUY signal triggered")
+        indicators.log_cache_stats(ticker_pair, candles)
+        
+        if trade_action == TradeAction.BUY:
+            logger.info(f"{ticker_pair}: BUY signal triggered")
+            with self.stage_metrics.span("buy_order", ticker_pair):
                 self.handle_buy_order(ticker_pair, ticker_info)    
-            elif trade_action == TradeAction.SELL:
-                logger.info(f'{ticker_pair}: SELL signal triggered but skipping selling until profit thresholds are met.')
+        elif trade_action == TradeAction.SELL:
+            logger.info(f'{ticker_pair}: SELL signal triggered but skipping selling until profit thresholds are met.')
 
-                # logger.info(f'{ticker_pair}: SELL signal triggered, number of lots being sold: {len(all_positions)}')
-                # self.handle_sell_order(ticker_pair, ticker_info, all_positions)
-      
-            time.sleep(self.crypto_currency_sleep_interval)
+            # logger.info(f'{ticker_pair}: SELL signal triggered, number of lots being sold: {len(all_positions)}')
+            # self.handle_sell_order(ticker_pair, ticker_info, all_positions)
         
     def handle_buy_order(self, ticker_pair: str, ticker_info = None):        
-        if self.ticker_in_cooldown(ticker_pair):
-            logger.warn(f"{ticker_pair} is in cooldown, skipping buy")
-            return None
-        
-        amount = self.amount_per_transaction
-        if ticker_pair in self.overrides:
-            if CONSTANTS.CONFIG_AMOUNT_PER_TRANSACTION in self.overrides[ticker_pair]:
-                amount = Decimal(self.overrides[ticker_pair][CONSTANTS.CONFIG_AMOUNT_PER_TRANSACTION])
-
-        if self.remaining_balance < amount:
-            logger.warn(f"{ticker_pair}: insufficient balance to place buy order, skipping")
+        amount = self.ledger.buy_amount(ticker_pair)
+        if amount is None:
             return None
         
         params = None
@@ -260,18 +426,35 @@ class CryptoBot:
                 CONSTANTS.PARAM_MARKET_ORDER_TYPE: 'market'
             }
         
+        submitted_at = time.time()
         order = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_CREATE_ORDER, params=params)
         if not order:
             logger.error(f"{ticker_pair}: FAILED to execute buy order")
             return None
         
-        self.remaining_balance -= amount
-        self.mongodb_service.insert_one(self.current_positions_collection, order)
-        self.start_cooldown(ticker_pair)
-        logger.info(f"{ticker_pair}: BUY executed. price: {order['price']}, shares: {order['filled']}, fees: {order['fee']['cost']}, remaining balance: {self.remaining_balance}")
+        self.ledger.reserve(ticker_pair, amount)
+        self.order_tracker.track(ticker_pair, 
+                                 order, 
+                                 on_fill=lambda filled_order: self.on_buy_order_filled(ticker_pair, filled_order),
+                                 on_cancel=lambda cancelled_order: self.on_buy_order_cancelled(ticker_pair, cancelled_order, amount),
+                                 submitted_at=submitted_at,
+                                 on_partial_fill=lambda partial_order: self.on_buy_order_partially_filled(ticker_pair, partial_order, amount))
 
         return order
 
+    def on_buy_order_filled(self, ticker_pair: str, order):
+        self.ledger.record_buy(order)
+        logger.info(f"{ticker_pair}: BUY executed. price: {order['price']}, shares: {order['filled']}, fees: {order['fee']['cost']}, remaining balance: {self.remaining_balance}")
+
+    def on_buy_order_cancelled(self, ticker_pair: str, order, amount: Decimal):
+        self.ledger.release(amount)
+        logger.warn(f"{ticker_pair}: buy order {order['id']} not filled, released {amount}, remaining balance: {self.remaining_balance}")
+
+    def on_buy_order_partially_filled(self, ticker_pair: str, order, amount: Decimal):
+        # keep the shares that were bought, release only what wasn't spent on them
+        unspent = self.ledger.record_partial_buy(order, amount)
+        logger.warn(f"{ticker_pair}: buy order {order['id']} ended {order['status']} with {order['filled']} shares filled, released {unspent}, remaining balance: {self.remaining_balance}")
+
     def handle_sell_order(self, ticker_pair: str, ticker_info, positions_to_exit):
         if "bid" not in ticker_info:
             logger.error(f"{ticker_info}: missing bid price in ticker_info, aborting handle_sell_order")
@@ -280,10 +463,8 @@ class CryptoBot:
         bid_price = ticker_info["bid"]
                     
         shares: float = 0.0
-        positions_to_delete = []
         for position in positions_to_exit:
             shares += position["filled"]
-            positions_to_delete.append(position["id"])
 
         rounded_shares = round_down(shares)
 
@@ -294,92 +475,74 @@ class CryptoBot:
             CONSTANTS.PARAM_PRICE: bid_price    
         }
 
+        submitted_at = time.time()
         order = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_CREATE_ORDER, params=params)
         if not order:
             logger.error(f"{ticker_pair}: FAILED to execute sell order")
             return None
 
+        self.order_tracker.track(ticker_pair, 
+                                 order, 
+                                 on_fill=lambda filled_order: self.on_sell_order_filled(ticker_pair, filled_order, positions_to_exit),
+                                 on_cancel=lambda cancelled_order: self.on_sell_order_cancelled(ticker_pair, cancelled_order),
+                                 submitted_at=submitted_at,
+                                 on_partial_fill=lambda partial_order: self.on_sell_order_partially_filled(ticker_pair, partial_order, positions_to_exit))
+        return order
+
+    def on_sell_order_cancelled(self, ticker_pair: str, order):
+        logger.warn(f"{ticker_pair}: sell order {order['id']} not filled, keeping positions")
+
+    def on_sell_order_partially_filled(self, ticker_pair: str, order, positions_to_exit):
+        (sold_positions, remainder) = split_sold_positions(positions_to_exit, float(order['filled']))
+        logger.warn(f"{ticker_pair}: sell order {order['id']} ended {order['status']} with {order['filled']} shares filled, exiting {len(sold_positions)} of {len(positions_to_exit)} positions")
+
+        closed_position = self.on_sell_order_filled(ticker_pair, order, sold_positions)
+        if remainder is not None:
+            # the lot the fill ended in stays open with the shares that weren't sold
+            self.position_book.add(remainder)
+        return closed_position
+
+    def on_sell_order_filled(self, ticker_pair: str, order, positions_to_exit):
         closed_position = {
             'sell_order': order,
             'closed_positions': positions_to_exit
         }
         self.mongodb_service.insert_one(self.closed_positions_collection, closed_position)
-        delete_filter = {
-            "id": {"$in": positions_to_delete}
-        }
-
-        deletion_result = self.mongodb_service.delete_many(self.current_positions_collection, delete_filter)
-        deletion_count = deletion_result.deleted_count
-        if deletion_count != len(positions_to_exit):
-            logger.warn(f"{ticker_pair}: mismatch of deleted positions, deletion count: {deletion_count}, positions exited:{len(positions_to_exit)}")
-
-        to_reinvest_percent = self.reinvestment_percent
-        if ticker_pair in self.overrides:
-            if CONSTANTS.CONFIG_REINVESTMENT_PERCENT in self.overrides[ticker_pair]:
-                to_reinvest_percent = Decimal(self.overrides[ticker_pair][CONSTANTS.CONFIG_REINVESTMENT_PERCENT])
-
-        proceeds = Decimal(order['info']['total_value_after_fees'])
-        if to_reinvest_percent > CONSTANTS.ZERO:
-            self.remaining_balance += (proceeds * to_reinvest_percent)
+        proceeds = self.ledger.record_sell(ticker_pair, order, positions_to_exit)
 
         logger.info(f"{ticker_pair}: SELL EXECUTED. price: {order['average']}, shares: {order['filled']}, proceeds: {proceeds}, remaining_balance: {self.remaining_balance}")
         return closed_position
 
-    def start_cooldown(self, ticker_pair):
-        self.ticker_trades_cooldown_periods[ticker_pair] = time.time()
-
-    def ticker_in_cooldown(self, ticker_pair):
-        if ticker_pair not in self.ticker_trades_cooldown_periods:
-            return False
-        
-        last_trade_timestamp = self.ticker_trades_cooldown_periods[ticker_pair]
-        elapse_time_minutes = self.get_elapse_time_mins(last_trade_timestamp)
-
-        trade_cooldown_period = self.trade_cooldown_period
-        if ticker_pair in self.overrides and CONSTANTS.CONFIG_TRADE_COOLDOWN_PERIOD in self.overrides[ticker_pair]:
-            trade_cooldown_period = self.overrides[ticker_pair][CONSTANTS.CONFIG_TRADE_COOLDOWN_PERIOD]
+    def log_metrics(self):
+        for (order_type, metrics) in self.order_tracker.get_latency_metrics().items():
+            logger.info(f"{order_type} order submit to fill latency: {metrics}")
+        for (op, metrics) in self.exchange_service.get_request_metrics().items():
+            logger.info(f"{op} exchange requests: {metrics}")
+        self.stage_metrics.log_if_due()
 
-        if elapse_time_minutes < trade_cooldown_period:
-            logger.info(f"{ticker_pair}: currently in cooldown, elapse {elapse_time_minutes} of {trade_cooldown_period} minutes so far")
-            return True
-        
-        return False
-
-    def handle_cooldown(self, ticker_pair):
-        if ticker_pair not in self.ticker_trades_cooldown_periods:
-            return 
-        
-        last_trade_timestamp = self.ticker_trades_cooldown_periods[ticker_pair]
-        elapse_time_minutes = self.get_elapse_time_mins(last_trade_timestamp)
-        
-        if elapse_time_minutes >= self.trade_cooldown_period:
-            logger.info(f"{ticker_pair}: resetting cooldown")
-            del self.ticker_trades_cooldown_periods[ticker_pair]
+    def start_metrics_server(self):
+        if not self.stage_metrics.enabled or self.metrics_port is None or self.metrics_server is not None:
+            return
+        self.metrics_server = MetricsServer(self.stage_metrics, self.metrics_port)
+        self.metrics_server.start()
 
-    def get_elapse_time_mins(self, timestamp):
-        current_time = time.time()
-        elapsed_time = current_time - timestamp
-        elapse_time_minutes = elapsed_time/60
+    def get_optimal_timeframe(self, ticker_pair):
+        # 1h candles for volatility check, served incrementally by the candle store
+        df = self.candle_store.update(ticker_pair, '1h')
+        return self.select_timeframe(ticker_pair, df)
 
-        return elapse_time_minutes
+    async def get_optimal_timeframe_async(self, ticker_pair):
+        df = await self.update_candles_async(ticker_pair, '1h')
+        return self.select_timeframe(ticker_pair, df)
 
-    def get_optimal_timeframe(self, ticker_pair):
-        # Fetch 1h candles for volatility check
-        ohlcv = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_OHLCV, params={"timeframe": '1h'})
-        if not ohlcv or len(ohlcv) < 15:
+    def select_timeframe(self, ticker_pair, df):
+        if df is None or len(df) < 15:
             return self.ohlcv_timeframe
 
-        df = pd.DataFrame(ohlcv, columns=['time', 'open', 'high', 'low', 'close', 'volume'])
-        
-        # Calculate ATR (14 periods)
-        high = df['high']
-        low = df['low']
-        close = df['close']
-        
         try:
-            atr = talib.ATR(high, low, close, timeperiod=14)
-            last_atr = atr.iloc[-1]
-            last_close = close.iloc[-1]
+            # Calculate ATR (14 periods)
+            last_atr = indicators.latest_atr(df, 14)
+            last_close = df['close'][-1]
             
             if last_close == 0:
                 return self.ohlcv_timeframe
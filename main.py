@@ -1,3 +1,4 @@
+import asyncio
 import os
 import ccxt
 from decimal import *
@@ -16,4 +17,7 @@ if __name__ == "__main__":
         exit()
     
     crypto_bot =  CryptoBot(MONGO_CONNECTION_STRING)
-    crypto_bot.run()
\ No newline at end of file
+    if crypto_bot.async_mode:
+        asyncio.run(crypto_bot.run_async())
+    else:
+        crypto_bot.run()
\ No newline at end of file
@@ -1,11 +1,15 @@
-import talib
+import numpy as np
+
 from decimal import *
 
-from .base_strategy import BaseStrategy
+import utils.indicators as indicators
+from .base_strategy import BaseStrategy, signal_codes
 from utils.logger import logger
 from utils.trading import TradeAction
 
 class AdaptiveRSI(BaseStrategy):
+    eval_cost = 3
+
     def __init__(self, config):
         parameters = config["parameters"]
         self.default_upper_threshold = parameters["default_upper_threshold"]
@@ -26,21 +30,14 @@ class AdaptiveRSI(BaseStrategy):
 
         return val
 
-    def eval(self, avg_position, candles_df, ticker_info):
-
-        rsi_key = "ADAPTIVE_RSI"
-        candles_df['close_normalized'] = candles_df['close'] * self.normalization_factor 
-
-        candles_df['price_change_std'] = candles_df['close_normalized'].pct_change().rolling(window=self.rsi_period).std()
-        candles_df["price_ma"] = candles_df['close_normalized'].rolling(window=self.trend_ma_period).mean()
-        candles_df[rsi_key] = talib.RSI(candles_df['close_normalized'], timeperiod=self.rsi_period)
+    def eval(self, avg_position, candles, ticker_info):
 
-        last_row = candles_df.iloc[-1]
+        scale = self.normalization_factor
 
-        rsi = last_row[rsi_key]
-        price_ma = last_row["price_ma"]
-        price_change_std = last_row['price_change_std']
-        closed_normalized = last_row['close_normalized']
+        rsi = indicators.latest_rsi(candles, self.rsi_period, scale=scale)
+        (price_ma, _) = indicators.latest_rolling_stats(candles, self.trend_ma_period, scale=scale)
+        price_change_std = indicators.latest_pct_change_std(candles, self.rsi_period, scale=scale)
+        closed_normalized = candles['close'][-1] * scale
 
         # Adjust thresholds for volatility
         volatility_upper_threshold = self.default_upper_threshold + (price_change_std * self.volatility_factor)
@@ -54,7 +51,7 @@ class AdaptiveRSI(BaseStrategy):
         lower_threshold = self.clip(trend_lower_threshold, upper=40, lower=10)
 
         ticker = ticker_info["symbol"]
-        logger.info(f"{ticker}: std dev: {last_row['price_change_std']}, shift: {threshold_shift}")
+        logger.info(f"{ticker}: std dev: {price_change_std}, shift: {threshold_shift}")
 
         logger.info(f"{ticker}: ADAPTIVE RSI: {rsi}, upper: {upper_threshold}, lower: {lower_threshold}")
 
@@ -74,4 +71,16 @@ class AdaptiveRSI(BaseStrategy):
         
         return action
 
+    def signals(self, candles):
+        scale = self.normalization_factor
+
+        rsi = indicators.rsi(candles, self.rsi_period, scale=scale)
+        price_ma = indicators.rolling_mean(candles, self.trend_ma_period, scale=scale)
+        price_change_std = indicators.pct_change_std(candles, self.rsi_period, scale=scale)
+        closed_normalized = candles['close'] * scale
+
+        threshold_shift = ((closed_normalized - price_ma) / price_ma) * self.trend_factor
+        upper_threshold = np.clip(self.default_upper_threshold + (price_change_std * self.volatility_factor) + threshold_shift, 55, 90)
+        lower_threshold = np.clip(self.default_lower_threshold - (price_change_std * self.volatility_factor) + threshold_shift, 10, 40)
 
+        return signal_codes(rsi < lower_threshold, rsi > upper_threshold)
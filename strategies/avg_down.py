@@ -6,12 +6,13 @@ from utils.logger import logger
 from utils.trading import TradeAction
 
 class AverageDown(BaseStrategy):
+    eval_cost = 0
 
     def __init__(self, config):
         self.threshold_percent = Decimal(-config["parameters"]["threshold_percent"]/100)
         super().__init__(config)
 
-    def eval(self, avg_position, candles_df, ticker_info):
+    def eval(self, avg_position, candles, ticker_info):
         if not self.enabled:
             return TradeAction.NOOP
         
@@ -1,9 +1,34 @@
+import numpy as np
+
 from decimal import *
 from utils.trading import calculate_profit_percent
 from utils.logger import logger
 from utils.trading import TradeAction
 
+# batch signal codes, see BaseStrategy.signals
+SIGNAL_SELL = -1
+SIGNAL_NOOP = 0
+SIGNAL_BUY = 1
+SIGNAL_ACTIONS = {
+    SIGNAL_SELL: TradeAction.SELL,
+    SIGNAL_NOOP: TradeAction.NOOP,
+    SIGNAL_BUY: TradeAction.BUY
+}
+
+def signal_codes(buy, sell) -> np.ndarray:
+    """
+    Combines boolean buy/sell arrays into signal codes, SELL wins like the
+    if/elif order in the eval methods.
+    """
+    return np.where(sell, SIGNAL_SELL, np.where(buy, SIGNAL_BUY, SIGNAL_NOOP)).astype(np.int8)
+
 class BaseStrategy:
+    # relative cost of eval, the scoring evaluates cheaper strategies first
+    # and skips the rest once their votes can't change the outcome
+    eval_cost = 1
+    # eval keeps state for later evals, so the scoring never skips it
+    stateful = False
+
     def __init__(self, config):
         self.name = config["name"]
         self.priority = config["priority"]
@@ -20,9 +45,19 @@ class BaseStrategy:
         if "normalization_factor" in config:
                 self.normalization_factor = config["normalization_factor"]
         
-    def eval(self, avg_position, candles_df, ticker_info) -> TradeAction:
+    def eval(self, avg_position, candles, ticker_info) -> TradeAction:
         pass
 
+    def signals(self, candles) -> np.ndarray:
+        """
+        Batch counterpart of eval for strategies that only read candles: the
+        signal eval would return for every prefix of candles, as SIGNAL_*
+        codes, in one vectorized pass over the full history.  prevent_loss
+        is not applied, it depends on the position at the time.  Strategies
+        that depend on positions return None.
+        """
+        return None
+
     def prevent_loss_eval(self, avg_position, ticker_info, curr_action):
         if avg_position is None:
             return TradeAction.NOOP
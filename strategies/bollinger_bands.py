@@ -1,10 +1,13 @@
 from decimal import *
 
-from .base_strategy import BaseStrategy
+import utils.indicators as indicators
+from .base_strategy import BaseStrategy, signal_codes
 from utils.logger import logger
 from utils.trading import TradeAction
 
 class BollingerBands(BaseStrategy):
+    eval_cost = 1
+
     def __init__(self, config):
         
         parameters = config["parameters"]
@@ -14,23 +17,13 @@ class BollingerBands(BaseStrategy):
         super().__init__(config)
 
 
-    def eval(self, avg_position, candles_df, ticker_info):
+    def eval(self, avg_position, candles, ticker_info):
         if not self.enabled:
             return TradeAction.NOOP
         
-        middle_band_key = "middle_band"
-        upper_band_key = "upper_band"
-        lower_band_key = "lower_band"
-        close_key = "close"
-
-        candles_df[middle_band_key] = candles_df[close_key].rolling(self.window).mean()
-        candles_df[upper_band_key] = candles_df[middle_band_key] + self.std_dev * candles_df[close_key].rolling(self.window).std()
-        candles_df[lower_band_key] = candles_df[middle_band_key] - self.std_dev * candles_df[close_key].rolling(self.window).std()
+        (_, upper_band, lower_band) = indicators.latest_bollinger_bands(candles, self.window, self.std_dev)
 
-        last_row = candles_df.iloc[-1]
-        close = last_row[close_key]
-        upper_band = last_row[upper_band_key]
-        lower_band = last_row[lower_band_key]
+        close = candles['close'][-1]
 
         action = TradeAction.NOOP
         if close > upper_band:
@@ -46,3 +39,10 @@ class BollingerBands(BaseStrategy):
         
         return action
 
+    def signals(self, candles):
+        (_, upper_band, lower_band) = indicators.bollinger_bands(candles, self.window, self.std_dev)
+        close = candles['close']
+        signals = signal_codes(close < lower_band, close > upper_band)
+        if not self.enabled:
+            signals[:] = 0
+        return signals
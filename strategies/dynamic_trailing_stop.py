@@ -1,4 +1,5 @@
 from decimal import Decimal
+from pymongo import ASCENDING
 
 from .base_strategy import BaseStrategy
 from utils.trading import calculate_profit_percent, TradeAction
@@ -18,6 +19,9 @@ class DynamicTrailingStop(BaseStrategy):
     Note: This is SOFTWARE-based trailing stop, not exchange order type.
     The bot tracks high water marks and triggers sells via normal limit orders.
     """
+    eval_cost = 0
+    # tracks each position's high water mark across evals
+    stateful = True
     
     def __init__(self, config, mongodb_service=None):
         parameters = config["parameters"]
@@ -42,6 +46,8 @@ class DynamicTrailingStop(BaseStrategy):
         
         # Load state from DB if available
         if self.mongodb_service:
+            self.mongodb_service.declare_index(self.collection_name, [("strategy", ASCENDING), ("position_id", ASCENDING)],
+                                               f"{self.name}: state upsert/delete by (strategy, position_id)")
             self._load_state()
 
     def _load_state(self):
@@ -88,7 +94,7 @@ class DynamicTrailingStop(BaseStrategy):
         except Exception as e:
             logger.error(f"{self.name}: Failed to delete state for {position_id}: {e}")
 
-    def eval(self, avg_position, candles_df, ticker_info):
+    def eval(self, avg_position, candles, ticker_info):
         if not self.enabled:
             return TradeAction.NOOP
         
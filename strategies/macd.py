@@ -1,11 +1,13 @@
-import talib
 from decimal import *
 
-from .base_strategy import BaseStrategy
+import utils.indicators as indicators
+from .base_strategy import BaseStrategy, signal_codes
 from utils.logger import logger
 from utils.trading import TradeAction
 
 class MACD(BaseStrategy):
+    eval_cost = 2
+
     def __init__(self, config):
         self.fastperiod=12
         self.slowperiod=26 
@@ -26,22 +28,11 @@ class MACD(BaseStrategy):
         super().__init__(config)
 
 
-    def eval(self, avg_position, candles_df, ticker_info):
+    def eval(self, avg_position, candles, ticker_info):
         if not self.enabled:
             return TradeAction.NOOP
         
-        macd_key = "MACD"
-        macd_signal_key = "MACD_signal"
-
-        candles_df[macd_key], candles_df[macd_signal_key], _ = talib.MACD(candles_df['close'], fastperiod=self.fastperiod, slowperiod=self.slowperiod, signalperiod=self.signalperiod)
-        
-        last_row = candles_df.iloc[-1]
-        macd = last_row[macd_key]
-        macd_signal = last_row[macd_signal_key]
-
-        prev_row = candles_df.iloc[-3]
-        prev_macd = prev_row[macd_key]
-        prev_macd_signal = prev_row[macd_signal_key]
+        (macd, macd_signal, _) = indicators.latest_macd(candles, self.fastperiod, self.slowperiod, self.signalperiod)
 
         ticker = ticker_info["symbol"]
 
@@ -58,4 +49,9 @@ class MACD(BaseStrategy):
         
         return action
 
-
+    def signals(self, candles):
+        (macd, macd_signal, _) = indicators.macd(candles, self.fastperiod, self.slowperiod, self.signalperiod)
+        signals = signal_codes((macd_signal > macd) & (macd_signal < 0), (macd_signal < macd) & (macd_signal > 0))
+        if not self.enabled:
+            signals[:] = 0
+        return signals
@@ -1,7 +1,10 @@
-import talib
+import numpy as np
+
 from decimal import Decimal
+from numpy.lib.stride_tricks import sliding_window_view
 
-from .base_strategy import BaseStrategy
+import utils.indicators as indicators
+from .base_strategy import BaseStrategy, signal_codes
 from utils.logger import logger
 from utils.trading import TradeAction
 
@@ -13,6 +16,7 @@ class PriceMomentum(BaseStrategy):
     This catches "panic sells" and sharp dips that occur faster than
     indicators can respond to.
     """
+    eval_cost = 2
     
     def __init__(self, config):
         parameters = config["parameters"]
@@ -31,42 +35,39 @@ class PriceMomentum(BaseStrategy):
         
         super().__init__(config)
 
-    def eval(self, avg_position, candles_df, ticker_info):
+    def eval(self, avg_position, candles, ticker_info):
         if not self.enabled:
             return TradeAction.NOOP
         
         ticker = ticker_info["symbol"]
         
         # Need enough candles for analysis
-        if len(candles_df) < 20:
+        if len(candles) < 20:
             return TradeAction.NOOP
         
         # Calculate RSI to avoid buying overbought conditions
-        rsi_key = "RSI_momentum"
-        candles_df[rsi_key] = talib.RSI(candles_df['close'] * self.normalization_factor, timeperiod=14)
+        current_rsi = indicators.latest_rsi(candles, 14, scale=self.normalization_factor)
         
         # Get recent candles for drop analysis
-        recent_candles = candles_df.tail(self.lookback_candles + 1)
+        recent_start = -(self.lookback_candles + 1)
         
         # Calculate price change from N candles ago to now
-        price_start = recent_candles.iloc[0]['close']
-        price_current = recent_candles.iloc[-1]['close']
-        price_high_in_period = recent_candles['high'].max()
+        price_current = candles['close'][-1]
+        price_high_in_period = candles['high'][recent_start:].max()
         
         # Calculate drop from recent high to current
         drop_percent = ((price_current - price_high_in_period) / price_high_in_period) * 100
         
         # Check volume confirmation (current volume vs average)
-        avg_volume = candles_df['volume'].tail(20).mean()
-        current_volume = recent_candles.iloc[-1]['volume']
+        avg_volume = candles['volume'][-20:].mean()
+        current_volume = candles['volume'][-1]
         volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
-        
-        current_rsi = recent_candles.iloc[-1][rsi_key]
+
         
         # DIAGNOSTIC: Always log the values for debugging
         logger.debug(f'{ticker}: {self.name} evaluation - '
                     f'drop: {drop_percent:.2f}%, RSI: {current_rsi:.1f}, '
-                    f'volume: {volume_ratio:.2f}x avg, candles: {len(candles_df)}')
+                    f'volume: {volume_ratio:.2f}x avg, candles: {len(candles)}')
         
         # BUY CONDITIONS:
         # 1. Sharp drop detected
@@ -90,3 +91,23 @@ class PriceMomentum(BaseStrategy):
         
         return TradeAction.NOOP
 
+    def signals(self, candles):
+        signals = np.zeros(len(candles), dtype=np.int8)
+        if not self.enabled or len(candles) < 20:
+            return signals
+
+        current_rsi = indicators.rsi(candles, 14, scale=self.normalization_factor)[19:]
+        price_current = candles['close'][19:]
+
+        # eval takes the max over at most lookback_candles + 1 candles
+        price_high_in_period = indicators.rolling(candles['high'], self.lookback_candles + 1, min_periods=1).max().to_numpy()[19:]
+        drop_percent = ((price_current - price_high_in_period) / price_high_in_period) * 100
+
+        # numpy means over the same 20 candle windows as eval, so they match it exactly
+        avg_volume = sliding_window_view(candles['volume'], 20).mean(axis=1)
+        current_volume = candles['volume'][19:]
+        volume_ratio = np.divide(current_volume, avg_volume, out=np.zeros(len(avg_volume)), where=avg_volume > 0)
+
+        buy = (drop_percent <= -self.min_drop_percent) & (current_rsi < self.rsi_max_threshold) & (volume_ratio >= self.volume_confirmation_multiplier)
+        signals[19:] = signal_codes(buy, False)
+        return signals
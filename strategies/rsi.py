@@ -1,11 +1,13 @@
-import talib
 from decimal import *
 
-from .base_strategy import BaseStrategy
+import utils.indicators as indicators
+from .base_strategy import BaseStrategy, signal_codes
 from utils.logger import logger
 from utils.trading import TradeAction
 
 class RSI(BaseStrategy):
+    eval_cost = 1
+
     def __init__(self, config):
         parameters = config["parameters"]
         self.overbought_signal_threshold = parameters["overbought_signal_threshold"]
@@ -22,23 +24,17 @@ class RSI(BaseStrategy):
         super().__init__(config)
 
 
-    def eval(self, avg_position, candles_df, ticker_info):
-        rsi_key = "RSI"
-        candles_df[rsi_key] = talib.RSI(candles_df['close'] * self.normalization_factor, timeperiod=self.timeperiod)
-
-        #last_row = candles_df.iloc[-1]
-
-        candles_to_evaluate = candles_df.tail(self.num_candles_required)
-        #rsi = last_row[rsi_key]
+    def eval(self, avg_position, candles, ticker_info):
+        rsi = indicators.latest_rsi(candles, self.timeperiod, scale=self.normalization_factor)
 
         ticker = ticker_info["symbol"]
         #logger.info(f"{ticker}: REGULAR RSI: {rsi}")
 
         action = TradeAction.NOOP
-        if candles_to_evaluate[rsi_key].iloc[-1] > self.overbought_signal_threshold:
+        if rsi > self.overbought_signal_threshold:
             logger.debug(f'{ticker}: {self.name} triggered SELL signal')
             action = TradeAction.SELL
-        elif candles_to_evaluate[rsi_key].iloc[-1] < self.oversold_signal_threshold:
+        elif rsi < self.oversold_signal_threshold:
             logger.debug(f'{ticker}: {self.name} triggered BUY signal')
             action = TradeAction.BUY
 
@@ -47,4 +43,6 @@ class RSI(BaseStrategy):
         
         return action
 
-
+    def signals(self, candles):
+        rsi = indicators.rsi(candles, self.timeperiod, scale=self.normalization_factor)
+        return signal_codes(rsi < self.oversold_signal_threshold, rsi > self.overbought_signal_threshold)
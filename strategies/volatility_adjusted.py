@@ -1,7 +1,10 @@
-import talib
+import numpy as np
+import pandas as pd
+
 from decimal import Decimal
 
-from .base_strategy import BaseStrategy
+import utils.indicators as indicators
+from .base_strategy import BaseStrategy, SIGNAL_NOOP
 from utils.logger import logger
 from utils.trading import TradeAction
 
@@ -16,6 +19,9 @@ class VolatilityAdjusted(BaseStrategy):
     
     This acts as a "signal enhancer" for other strategies.
     """
+    eval_cost = 1
+    # the scoring reads the volatility left by the previous eval
+    stateful = True
     
     def __init__(self, config):
         parameters = config["parameters"]
@@ -35,27 +41,18 @@ class VolatilityAdjusted(BaseStrategy):
         # Store last calculated volatility for external access
         self.last_volatility_state = {}
 
-    def calculate_volatility(self, candles_df, ticker):
+    def calculate_volatility(self, candles, ticker):
         """
         Calculate ATR-based volatility as percentage of price.
         Returns: (volatility_pct, volatility_state)
         volatility_state: "high", "medium", "low"
         """
-        if len(candles_df) < self.atr_period + 1:
+        if len(candles) < self.atr_period + 1:
             return None, "unknown"
         
         # Calculate ATR
-        atr_key = "ATR"
-        candles_df[atr_key] = talib.ATR(
-            candles_df['high'], 
-            candles_df['low'], 
-            candles_df['close'], 
-            timeperiod=self.atr_period
-        )
-        
-        last_row = candles_df.iloc[-1]
-        atr = last_row[atr_key]
-        current_price = last_row['close']
+        atr = indicators.latest_atr(candles, self.atr_period)
+        current_price = candles['close'][-1]
         
         if current_price == 0 or atr is None:
             return None, "unknown"
@@ -73,13 +70,13 @@ class VolatilityAdjusted(BaseStrategy):
         
         return volatility_pct, volatility_state
 
-    def eval(self, avg_position, candles_df, ticker_info):
+    def eval(self, avg_position, candles, ticker_info):
         if not self.enabled:
             return TradeAction.NOOP
         
         ticker = ticker_info["symbol"]
         
-        volatility_pct, volatility_state = self.calculate_volatility(candles_df, ticker)
+        volatility_pct, volatility_state = self.calculate_volatility(candles, ticker)
         
         if volatility_pct is None:
             return TradeAction.NOOP
@@ -124,3 +121,28 @@ class VolatilityAdjusted(BaseStrategy):
         else:
             return Decimal("1.0")  # neutral
 
+    def signals(self, candles):
+        # the volatility only feeds the scoring, see volatility_multipliers
+        return np.full(len(candles), SIGNAL_NOOP, dtype=np.int8)
+
+    def volatility_multipliers(self, candles) -> np.ndarray:
+        """
+        Batch counterpart of eval followed by get_volatility_multiplier: the
+        multiplier for the state left by evaluating every prefix of candles.
+        """
+        if not self.enabled or len(candles) < self.atr_period + 1:
+            return np.ones(len(candles))
+
+        atr = indicators.atr(candles, self.atr_period)[self.atr_period:]
+        current_price = candles['close'][self.atr_period:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            volatility_pct = atr / current_price
+
+        known = (current_price != 0) & ~np.isnan(atr)
+        state_multipliers = np.where(volatility_pct >= float(self.high_volatility_threshold), 0.7,
+                                     np.where(volatility_pct <= float(self.low_volatility_threshold), 1.3, 1.0))
+        multipliers = np.full(len(candles), np.nan)
+        multipliers[self.atr_period:] = np.where(known, state_multipliers, np.nan)
+
+        # an unknown volatility leaves the previous state in place
+        return pd.Series(multipliers, copy=False).ffill().fillna(1.0).to_numpy()
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# keep the bot's log file out of the working tree while tests run
+os.environ.setdefault("LOG_DIRECTORY", os.path.join(tempfile.gettempdir(), "crypto_bot_test_logs"))
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from utils.candle_frame import CandleFrame
+
+ONE_MINUTE_MS = 60 * 1000
+OHLCV_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
+
+def generate_ohlcv(num_candles: int = 300, start_price: float = 10.0, seed: int = 7, start_timestamp: int = 1698926400000):
+    """
+    Deterministic random-walk candles, returned as ccxt-style ohlcv lists.
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.01, num_candles)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.005, num_candles)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.uniform(100, 1000, num_candles)
+
+    ohlcv = []
+    for idx in range(num_candles):
+        ohlcv.append([start_timestamp + idx * ONE_MINUTE_MS, float(open_[idx]), float(high[idx]), float(low[idx]), float(close[idx]), float(volume[idx])])
+    return ohlcv
+
+def generate_candles_df(num_candles: int = 300, start_price: float = 10.0, seed: int = 7) -> pd.DataFrame:
+    return pd.DataFrame(generate_ohlcv(num_candles, start_price, seed), columns=OHLCV_COLUMNS)
+
+def generate_candle_frame(num_candles: int = 300, start_price: float = 10.0, seed: int = 7) -> CandleFrame:
+    return CandleFrame.from_ohlcv(generate_ohlcv(num_candles, start_price, seed))
@@ -0,0 +1,151 @@
+import asyncio
+import copy
+import ccxt
+
+from tests.fixtures.ticker_info import ATOM_TICKER_INFO, MATIC_TICKER_INFO
+
+OHLCV_CANDLES = [
+    [1698926400000, 7.90, 7.98, 7.85, 7.94, 1200.0],
+    [1698930000000, 7.94, 8.02, 7.91, 8.00, 1350.0],
+    [1698933600000, 8.00, 8.05, 7.96, 7.97, 980.0],
+    [1698937200000, 7.97, 7.99, 7.80, 7.82, 2100.0],
+    [1698940800000, 7.82, 7.90, 7.78, 7.88, 1500.0]
+]
+
+TICKERS = {
+    ATOM_TICKER_INFO["symbol"]: ATOM_TICKER_INFO,
+    MATIC_TICKER_INFO["symbol"]: MATIC_TICKER_INFO
+}
+
+
+class FakeExchangeClient:
+    """
+    Minimal stand-in for a ccxt exchange client, serving canned tickers and
+    candles and recording every call it receives.
+    """
+    def __init__(self, tickers=None, ohlcv=None, page_size=None, bounded_pages=False):
+        self.tickers = copy.deepcopy(TICKERS if tickers is None else tickers)
+        self.ohlcv = copy.deepcopy(OHLCV_CANDLES if ohlcv is None else ohlcv)
+        # candles per fetch_ohlcv page when no limit is given, like exchange defaults
+        self.page_size = page_size
+        # like coinbase, only serve the limit * timeframe window after since
+        self.bounded_pages = bounded_pages
+        self.calls = []
+        self.since_params = []
+        self.orders = {}
+        self.has = {
+            "fetchTicker": True,
+            "fetchTickers": True,
+            "fetchOHLCV": True,
+            "createOrder": True,
+            "fetchOrder": True,
+            "fetchOrders": False,
+            "fetchOpenOrders": False,
+            "cancelOrder": True
+        }
+
+    def fetch_ticker(self, symbol):
+        self.calls.append(("fetch_ticker", symbol))
+        return copy.deepcopy(self.tickers[symbol])
+
+    def fetch_tickers(self, symbols=None):
+        self.calls.append(("fetch_tickers", tuple(symbols)))
+        return {symbol: copy.deepcopy(self.tickers[symbol]) for symbol in symbols if symbol in self.tickers}
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        self.calls.append(("fetch_ohlcv", symbol, timeframe))
+        self.since_params.append(since)
+        candles = [candle for candle in self.ohlcv if since is None or candle[0] >= since]
+        if limit is None:
+            limit = self.page_size
+        if self.bounded_pages and since is not None and limit is not None:
+            window_end = since + limit * ccxt.Exchange.parse_timeframe(timeframe) * 1000
+            candles = [candle for candle in candles if candle[0] < window_end]
+        if limit is not None:
+            candles = candles[:limit] if since is not None else candles[-limit:]
+        return copy.deepcopy(candles)
+
+    def create_order(self, symbol, type, side, amount, price=None):
+        self.calls.append(("create_order", symbol, side))
+        order_id = str(len(self.orders) + 1)
+        price = None if price is None else float(price)
+        self.orders[order_id] = {
+            "id": order_id,
+            "symbol": symbol,
+            "type": type,
+            "side": side,
+            "amount": amount,
+            "price": price,
+            "average": price,
+            "filled": 0.0,
+            "cost": 0.0,
+            "status": "open",
+            "fee": {"cost": 0.0},
+            "info": {"order_id": order_id, "total_value_after_fees": "0"}
+        }
+        return copy.deepcopy(self.orders[order_id])
+
+    def create_market_buy_order(self, symbol, cost):
+        order = self.create_order(symbol, "market", "buy", cost)
+        self.orders[order["id"]]["price"] = None
+        return copy.deepcopy(self.orders[order["id"]])
+
+    def create_market_sell_order(self, symbol, amount):
+        return self.create_order(symbol, "market", "sell", amount)
+
+    def fill_order(self, order_id, filled=None):
+        """
+        Test helper, fills the order completely unless a partial amount is given.
+        """
+        order = self.orders[order_id]
+        order["filled"] = order["amount"] if filled is None else filled
+        order["cost"] = float(order["filled"]) * (order["price"] or 1.0)
+        if order["filled"] == order["amount"]:
+            order["status"] = "closed"
+
+    def fetch_order(self, order_id):
+        self.calls.append(("fetch_order", order_id))
+        return copy.deepcopy(self.orders[order_id])
+
+    def fetch_orders(self, symbol, since=None, limit=None):
+        self.calls.append(("fetch_orders", symbol))
+        return [copy.deepcopy(order) for order in self.orders.values() if order["symbol"] == symbol]
+
+    def fetch_open_orders(self, symbol):
+        self.calls.append(("fetch_open_orders", symbol))
+        return [copy.deepcopy(order) for order in self.orders.values() if order["symbol"] == symbol and order["status"] == "open"]
+
+    def cancel_order(self, order_id, symbol=None):
+        self.calls.append(("cancel_order", order_id))
+        self.orders[order_id]["status"] = "canceled"
+        return copy.deepcopy(self.orders[order_id])
+
+
+class FakeAsyncExchangeClient(FakeExchangeClient):
+    def __init__(self, tickers=None, ohlcv=None, delay=0.0, page_size=None, bounded_pages=False):
+        super().__init__(tickers, ohlcv, page_size, bounded_pages)
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    async def _track(self, result):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return result
+
+    async def fetch_ticker(self, symbol):
+        return await self._track(FakeExchangeClient.fetch_ticker(self, symbol))
+
+    async def fetch_tickers(self, symbols=None):
+        return await self._track(FakeExchangeClient.fetch_tickers(self, symbols))
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        return await self._track(FakeExchangeClient.fetch_ohlcv(self, symbol, timeframe, since, limit))
+
+    async def close(self):
+        self.closed = True
@@ -0,0 +1,104 @@
+import json
+import unittest
+import numpy as np
+import pandas as pd
+
+from decimal import Decimal
+from backtesting.engine import Backtester, PairReplay
+from backtesting.fill_model import FillModel
+from tests.fixtures.candles import generate_ohlcv, OHLCV_COLUMNS
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, SOL_TICKER_PAIR
+
+CONFIG_FILE = "./tests/fixtures/configs/backtest_config.json"
+FIVE_MINUTES_MS = 5 * 60 * 1000
+
+def resample(ohlcv, timeframe_ms):
+    candles_df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+    candles_df["time"] = candles_df["time"] - candles_df["time"] % timeframe_ms
+    return candles_df.groupby("time", as_index=False).agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+
+class TestPairReplay(unittest.TestCase):
+
+    def test_frames_hold_closed_candles_and_the_forming_one(self):
+        ohlcv = np.array(generate_ohlcv(num_candles=203, start_timestamp=1698926400000 + 2 * 60 * 1000))
+        replay = PairReplay(ATOM_TICKER_PAIR, ohlcv, FIVE_MINUTES_MS, max_candles=10)
+
+        for idx in range(len(replay)):
+            candles = replay.step(idx)
+            expected = resample(ohlcv[:idx + 1], FIVE_MINUTES_MS).tail(10)
+
+            self.assertEqual(len(candles), len(expected))
+            for column in OHLCV_COLUMNS:
+                np.testing.assert_allclose(candles[column], expected[column].to_numpy(dtype=np.float64), rtol=1e-12)
+
+            self.assertEqual(list(replay.candles), [list(row) for row in np.column_stack([candles[column] for column in OHLCV_COLUMNS])])
+
+
+class TestFillModel(unittest.TestCase):
+
+    def test_fills_charge_fees_on_both_sides(self):
+        fill_model = FillModel(fee_rate=0.01, slippage=0.001, spread=0.002)
+        ticker_info = fill_model.get_ticker_info(ATOM_TICKER_PAIR, 10.0, 0)
+        self.assertAlmostEqual(ticker_info["ask"], 10.01)
+        self.assertAlmostEqual(ticker_info["bid"], 9.99)
+
+        buy_order = fill_model.buy(ATOM_TICKER_PAIR, Decimal(100), ticker_info, 0)
+        self.assertEqual(buy_order["status"], "closed")
+        self.assertAlmostEqual(buy_order["price"], 10.01 * 1.001)
+        self.assertAlmostEqual(buy_order["cost"], buy_order["filled"] * buy_order["price"])
+        self.assertAlmostEqual(buy_order["fee"]["cost"], buy_order["cost"] * 0.01)
+
+        sell_order = fill_model.sell(ATOM_TICKER_PAIR, buy_order["filled"], ticker_info, 0)
+        self.assertAlmostEqual(sell_order["price"], 9.99 * 0.999)
+        self.assertAlmostEqual(float(sell_order["info"]["total_value_after_fees"]), sell_order["cost"] * 0.99)
+        self.assertNotEqual(sell_order["id"], buy_order["id"])
+
+
+class TestBacktester(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE) as f:
+            self.config = json.load(f)
+
+        self.ohlcv_by_pair = {
+            ATOM_TICKER_PAIR: np.array(generate_ohlcv(num_candles=3000, seed=3)),
+            SOL_TICKER_PAIR: np.array(generate_ohlcv(num_candles=3000, start_price=20.0, seed=5))
+        }
+
+    def test_accounting_adds_up(self):
+        result = Backtester(self.config, FillModel(fee_rate=0.004)).run(self.ohlcv_by_pair)
+        summary = result.summary()
+
+        self.assertGreater(summary["buys"], 0)
+        self.assertGreater(summary["sells"], 0)
+        self.assertAlmostEqual(summary["pnl"], summary["realized_pnl"] + summary["unrealized_pnl"])
+        self.assertEqual(len(result.timestamps), 3000)
+        self.assertEqual(len(result.equity), len(result.timestamps))
+        self.assertTrue((result.exposure >= 0).all())
+
+        for trade in result.trades:
+            self.assertAlmostEqual(trade["fee"], trade["cost"] * 0.004)
+            if trade["side"] == "sell":
+                self.assertGreater(trade["realized_pnl"], 0)
+
+    def test_buys_follow_overrides_and_cooldowns(self):
+        result = Backtester(self.config).run(self.ohlcv_by_pair)
+        buys = result.trades_df().query("side == 'buy'")
+
+        for (ticker_pair, amount) in [(ATOM_TICKER_PAIR, 5), (SOL_TICKER_PAIR, 10)]:
+            pair_buys = buys[buys["ticker_pair"] == ticker_pair]
+            self.assertGreater(len(pair_buys), 0)
+            self.assertTrue((pair_buys["cost"] <= amount).all())
+            self.assertTrue((np.diff(pair_buys["time"]) >= 20 * 60 * 1000).all())
+
+    def test_runs_are_repeatable(self):
+        backtester = Backtester(self.config)
+        first = backtester.run(self.ohlcv_by_pair)
+        second = backtester.run(self.ohlcv_by_pair)
+
+        self.assertEqual(first.trades, second.trades)
+        np.testing.assert_array_equal(first.equity, second.equity)
+
+
+if __name__ == '__main__':
+    unittest.main()
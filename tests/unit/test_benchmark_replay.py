@@ -0,0 +1,83 @@
+import os
+import time
+import tempfile
+import unittest
+import mongomock
+
+import utils.constants as CONSTANTS
+from benchmark.main import benchmark_config, create_bot
+from benchmark.replay import RecordingExchangeClient, ReplayExchangeClient, benchmark
+from tests.fixtures.candles import generate_ohlcv, ONE_MINUTE_MS
+from tests.fixtures.fake_exchange import FakeExchangeClient
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR
+
+BOT_CONFIG = {
+    "max_spend": 50,
+    "amount_per_transaction": 5,
+    "currency": "USD",
+    "ohlcv_timeframe": "1m",
+    "take_profits": {
+        "threshold_percent": 2,
+        "evaluation_type": "INDIVIDUAL_LOTS"
+    },
+    "db": {
+        "db_type": "mongodb",
+        "db_name": "crypto-bot-benchmark",
+        "current_positions_collection": "benchmark_positions",
+        "closed_positions_collection": "benchmark_sell_orders"
+    },
+    "exchange": {},
+    "supported_crypto_currencies": ["ATOM", "MATIC"],
+    "strategies": [
+        {
+            "name": "RSI",
+            "priority": 1,
+            "parameters": {
+                "overbought_signal_threshold": 70,
+                "oversold_signal_threshold": 30
+            }
+        }
+    ]
+}
+
+class TestBenchmarkReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.recording_path = os.path.join(self.tmp_dir.name, "recording.json")
+        self.config = benchmark_config(BOT_CONFIG)
+
+        exchange_client = RecordingExchangeClient(FakeExchangeClient(ohlcv=generate_ohlcv(num_candles=120)))
+        self.recording_bot = create_bot(self.config, exchange_client)
+        self.recording_bot.run(max_cycles=2)
+        exchange_client.save(self.recording_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        self.recording_bot.mongodb_service.delete_many(BOT_CONFIG["db"]["current_positions_collection"])
+
+    def test_replays_recorded_responses(self):
+        replay_client = ReplayExchangeClient(self.recording_path)
+        key = f"{CONSTANTS.OP_FETCH_OHLCV}|{ATOM_TICKER_PAIR}|1m"
+        self.assertEqual(len(replay_client.responses[key]), 2)
+
+        # shifted by whole minutes so the newest candle is current again
+        newest = replay_client.fetch_ohlcv(ATOM_TICKER_PAIR)[-1][0]
+        self.assertEqual(newest % ONE_MINUTE_MS, 0)
+        self.assertLess(abs(time.time() * 1000 - newest), 2 * ONE_MINUTE_MS)
+
+        # the last response repeats once the recording runs out
+        replay_client.fetch_ohlcv(ATOM_TICKER_PAIR)
+        self.assertEqual(replay_client.fetch_ohlcv(ATOM_TICKER_PAIR), replay_client.fetch_ohlcv(ATOM_TICKER_PAIR))
+
+    def test_benchmark_reports_stages_and_throughput(self):
+        crypto_bot = create_bot(self.config, ReplayExchangeClient(self.recording_path))
+        report = benchmark(crypto_bot, cycles=5)
+
+        self.assertEqual((report["cycles"], report["tickers"]), (5, 10))
+        self.assertGreater(report["tickers_per_second"], 0)
+        for stage in ["fetch", "frame_build", "position_query", "take_profit", "strategy_eval"]:
+            self.assertIn(stage, report["stages"])
+        self.assertEqual(report["stages"]["strategy_eval"]["count"], 10)
+        # one snapshot per cycle and one ohlcv fetch per ticker
+        self.assertEqual(report["stages"]["fetch"]["count"], 5 + 10)
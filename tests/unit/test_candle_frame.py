@@ -0,0 +1,46 @@
+import unittest
+
+from utils.candle_frame import CandleFrame, as_candle_frame
+from utils.strategies_enhanced import execute_strategies, init_strategies
+from tests.fixtures.candles import generate_ohlcv, generate_candles_df
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, ATOM_TICKER_INFO
+
+class TestCandleFrame(unittest.TestCase):
+
+    def test_columns_are_read_only(self):
+        ohlcv = generate_ohlcv(num_candles=50)
+        candles = CandleFrame.from_ohlcv(ohlcv)
+
+        self.assertEqual(len(candles), 50)
+        self.assertEqual(candles['close'][-1], ohlcv[-1][4])
+        self.assertTrue(candles['close'].flags.c_contiguous)
+        with self.assertRaises(ValueError):
+            candles['close'][-1] = 0.0
+
+    def test_dataframe_is_wrapped_once(self):
+        candles_df = generate_candles_df(num_candles=50)
+
+        candles = as_candle_frame(candles_df)
+        self.assertIs(as_candle_frame(candles_df), candles)
+        self.assertIs(as_candle_frame(candles), candles)
+        self.assertEqual(candles['volume'][0], candles_df['volume'].iloc[0])
+
+    def test_execute_strategies_does_not_touch_dataframe(self):
+        config = {
+            "strategies": [
+                {"name": "RSI", "priority": 2, "parameters": {"overbought_signal_threshold": 70, "oversold_signal_threshold": 30}},
+                {"name": "MACD", "priority": 2, "parameters": {"fastperiod": 12, "slowperiod": 26, "signalperiod": 9}},
+                {"name": "BOLLINGER_BANDS", "priority": 2, "parameters": {"window": 20, "std_dev": 2}}
+            ]
+        }
+        candles_df = generate_candles_df()
+        columns_before = list(candles_df.columns)
+
+        execute_strategies(ATOM_TICKER_PAIR, init_strategies(config), None, ATOM_TICKER_INFO, candles_df)
+
+        self.assertEqual(list(candles_df.columns), columns_before)
+        self.assertGreater(as_candle_frame(candles_df).derived.misses, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+import time
+import unittest
+import utils.constants as CONSTANTS
+
+from utils.exchange_service import ExchangeService
+from utils.candle_store import CandleStore
+from utils.paper_exchange import CandleReplayFeed
+from tests.fixtures.fake_exchange import FakeExchangeClient, FakeAsyncExchangeClient
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR
+
+ONE_HOUR_MS = 3600 * 1000
+
+def build_candles(num_candles, end_timestamp):
+    start_timestamp = end_timestamp - (num_candles - 1) * ONE_HOUR_MS
+    candles = []
+    for idx in range(num_candles):
+        close = 10.0 + idx
+        candles.append([start_timestamp + idx * ONE_HOUR_MS, close - 0.5, close + 1.0, close - 1.0, close, 100.0 + idx])
+    return candles
+
+class TestCandleStore(unittest.TestCase):
+
+    def setUp(self):
+        now_ms = int(time.time() * 1000)
+        self.candles = build_candles(10, now_ms - now_ms % ONE_HOUR_MS)
+        self.exchange_client = FakeExchangeClient(ohlcv=self.candles)
+        self.exchange_service = ExchangeService({}, exchange_client=self.exchange_client)
+        self.candle_store = CandleStore(self.exchange_service, max_candles=8)
+
+    def test_first_update_fetches_full_history(self):
+        candles = self.candle_store.update(ATOM_TICKER_PAIR, "1h")
+
+        self.assertEqual(self.exchange_client.since_params, [None])
+        self.assertEqual(len(candles), 8)
+        self.assertEqual(candles["time"][-1], self.candles[-1][0])
+        self.assertEqual(list(candles.columns.keys()), ['time', 'open', 'high', 'low', 'close', 'volume'])
+
+    def test_delta_update_replaces_forming_candle(self):
+        self.candle_store.update(ATOM_TICKER_PAIR, "1h")
+
+        last_timestamp = self.candles[-1][0]
+        self.exchange_client.ohlcv[-1][4] = 42.0
+        candles = self.candle_store.update(ATOM_TICKER_PAIR, "1h")
+
+        self.assertEqual(self.exchange_client.since_params[-1], last_timestamp)
+        self.assertEqual(len(candles), 8)
+        self.assertEqual(candles["close"][-1], 42.0)
+
+    def test_delta_update_appends_new_candle_within_ring_buffer(self):
+        self.candle_store.update(ATOM_TICKER_PAIR, "1h")
+
+        new_timestamp = self.candles[-1][0] + ONE_HOUR_MS
+        self.exchange_client.ohlcv.append([new_timestamp, 20.0, 21.0, 19.0, 20.5, 300.0])
+        candles = self.candle_store.update(ATOM_TICKER_PAIR, "1h")
+
+        self.assertEqual(len(candles), 8)
+        self.assertEqual(candles["time"][-1], new_timestamp)
+        self.assertEqual(candles["time"][0], self.candles[3][0])
+
+    def test_stale_candles_are_reloaded(self):
+        self.candle_store.update(ATOM_TICKER_PAIR, "1h")
+        key = (ATOM_TICKER_PAIR, "1h")
+        self.candle_store.candles[key][-1][0] -= 10 * ONE_HOUR_MS
+
+        self.candle_store.update(ATOM_TICKER_PAIR, "1h")
+        self.assertEqual(self.exchange_client.since_params, [None, None])
+        self.assertEqual(self.candle_store.versions[key], 1)
+
+    def test_replayed_candles_are_fresh_by_the_replay_clock(self):
+        # a day old on the wall clock, current on the feed's
+        feed = CandleReplayFeed({ATOM_TICKER_PAIR: build_candles(20, self.candles[-1][0] - 24 * ONE_HOUR_MS)})
+        feed.cursor = 9
+        exchange_service = ExchangeService({}, exchange_client=feed)
+        candle_store = CandleStore(exchange_service, max_candles=8, clock=exchange_service.clock)
+
+        candle_store.update(ATOM_TICKER_PAIR, "1h")
+        feed.advance()
+        params = candle_store.get_fetch_params((ATOM_TICKER_PAIR, "1h"))
+
+        self.assertEqual(params[CONSTANTS.PARAM_SINCE], feed.ohlcv_by_pair[ATOM_TICKER_PAIR][9][0])
+        self.assertEqual(len(candle_store.update(ATOM_TICKER_PAIR, "1h")), 8)
+
+    def test_failed_fetch_returns_none(self):
+        self.exchange_client.has["fetchOHLCV"] = False
+        self.assertIsNone(self.candle_store.update(ATOM_TICKER_PAIR, "1h"))
+
+    def test_update_async(self):
+        async_exchange_client = FakeAsyncExchangeClient(ohlcv=self.candles)
+        exchange_service = ExchangeService({}, exchange_client=self.exchange_client, async_exchange_client=async_exchange_client)
+        candle_store = CandleStore(exchange_service, max_candles=8)
+
+        asyncio.run(candle_store.update_async(ATOM_TICKER_PAIR, "1h"))
+        candles = asyncio.run(candle_store.update_async(ATOM_TICKER_PAIR, "1h"))
+
+        self.assertEqual(async_exchange_client.since_params, [None, self.candles[-1][0]])
+        self.assertEqual(len(candles), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+
+import utils.constants as CONSTANTS
+from utils.exchange_service import ExchangeService
+from tests.fixtures.fake_exchange import FakeExchangeClient, FakeAsyncExchangeClient, OHLCV_CANDLES
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, MATIC_TICKER_INFO
+
+MATIC_TICKER_PAIR = MATIC_TICKER_INFO["symbol"]
+
+class TestExchangeService(unittest.TestCase):
+
+    def setUp(self):
+        self.exchange_client = FakeExchangeClient()
+        self.async_exchange_client = FakeAsyncExchangeClient(delay=0.01)
+        self.exchange_service = ExchangeService({}, 
+                                                exchange_client=self.exchange_client, 
+                                                async_exchange_client=self.async_exchange_client)
+
+    def test_fetch_ticker(self):
+        ticker_info = self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_TICKER)
+        self.assertEqual(ticker_info["symbol"], ATOM_TICKER_PAIR)
+
+    def test_fetch_ohlcv_async(self):
+        ohlcv = asyncio.run(self.exchange_service.execute_op_async(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_OHLCV, {"timeframe": "1h"}))
+        self.assertEqual(ohlcv, OHLCV_CANDLES)
+        self.assertEqual(self.async_exchange_client.calls, [("fetch_ohlcv", ATOM_TICKER_PAIR, "1h")])
+
+    def test_async_fetches_run_concurrently(self):
+        async def fetch_all():
+            ops = [self.exchange_service.execute_op_async(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_TICKER) for _ in range(5)]
+            return await asyncio.gather(*ops)
+
+        results = asyncio.run(fetch_all())
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.async_exchange_client.max_in_flight, 5)
+
+    def test_non_native_async_op_falls_back_to_sync_client(self):
+        orders = asyncio.run(self.exchange_service.execute_op_async(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_ORDERS))
+        self.assertIsNone(orders)
+        self.assertEqual(self.async_exchange_client.calls, [])
+
+    def test_fetch_tickers_in_chunks(self):
+        self.exchange_service.fetch_tickers_chunk_size = 1
+        params = {
+            CONSTANTS.PARAM_SYMBOLS: [ATOM_TICKER_PAIR, MATIC_TICKER_PAIR]
+        }
+        tickers = self.exchange_service.execute_op("*", CONSTANTS.OP_FETCH_TICKERS, params)
+
+        self.assertEqual(set(tickers.keys()), {ATOM_TICKER_PAIR, MATIC_TICKER_PAIR})
+        expected_calls = [("fetch_tickers", (ATOM_TICKER_PAIR,)), ("fetch_tickers", (MATIC_TICKER_PAIR,))]
+        self.assertEqual(self.exchange_client.calls, expected_calls)
+
+    def test_fetch_tickers_falls_back_to_fetch_ticker(self):
+        self.exchange_client.has["fetchTickers"] = False
+        params = {
+            CONSTANTS.PARAM_SYMBOLS: [ATOM_TICKER_PAIR, MATIC_TICKER_PAIR]
+        }
+        tickers = self.exchange_service.execute_op("*", CONSTANTS.OP_FETCH_TICKERS, params)
+
+        self.assertEqual(set(tickers.keys()), {ATOM_TICKER_PAIR, MATIC_TICKER_PAIR})
+        self.assertEqual([call[0] for call in self.exchange_client.calls], ["fetch_ticker", "fetch_ticker"])
+
+    def test_ticker_snapshot_serves_cycle_with_one_request(self):
+        self.exchange_service.refresh_ticker_snapshot([ATOM_TICKER_PAIR, MATIC_TICKER_PAIR])
+
+        atom_ticker_info = self.exchange_service.get_ticker_info(ATOM_TICKER_PAIR)
+        matic_ticker_info = self.exchange_service.get_ticker_info(MATIC_TICKER_PAIR)
+
+        self.assertEqual(atom_ticker_info["symbol"], ATOM_TICKER_PAIR)
+        self.assertEqual(matic_ticker_info["symbol"], MATIC_TICKER_PAIR)
+        self.assertEqual(len(self.exchange_client.calls), 1)
+
+    def test_ticker_snapshot_miss_fetches_single_ticker(self):
+        self.exchange_service.refresh_ticker_snapshot([MATIC_TICKER_PAIR])
+        ticker_info = self.exchange_service.get_ticker_info(ATOM_TICKER_PAIR)
+
+        self.assertEqual(ticker_info["symbol"], ATOM_TICKER_PAIR)
+        self.assertEqual(self.exchange_client.calls[-1], ("fetch_ticker", ATOM_TICKER_PAIR))
+
+    def test_stale_ticker_snapshot_is_refreshed(self):
+        self.exchange_service.refresh_ticker_snapshot([ATOM_TICKER_PAIR])
+        self.exchange_service.ticker_snapshot_timestamp -= self.exchange_service.ticker_snapshot_max_age + 1
+        self.exchange_service.get_ticker_info(ATOM_TICKER_PAIR)
+
+        self.assertEqual([call[0] for call in self.exchange_client.calls], ["fetch_tickers", "fetch_tickers"])
+
+    def test_ticker_snapshot_async(self):
+        asyncio.run(self.exchange_service.refresh_ticker_snapshot_async([ATOM_TICKER_PAIR, MATIC_TICKER_PAIR]))
+        self.assertEqual(set(self.exchange_service.ticker_snapshot.keys()), {ATOM_TICKER_PAIR, MATIC_TICKER_PAIR})
+
+    def test_close_async(self):
+        asyncio.run(self.exchange_service.close_async())
+        self.assertTrue(self.async_exchange_client.closed)
+        self.assertIsNone(self.exchange_service.async_exchange_client)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import talib
+
+import utils.indicators as indicators
+from strategies.rsi import RSI
+from strategies.price_momentum import PriceMomentum
+from strategies.bollinger_bands import BollingerBands
+from strategies.volatility_adjusted import VolatilityAdjusted
+from tests.fixtures.candles import generate_candle_frame
+from tests.fixtures.ticker_info import ATOM_TICKER_INFO
+
+class TestIndicatorCache(unittest.TestCase):
+
+    def setUp(self):
+        self.candles = generate_candle_frame()
+
+    def test_rsi_matches_talib(self):
+        rsi = indicators.rsi(self.candles, 14, scale=100000)
+        expected_rsi = talib.RSI(self.candles['close'] * 100000, timeperiod=14)
+        self.assertAlmostEqual(rsi[-1], expected_rsi[-1])
+
+    def test_same_indicator_is_computed_once(self):
+        first = indicators.rsi(self.candles, 14)
+        second = indicators.rsi(self.candles, 14)
+
+        cache = indicators.get_indicator_cache(self.candles)
+        self.assertIs(first, second)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_scale_and_params_are_part_of_key(self):
+        indicators.rsi(self.candles, 14)
+        indicators.rsi(self.candles, 14, scale=100000)
+        indicators.rsi(self.candles, 10)
+
+        cache = indicators.get_indicator_cache(self.candles)
+        self.assertEqual(len([key for key in cache.entries if key[0] == "RSI"]), 3)
+
+    def test_invalidate_bumps_version(self):
+        indicators.atr(self.candles, 14)
+        cache = indicators.get_indicator_cache(self.candles)
+        cache.invalidate()
+        indicators.atr(self.candles, 14)
+
+        self.assertEqual(cache.version, 1)
+        self.assertEqual(cache.misses, 2)
+
+    def test_bollinger_bands_share_rolling_std(self):
+        (middle_band, upper_band, lower_band) = indicators.bollinger_bands(self.candles, 20, 2)
+        rolling_std = indicators.rolling_std(self.candles, 20)
+
+        self.assertAlmostEqual(upper_band[-1] - middle_band[-1], 2 * rolling_std[-1])
+        self.assertAlmostEqual(middle_band[-1] - lower_band[-1], 2 * rolling_std[-1])
+
+    def test_strategies_share_indicators_on_read_only_frame(self):
+        rsi_config = {
+            "name": "RSI", "priority": 2, "normalization_factor": 1,
+            "parameters": {"overbought_signal_threshold": 70, "oversold_signal_threshold": 30}
+        }
+        momentum_config = {"name": "PRICE_MOMENTUM", "priority": 2, "parameters": {}}
+        bollinger_config = {"name": "BOLLINGER_BANDS", "priority": 2, "parameters": {"window": 20, "std_dev": 2}}
+        volatility_config = {"name": "VOLATILITY_ADJUSTED", "priority": 0, "parameters": {"atr_period": 14}}
+
+        strategies = [RSI(rsi_config), PriceMomentum(momentum_config), BollingerBands(bollinger_config), VolatilityAdjusted(volatility_config)]
+        for strategy in strategies + strategies:
+            strategy.eval(None, self.candles, ATOM_TICKER_INFO)
+
+        cache = indicators.get_indicator_cache(self.candles)
+        computed_indicators = sorted(key[0] for key in cache.entries)
+        self.assertEqual(computed_indicators, ["ATR", "ROLLING_MEAN", "ROLLING_STD", "RSI"])
+        self.assertFalse(self.candles['close'].flags.writeable)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 import mongomock
+from pymongo import ASCENDING
 from utils.mongodb_service import MongoDBService
 from utils.constants import DEFAULT_MONGO_DB_NAME, DEFAULT_MONGO_SELL_ORDERS_COLLECTION, DEFAULT_MONGO_TRADES_COLLECTION
 from tests.fixtures.multiple_trades import SOL_TRADES, ATOM_TRADES
@@ -65,6 +66,18 @@ class TestDatabaseQueriesWithMongomock(unittest.TestCase):
 
         self.assertEqual(len(atom_docs) + 1, len(atom_docs_new))
 
+    def test_ensure_indexes_reports_coverage(self):
+        self.mongodb_service.declare_index(DEFAULT_MONGO_TRADES_COLLECTION, [("symbol", ASCENDING)], "positions by symbol")
+        self.mongodb_service.declare_index(DEFAULT_MONGO_TRADES_COLLECTION, [("symbol", ASCENDING)], "avg position by symbol")
+        self.mongodb_service.declare_index(DEFAULT_MONGO_SELL_ORDERS_COLLECTION, [("sell_order.id", ASCENDING)], "sell order by id")
+
+        report = self.mongodb_service.ensure_indexes()
+        self.assertEqual([(entry["name"], entry["status"]) for entry in report], [("symbol_1", "created"), ("sell_order.id_1", "created")])
+        self.assertEqual(report[0]["queries"], ["positions by symbol", "avg position by symbol"])
+
+        report = self.mongodb_service.ensure_indexes()
+        self.assertEqual([entry["status"] for entry in report], ["exists", "exists"])
+
         
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+import mongomock
+import numpy as np
+
+import utils.constants as CONSTANTS
+from utils.exchange_service import ExchangeService
+from utils.mongodb_service import MongoDBService
+from backtesting.data import load_ohlcv_from_path
+from utils.ohlcv_ingestion import OhlcvIngester, CsvOhlcvIngester, OhlcvCheckpoints, backfill, to_epoch_ms
+from tests.fixtures.candles import generate_ohlcv, ONE_MINUTE_MS
+from tests.fixtures.fake_exchange import FakeExchangeClient, FakeAsyncExchangeClient
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, SOL_TICKER_PAIR
+
+OHLCV_COLLECTION = CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_COLLECTION
+
+class TestOhlcvIngestion(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_db = mongomock.MongoClient().db
+        self.mongodb_service = MongoDBService("mongomock://localhost", CONSTANTS.DEFAULT_MONGO_DB_NAME, self.mock_db)
+
+        self.ohlcv = generate_ohlcv(num_candles=500)
+        self.async_exchange_client = FakeAsyncExchangeClient(ohlcv=self.ohlcv, delay=0.01, page_size=120)
+        self.exchange_service = ExchangeService({}, exchange_client=FakeExchangeClient(), async_exchange_client=self.async_exchange_client)
+        self.ingester = OhlcvIngester(self.mongodb_service, self.exchange_service, "1m", max_concurrent_requests=2)
+
+    def tearDown(self):
+        self.mongodb_service.delete_many(OHLCV_COLLECTION)
+
+    def ingest(self, ticker_pairs, since=None, until=None):
+        # ingest closes the async client at the end of its event loop
+        self.exchange_service.async_exchange_client = self.async_exchange_client
+        return self.ingester.ingest(ticker_pairs, since, until)
+
+    def stored_timestamps(self, ticker_pair):
+        docs = self.mongodb_service.query(OHLCV_COLLECTION, {CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD: ticker_pair})
+        return sorted(to_epoch_ms(doc[CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD]) for doc in docs)
+
+    def test_backfills_every_page_from_since(self):
+        inserted = self.ingest([ATOM_TICKER_PAIR, SOL_TICKER_PAIR], since=self.ohlcv[0][0])
+
+        self.assertEqual(inserted, {ATOM_TICKER_PAIR: 500, SOL_TICKER_PAIR: 500})
+        self.assertEqual(self.stored_timestamps(ATOM_TICKER_PAIR), [candle[0] for candle in self.ohlcv])
+        self.assertEqual(self.async_exchange_client.max_in_flight, 2)
+
+        # 120 candle pages, then an empty one past the last candle, for each pair
+        page_starts = [self.ohlcv[0][0] + idx * 120 * ONE_MINUTE_MS for idx in range(5)] + [self.ohlcv[-1][0] + ONE_MINUTE_MS]
+        self.assertEqual(sorted(self.async_exchange_client.since_params), sorted(page_starts * 2))
+
+    def test_resumes_from_newest_stored_candle(self):
+        self.ingest([ATOM_TICKER_PAIR], since=self.ohlcv[0][0], until=self.ohlcv[300][0])
+        self.assertEqual(len(self.stored_timestamps(ATOM_TICKER_PAIR)), 300)
+
+        self.async_exchange_client.since_params.clear()
+        inserted = self.ingest([ATOM_TICKER_PAIR], since=self.ohlcv[0][0])
+
+        self.assertEqual(inserted, {ATOM_TICKER_PAIR: 200})
+        self.assertEqual(self.async_exchange_client.since_params[0], self.ohlcv[300][0])
+        self.assertEqual(self.stored_timestamps(ATOM_TICKER_PAIR), [candle[0] for candle in self.ohlcv])
+
+    def test_store_skips_stored_and_repeated_candles(self):
+        self.assertEqual(self.ingester.store(ATOM_TICKER_PAIR, self.ohlcv[:50]), 50)
+        self.assertEqual(self.ingester.store(ATOM_TICKER_PAIR, self.ohlcv[40:60] + self.ohlcv[55:60]), 10)
+        self.assertEqual(self.ingester.store(SOL_TICKER_PAIR, self.ohlcv[40:60]), 20)
+        self.assertEqual(self.stored_timestamps(ATOM_TICKER_PAIR), [candle[0] for candle in self.ohlcv[:60]])
+
+    def test_forming_candle_is_not_stored(self):
+        self.ingester.timeframe_ms = ONE_MINUTE_MS
+        now = self.ohlcv[10][0] + ONE_MINUTE_MS // 2
+        self.assertEqual(self.ingester.closed_candles(self.ohlcv[:11], now), self.ohlcv[:10])
+
+
+class TestOhlcvBackfill(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_db = mongomock.MongoClient().db
+        self.mongodb_service = MongoDBService("mongomock://localhost", CONSTANTS.DEFAULT_MONGO_DB_NAME, self.mock_db)
+
+        self.ohlcv = generate_ohlcv(num_candles=500)
+        self.async_exchange_client = FakeAsyncExchangeClient(ohlcv=self.ohlcv, bounded_pages=True)
+        self.exchange_service = ExchangeService({}, exchange_client=FakeExchangeClient(), async_exchange_client=self.async_exchange_client)
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.checkpoints = OhlcvCheckpoints(os.path.join(self.tmp_dir.name, "checkpoints.json"))
+
+    def tearDown(self):
+        self.mongodb_service.delete_many(OHLCV_COLLECTION)
+        self.tmp_dir.cleanup()
+
+    def backfill(self, ingester, since, until=None):
+        self.exchange_service.async_exchange_client = self.async_exchange_client
+        return backfill([ingester], [ATOM_TICKER_PAIR], since, until, max_concurrent_requests=2)
+
+    def test_resumes_from_checkpoint_behind_stored_candles(self):
+        ingester = OhlcvIngester(self.mongodb_service, self.exchange_service, "1m", page_limit=100, checkpoints=self.checkpoints)
+        # candles populate_ohlcv already stored must not hide the history behind them
+        ingester.store(ATOM_TICKER_PAIR, self.ohlcv[400:])
+
+        self.backfill(ingester, self.ohlcv[0][0], until=self.ohlcv[250][0])
+        self.assertEqual(self.checkpoints.get(ATOM_TICKER_PAIR, "1m"), self.ohlcv[250][0])
+
+        # a fresh run picks the checkpoint up from the file
+        ingester.checkpoints = OhlcvCheckpoints(self.checkpoints.path)
+        self.async_exchange_client.since_params.clear()
+        inserted = self.backfill(ingester, self.ohlcv[0][0])
+
+        self.assertEqual(inserted, {(ATOM_TICKER_PAIR, "1m"): 150})
+        self.assertEqual(self.async_exchange_client.since_params[0], self.ohlcv[250][0])
+        docs = self.mongodb_service.query(OHLCV_COLLECTION, {CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD: ATOM_TICKER_PAIR})
+        self.assertEqual(sorted(to_epoch_ms(doc[CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD]) for doc in docs), [candle[0] for candle in self.ohlcv])
+
+    def test_skips_gaps_and_stops_after_the_newest_candle(self):
+        # listed 350 minutes after since, then down for 200 minutes
+        self.async_exchange_client.ohlcv = self.ohlcv[:200] + self.ohlcv[400:]
+        ingester = OhlcvIngester(self.mongodb_service, self.exchange_service, "1m", page_limit=100, checkpoints=self.checkpoints)
+        inserted = self.backfill(ingester, self.ohlcv[0][0] - 350 * ONE_MINUTE_MS)
+
+        self.assertEqual(inserted, {(ATOM_TICKER_PAIR, "1m"): 300})
+        # 3 empty pages before the listing, 1 probe for the newest candle,
+        # 3 pages up to the outage, 2 empty ones, 1 with the rest and 1 past the newest
+        self.assertEqual(self.async_exchange_client.since_params.count(None), 1)
+        self.assertEqual(len(self.async_exchange_client.since_params), 3 + 1 + 3 + 2 + 1 + 1)
+
+    def test_csv_backfill_round_trips(self):
+        ingester = CsvOhlcvIngester(self.tmp_dir.name, self.exchange_service, "1m", page_limit=120, checkpoints=self.checkpoints)
+        ingester.ensure_collection()
+        self.backfill(ingester, self.ohlcv[0][0])
+        # rerunning without checkpoints only appends what's missing
+        ingester.checkpoints = None
+        self.assertEqual(self.backfill(ingester, self.ohlcv[0][0]), {(ATOM_TICKER_PAIR, "1m"): 0})
+
+        ohlcv_by_pair = load_ohlcv_from_path(os.path.join(self.tmp_dir.name, "1m"))
+        np.testing.assert_array_equal(ohlcv_by_pair[ATOM_TICKER_PAIR], np.array(self.ohlcv))
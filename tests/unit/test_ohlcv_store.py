@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import mongomock
+import numpy as np
+
+import utils.constants as CONSTANTS
+from datetime import datetime, timezone
+from backtesting.data import export_mongo_to_store
+from utils.mongodb_service import MongoDBService
+from utils.ohlcv_ingestion import OhlcvIngester
+from utils.ohlcv_store import OhlcvStore
+from tests.fixtures.candles import generate_ohlcv
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, SOL_TICKER_PAIR
+
+# 2023-10-31 22:00 UTC, so the candles cross into November
+MONTH_END_TIMESTAMP = 1698789600000
+
+class TestOhlcvStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = OhlcvStore(self.tmp_dir.name)
+        self.ohlcv = np.array(generate_ohlcv(num_candles=300, start_timestamp=MONTH_END_TIMESTAMP))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_partitions_by_pair_and_month(self):
+        self.assertEqual(self.store.write(ATOM_TICKER_PAIR, self.ohlcv), 300)
+        self.store.write(SOL_TICKER_PAIR, self.ohlcv[:10])
+
+        self.assertEqual(self.store.pairs(), [ATOM_TICKER_PAIR, SOL_TICKER_PAIR])
+        self.assertEqual(self.store.months(ATOM_TICKER_PAIR), ["2023-10", "2023-11"])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, "1m", "ATOM-USD", "2023-11.npy")))
+        self.assertEqual(len(self.store.read_partition(ATOM_TICKER_PAIR, "2023-10")), 120)
+        self.assertEqual(self.store.latest_timestamp(ATOM_TICKER_PAIR), self.ohlcv[-1, 0])
+        np.testing.assert_array_equal(self.store.read(ATOM_TICKER_PAIR), self.ohlcv)
+
+    def test_reads_ranges_without_copying_a_single_month(self):
+        self.store.write(ATOM_TICKER_PAIR, self.ohlcv)
+
+        within_month = self.store.read(ATOM_TICKER_PAIR, self.ohlcv[130, 0], self.ohlcv[200, 0])
+        np.testing.assert_array_equal(within_month, self.ohlcv[130:200])
+        self.assertIsInstance(within_month, np.memmap)
+        self.assertFalse(within_month.flags.writeable)
+
+        across_months = self.store.read(ATOM_TICKER_PAIR, self.ohlcv[100, 0], self.ohlcv[150, 0])
+        np.testing.assert_array_equal(across_months, self.ohlcv[100:150])
+        self.assertEqual(self.store.read(ATOM_TICKER_PAIR, self.ohlcv[-1, 0] + 1).shape, (0, 6))
+
+        ohlcv_by_pair = self.store.read_all(start_ms=self.ohlcv[290, 0])
+        self.assertEqual(list(ohlcv_by_pair.keys()), [ATOM_TICKER_PAIR])
+        np.testing.assert_array_equal(ohlcv_by_pair[ATOM_TICKER_PAIR], self.ohlcv[290:])
+
+    def test_writes_merge_and_replace_by_timestamp(self):
+        self.store.write(ATOM_TICKER_PAIR, self.ohlcv[:200])
+
+        updated = self.ohlcv[150:].copy()
+        updated[:, 4] += 1
+        self.assertEqual(self.store.write(ATOM_TICKER_PAIR, updated), 100)
+
+        expected = np.concatenate((self.ohlcv[:150], updated))
+        np.testing.assert_array_equal(self.store.read(ATOM_TICKER_PAIR), expected)
+
+    def test_exports_mongo_month_by_month(self):
+        mongodb_service = MongoDBService("mongomock://localhost", CONSTANTS.DEFAULT_MONGO_DB_NAME, mongomock.MongoClient().db)
+        try:
+            OhlcvIngester(mongodb_service, None).store(ATOM_TICKER_PAIR, self.ohlcv.tolist())
+
+            self.assertEqual(export_mongo_to_store(mongodb_service, self.store, ATOM_TICKER_PAIR), 300)
+            np.testing.assert_array_equal(self.store.read(ATOM_TICKER_PAIR), self.ohlcv)
+
+            # exporting again only rewrites what's already there
+            self.assertEqual(export_mongo_to_store(mongodb_service, self.store, ATOM_TICKER_PAIR, datetime(2023, 11, 1, tzinfo=timezone.utc)), 0)
+            self.assertEqual(export_mongo_to_store(mongodb_service, self.store, SOL_TICKER_PAIR), 0)
+        finally:
+            mongodb_service.delete_many(CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_COLLECTION)
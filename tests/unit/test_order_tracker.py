@@ -0,0 +1,312 @@
+import asyncio
+import copy
+import time
+import threading
+import unittest
+import utils.constants as CONSTANTS
+
+from decimal import Decimal
+from benchmark.main import create_bot
+from utils.exchange_service import ExchangeService
+from utils.order_tracker import OrderTracker
+from utils.trading import TakeProfitEvaluationType, find_profitable_trades
+from tests.fixtures.fake_exchange import FakeExchangeClient
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, ATOM_TICKER_INFO, SOL_TICKER_PAIR
+
+BOT_CONFIG = {
+    "max_spend": 50,
+    "amount_per_transaction": 10,
+    "currency": "USD",
+    "sleep_interval": 0,
+    "take_profits": {
+        "threshold_percent": 2,
+        "evaluation_type": "INDIVIDUAL_LOTS"
+    },
+    "db": {
+        "db_type": "mongodb",
+        "db_name": "crypto-bot-order-tracker",
+        "current_positions_collection": "order_tracker_positions",
+        "closed_positions_collection": "order_tracker_sell_orders"
+    },
+    "exchange": {},
+    "supported_crypto_currencies": ["ATOM"],
+    "strategies": []
+}
+
+class TestOrderTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.exchange_client = FakeExchangeClient()
+        self.exchange_service = ExchangeService({}, exchange_client=self.exchange_client)
+        self.order_tracker = OrderTracker(self.exchange_service, poll_interval=0, fill_timeout=60)
+        self.filled = []
+        self.cancelled = []
+        self.partially_filled = []
+
+    def submit(self, ticker_pair, side="buy"):
+        params = {
+            CONSTANTS.PARAM_ORDER_TYPE: side,
+            CONSTANTS.PARAM_MARKET_ORDER_TYPE: "limit",
+            CONSTANTS.PARAM_SHARES: 1.0,
+            CONSTANTS.PARAM_PRICE: 10.0
+        }
+        order = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_CREATE_ORDER, params=params)
+        self.order_tracker.track(ticker_pair, order, on_fill=self.filled.append, on_cancel=self.cancelled.append, on_partial_fill=self.partially_filled.append)
+        return order
+
+    def test_create_order_does_not_wait_for_fill(self):
+        order = self.submit(ATOM_TICKER_PAIR)
+
+        self.assertEqual(order["status"], "open")
+        self.assertTrue(self.order_tracker.has_pending(ATOM_TICKER_PAIR))
+        self.assertFalse(self.order_tracker.has_pending(SOL_TICKER_PAIR))
+        self.assertNotIn(("fetch_order", order["id"]), self.exchange_client.calls)
+
+    def test_fill_is_reported_on_poll(self):
+        order = self.submit(ATOM_TICKER_PAIR)
+        self.order_tracker.poll()
+        self.assertEqual(self.filled, [])
+
+        self.exchange_client.fill_order(order["id"])
+        self.order_tracker.poll()
+
+        self.assertEqual([filled_order["id"] for filled_order in self.filled], [order["id"]])
+        self.assertFalse(self.order_tracker.has_pending(ATOM_TICKER_PAIR))
+
+    def test_fetch_orders_batches_per_ticker(self):
+        self.exchange_client.has["fetchOrders"] = True
+        orders = [self.submit(ATOM_TICKER_PAIR), self.submit(ATOM_TICKER_PAIR), self.submit(SOL_TICKER_PAIR)]
+        for order in orders:
+            self.exchange_client.fill_order(order["id"])
+
+        self.exchange_client.calls = []
+        self.order_tracker.poll()
+
+        self.assertEqual(sorted(self.exchange_client.calls), [("fetch_orders", ATOM_TICKER_PAIR), ("fetch_orders", SOL_TICKER_PAIR)])
+        self.assertEqual(len(self.filled), 3)
+
+    def test_fetch_open_orders_only_fetches_orders_that_left_the_book(self):
+        self.exchange_client.has["fetchOpenOrders"] = True
+        first = self.submit(ATOM_TICKER_PAIR)
+        self.submit(ATOM_TICKER_PAIR)
+        self.exchange_client.fill_order(first["id"])
+
+        self.exchange_client.calls = []
+        self.order_tracker.poll()
+
+        self.assertEqual(self.exchange_client.calls, [("fetch_open_orders", ATOM_TICKER_PAIR), ("fetch_order", first["id"])])
+        self.assertEqual(len(self.filled), 1)
+        self.assertTrue(self.order_tracker.has_pending(ATOM_TICKER_PAIR))
+
+    def test_unfilled_order_is_cancelled_after_timeout(self):
+        self.order_tracker.fill_timeout = 0
+        order = self.submit(ATOM_TICKER_PAIR)
+        self.order_tracker.poll()
+
+        self.assertIn(("cancel_order", order["id"]), self.exchange_client.calls)
+        self.assertEqual([cancelled_order["id"] for cancelled_order in self.cancelled], [order["id"]])
+        self.assertFalse(self.order_tracker.has_pending(ATOM_TICKER_PAIR))
+
+    def test_partially_filled_order_keeps_waiting_after_timeout(self):
+        self.order_tracker.fill_timeout = 0
+        order = self.submit(ATOM_TICKER_PAIR)
+        self.exchange_client.fill_order(order["id"], filled=0.5)
+        self.order_tracker.poll()
+
+        self.assertNotIn(("cancel_order", order["id"]), self.exchange_client.calls)
+        self.assertTrue(self.order_tracker.has_pending(ATOM_TICKER_PAIR))
+
+    def test_cancelled_order_with_fills_is_reported_as_partial_fill(self):
+        order = self.submit(ATOM_TICKER_PAIR)
+        self.exchange_client.fill_order(order["id"], filled=0.5)
+        self.exchange_client.orders[order["id"]]["status"] = "expired"
+        self.order_tracker.poll()
+
+        self.assertEqual([partial_order["filled"] for partial_order in self.partially_filled], [0.5])
+        self.assertEqual((self.filled, self.cancelled), ([], []))
+        self.assertFalse(self.order_tracker.has_pending(ATOM_TICKER_PAIR))
+
+    def test_fills_after_the_last_poll_are_not_dropped_on_cancel(self):
+        self.order_tracker.fill_timeout = 0
+        order = self.submit(ATOM_TICKER_PAIR)
+        cancel_order = self.exchange_client.cancel_order
+
+        def fill_then_cancel(order_id, symbol=None):
+            # the poll saw nothing filled, the exchange filled some before the cancel landed
+            self.exchange_client.fill_order(order_id, filled=0.4)
+            cancel_order(order_id, symbol)
+            return {"id": order_id, "status": None, "filled": None, "info": {}}
+
+        self.exchange_client.cancel_order = fill_then_cancel
+        self.order_tracker.poll()
+
+        self.assertEqual(self.exchange_client.calls[-2:], [("cancel_order", order["id"]), ("fetch_order", order["id"])])
+        self.assertEqual([partial_order["filled"] for partial_order in self.partially_filled], [0.4])
+        self.assertEqual(self.cancelled, [])
+
+    def test_cancelled_order_not_closed_yet_is_not_cancelled_again(self):
+        self.order_tracker.fill_timeout = 0
+        order = self.submit(ATOM_TICKER_PAIR)
+        self.exchange_client.cancel_order = lambda order_id, symbol=None: {"id": order_id, "status": "open", "filled": None, "info": {}}
+        self.order_tracker.poll()
+        self.assertTrue(self.order_tracker.has_pending(ATOM_TICKER_PAIR))
+
+        self.exchange_client.calls = []
+        self.exchange_client.orders[order["id"]]["status"] = "canceled"
+        self.order_tracker.poll()
+
+        self.assertEqual(self.exchange_client.calls, [("fetch_order", order["id"])])
+        self.assertEqual([cancelled_order["id"] for cancelled_order in self.cancelled], [order["id"]])
+
+    def test_poll_if_due_waits_for_initial_delay(self):
+        order_tracker = OrderTracker(self.exchange_service, poll_interval=3600, fill_timeout=60, initial_poll_delay=1)
+        order = self.submit(ATOM_TICKER_PAIR)
+        order_tracker.track(ATOM_TICKER_PAIR, order, on_fill=self.filled.append)
+
+        self.exchange_client.calls = []
+        order_tracker.poll_if_due()
+        asyncio.run(order_tracker.poll_if_due_async())
+        self.assertEqual(self.exchange_client.calls, [])
+
+    def test_async_poll_runs_cancels_and_callbacks_off_the_event_loop(self):
+        self.order_tracker.fill_timeout = 0
+        order = self.submit(ATOM_TICKER_PAIR)
+        cancel_order = self.exchange_client.cancel_order
+        threads = []
+
+        def record_thread(order_id, symbol=None):
+            threads.append(threading.get_ident())
+            return cancel_order(order_id, symbol)
+
+        self.exchange_client.cancel_order = record_thread
+        self.order_tracker.pending[order["id"]].on_cancel = lambda order: threads.append(threading.get_ident())
+
+        async def poll():
+            await self.order_tracker.poll_if_due_async()
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(poll())
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+    def test_poll_delay_backs_off_exponentially(self):
+        order_tracker = OrderTracker(self.exchange_service, poll_interval=8, fill_timeout=60, initial_poll_delay=1)
+        order = self.submit(ATOM_TICKER_PAIR)
+        order_tracker.track(ATOM_TICKER_PAIR, order, on_fill=self.filled.append)
+        pending_order = order_tracker.pending[order["id"]]
+
+        poll_delays = []
+        for _ in range(5):
+            pending_order.next_poll_at = 0
+            order_tracker.poll_if_due()
+            poll_delays.append(pending_order.poll_delay)
+
+        self.assertEqual(poll_delays, [2, 4, 8, 8, 8])
+
+    def submit_market(self, ticker_pair, side, submitted_at=None):
+        params = {
+            CONSTANTS.PARAM_ORDER_TYPE: side,
+            CONSTANTS.PARAM_MARKET_ORDER_TYPE: "market",
+            CONSTANTS.PARAM_TOTAL_COST: 10.0,
+            CONSTANTS.PARAM_SHARES: 1.0
+        }
+        order = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_CREATE_ORDER, params=params)
+        self.order_tracker.track(ticker_pair, order, on_fill=self.filled.append, on_cancel=self.cancelled.append, submitted_at=submitted_at)
+        return order
+
+    def test_market_orders_are_tracked_without_blocking(self):
+        buy_order = self.submit_market(ATOM_TICKER_PAIR, "buy")
+        sell_order = self.submit_market(SOL_TICKER_PAIR, "sell")
+
+        self.assertEqual((buy_order["status"], sell_order["status"]), ("open", "open"))
+        self.assertTrue(self.order_tracker.has_pending(ATOM_TICKER_PAIR))
+        self.assertTrue(self.order_tracker.has_pending(SOL_TICKER_PAIR))
+
+    def test_market_order_deadline(self):
+        self.order_tracker.market_fill_timeout = 0
+        limit_order = self.submit(ATOM_TICKER_PAIR)
+        market_order = self.submit_market(ATOM_TICKER_PAIR, "buy")
+        self.order_tracker.poll()
+
+        self.assertEqual([cancelled_order["id"] for cancelled_order in self.cancelled], [market_order["id"]])
+        self.assertIn(limit_order["id"], self.order_tracker.pending)
+
+    def test_fill_latency_is_recorded_per_order_type(self):
+        market_order = self.submit_market(ATOM_TICKER_PAIR, "buy", submitted_at=time.time() - 2)
+        self.exchange_client.fill_order(market_order["id"])
+        self.order_tracker.poll()
+
+        metrics = self.order_tracker.get_latency_metrics()
+        self.assertEqual(list(metrics.keys()), ["market"])
+        self.assertEqual(metrics["market"]["count"], 1)
+        self.assertGreaterEqual(metrics["market"]["p50"], 2)
+
+class TestPartialFillAccounting(unittest.TestCase):
+
+    def setUp(self):
+        self.exchange_client = FakeExchangeClient()
+        self.crypto_bot = create_bot(copy.deepcopy(BOT_CONFIG), self.exchange_client)
+
+    def tearDown(self):
+        self.crypto_bot.mongodb_service.delete_many(BOT_CONFIG["db"]["current_positions_collection"])
+
+    def end_order(self, order, filled, status="canceled", proceeds="0"):
+        self.exchange_client.fill_order(order["id"], filled=filled)
+        self.exchange_client.orders[order["id"]]["status"] = status
+        self.exchange_client.orders[order["id"]]["info"]["total_value_after_fees"] = proceeds
+        self.crypto_bot.order_tracker.pending[order["id"]].next_poll_at = 0
+        self.crypto_bot.order_tracker.poll()
+
+    def test_partially_filled_buy_keeps_shares_and_releases_the_rest(self):
+        order = self.crypto_bot.handle_buy_order(ATOM_TICKER_PAIR, ATOM_TICKER_INFO)
+        self.assertEqual(self.crypto_bot.remaining_balance, Decimal(40))
+
+        self.end_order(order, filled=0.5)
+
+        positions = self.crypto_bot.position_book.get_positions(ATOM_TICKER_PAIR)
+        self.assertEqual([position["filled"] for position in positions], [0.5])
+        spent = Decimal(str(0.5 * ATOM_TICKER_INFO["ask"]))
+        self.assertEqual(self.crypto_bot.remaining_balance, Decimal(50) - spent)
+
+    def test_partially_filled_buy_is_priced_by_its_filled_shares(self):
+        ticker_info = dict(ATOM_TICKER_INFO, ask=100.0, bid=100.0)
+        self.crypto_bot.amount_per_transaction = Decimal(1000)
+        self.crypto_bot.remaining_balance = Decimal(1000)
+        self.crypto_bot.pipelines = self.crypto_bot.compile_pipelines(self.crypto_bot.supported_ticker_pairs)
+        order = self.crypto_bot.handle_buy_order(ATOM_TICKER_PAIR, ticker_info)
+        self.assertEqual(order["amount"], 10.0)
+
+        self.end_order(order, filled=4.0)
+
+        position_book = self.crypto_bot.position_book
+        avg_position = position_book.get_avg_position(ATOM_TICKER_PAIR)
+        self.assertEqual((avg_position["amount"], avg_position["price"]), (4.0, 100.0))
+        self.assertEqual(position_book.get_lots(ATOM_TICKER_PAIR).profits(100.0).tolist(), [0.0])
+
+        # no profit at the buy price, so neither take profit evaluation exits it
+        for evaluation_type in [TakeProfitEvaluationType.AVERAGE, TakeProfitEvaluationType.INDIVIDUAL_LOTS]:
+            self.assertIsNone(find_profitable_trades(ATOM_TICKER_PAIR, avg_position, position_book.get_positions(ATOM_TICKER_PAIR), ticker_info,
+                                                     Decimal("0.02"), evaluation_type, position_book.get_lots(ATOM_TICKER_PAIR)))
+        ticker_info["bid"] = 103.0
+        self.assertIsNotNone(find_profitable_trades(ATOM_TICKER_PAIR, avg_position, position_book.get_positions(ATOM_TICKER_PAIR), ticker_info,
+                                                    Decimal("0.02"), TakeProfitEvaluationType.AVERAGE, position_book.get_lots(ATOM_TICKER_PAIR)))
+
+    def test_partially_filled_sell_exits_only_the_sold_shares(self):
+        positions = [
+            {"id": "lot-1", "symbol": ATOM_TICKER_PAIR, "filled": 2.0, "amount": 2.0, "cost": 14.0, "price": 7.0, "average": 7.0, "fee": {"cost": 0.2}},
+            {"id": "lot-2", "symbol": ATOM_TICKER_PAIR, "filled": 2.0, "amount": 2.0, "cost": 16.0, "price": 8.0, "average": 8.0, "fee": {"cost": 0.4}}
+        ]
+        for position in positions:
+            self.crypto_bot.position_book.add(copy.deepcopy(position))
+
+        order = self.crypto_bot.handle_sell_order(ATOM_TICKER_PAIR, ATOM_TICKER_INFO, self.crypto_bot.position_book.get_positions(ATOM_TICKER_PAIR))
+        self.end_order(order, filled=3.0, status="expired", proceeds="23.5")
+
+        remaining = self.crypto_bot.position_book.get_positions(ATOM_TICKER_PAIR)
+        self.assertEqual([(position["id"], position["filled"], position["cost"]) for position in remaining], [("lot-2", 1.0, 8.0)])
+        self.assertAlmostEqual(remaining[0]["fee"]["cost"], 0.2)
+        self.assertEqual(self.crypto_bot.remaining_balance, Decimal(50) + Decimal("23.5") * self.crypto_bot.reinvestment_percent)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import asyncio
+import sys
+import threading
+import unittest
+import utils.constants as CONSTANTS
+
+from decimal import Decimal
+from utils.exchange_service import ExchangeService
+from utils.order_tracker import OrderTracker
+from utils.paper_exchange import CandleReplayFeed
+from tests.fixtures.candles import generate_ohlcv, ONE_MINUTE_MS
+from tests.fixtures.fake_exchange import FakeAsyncExchangeClient
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, SOL_TICKER_PAIR
+
+PAPER_TRADING_CONFIG = {
+    CONSTANTS.CONFIG_PAPER_FEE_RATE: 0.01,
+    CONSTANTS.CONFIG_PAPER_SLIPPAGE: 0.001,
+    CONSTANTS.CONFIG_PAPER_LATENCY: 90
+}
+
+class TestPaperExchange(unittest.TestCase):
+
+    def setUp(self):
+        self.ohlcv = generate_ohlcv(num_candles=50)
+        self.feed = CandleReplayFeed({ATOM_TICKER_PAIR: self.ohlcv, SOL_TICKER_PAIR: self.ohlcv}, spread=0.002)
+        self.exchange_service = ExchangeService({CONSTANTS.CONFIG_PAPER_TRADING: PAPER_TRADING_CONFIG}, dry_run=True, exchange_client=self.feed)
+        self.paper_exchange = self.exchange_service.paper_exchange
+        self.order_tracker = OrderTracker(self.exchange_service, poll_interval=0, fill_timeout=60)
+        self.filled = []
+
+    def place(self, side, shares, price, ticker_pair=ATOM_TICKER_PAIR):
+        params = {
+            CONSTANTS.PARAM_ORDER_TYPE: side,
+            CONSTANTS.PARAM_MARKET_ORDER_TYPE: "limit",
+            CONSTANTS.PARAM_SHARES: shares,
+            CONSTANTS.PARAM_PRICE: price
+        }
+        order = self.exchange_service.execute_op(ticker_pair, CONSTANTS.OP_CREATE_ORDER, params)
+        self.order_tracker.track(ticker_pair, order, on_fill=self.filled.append)
+        return order
+
+    def step(self, candles=1):
+        for _ in range(candles):
+            self.feed.advance()
+        self.exchange_service.refresh_ticker_snapshot([ATOM_TICKER_PAIR, SOL_TICKER_PAIR])
+        self.order_tracker.poll()
+
+    def test_limit_orders_fill_after_latency_at_the_limit(self):
+        ticker_info = self.exchange_service.get_ticker_info(ATOM_TICKER_PAIR)
+        limit_price = ticker_info["ask"] * 1.01
+        order = self.place("buy", 2.0, Decimal(str(limit_price)))
+        self.assertEqual((order["status"], order["info"]["order_id"]), ("open", order["id"]))
+
+        # 90s of latency is two replayed minutes
+        self.step()
+        self.assertEqual(self.filled, [])
+        self.step()
+        self.assertEqual(len(self.filled), 1)
+
+        filled_order = self.filled[0]
+        (_, ask) = self.paper_exchange.quotes[ATOM_TICKER_PAIR]
+        self.assertEqual((filled_order["status"], filled_order["filled"], filled_order["remaining"]), ("closed", 2.0, 0.0))
+        self.assertAlmostEqual(filled_order["average"], ask * 1.001)
+        self.assertLessEqual(filled_order["average"], limit_price)
+        self.assertAlmostEqual(float(filled_order["info"]["total_value_after_fees"]), filled_order["cost"] * 1.01)
+        self.assertAlmostEqual(filled_order["fee"]["cost"], filled_order["cost"] * 0.01)
+
+    def test_limit_sells_wait_for_the_bid(self):
+        self.step(40)
+        limit_price = 8.6
+        order = self.place("sell", 1.0, limit_price)
+
+        crossed_at = next(idx for (idx, candle) in enumerate(self.ohlcv) if idx > 40 and candle[4] * 0.999 >= limit_price)
+        self.step(crossed_at - 41)
+        self.assertEqual(self.filled, [])
+        self.step()
+        self.assertEqual(self.filled[0]["id"], order["id"])
+        self.assertGreaterEqual(self.filled[0]["average"], limit_price)
+        self.assertAlmostEqual(float(self.filled[0]["info"]["total_value_after_fees"]), self.filled[0]["cost"] * 0.99)
+
+    def test_market_buys_are_sized_by_cost(self):
+        self.paper_exchange.latency = 0
+        self.exchange_service.refresh_ticker_snapshot([SOL_TICKER_PAIR])
+        params = {
+            CONSTANTS.PARAM_ORDER_TYPE: "buy",
+            CONSTANTS.PARAM_MARKET_ORDER_TYPE: "market",
+            CONSTANTS.PARAM_TOTAL_COST: 5
+        }
+        order = self.exchange_service.execute_op(SOL_TICKER_PAIR, CONSTANTS.OP_CREATE_ORDER, params)
+
+        (_, ask) = self.paper_exchange.quotes[SOL_TICKER_PAIR]
+        self.assertEqual(order["status"], "closed")
+        self.assertAlmostEqual(order["average"], ask * 1.001)
+        self.assertAlmostEqual(order["cost"], 5)
+
+    def test_cancel_removes_the_order_from_the_book(self):
+        self.exchange_service.refresh_ticker_snapshot([ATOM_TICKER_PAIR])
+        order = self.place("buy", 1.0, 1.0)
+
+        cancelled = self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_CANCEL_ORDER, {CONSTANTS.PARAM_ORDER_ID: order["id"]})
+        self.assertEqual(cancelled["status"], "canceled")
+        self.assertEqual(self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_OPEN_ORDERS), [])
+        # a second cancel is rejected like an exchange would
+        self.assertIsNone(self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_CANCEL_ORDER, {CONSTANTS.PARAM_ORDER_ID: order["id"]}))
+
+    def test_account_history_ops_are_not_supported(self):
+        for op in [CONSTANTS.OP_FETCH_MY_TRADES, CONSTANTS.OP_FETCH_TRANSACTIONS]:
+            self.assertIsNone(self.exchange_service.execute_op(ATOM_TICKER_PAIR, op))
+
+    def test_books_stay_consistent_across_threads(self):
+        self.paper_exchange.latency = 0
+        ticker_info = self.feed.fetch_ticker(ATOM_TICKER_PAIR)
+        stop = threading.Event()
+
+        def update_quotes():
+            while not stop.is_set():
+                self.paper_exchange.update_quote(ATOM_TICKER_PAIR, ticker_info)
+
+        def place_orders():
+            for _ in range(300):
+                self.paper_exchange.create_order(ATOM_TICKER_PAIR, "limit", "buy", 1.0, price=ticker_info["ask"] * 2)
+
+        # switch threads as often as possible so unguarded book updates would interleave
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+
+        quoting = threading.Thread(target=update_quotes)
+        quoting.start()
+        placing = [threading.Thread(target=place_orders) for _ in range(4)]
+        for thread in placing:
+            thread.start()
+        for thread in placing:
+            thread.join()
+        stop.set()
+        quoting.join()
+
+        orders = self.paper_exchange.fetch_orders(ATOM_TICKER_PAIR)
+        self.assertEqual(len(orders), 1200)
+        self.assertEqual(len(set(order["id"] for order in orders)), 1200)
+        self.assertTrue(all(order["status"] == "closed" for order in orders))
+        self.assertEqual(self.paper_exchange.fetch_open_orders(ATOM_TICKER_PAIR), [])
+
+    def test_replayed_candles_follow_the_cursor(self):
+        self.step(9)
+        ohlcv = self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_OHLCV, {CONSTANTS.PARAM_LIMIT: 5})
+        self.assertEqual(ohlcv, self.ohlcv[5:10])
+        self.assertEqual(self.feed.now(), (self.ohlcv[0][0] + 9 * ONE_MINUTE_MS) / 1000)
+
+    def test_async_quotes_reach_the_books(self):
+        async_client = FakeAsyncExchangeClient()
+        exchange_service = ExchangeService({CONSTANTS.CONFIG_PAPER_TRADING: {}}, exchange_client=self.feed, async_exchange_client=async_client)
+
+        asyncio.run(exchange_service.refresh_ticker_snapshot_async([ATOM_TICKER_PAIR]))
+        self.assertIn(ATOM_TICKER_PAIR, exchange_service.paper_exchange.quotes)
@@ -0,0 +1,83 @@
+import copy
+import unittest
+import mongomock
+
+from utils.mongodb_service import MongoDBService
+from utils.constants import DEFAULT_MONGO_DB_NAME
+from utils.position_book import PositionBook
+from utils.trading import calculate_avg_position
+from tests.fixtures.multiple_trades import SOL_TRADES, ATOM_TRADES
+from tests.fixtures.ticker_info import SOL_TICKER_PAIR, ATOM_TICKER_PAIR
+
+POSITIONS_COLLECTION = "position_book_positions"
+
+class TestPositionBook(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_db = mongomock.MongoClient().db
+        self.mongodb_service = MongoDBService("mongomock://localhost", DEFAULT_MONGO_DB_NAME, self.mock_db)
+        self.mongodb_service.insert_many(POSITIONS_COLLECTION, copy.deepcopy(SOL_TRADES + ATOM_TRADES[:2]))
+        self.position_book = PositionBook(self.mongodb_service, POSITIONS_COLLECTION)
+        self.position_book.load()
+
+    def tearDown(self):
+        self.mongodb_service.delete_many(POSITIONS_COLLECTION)
+
+    def stored_positions(self, symbol):
+        return self.mongodb_service.query(POSITIONS_COLLECTION, {"symbol": symbol})
+
+    def test_load_indexes_positions_by_symbol(self):
+        self.assertEqual(len(self.position_book.get_positions(SOL_TICKER_PAIR)), len(SOL_TRADES))
+        self.assertEqual(len(self.position_book.get_positions(ATOM_TICKER_PAIR)), 2)
+        self.assertEqual(self.position_book.get_positions("BTC/USD"), [])
+        self.assertIsNone(self.position_book.get_avg_position("BTC/USD"))
+
+    def test_avg_position_matches_calculate_avg_position(self):
+        self.assertEqual(self.position_book.get_avg_position(SOL_TICKER_PAIR), calculate_avg_position(self.stored_positions(SOL_TICKER_PAIR)))
+
+    def test_add_writes_through_and_updates_average(self):
+        self.position_book.add(copy.deepcopy(ATOM_TRADES[2]))
+
+        stored = self.stored_positions(ATOM_TICKER_PAIR)
+        self.assertEqual(len(stored), 3)
+        self.assertEqual(self.position_book.get_avg_position(ATOM_TICKER_PAIR), calculate_avg_position(stored))
+
+    def test_remove_writes_through_and_updates_average(self):
+        removed_ids = [SOL_TRADES[1]["id"], SOL_TRADES[3]["id"]]
+        deletion_count = self.position_book.remove(SOL_TICKER_PAIR, removed_ids)
+
+        stored = self.stored_positions(SOL_TICKER_PAIR)
+        avg_position = self.position_book.get_avg_position(SOL_TICKER_PAIR)
+        expected = calculate_avg_position(stored)
+        self.assertEqual(deletion_count, 2)
+        self.assertEqual(len(self.position_book.get_positions(SOL_TICKER_PAIR)), 2)
+        self.assertEqual(avg_position["id"], expected["id"])
+        self.assertAlmostEqual(avg_position["cost"], expected["cost"])
+        self.assertAlmostEqual(avg_position["price"], expected["price"])
+
+    def test_removing_oldest_lot_rebases_average(self):
+        self.position_book.remove(SOL_TICKER_PAIR, [SOL_TRADES[0]["id"]])
+
+        self.assertEqual(self.position_book.get_avg_position(SOL_TICKER_PAIR), calculate_avg_position(self.stored_positions(SOL_TICKER_PAIR)))
+
+    def test_removing_all_lots_clears_symbol(self):
+        self.position_book.remove(ATOM_TICKER_PAIR, [trade["id"] for trade in ATOM_TRADES[:2]])
+
+        self.assertEqual(self.position_book.get_positions(ATOM_TICKER_PAIR), [])
+        self.assertIsNone(self.position_book.get_avg_position(ATOM_TICKER_PAIR))
+
+    def test_lots_follow_position_changes(self):
+        lots = self.position_book.get_lots(ATOM_TICKER_PAIR)
+        self.assertEqual(len(lots), 2)
+        self.assertIs(self.position_book.get_lots(ATOM_TICKER_PAIR), lots)
+
+        self.position_book.add(copy.deepcopy(ATOM_TRADES[2]))
+        self.assertEqual(len(self.position_book.get_lots(ATOM_TICKER_PAIR)), 3)
+
+        self.position_book.remove(ATOM_TICKER_PAIR, [ATOM_TRADES[0]["id"]])
+        lots = self.position_book.get_lots(ATOM_TICKER_PAIR)
+        self.assertEqual([position["id"] for position in lots.positions], [ATOM_TRADES[1]["id"], ATOM_TRADES[2]["id"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import itertools
+import random
+import unittest
+import numpy as np
+
+from decimal import Decimal
+from utils.position_lots import PositionLots
+from utils.trading import calculate_profit_percent, find_profitable_lots, find_profitable_trades, TakeProfitEvaluationType
+from tests.fixtures.multiple_trades import SOL_TRADES, ATOM_TRADES, MATIC_TRADES
+from tests.fixtures.ticker_info import MATIC_TICKER_INFO
+
+TOLERANCE = 1e-12
+
+class TestPositionLots(unittest.TestCase):
+
+    def test_profit_percents_match_calculate_profit_percent(self):
+        for trades in [SOL_TRADES, ATOM_TRADES, MATIC_TRADES]:
+            lots = PositionLots(trades)
+            bid_price = trades[0]["price"] * 1.03
+            profit_pcts = lots.profit_percents(bid_price)
+
+            self.assertEqual(len(profit_pcts), len(trades))
+            for (profit_pct, trade) in zip(profit_pcts, trades):
+                self.assertAlmostEqual(profit_pct, float(calculate_profit_percent(trade, bid_price)), delta=TOLERANCE)
+
+    def test_find_profitable_lots_keeps_position_order(self):
+        bid_price = MATIC_TICKER_INFO["bid"]
+        take_profit_threshold = Decimal(2.5/100)
+        expected = [trade for trade in MATIC_TRADES if calculate_profit_percent(trade, bid_price) >= take_profit_threshold]
+
+        profitable_positions = find_profitable_lots("MATIC/USD", MATIC_TRADES, bid_price, take_profit_threshold, PositionLots(MATIC_TRADES))
+        self.assertEqual(profitable_positions, expected)
+
+    def test_stale_lots_are_rebuilt(self):
+        bid_price = MATIC_TICKER_INFO["bid"]
+        take_profit_threshold = Decimal(2.5/100)
+        expected = find_profitable_lots("MATIC/USD", MATIC_TRADES, bid_price, take_profit_threshold)
+
+        profitable_positions = find_profitable_lots("MATIC/USD", MATIC_TRADES, bid_price, take_profit_threshold, PositionLots(MATIC_TRADES[:3]))
+        self.assertEqual(profitable_positions, expected)
+
+
+def generate_lots(rng, num_lots):
+    positions = []
+    for idx in range(num_lots):
+        amount = rng.uniform(0.5, 20)
+        price = rng.uniform(0.8, 1.2)
+        positions.append({
+            "id": str(idx),
+            "amount": amount,
+            "filled": amount,
+            "price": price,
+            "cost": amount * price,
+            "fee": {"cost": amount * price * 0.004}
+        })
+    return PositionLots(positions)
+
+class TestOptimizedTakeProfit(unittest.TestCase):
+
+    def assertBlendedProfitMeetsThreshold(self, lots, bid_price, threshold, selected):
+        profits = lots.profits(bid_price)
+        self.assertGreaterEqual(profits[selected].sum() + 1e-9, threshold * lots.cost[selected].sum())
+        self.assertTrue((profits[selected] > 0).all())
+
+    def test_selection_matches_brute_force(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            lots = generate_lots(rng, rng.randint(1, 10))
+            bid_price = rng.uniform(0.9, 1.2)
+            threshold = rng.uniform(0, 0.1)
+            profits = lots.profits(bid_price)
+
+            best = 0.0
+            for size in range(1, len(lots) + 1):
+                for subset in itertools.combinations(range(len(lots)), size):
+                    subset = list(subset)
+                    if (profits[subset] > 0).all() and profits[subset].sum() >= threshold * lots.cost[subset].sum():
+                        best = max(best, profits[subset].sum())
+
+            selected = lots.select_optimized(bid_price, threshold)
+            self.assertAlmostEqual(profits[selected].sum(), best, delta=1e-9)
+            if best > 0:
+                self.assertBlendedProfitMeetsThreshold(lots, bid_price, threshold, selected)
+
+    def test_prefers_profit_over_lot_count(self):
+        # one lot above a 10% threshold with 9 of surplus, then lots below it:
+        # "big" makes 10 for a deficit of 9, "small" ones make 4.5 for 4.05 each
+        def lot(lot_id, price, amount):
+            return {"id": lot_id, "amount": amount, "filled": amount, "price": price, "cost": price * amount, "fee": {"cost": 0.0}}
+
+        positions = [lot("above", 0.5, 20), lot("big", 0.95, 200), lot("small-1", 0.95, 90), lot("small-2", 0.95, 90)]
+        lots = PositionLots(positions)
+
+        selected = lots.select_optimized(1.0, 0.1)
+
+        # both small lots would exit more lots for 19 of profit, the big one realizes 20
+        self.assertEqual([positions[idx]["id"] for idx in selected], ["above", "big"])
+        self.assertAlmostEqual(lots.profits(1.0)[selected].sum(), 20.0)
+        self.assertBlendedProfitMeetsThreshold(lots, 1.0, 0.1, selected)
+
+    def test_sells_at_least_the_individually_profitable_lots(self):
+        lots = generate_lots(random.Random(11), 5000)
+        bid_price = 1.05
+        threshold = 0.05
+
+        selected = lots.select_optimized(bid_price, threshold)
+        individual = set(np.flatnonzero(lots.profit_percents(bid_price) >= threshold))
+
+        self.assertTrue(individual <= set(selected))
+        self.assertGreater(len(selected), len(individual))
+        self.assertBlendedProfitMeetsThreshold(lots, bid_price, threshold, selected)
+
+    def test_find_profitable_trades_optimized(self):
+        bid_price = MATIC_TICKER_INFO["bid"]
+        take_profit_threshold = Decimal(2.5/100)
+        individual = find_profitable_lots("MATIC/USD", MATIC_TRADES, bid_price, take_profit_threshold)
+
+        profitable_positions = find_profitable_trades("MATIC/USD",
+                                                      MATIC_TRADES[0],
+                                                      MATIC_TRADES,
+                                                      MATIC_TICKER_INFO,
+                                                      take_profit_threshold,
+                                                      TakeProfitEvaluationType.OPTIMIZED)
+        self.assertGreaterEqual(len(profitable_positions), len(individual))
+        self.assertTrue(all(position in profitable_positions for position in individual))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import unittest
+
+import utils.constants as CONSTANTS
+from ccxt import RequestTimeout, NetworkError, InsufficientFunds
+from utils.exchange_service import ExchangeService
+from utils.request_retry import CIRCUIT_CLOSED, CIRCUIT_OPEN
+from tests.fixtures.fake_exchange import FakeExchangeClient, FakeAsyncExchangeClient
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR
+
+EXCHANGE_CONFIG = {
+    CONSTANTS.CONFIG_MAX_RETRIES: 3,
+    CONSTANTS.CONFIG_RETRY_BASE_DELAY: 0.001,
+    CONSTANTS.CONFIG_RETRY_MAX_DELAY: 0.005,
+    CONSTANTS.CONFIG_CIRCUIT_FAILURE_THRESHOLD: 3,
+    CONSTANTS.CONFIG_CIRCUIT_RESET_TIMEOUT: 60
+}
+
+class FlakyExchangeClient(FakeExchangeClient):
+    """
+    Raises the queued errors, one per call, before serving requests again.
+    """
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+        self.attempts = 0
+
+    def fail(self):
+        self.attempts += 1
+        if len(self.errors) > 0:
+            raise self.errors.pop(0)
+
+    def fetch_ticker(self, symbol):
+        self.fail()
+        return super().fetch_ticker(symbol)
+
+    def create_order(self, symbol, type, side, amount, price=None):
+        self.fail()
+        return super().create_order(symbol, type, side, amount, price)
+
+
+class FlakyAsyncExchangeClient(FakeAsyncExchangeClient):
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        if len(self.errors) > 0:
+            self.calls.append(("fetch_ohlcv", symbol, timeframe))
+            raise self.errors.pop(0)
+        return await super().fetch_ohlcv(symbol, timeframe, since, limit)
+
+
+class TestRequestRetry(unittest.TestCase):
+
+    def setUp(self):
+        self.exchange_client = FlakyExchangeClient()
+        self.async_exchange_client = FlakyAsyncExchangeClient()
+        self.exchange_service = ExchangeService(EXCHANGE_CONFIG,
+                                                exchange_client=self.exchange_client,
+                                                async_exchange_client=self.async_exchange_client)
+
+    def test_retries_transient_errors_on_reads(self):
+        self.exchange_client.errors = [RequestTimeout("timed out"), NetworkError("reset")]
+        ticker_info = self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_TICKER)
+
+        self.assertEqual(ticker_info["symbol"], ATOM_TICKER_PAIR)
+        self.assertEqual(self.exchange_client.attempts, 3)
+        metrics = self.exchange_service.get_request_metrics()[CONSTANTS.OP_FETCH_TICKER]
+        self.assertEqual((metrics["retries"], metrics["failures"], metrics["circuit"]), (2, 0, CIRCUIT_CLOSED))
+
+    def test_orders_are_never_retried(self):
+        self.exchange_client.errors = [RequestTimeout("timed out")]
+        params = {CONSTANTS.PARAM_ORDER_TYPE: "sell", CONSTANTS.PARAM_SHARES: 1}
+        order = self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_CREATE_ORDER, params)
+
+        self.assertIsNone(order)
+        self.assertEqual(self.exchange_client.orders, {})
+        self.assertEqual(self.exchange_service.get_request_metrics()[CONSTANTS.OP_CREATE_ORDER]["failures"], 1)
+
+    def test_non_transient_errors_are_not_retried(self):
+        self.exchange_client.errors = [InsufficientFunds("no funds")]
+        params = {CONSTANTS.PARAM_ORDER_TYPE: "sell", CONSTANTS.PARAM_SHARES: 1}
+        self.assertIsNone(self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_CREATE_ORDER, params))
+        self.assertEqual(self.exchange_service.circuit_breakers[CONSTANTS.OP_CREATE_ORDER].failures, 0)
+
+    def test_circuit_opens_and_probes_after_the_timeout(self):
+        self.exchange_client.errors = [RequestTimeout("timed out")] * 3
+        self.assertIsNone(self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_TICKER))
+        self.assertEqual(self.exchange_client.attempts, 3)
+
+        # open, so nothing reaches the exchange, other endpoints are unaffected
+        self.assertIsNone(self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_TICKER))
+        self.assertEqual(self.exchange_client.attempts, 3)
+        self.assertIsNotNone(self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_OHLCV))
+
+        metrics = self.exchange_service.get_request_metrics()[CONSTANTS.OP_FETCH_TICKER]
+        self.assertEqual((metrics["retries"], metrics["rejected"], metrics["circuit_opens"], metrics["circuit"]), (2, 1, 1, CIRCUIT_OPEN))
+
+        # once the reset timeout passes, a successful probe closes it again
+        self.exchange_service.circuit_breakers[CONSTANTS.OP_FETCH_TICKER].opened_at -= EXCHANGE_CONFIG[CONSTANTS.CONFIG_CIRCUIT_RESET_TIMEOUT]
+        self.assertIsNotNone(self.exchange_service.execute_op(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_TICKER))
+        self.assertEqual(self.exchange_service.get_request_metrics()[CONSTANTS.OP_FETCH_TICKER]["circuit"], CIRCUIT_CLOSED)
+
+    def test_async_retries_back_off_on_the_event_loop(self):
+        self.async_exchange_client.errors = [NetworkError("reset")]
+        ohlcv = asyncio.run(self.exchange_service.execute_op_async(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_OHLCV))
+
+        self.assertEqual(len(ohlcv), 5)
+        self.assertEqual(len(self.async_exchange_client.calls), 2)
+        self.assertEqual(self.exchange_service.get_request_metrics()[CONSTANTS.OP_FETCH_OHLCV]["retries"], 1)
@@ -0,0 +1,95 @@
+import asyncio
+import time
+import unittest
+
+import utils.constants as CONSTANTS
+from utils.exchange_service import ExchangeService
+from utils.request_scheduler import RequestScheduler
+from tests.fixtures.fake_exchange import FakeExchangeClient, FakeAsyncExchangeClient
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, MATIC_TICKER_INFO
+
+class TestRequestScheduler(unittest.TestCase):
+
+    def test_paces_requests_to_the_rate(self):
+        scheduler = RequestScheduler(rate=100, burst=2)
+
+        start = time.monotonic()
+        for _ in range(6):
+            scheduler.acquire(CONSTANTS.OP_FETCH_TICKER)
+        elapsed = time.monotonic() - start
+
+        # 2 go out on the burst, the other 4 at 10ms apart
+        self.assertGreaterEqual(elapsed, 0.035)
+        self.assertEqual(scheduler.requests, 6)
+
+    def test_weights_spend_more_tokens(self):
+        scheduler = RequestScheduler(rate=100, burst=4, weights={CONSTANTS.OP_FETCH_OHLCV: 3})
+        scheduler.acquire(CONSTANTS.OP_FETCH_OHLCV)
+        self.assertLess(scheduler.tokens, 1.1)
+
+        scheduler.acquire(CONSTANTS.OP_FETCH_TICKER, requests=0)
+        self.assertEqual(scheduler.requests, 1)
+
+    def test_orders_preempt_queued_market_data(self):
+        scheduler = RequestScheduler(rate=50, burst=1)
+        served = []
+
+        async def request(op, name):
+            await scheduler.acquire_async(op)
+            served.append(name)
+
+        async def run():
+            fetches = [asyncio.create_task(request(CONSTANTS.OP_FETCH_OHLCV, f"ohlcv_{idx}")) for idx in range(4)]
+            await asyncio.sleep(0.005)
+            order = asyncio.create_task(request(CONSTANTS.OP_CREATE_ORDER, "order"))
+            await asyncio.gather(order, *fetches)
+
+        asyncio.run(run())
+        # the first fetch already had the token, the order goes next
+        self.assertEqual(served, ["ohlcv_0", "order", "ohlcv_1", "ohlcv_2", "ohlcv_3"])
+
+    def test_cancelled_waiters_leave_the_queue(self):
+        scheduler = RequestScheduler(rate=10, burst=1)
+
+        async def run():
+            await scheduler.acquire_async(CONSTANTS.OP_FETCH_TICKER)
+            waiter = asyncio.create_task(scheduler.acquire_async(CONSTANTS.OP_FETCH_TICKER))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+
+        asyncio.run(run())
+        self.assertEqual(scheduler.queue, [])
+        self.assertEqual(scheduler.requests, 1)
+
+
+class TestExchangeServiceScheduling(unittest.TestCase):
+
+    def setUp(self):
+        self.exchange_client = FakeExchangeClient()
+        self.exchange_service = ExchangeService({CONSTANTS.CONFIG_REQUESTS_PER_SECOND: 100, CONSTANTS.CONFIG_REQUEST_BURST: 2},
+                                                exchange_client=self.exchange_client,
+                                                async_exchange_client=FakeAsyncExchangeClient())
+
+    def test_unpaced_without_a_rate(self):
+        exchange_service = ExchangeService({}, exchange_client=FakeExchangeClient())
+        self.assertIsNone(exchange_service.request_scheduler)
+
+    def test_fetch_tickers_spends_a_token_per_chunk(self):
+        self.exchange_service.fetch_tickers_chunk_size = 1
+        params = {CONSTANTS.PARAM_SYMBOLS: [ATOM_TICKER_PAIR, MATIC_TICKER_INFO["symbol"]]}
+        self.exchange_service.execute_op("*", CONSTANTS.OP_FETCH_TICKERS, params)
+
+        self.assertLess(self.exchange_service.request_scheduler.tokens, 0.5)
+        self.assertEqual(len(self.exchange_client.calls), 2)
+
+    def test_async_ops_share_the_sync_queue(self):
+        async def run():
+            ops = [self.exchange_service.execute_op_async(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_OHLCV) for _ in range(3)]
+            ops.append(self.exchange_service.execute_op_async(ATOM_TICKER_PAIR, CONSTANTS.OP_FETCH_ORDER, {CONSTANTS.PARAM_ORDER_ID: None}))
+            return await asyncio.gather(*ops)
+
+        start = time.monotonic()
+        asyncio.run(run())
+        self.assertGreaterEqual(time.monotonic() - start, 0.015)
+        self.assertEqual(self.exchange_service.request_scheduler.requests, 4)
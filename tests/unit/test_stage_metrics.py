@@ -0,0 +1,88 @@
+import unittest
+import urllib.request
+
+import utils.constants as CONSTANTS
+from utils.candle_store import CandleStore
+from utils.exchange_service import ExchangeService
+from utils.stage_metrics import StageMetrics, MetricsServer, NULL_SPAN, METRIC_NAME
+from utils.strategies_enhanced import execute_strategies, init_strategies
+from tests.fixtures.candles import generate_ohlcv
+from tests.fixtures.fake_exchange import FakeExchangeClient
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, ATOM_TICKER_INFO
+
+STRATEGIES_CONFIG = {
+    "strategies": [
+        {"name": "RSI", "priority": 1, "parameters": {"overbought_signal_threshold": 70, "oversold_signal_threshold": 30}},
+        {"name": "MACD", "priority": 1, "parameters": {"fastperiod": 12, "slowperiod": 26, "signalperiod": 9}}
+    ]
+}
+
+class TestStageMetrics(unittest.TestCase):
+
+    def test_disabled_spans_record_nothing(self):
+        stage_metrics = StageMetrics()
+        self.assertIs(stage_metrics.span("frame_build", ATOM_TICKER_PAIR), NULL_SPAN)
+        with stage_metrics.span("frame_build", ATOM_TICKER_PAIR):
+            pass
+        self.assertEqual(stage_metrics.histograms, {})
+
+    def test_histogram_buckets_and_summary(self):
+        stage_metrics = StageMetrics(enabled=True, buckets=(0.001, 0.01, 0.1))
+        for seconds in [0.0005, 0.002, 0.003, 0.05, 0.5]:
+            stage_metrics.observe(("strategy", ATOM_TICKER_PAIR, "RSI"), seconds)
+
+        histogram = stage_metrics.histograms[("strategy", ATOM_TICKER_PAIR, "RSI")]
+        self.assertEqual(histogram.bucket_counts, [1, 2, 1, 1])
+        summary = stage_metrics.summary()["strategy"][f"RSI/{ATOM_TICKER_PAIR}"]
+        self.assertEqual(summary["count"], 5)
+        self.assertAlmostEqual(summary["p50_ms"], 10.0)
+        # past the last bucket the max is the best bound there is
+        self.assertAlmostEqual(summary["p95_ms"], 500.0)
+        self.assertAlmostEqual(summary["max_ms"], 500.0)
+
+    def test_prometheus_buckets_are_cumulative(self):
+        stage_metrics = StageMetrics(enabled=True, buckets=(0.001, 0.01))
+        for seconds in [0.0005, 0.005, 0.02]:
+            stage_metrics.observe(("fetchOHLCV", ATOM_TICKER_PAIR, ""), seconds)
+
+        text = stage_metrics.render_prometheus()
+        labels = f'stage="fetchOHLCV",ticker="{ATOM_TICKER_PAIR}",strategy=""'
+        self.assertIn(f'{METRIC_NAME}_bucket{{{labels},le="0.001"}} 1', text)
+        self.assertIn(f'{METRIC_NAME}_bucket{{{labels},le="0.01"}} 2', text)
+        self.assertIn(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} 3', text)
+        self.assertIn(f'{METRIC_NAME}_count{{{labels}}} 3', text)
+
+    def test_loop_stages_are_timed_per_ticker_and_strategy(self):
+        stage_metrics = StageMetrics(enabled=True)
+        exchange_service = ExchangeService({}, exchange_client=FakeExchangeClient(ohlcv=generate_ohlcv(num_candles=100)), stage_metrics=stage_metrics)
+        candle_store = CandleStore(exchange_service, stage_metrics=stage_metrics)
+
+        candles = candle_store.update(ATOM_TICKER_PAIR, "1m")
+        execute_strategies(ATOM_TICKER_PAIR, init_strategies(STRATEGIES_CONFIG), None, ATOM_TICKER_INFO, candles, stage_metrics=stage_metrics)
+
+        self.assertEqual(set(stage_metrics.histograms), {
+            (CONSTANTS.OP_FETCH_OHLCV, ATOM_TICKER_PAIR, ""),
+            ("frame_build", ATOM_TICKER_PAIR, ""),
+            ("strategy", ATOM_TICKER_PAIR, "RSI"),
+            ("strategy", ATOM_TICKER_PAIR, "MACD")
+        })
+
+    def test_metrics_endpoint_serves_prometheus_text(self):
+        stage_metrics = StageMetrics(enabled=True)
+        with stage_metrics.span("evaluate_ticker", ATOM_TICKER_PAIR):
+            pass
+
+        metrics_server = MetricsServer(stage_metrics, port=0)
+        metrics_server.start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{metrics_server.port}/metrics") as response:
+                body = response.read().decode()
+        finally:
+            metrics_server.stop()
+
+        self.assertEqual(body, stage_metrics.render_prometheus())
+        self.assertIn(f'{METRIC_NAME}_count{{stage="evaluate_ticker",ticker="{ATOM_TICKER_PAIR}",strategy=""}} 1', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import itertools
+import unittest
+
+from decimal import Decimal
+from strategies.base_strategy import BaseStrategy
+from utils.strategies_enhanced import execute_strategies_scoring, priority_weight, ACTION_THRESHOLD
+from utils.trading import TradeAction
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, ATOM_TICKER_INFO
+
+ACTIONS = [TradeAction.BUY, TradeAction.SELL, TradeAction.HOLD, TradeAction.NOOP]
+
+class StubStrategy(BaseStrategy):
+    def __init__(self, name, priority, action=TradeAction.NOOP, eval_cost=1, stateful=False):
+        super().__init__({"name": name, "priority": priority})
+        self.action = action
+        self.eval_cost = eval_cost
+        self.stateful = stateful
+        self.evals = 0
+
+    def eval(self, avg_position, candles, ticker_info):
+        self.evals += 1
+        return self.action
+
+
+class StubVolatility(StubStrategy):
+    def __init__(self, multiplier):
+        super().__init__("VOLATILITY_ADJUSTED", 0, eval_cost=1, stateful=True)
+        self.multiplier = Decimal(multiplier)
+
+    def get_volatility_multiplier(self, ticker):
+        return self.multiplier
+
+
+def by_priority(strategy_list) -> dict:
+    strategies = {}
+    for strategy in strategy_list:
+        strategies.setdefault(strategy.priority, []).append(strategy)
+    return dict(sorted(strategies.items()))
+
+
+def full_scoring(strategy_list, multiplier) -> TradeAction:
+    """
+    Every strategy evaluated, scores summed exactly so float rounding can't
+    break ties.
+    """
+    buy_score = sell_score = 0
+    hold_lock = False
+    for strategy in strategy_list:
+        weight = priority_weight(strategy.priority) * multiplier
+        if strategy.action == TradeAction.BUY:
+            buy_score += weight
+        elif strategy.action == TradeAction.SELL:
+            sell_score += weight
+        elif strategy.action == TradeAction.HOLD:
+            hold_lock = True
+
+    if buy_score >= ACTION_THRESHOLD and buy_score > sell_score:
+        return TradeAction.BUY
+    if sell_score >= ACTION_THRESHOLD and sell_score > buy_score:
+        return TradeAction.HOLD if hold_lock else TradeAction.SELL
+    return TradeAction.NOOP
+
+
+class TestStrategyScoring(unittest.TestCase):
+
+    def score(self, strategy_list):
+        return execute_strategies_scoring(ATOM_TICKER_PAIR, by_priority(strategy_list), None, ATOM_TICKER_INFO, None)
+
+    def test_short_circuit_matches_full_evaluation(self):
+        layout = [(1, 0), (1, 2), (2, 0), (2, 1), (2, 2), (3, 3)]
+        for multiplier in ["0.7", "1.0", "1.3"]:
+            for actions in itertools.product(ACTIONS, repeat=len(layout)):
+                strategy_list = [StubStrategy(f"S{idx}", priority, action, eval_cost) for (idx, ((priority, eval_cost), action)) in enumerate(zip(layout, actions))]
+                expected = full_scoring(strategy_list, Decimal(multiplier))
+                self.assertEqual(self.score(strategy_list + [StubVolatility(multiplier)]), expected, f"{multiplier} {actions}")
+
+    def test_expensive_strategies_are_skipped_once_decided(self):
+        cheap = [StubStrategy("AVERAGE_DOWN", 1, eval_cost=0), StubStrategy("RSI", 2, eval_cost=1), StubStrategy("BOLLINGER_BANDS", 2, eval_cost=1)]
+        expensive = [StubStrategy("MACD", 2, eval_cost=2), StubStrategy("ADAPTIVE_RSI", 2, eval_cost=3)]
+
+        # with no votes from the cheap ones, two priority 2 strategies can't reach the threshold at 0.7
+        self.assertEqual(self.score(expensive + cheap + [StubVolatility("0.7")]), TradeAction.NOOP)
+        self.assertEqual([strategy.evals for strategy in cheap + expensive], [1, 1, 1, 0, 0])
+
+        # a priority 1 buy and two priority 2 buys can't be outvoted by the rest
+        buys = [StubStrategy("AVERAGE_DOWN", 1, TradeAction.BUY, eval_cost=0), StubStrategy("RSI", 2, TradeAction.BUY), StubStrategy("BOLLINGER_BANDS", 2, TradeAction.BUY)]
+        macd = StubStrategy("MACD", 2, TradeAction.SELL, eval_cost=2)
+        self.assertEqual(self.score([macd] + buys), TradeAction.BUY)
+        self.assertEqual(macd.evals, 0)
+
+    def test_stateful_strategies_always_run(self):
+        trailing_stop = StubStrategy("DYNAMIC_TRAILING_STOP", 1, TradeAction.HOLD, eval_cost=0, stateful=True)
+        volatility = StubVolatility("0.7")
+        self.assertEqual(self.score([StubStrategy("RSI", 3), trailing_stop, volatility]), TradeAction.NOOP)
+        self.assertEqual((trailing_stop.evals, volatility.evals), (1, 1))
+
+    def test_pending_hold_keeps_sell_undecided(self):
+        # a sell that's already certain still waits for a HOLD from prevent_loss
+        hold = StubStrategy("MACD", 3, TradeAction.HOLD, eval_cost=2)
+        self.assertEqual(self.score([StubStrategy("TAKE_PROFIT", 1, TradeAction.SELL, eval_cost=0), StubStrategy("RSI", 2, TradeAction.SELL), hold]), TradeAction.HOLD)
+        self.assertEqual(hold.evals, 1)
+
+    def test_overrides_are_evaluated_in_place_of_strategies(self):
+        strategy = StubStrategy("RSI", 1, TradeAction.NOOP)
+        override = StubStrategy("RSI", 1, TradeAction.BUY)
+        strategies_overrides = {ATOM_TICKER_PAIR: {"RSI": override}}
+        action = execute_strategies_scoring(ATOM_TICKER_PAIR, by_priority([strategy]), None, ATOM_TICKER_INFO, None, strategies_overrides)
+        self.assertEqual((action, strategy.evals, override.evals), (TradeAction.BUY, 0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
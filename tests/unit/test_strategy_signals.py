@@ -0,0 +1,88 @@
+import json
+import unittest
+import numpy as np
+
+from backtesting.data import resample_ohlcv
+from backtesting.engine import Backtester
+from strategies.base_strategy import SIGNAL_ACTIONS, SIGNAL_NOOP
+from strategies.rsi import RSI
+from strategies.macd import MACD
+from strategies.bollinger_bands import BollingerBands
+from strategies.adaptive_rsi import AdaptiveRSI
+from strategies.price_momentum import PriceMomentum
+from strategies.volatility_adjusted import VolatilityAdjusted
+from utils.candle_frame import CandleFrame
+from tests.fixtures.candles import generate_ohlcv
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, SOL_TICKER_PAIR
+
+CONFIG_FILE = "./tests/fixtures/configs/backtest_config.json"
+
+STRATEGY_CONFIGS = [
+    (RSI, {"name": "RSI", "priority": 1, "prevent_loss": False, "parameters": {"overbought_signal_threshold": 60, "oversold_signal_threshold": 40, "num_candles_required": 2}}),
+    (MACD, {"name": "MACD", "priority": 1, "prevent_loss": False, "parameters": {"fastperiod": 12, "slowperiod": 26, "signalperiod": 9}}),
+    (BollingerBands, {"name": "BOLLINGER_BANDS", "priority": 1, "prevent_loss": False, "parameters": {"window": 20, "std_dev": 1}}),
+    (AdaptiveRSI, {"name": "ADAPTIVE_RSI", "priority": 1, "prevent_loss": False, "parameters": {"default_upper_threshold": 60, "default_lower_threshold": 40, "volatility_factor": 100, "rsi_period": 14, "trend_ma_period": 50, "trend_factor": 50}}),
+    (PriceMomentum, {"name": "PRICE_MOMENTUM", "priority": 1, "prevent_loss": False, "parameters": {"min_drop_percent": 1, "lookback_candles": 3, "rsi_max_threshold": 50, "volume_confirmation_multiplier": 0.8}})
+]
+
+class TestStrategySignals(unittest.TestCase):
+
+    def setUp(self):
+        self.ohlcv = generate_ohlcv(num_candles=240, seed=11)
+        self.ticker_info = {"symbol": ATOM_TICKER_PAIR, "bid": self.ohlcv[-1][4], "ask": self.ohlcv[-1][4]}
+
+    def test_signals_match_eval_on_every_prefix(self):
+        candles = CandleFrame.from_ohlcv(self.ohlcv)
+        for (strategy_class, config) in STRATEGY_CONFIGS:
+            strategy = strategy_class(config)
+            codes = strategy.signals(candles)
+
+            self.assertEqual(len(codes), len(self.ohlcv), strategy.name)
+            self.assertTrue(np.any(codes != SIGNAL_NOOP), strategy.name)
+            for idx in range(len(self.ohlcv)):
+                expected = strategy.eval(None, CandleFrame.from_ohlcv(self.ohlcv[:idx + 1]), self.ticker_info)
+                self.assertEqual(SIGNAL_ACTIONS[codes[idx]], expected, f"{strategy.name} at {idx}")
+
+    def test_volatility_multipliers_match_eval(self):
+        # low thresholds around the fixture's volatility so every state shows up
+        strategy = VolatilityAdjusted({"name": "VOLATILITY_ADJUSTED", "priority": 0, "parameters": {"high_volatility_pct": 1.6, "low_volatility_pct": 1.3}})
+        multipliers = strategy.volatility_multipliers(CandleFrame.from_ohlcv(self.ohlcv))
+
+        self.assertEqual(set(np.unique(multipliers)), {0.7, 1.0, 1.3})
+        for idx in range(len(self.ohlcv)):
+            strategy.eval(None, CandleFrame.from_ohlcv(self.ohlcv[:idx + 1]), self.ticker_info)
+            self.assertEqual(float(strategy.get_volatility_multiplier(ATOM_TICKER_PAIR)), multipliers[idx], f"at {idx}")
+
+    def test_disabled_strategies_never_signal(self):
+        candles = CandleFrame.from_ohlcv(self.ohlcv)
+        for (strategy_class, config) in STRATEGY_CONFIGS:
+            if strategy_class in (RSI, AdaptiveRSI):
+                # like their eval, these leave enabled to init_strategies
+                continue
+            strategy = strategy_class(dict(config, enabled=False))
+            self.assertFalse(np.any(strategy.signals(candles) != SIGNAL_NOOP), strategy.name)
+
+
+class TestVectorizedBacktest(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE) as f:
+            self.config = json.load(f)
+
+        self.ohlcv_by_pair = {
+            ATOM_TICKER_PAIR: np.array(generate_ohlcv(num_candles=3000, seed=3)),
+            SOL_TICKER_PAIR: np.array(generate_ohlcv(num_candles=3000, start_price=100.0, seed=5))
+        }
+
+    def test_matches_stepping_over_closed_candles(self):
+        # on closed 5m candles the stepped run sees exactly what the replayed signals saw
+        closed_by_pair = {ticker_pair: resample_ohlcv(ohlcv, 5 * 60 * 1000) for (ticker_pair, ohlcv) in self.ohlcv_by_pair.items()}
+
+        stepped = Backtester(self.config).run(closed_by_pair)
+        vectorized = Backtester(self.config, vectorized=True).run(self.ohlcv_by_pair)
+
+        self.assertGreater(vectorized.summary()["buys"], 0)
+        self.assertEqual(vectorized.evaluations, stepped.evaluations)
+        self.assertEqual([(trade["time"], trade["side"], trade["ticker_pair"]) for trade in vectorized.trades],
+                         [(trade["time"], trade["side"], trade["ticker_pair"]) for trade in stepped.trades])
+        np.testing.assert_allclose(vectorized.equity, stepped.equity, rtol=1e-12)
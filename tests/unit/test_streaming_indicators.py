@@ -0,0 +1,136 @@
+import math
+import time
+import unittest
+import talib
+import numpy as np
+
+import utils.indicators as indicators
+from collections import deque
+from utils.exchange_service import ExchangeService
+from utils.candle_store import CandleStore
+from utils.streaming_indicators import StreamingRSI, StreamingMACD, StreamingATR, RollingWindowStats, StreamingPctChangeStats, StreamingIndicatorEngine
+from tests.fixtures.candles import generate_ohlcv, generate_candles_df
+from tests.fixtures.fake_exchange import FakeExchangeClient
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR
+
+TOLERANCE = 1e-9
+ONE_MINUTE_MS = 60 * 1000
+
+def stream(indicator, values):
+    return [indicator.update(value) for value in values]
+
+class TestStreamingIndicators(unittest.TestCase):
+
+    def setUp(self):
+        self.candles_df = generate_candles_df()
+        self.close = self.candles_df['close']
+
+    def assertSeriesClose(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for (a, e) in zip(actual, expected):
+            if math.isnan(e):
+                self.assertTrue(math.isnan(a))
+            else:
+                self.assertLessEqual(abs(a - e), TOLERANCE * max(1.0, abs(e)))
+
+    def test_rsi_matches_talib(self):
+        for scale in [1, 100000]:
+            expected = talib.RSI(self.close * scale, timeperiod=14)
+            self.assertSeriesClose(stream(StreamingRSI(14), self.close * scale), expected)
+
+    def test_rsi_flat_prices_match_talib_zero_check(self):
+        flat = np.full(40, 0.00002)
+        self.assertSeriesClose(stream(StreamingRSI(14), flat), talib.RSI(flat, timeperiod=14))
+
+    def test_macd_matches_talib(self):
+        (macd, macd_signal, macd_hist) = talib.MACD(self.close, fastperiod=12, slowperiod=26, signalperiod=9)
+        outputs = stream(StreamingMACD(12, 26, 9), self.close)
+
+        self.assertSeriesClose([output[0] for output in outputs], macd)
+        self.assertSeriesClose([output[1] for output in outputs], macd_signal)
+        self.assertSeriesClose([output[2] for output in outputs], macd_hist)
+
+    def test_atr_matches_talib(self):
+        values = zip(self.candles_df['high'], self.candles_df['low'], self.close)
+        expected = talib.ATR(self.candles_df['high'], self.candles_df['low'], self.close, timeperiod=14)
+        self.assertSeriesClose(stream(StreamingATR(14), values), expected)
+
+    def test_rolling_stats_match_pandas(self):
+        outputs = stream(RollingWindowStats(20), self.close * 1000000)
+
+        self.assertSeriesClose([output[0] for output in outputs], (self.close * 1000000).rolling(20).mean())
+        self.assertSeriesClose([output[1] for output in outputs], (self.close * 1000000).rolling(20).std())
+
+    def test_pct_change_std_matches_pandas(self):
+        outputs = stream(StreamingPctChangeStats(14), self.close)
+        self.assertSeriesClose([output[1] for output in outputs], self.close.pct_change().rolling(14).std())
+
+    def test_peek_does_not_advance_state(self):
+        rsi = StreamingRSI(14)
+        stream(rsi, self.close[:-1])
+        state = rsi.state
+
+        peeked = rsi.peek(self.close.iloc[-1])
+        self.assertEqual(rsi.state, state)
+        self.assertEqual(peeked, rsi.update(self.close.iloc[-1]))
+
+
+class TestStreamingIndicatorEngine(unittest.TestCase):
+
+    def test_latest_evaluates_forming_candle(self):
+        ohlcv = generate_ohlcv()
+        engine = StreamingIndicatorEngine(deque(ohlcv))
+        candles_df = generate_candles_df()
+
+        rsi = engine.latest("RSI", (14,), lambda: StreamingRSI(14), indicators.candle_value("close"))
+        self.assertAlmostEqual(rsi, talib.RSI(candles_df['close'], timeperiod=14).iloc[-1], delta=TOLERANCE)
+
+    def test_sync_feeds_only_newly_closed_candles(self):
+        ohlcv = generate_ohlcv(num_candles=120)
+        candles = deque(ohlcv[:100])
+        engine = StreamingIndicatorEngine(candles)
+        engine.sync()
+        engine.latest("RSI", (14,), lambda: StreamingRSI(14), indicators.candle_value("close"))
+
+        for candle in ohlcv[100:]:
+            candles.append(candle)
+            engine.sync()
+
+        expected = talib.RSI(np.array([candle[4] for candle in ohlcv]), timeperiod=14)
+        rsi = engine.latest("RSI", (14,), lambda: StreamingRSI(14), indicators.candle_value("close"))
+        self.assertAlmostEqual(rsi, expected[-1], delta=TOLERANCE)
+        (indicator, _) = engine.indicators[("RSI", (14,))]
+        self.assertEqual(indicator.state[1], 118)
+
+
+class TestCandleStoreStreaming(unittest.TestCase):
+
+    def setUp(self):
+        now_ms = int(time.time() * 1000)
+        end_timestamp = now_ms - now_ms % ONE_MINUTE_MS
+        self.ohlcv = generate_ohlcv(num_candles=150, start_timestamp=end_timestamp - 149 * ONE_MINUTE_MS)
+        self.exchange_client = FakeExchangeClient(ohlcv=self.ohlcv[:140])
+        self.candle_store = CandleStore(ExchangeService({}, exchange_client=self.exchange_client), max_candles=300)
+
+    def test_latest_values_follow_merged_candles(self):
+        candles = self.candle_store.update(ATOM_TICKER_PAIR, "1m")
+        self.assertAlmostEqual(indicators.latest_atr(candles, 14), indicators.atr(candles, 14)[-1], delta=TOLERANCE)
+
+        self.exchange_client.ohlcv = self.ohlcv
+        candles = self.candle_store.update(ATOM_TICKER_PAIR, "1m")
+        self.assertEqual(len(candles), 150)
+
+        (macd, macd_signal, _) = indicators.latest_macd(candles)
+        (expected_macd, expected_signal, _) = indicators.macd(candles)
+        self.assertAlmostEqual(indicators.latest_atr(candles, 14), indicators.atr(candles, 14)[-1], delta=TOLERANCE)
+        self.assertAlmostEqual(macd, expected_macd[-1], delta=TOLERANCE)
+        self.assertAlmostEqual(macd_signal, expected_signal[-1], delta=TOLERANCE)
+
+        (middle_band, upper_band, _) = indicators.latest_bollinger_bands(candles, 20, 2)
+        expected_middle = indicators.rolling_mean(candles, 20)[-1]
+        self.assertAlmostEqual(middle_band, expected_middle, delta=TOLERANCE)
+        self.assertAlmostEqual(upper_band, expected_middle + 2 * indicators.rolling_std(candles, 20)[-1], delta=TOLERANCE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import unittest
+import numpy as np
+
+from backtesting.engine import Backtester
+from backtesting.fill_model import FillModel
+from backtesting.sweep import SharedOhlcv, apply_parameters, build_trials, rank_results, run_sweep, SWEEP_METHOD_RANDOM, RESULT_FIELDS
+from tests.fixtures.candles import generate_ohlcv
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, SOL_TICKER_PAIR
+
+CONFIG_FILE = "./tests/fixtures/configs/backtest_config.json"
+SWEEP_FILE = "./tests/fixtures/configs/sweep_config.json"
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE) as f:
+            self.config = json.load(f)
+        with open(SWEEP_FILE) as f:
+            self.parameter_space = json.load(f)["parameters"]
+
+        self.ohlcv_by_pair = {
+            ATOM_TICKER_PAIR: np.array(generate_ohlcv(num_candles=2000, seed=3)),
+            SOL_TICKER_PAIR: np.array(generate_ohlcv(num_candles=2000, start_price=100.0, seed=5))
+        }
+
+    def test_apply_parameters_sets_paths_on_a_copy(self):
+        config = apply_parameters(self.config, {"take_profits.threshold_percent": 4, "strategies.RSI.parameters.oversold_signal_threshold": 25, "trade_cooldown_period": 5})
+        self.assertEqual(config["take_profits"]["threshold_percent"], 4)
+        self.assertEqual(config["strategies"][0]["parameters"]["oversold_signal_threshold"], 25)
+        self.assertEqual(config["trade_cooldown_period"], 5)
+        self.assertEqual(self.config["take_profits"]["threshold_percent"], 2)
+        self.assertEqual(self.config["strategies"][0]["parameters"]["oversold_signal_threshold"], 30)
+
+        self.assertIsNone(apply_parameters(self.config, {"strategies.MACD.parameters.fastperiod": 10}))
+
+    def test_build_trials(self):
+        grid = build_trials(self.parameter_space)
+        self.assertEqual(len(grid), 12)
+        self.assertEqual(len({json.dumps(trial, sort_keys=True) for trial in grid}), 12)
+
+        sampled = build_trials(self.parameter_space, SWEEP_METHOD_RANDOM, samples=5, seed=1)
+        self.assertEqual(len(sampled), 5)
+        self.assertTrue(all(trial in grid for trial in sampled))
+        self.assertEqual(sampled, build_trials(self.parameter_space, SWEEP_METHOD_RANDOM, samples=5, seed=1))
+        self.assertEqual(len(build_trials(self.parameter_space, SWEEP_METHOD_RANDOM, samples=50, seed=1)), 12)
+
+    def test_rank_results(self):
+        ranked = rank_results([
+            {"pnl": 1.0, "max_drawdown_percent": 5.0},
+            {"pnl": 2.0, "max_drawdown_percent": 9.0},
+            {"pnl": 1.0, "max_drawdown_percent": 3.0}
+        ])
+        self.assertEqual(list(ranked["pnl"]), [2.0, 1.0, 1.0])
+        self.assertEqual(list(ranked["max_drawdown_percent"]), [9.0, 3.0, 5.0])
+
+    def test_shared_ohlcv_round_trips(self):
+        shared_ohlcv = SharedOhlcv(self.ohlcv_by_pair)
+        try:
+            (shm, ohlcv_by_pair) = SharedOhlcv.attach(shared_ohlcv.shm.name, shared_ohlcv.layout)
+            for (ticker_pair, ohlcv) in self.ohlcv_by_pair.items():
+                np.testing.assert_array_equal(ohlcv_by_pair[ticker_pair], ohlcv)
+                self.assertFalse(ohlcv_by_pair[ticker_pair].flags.writeable)
+            del ohlcv_by_pair
+            shm.close()
+        finally:
+            shared_ohlcv.close()
+
+    def test_parallel_sweep_matches_serial_backtests(self):
+        trials = build_trials(self.parameter_space, SWEEP_METHOD_RANDOM, samples=4, seed=2)
+        results_df = run_sweep(self.config, self.ohlcv_by_pair, trials, workers=2)
+
+        self.assertEqual(len(results_df), 4)
+        self.assertTrue(np.all(np.diff(results_df["pnl"]) <= 0))
+        for trial in trials:
+            summary = Backtester(apply_parameters(self.config, trial), FillModel()).run(self.ohlcv_by_pair).summary()
+            row = results_df[np.logical_and.reduce([results_df[path] == value for (path, value) in trial.items()])]
+            self.assertEqual(len(row), 1)
+            for field in RESULT_FIELDS:
+                if field != "elapsed_seconds":
+                    self.assertAlmostEqual(row[field].iloc[0], summary[field], places=9)
+
+        self.assertIsNone(run_sweep(self.config, self.ohlcv_by_pair, [{"strategies.MACD.parameters.fastperiod": 10}]))
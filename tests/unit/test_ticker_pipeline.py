@@ -0,0 +1,79 @@
+import unittest
+
+from decimal import Decimal
+from utils.candle_frame import CandleFrame
+from utils.strategies_enhanced import execute_strategies, init_strategies, init_strategies_overrides
+from utils.ticker_pipeline import TickerPipeline, compile_ticker_pipelines
+from utils.trading import TakeProfitEvaluationType
+from tests.fixtures.candles import generate_ohlcv
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR, ATOM_TICKER_INFO
+
+SOL_TICKER_PAIR = "SOL/USD"
+
+CONFIG = {
+    "strategies": [
+        {"name": "RSI", "priority": 1, "parameters": {"overbought_signal_threshold": 70, "oversold_signal_threshold": 30}}
+    ],
+    "overrides": [
+        {
+            "tickers": [ATOM_TICKER_PAIR],
+            "strategies": [
+                {"name": "RSI", "priority": 1, "parameters": {"overbought_signal_threshold": 72, "oversold_signal_threshold": 20}}
+            ]
+        }
+    ]
+}
+
+OVERRIDES = {
+    ATOM_TICKER_PAIR: {
+        "take_profits": {"threshold_percent": 5, "evaluation_type": "AVERAGE"},
+        "amount_per_transaction": 10,
+        "reinvestment_percent": 1,
+        "trade_cooldown_period": 30
+    }
+}
+
+class TestTickerPipeline(unittest.TestCase):
+
+    def compile(self):
+        strategies = init_strategies(CONFIG)
+        strategies_overrides = init_strategies_overrides(CONFIG)
+        defaults = TickerPipeline(Decimal(2/100), TakeProfitEvaluationType.INDIVIDUAL_LOTS, Decimal(5), Decimal("0.5"), 10)
+        pipelines = compile_ticker_pipelines([ATOM_TICKER_PAIR, SOL_TICKER_PAIR], defaults, OVERRIDES, strategies, strategies_overrides)
+        return (pipelines, strategies, strategies_overrides)
+
+    def test_overrides_are_resolved(self):
+        (pipelines, strategies, strategies_overrides) = self.compile()
+        pipeline = pipelines[ATOM_TICKER_PAIR]
+
+        self.assertEqual(pipeline.take_profit_threshold, Decimal(5/100))
+        self.assertEqual(pipeline.take_profit_evaluation_type, TakeProfitEvaluationType.AVERAGE)
+        self.assertEqual(pipeline.amount_per_transaction, Decimal(10))
+        self.assertEqual(pipeline.reinvestment_percent, Decimal(1))
+        self.assertEqual(pipeline.trade_cooldown_period, 30)
+        self.assertIs(pipeline.scoring_plan.strategies[1][0], strategies_overrides[ATOM_TICKER_PAIR]["RSI"])
+
+    def test_pairs_without_overrides_get_the_defaults(self):
+        (pipelines, strategies, strategies_overrides) = self.compile()
+        pipeline = pipelines[SOL_TICKER_PAIR]
+
+        self.assertEqual(pipeline.take_profit_threshold, Decimal(2/100))
+        self.assertEqual(pipeline.take_profit_evaluation_type, TakeProfitEvaluationType.INDIVIDUAL_LOTS)
+        self.assertEqual(pipeline.amount_per_transaction, Decimal(5))
+        self.assertEqual(pipeline.reinvestment_percent, Decimal("0.5"))
+        self.assertEqual(pipeline.trade_cooldown_period, 10)
+        self.assertIs(pipeline.scoring_plan.strategies[1][0], strategies[1][0])
+
+    def test_scoring_plan_matches_per_call_resolution(self):
+        (pipelines, strategies, strategies_overrides) = self.compile()
+        candles = CandleFrame.from_ohlcv(generate_ohlcv(num_candles=100))
+
+        for use_scoring in [True, False]:
+            expected = execute_strategies(ATOM_TICKER_PAIR, strategies, None, ATOM_TICKER_INFO, candles, strategies_overrides, use_scoring=use_scoring)
+            action = execute_strategies(ATOM_TICKER_PAIR, strategies, None, ATOM_TICKER_INFO, candles, use_scoring=use_scoring,
+                                        scoring_plan=pipelines[ATOM_TICKER_PAIR].scoring_plan)
+            self.assertEqual(action, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import copy
+import unittest
+
+from decimal import Decimal
+from utils.position_book import PositionBook
+from utils.ticker_pipeline import TickerPipeline
+from utils.trade_ledger import TradeLedger
+from utils.trading import TakeProfitEvaluationType, TradeAction
+from tests.fixtures.multiple_trades import ATOM_TRADES
+from tests.fixtures.ticker_info import ATOM_TICKER_PAIR
+
+PIPELINE = TickerPipeline(Decimal(2/100), TakeProfitEvaluationType.AVERAGE, Decimal(5), Decimal("0.5"), 10)
+
+class TestTradeLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.position_book = PositionBook(None, None)
+        self.ledger = TradeLedger(self.position_book, Decimal(12), lambda ticker_pair: PIPELINE, clock=lambda: self.now)
+
+    def test_buys_wait_out_the_cooldown(self):
+        amount = self.ledger.buy_amount(ATOM_TICKER_PAIR)
+        self.assertEqual(amount, Decimal(5))
+
+        self.ledger.reserve(ATOM_TICKER_PAIR, amount)
+        self.assertEqual(self.ledger.remaining_balance, Decimal(7))
+        self.now += 9 * 60
+        self.assertIsNone(self.ledger.buy_amount(ATOM_TICKER_PAIR))
+
+        self.now += 60
+        self.assertEqual(self.ledger.buy_amount(ATOM_TICKER_PAIR), Decimal(5))
+
+    def test_buys_need_the_remaining_balance(self):
+        self.ledger.remaining_balance = Decimal(4)
+        self.assertIsNone(self.ledger.buy_amount(ATOM_TICKER_PAIR))
+
+    def test_partial_buy_releases_what_was_not_spent(self):
+        order = dict(copy.deepcopy(ATOM_TRADES[0]), amount=2 * ATOM_TRADES[0]["filled"], status="canceled")
+        self.ledger.reserve(ATOM_TICKER_PAIR, Decimal(10))
+
+        unspent = self.ledger.record_partial_buy(order, Decimal(10))
+        spent = Decimal(str(order["cost"])) + Decimal(str(order["fee"]["cost"]))
+        self.assertEqual(unspent, Decimal(10) - spent)
+        self.assertEqual(self.ledger.remaining_balance, Decimal(12) - spent)
+        self.assertEqual(self.position_book.get_positions(ATOM_TICKER_PAIR)[0]["amount"], order["filled"])
+
+    def test_sell_closes_positions_and_reinvests(self):
+        for trade in ATOM_TRADES[:2]:
+            self.ledger.record_buy(copy.deepcopy(trade))
+
+        proceeds = self.ledger.record_sell(ATOM_TICKER_PAIR, {"info": {"total_value_after_fees": "11"}}, self.position_book.get_positions(ATOM_TICKER_PAIR))
+        self.assertEqual(proceeds, Decimal(11))
+        self.assertEqual(self.ledger.remaining_balance, Decimal(12) + Decimal(11) * PIPELINE.reinvestment_percent)
+        self.assertEqual(self.position_book.get_positions(ATOM_TICKER_PAIR), [])
+
+    def test_take_profit_comes_before_the_strategies(self):
+        for trade in ATOM_TRADES[:2]:
+            self.ledger.record_buy(copy.deepcopy(trade))
+        avg_position = self.position_book.get_avg_position(ATOM_TICKER_PAIR)
+        all_positions = self.position_book.get_positions(ATOM_TICKER_PAIR)
+
+        def run_strategies():
+            raise AssertionError("strategies ran after take profit fired")
+
+        (positions_to_exit, trade_action) = self.ledger.evaluate(ATOM_TICKER_PAIR, avg_position, all_positions, {"bid": 7.0}, run_strategies)
+        self.assertEqual(len(positions_to_exit), 2)
+        self.assertIsNone(trade_action)
+
+        (positions_to_exit, trade_action) = self.ledger.evaluate(ATOM_TICKER_PAIR, avg_position, all_positions, {"bid": 6.0}, lambda: TradeAction.BUY)
+        self.assertIsNone(positions_to_exit)
+        self.assertEqual(trade_action, TradeAction.BUY)
+
+
+if __name__ == '__main__':
+    unittest.main()
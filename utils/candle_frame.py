@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import utils.constants as CONSTANTS
+
+CANDLE_FRAME_ATTRIBUTE = "_candle_frame"
+
+class IndicatorCache:
+    """
+    Memoizes indicator series computed from a single candle frame.
+
+    Entries are keyed by (indicator, params, source column, frame version) so
+    strategies and overrides asking for the same indicator share one
+    computation per ticker per cycle.  Scaled inputs (normalization_factor) are
+    part of params because talib's zero checks make RSI differ for tiny prices.
+
+    Frames served by the CandleStore also carry the key's streaming engine,
+    which the latest_* helpers use to get the last value in O(1).
+    """
+
+    def __init__(self, version: int = 0, streaming = None):
+        self.version = version
+        self.streaming = streaming
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, indicator: str, params: tuple, source: str, compute):
+        key = (indicator, params, source, self.version)
+        if key in self.entries:
+            self.hits += 1
+            return self.entries[key]
+
+        self.misses += 1
+        value = compute()
+        self.entries[key] = value
+        return value
+
+    def invalidate(self):
+        """
+        Call after replacing the OHLCV columns of the frame.
+        """
+        self.version += 1
+        self.entries = {}
+
+
+class CandleFrame:
+    """
+    Read-only OHLCV view handed to strategies.
+
+    Each column is a contiguous float64 NumPy array with the writeable flag
+    cleared, so every strategy evaluated for a ticker reads the same buffers
+    and none of them can change what the next one sees.  Derived series
+    (indicators) never go into the frame, they live in the derived side
+    channel, an IndicatorCache shared by everyone holding the frame.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray], version: int = 0, streaming = None):
+        self.columns = {}
+        for name in CONSTANTS.OHLCV_COLUMNS:
+            column = np.ascontiguousarray(columns[name], dtype=np.float64)
+            column.flags.writeable = False
+            self.columns[name] = column
+
+        self.derived = IndicatorCache(version, streaming)
+
+    @classmethod
+    def from_ohlcv(cls, ohlcv, version: int = 0, streaming = None):
+        """
+        Builds the frame from ccxt style [time, open, high, low, close, volume]
+        candles with a single copy into a column major block.
+        """
+        block = np.array(ohlcv, dtype=np.float64).reshape(-1, len(CONSTANTS.OHLCV_COLUMNS)).T.copy()
+        return cls(dict(zip(CONSTANTS.OHLCV_COLUMNS, block)), version, streaming)
+
+    @classmethod
+    def from_dataframe(cls, candles_df: pd.DataFrame):
+        return cls({name: candles_df[name].to_numpy(dtype=np.float64) for name in CONSTANTS.OHLCV_COLUMNS})
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __len__(self):
+        return len(self.columns["close"])
+
+
+def as_candle_frame(candles) -> CandleFrame:
+    """
+    Returns candles as a CandleFrame, DataFrames are converted once and the
+    frame is remembered on the DataFrame so repeated calls share its cache.
+    """
+    if candles is None or isinstance(candles, CandleFrame):
+        return candles
+
+    candle_frame = candles.__dict__.get(CANDLE_FRAME_ATTRIBUTE)
+    if candle_frame is None:
+        candle_frame = CandleFrame.from_dataframe(candles)
+        # set on the instance directly, DataFrame.__setattr__ would treat it as a column
+        object.__setattr__(candles, CANDLE_FRAME_ATTRIBUTE, candle_frame)
+    return candle_frame
@@ -0,0 +1,120 @@
+import time
+import ccxt
+import utils.constants as CONSTANTS
+
+from collections import deque
+from utils.logger import logger
+from utils.candle_frame import CandleFrame
+from utils.streaming_indicators import StreamingIndicatorEngine
+from utils.stage_metrics import StageMetrics
+
+class CandleStore:
+    """
+    In-process OHLCV cache keyed by (ticker_pair, timeframe).
+
+    The first fetch for a key downloads the exchange's default page of candles,
+    after that only candles at or after the last stored timestamp are fetched.
+    The last stored candle is usually still forming, so an incoming candle with
+    the same timestamp replaces it instead of being appended.  Each key keeps at
+    most max_candles candles in a ring buffer.
+
+    The read-only CandleFrame handed out for a key is reused until a merge
+    changes its candles, and carries an indicator cache tagged with the key's
+    version, so every consumer of the same candles shares indicator
+    computations.  Each
+    key also owns a StreamingIndicatorEngine, synced on every merge, which
+    serves the latest indicator values in O(1) per new candle.
+
+    Staleness is judged against clock, seconds since the epoch like
+    time.time, so replayed market data passes its replayed time instead.
+    """
+
+    def __init__(self, exchange_service, max_candles: int = CONSTANTS.CONFIG_DEFAULT_OHLCV_MAX_CANDLES, stage_metrics: StageMetrics = None, clock=None):
+        self.exchange_service = exchange_service
+        self.max_candles = max_candles
+        self.stage_metrics = StageMetrics() if stage_metrics is None else stage_metrics
+        self.clock = time.time if clock is None else clock
+        self.candles: dict[tuple[str, str], deque] = {}
+        self.versions: dict[tuple[str, str], int] = {}
+        self.frames: dict[tuple[str, str], CandleFrame] = {}
+        self.streaming: dict[tuple[str, str], StreamingIndicatorEngine] = {}
+
+    def update(self, ticker_pair: str, timeframe: str) -> CandleFrame:
+        key = (ticker_pair, timeframe)
+        params = self.get_fetch_params(key)
+        ohlcv = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_OHLCV, params=params)
+        with self.stage_metrics.span("frame_build", ticker_pair):
+            return self.merge(key, ohlcv)
+
+    async def update_async(self, ticker_pair: str, timeframe: str) -> CandleFrame:
+        key = (ticker_pair, timeframe)
+        params = self.get_fetch_params(key)
+        ohlcv = await self.exchange_service.execute_op_async(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_OHLCV, params=params)
+        with self.stage_metrics.span("frame_build", ticker_pair):
+            return self.merge(key, ohlcv)
+
+    def get_fetch_params(self, key) -> dict:
+        (ticker_pair, timeframe) = key
+        params = {
+            CONSTANTS.PARAM_TIMEFRAME: timeframe
+        }
+
+        last_timestamp = self.get_last_timestamp(key)
+        if last_timestamp is None:
+            return params
+
+        # a delta fetch only returns one page forward from since, so after a long
+        # gap it would miss the newest candles; reload the whole window instead
+        timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        if self.clock() * 1000 - last_timestamp > self.max_candles * timeframe_ms:
+            logger.info(f"{ticker_pair}: {timeframe} candles are stale, reloading full history")
+            del self.candles[key]
+            self.frames.pop(key, None)
+            self.versions.pop(key, None)
+            self.streaming.pop(key, None)
+            return params
+
+        params[CONSTANTS.PARAM_SINCE] = last_timestamp
+        return params
+
+    def get_last_timestamp(self, key):
+        if key not in self.candles or len(self.candles[key]) == 0:
+            return None
+        return self.candles[key][-1][0]
+
+    def merge(self, key, ohlcv) -> CandleFrame:
+        if ohlcv is None:
+            return None
+
+        if key not in self.candles:
+            self.candles[key] = deque(maxlen=self.max_candles)
+            self.streaming[key] = StreamingIndicatorEngine(self.candles[key])
+
+        candles = self.candles[key]
+        changed = False
+        for candle in ohlcv:
+            last_timestamp = self.get_last_timestamp(key)
+            if last_timestamp is None or candle[0] > last_timestamp:
+                candles.append(candle)
+                changed = True
+            elif candle[0] == last_timestamp and candle != candles[-1]:
+                candles[-1] = candle
+                changed = True
+
+        if changed:
+            self.versions[key] = self.versions.get(key, 0) + 1
+            self.frames.pop(key, None)
+            self.streaming[key].sync()
+
+        logger.debug(f"{key[0]}: merged {len(ohlcv)} {key[1]} candles, {len(candles)} stored")
+        return self.get_candle_frame(key[0], key[1])
+
+    def get_candle_frame(self, ticker_pair: str, timeframe: str) -> CandleFrame:
+        key = (ticker_pair, timeframe)
+        if key not in self.candles:
+            return None
+
+        if key not in self.frames:
+            self.frames[key] = CandleFrame.from_ohlcv(self.candles[key], self.versions.get(key, 0), self.streaming[key])
+
+        return self.frames[key]
@@ -18,6 +18,8 @@ DEFAULT_MONGO_OHLCV_DATA_COLLECTION = "ohlcv_data"
 DEFAULT_MONGO_OHLCV_DATA_GRANULARITY = "minutes"
 DEFAULT_MONGO_OHLCV_DATA_META_FIELD = "ticker"
 DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD = "timestamp"
+DEFAULT_OHLCV_BACKFILL_CHECKPOINT_FILE = "ohlcv_backfill_checkpoints.json"
+DEFAULT_OHLCV_BACKFILL_PAGE_LIMIT = 300
 
 DEFAULT_TAKE_PROFIT_THRESHOLD = 2
 DEFAULT_TAKE_PROFIT_EVALUATION_TYPE = "AVERAGE"
@@ -43,10 +45,12 @@ CONFIG_BLACKLISTED_CRYPTO_CURRENCIES = "blacklisted_crypto_currencies"
 CONFIG_DRY_RUN = "dry_run"
 CONFIG_CURRENCY = "currency"
 CONFIG_SLEEP_INTERVAL = "sleep_interval"
-CONFIG_CRYPTO_CURRENCY_SLEEP_INTERVAL = "crypto_currency_sleep_interval"
 CONFIG_OHLCV_TIMEFRAME = "ohlcv_timeframe"
 CONFIG_DYNAMIC_TIMEFRAME = "dynamic_timeframe"
+CONFIG_OHLCV_MAX_CANDLES = "ohlcv_max_candles"
 CONFIG_VOLATILITY_THRESHOLDS = "volatility_thresholds"
+CONFIG_ASYNC_MODE = "async_mode"
+CONFIG_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
 CONFIG_DB = "db"
 CONFIG_DB_TYPE = "db_type"
 CONFIG_DB_NAME = "db_name"
@@ -57,16 +61,52 @@ CONFIG_EXCHANGE_ID = "exchange_id"
 CONFIG_TICKERS = "tickers"
 CONFIG_LIMIT_ORDER_NUM_PERIODS_LIMIT = "limit_order_num_periods_limit"
 CONFIG_LIMIT_ORDER_PERIOD_TIME_LIMIT = "limit_order_period_time_limit"
+CONFIG_MARKET_ORDER_TIME_LIMIT = "market_order_time_limit"
+CONFIG_ORDER_POLL_INITIAL_DELAY = "order_poll_initial_delay"
 CONFIG_CREATE_MARKET_BUY_ORDER_REQUIRES_PRICE = "create_market_buy_order_requires_price"
+CONFIG_FETCH_TICKERS_CHUNK_SIZE = "fetch_tickers_chunk_size"
+CONFIG_TICKER_SNAPSHOT_MAX_AGE = "ticker_snapshot_max_age"
+CONFIG_REQUESTS_PER_SECOND = "requests_per_second"
+CONFIG_REQUEST_BURST = "request_burst"
+CONFIG_REQUEST_WEIGHTS = "request_weights"
+CONFIG_MAX_RETRIES = "max_retries"
+CONFIG_RETRY_BASE_DELAY = "retry_base_delay"
+CONFIG_RETRY_MAX_DELAY = "retry_max_delay"
+CONFIG_CIRCUIT_FAILURE_THRESHOLD = "circuit_failure_threshold"
+CONFIG_CIRCUIT_RESET_TIMEOUT = "circuit_reset_timeout"
+CONFIG_PAPER_TRADING = "paper_trading"
+CONFIG_PAPER_FEE_RATE = "fee_rate"
+CONFIG_PAPER_SLIPPAGE = "slippage"
+CONFIG_PAPER_LATENCY = "latency"
+CONFIG_STAGE_METRICS = "stage_metrics"
+CONFIG_STAGE_METRICS_PORT = "port"
+CONFIG_STAGE_METRICS_LOG_INTERVAL = "log_interval"
 
 CONFIG_DEFAULT_CURRENCY = "USD"
 CONFIG_DEFAULT_REINVESTMENT_PERCENT = 0
 CONFIG_DEFAULT_SLEEP_INTERVAL = 20
-CONFIG_DEFAULT_CRYPTO_CURRENCY_SLEEP_INTERVAL = 1
 CONFIG_DEFAULT_OHLCV_TIMEFRAME = "1h"
+CONFIG_DEFAULT_OHLCV_MAX_CANDLES = 300
 CONFIG_DEFAULT_EXCHANGE_ID = "coinbase"
+CONFIG_DEFAULT_MAX_CONCURRENT_REQUESTS = 10
+CONFIG_DEFAULT_FETCH_TICKERS_CHUNK_SIZE = 50
+CONFIG_DEFAULT_TICKER_SNAPSHOT_MAX_AGE = 30
+CONFIG_DEFAULT_REQUEST_BURST = 1
+CONFIG_DEFAULT_MAX_RETRIES = 3
+CONFIG_DEFAULT_RETRY_BASE_DELAY = 0.1
+CONFIG_DEFAULT_RETRY_MAX_DELAY = 2
+CONFIG_DEFAULT_CIRCUIT_FAILURE_THRESHOLD = 5
+CONFIG_DEFAULT_CIRCUIT_RESET_TIMEOUT = 30
+CONFIG_DEFAULT_PAPER_FEE_RATE = 0.006
+CONFIG_DEFAULT_PAPER_SLIPPAGE = 0.0
+CONFIG_DEFAULT_PAPER_LATENCY = 0.0
+CONFIG_DEFAULT_STAGE_METRICS_LOG_INTERVAL = 60
 CONFIG_DEFAULT_LIMIT_ORDER_NUM_PERIODS_LIMIT = 10
 CONFIG_DEFAULT_LIMIT_ORDER_PERIOD_TIME_LIMIT = 4
+CONFIG_DEFAULT_MARKET_ORDER_TIME_LIMIT = 30
+CONFIG_DEFAULT_ORDER_POLL_INITIAL_DELAY = 1
+
+OHLCV_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
 
 PARAM_ORDER_ID = "order_id"
 PARAM_ORDER_TYPE = "order_type"
@@ -76,11 +116,15 @@ PARAM_SHARES = "shares"
 PARAM_PRICE = "price"
 PARAM_TIMEFRAME = "timeframe"
 PARAM_SINCE = "since"
+PARAM_LIMIT = "limit"
+PARAM_SYMBOLS = "symbols"
 
 OP_FETCH_TICKER = "fetchTicker"
+OP_FETCH_TICKERS = "fetchTickers"
 OP_FETCH_OHLCV = "fetchOHLCV"
 OP_FETCH_ORDER = "fetchOrder"
 OP_FETCH_ORDERS = "fetchOrders"
+OP_FETCH_OPEN_ORDERS = "fetchOpenOrders"
 OP_CANCEL_ORDER = "cancelOrder"
 OP_CREATE_ORDER = "createOrder"
 OP_FETCH_MY_TRADES = "fetchMyTrades"
@@ -1,43 +1,102 @@
+import asyncio
 import ccxt
+import ccxt.async_support
 import os
 import time
 from dotenv import load_dotenv
 from decimal import *
 from ccxt import BadSymbol, RequestTimeout, AuthenticationError, NetworkError, ExchangeError
 from utils.logger import logger
+from utils.request_scheduler import RequestScheduler
+from utils.request_retry import RetryPolicy, CircuitBreaker, RequestMetrics
+from utils.paper_exchange import PaperExchange, AsyncPaperExchange
+from utils.stage_metrics import StageMetrics
 import utils.constants as CONSTANTS
 
 load_dotenv()
 API_KEY = os.getenv('API_KEY')
-API_SECRET = os.getenv('API_SECRET').replace('\\n', '\n')
+API_SECRET = os.getenv('API_SECRET', '').replace('\\n', '\n')
+
+ASYNC_NATIVE_OPS = {
+    CONSTANTS.OP_FETCH_TICKER,
+    CONSTANTS.OP_FETCH_TICKERS,
+    CONSTANTS.OP_FETCH_OHLCV
+}
 
 class ExchangeService:
     _exchange = None
+    _async_exchange = None
+
+    @staticmethod
+    def _get_exchange_settings(exchange_config):
+        exchange_id = CONSTANTS.CONFIG_DEFAULT_EXCHANGE_ID
+        if CONSTANTS.CONFIG_EXCHANGE_ID in exchange_config:
+            exchange_id = exchange_config[CONSTANTS.CONFIG_EXCHANGE_ID]
+
+        create_market_buy_order_requires_price = False
+        if CONSTANTS.CONFIG_CREATE_MARKET_BUY_ORDER_REQUIRES_PRICE in exchange_config:
+            create_market_buy_order_requires_price = exchange_config[CONSTANTS.CONFIG_CREATE_MARKET_BUY_ORDER_REQUIRES_PRICE]
+
+        return (exchange_id, create_market_buy_order_requires_price)
 
     @classmethod
     def _get_exchange(cls, exchange_config):
 
         if cls._exchange is None:
-            exchange_id = "coinbase"
-            if CONSTANTS.CONFIG_EXCHANGE_ID in exchange_config:
-                exchange_id = exchange_config[CONSTANTS.CONFIG_EXCHANGE_ID]
-            
-            create_market_buy_order_requires_price = False
-            if CONSTANTS.CONFIG_CREATE_MARKET_BUY_ORDER_REQUIRES_PRICE in exchange_config:
-                create_market_buy_order_requires_price = exchange_config[CONSTANTS.CONFIG_CREATE_MARKET_BUY_ORDER_REQUIRES_PRICE]
+            (exchange_id, create_market_buy_order_requires_price) = cls._get_exchange_settings(exchange_config)
 
             exchange_class = getattr(ccxt, exchange_id)
+            # requests are paced by the service's RequestScheduler instead of ccxt's throttle
             cls._exchange = exchange_class({
                 'apiKey': API_KEY,
-                'secret': API_SECRET
+                'secret': API_SECRET,
+                'enableRateLimit': False
             })
 
             cls._exchange.options["createMarketBuyOrderRequiresPrice"] = create_market_buy_order_requires_price    
-            return cls._exchange
+        return cls._exchange
+
+    @classmethod
+    def _get_async_exchange(cls, exchange_config):
+        """
+        The async client owns an aiohttp session, so it has to be created from
+        inside a running event loop; it is built lazily on first async use.
+        """
+        if cls._async_exchange is None:
+            (exchange_id, create_market_buy_order_requires_price) = cls._get_exchange_settings(exchange_config)
+
+            exchange_class = getattr(ccxt.async_support, exchange_id)
+            cls._async_exchange = exchange_class({
+                'apiKey': API_KEY,
+                'secret': API_SECRET,
+                'enableRateLimit': False
+            })
+
+            cls._async_exchange.options["createMarketBuyOrderRequiresPrice"] = create_market_buy_order_requires_price
+        return cls._async_exchange
     
-    def __init__(self, exchange_config, dry_run=False):
-        self.exchange_client = self._get_exchange(exchange_config)
-        self.dry_run = dry_run
+    def __init__(self, exchange_config, dry_run=False, exchange_client=None, async_exchange_client=None, stage_metrics=None):
+        self.exchange_config = exchange_config
+        self.exchange_client = exchange_client
+        if self.exchange_client is None:
+            self.exchange_client = self._get_exchange(exchange_config)
+        self.async_exchange_client = async_exchange_client
+
+        # replayed market data carries its own time, fills and candle freshness follow it
+        self.clock = time.time
+        if hasattr(self.exchange_client, "now"):
+            self.clock = self.exchange_client.now
+
+        # paper trading swaps the client for a local matching engine fed by its market data
+        self.paper_exchange = None
+        if CONSTANTS.CONFIG_PAPER_TRADING in exchange_config:
+            self.paper_exchange = self._create_paper_exchange(exchange_config[CONSTANTS.CONFIG_PAPER_TRADING])
+            self.exchange_client = self.paper_exchange
+            if self.async_exchange_client is not None:
+                self.async_exchange_client = AsyncPaperExchange(self.paper_exchange, self.async_exchange_client)
+
+        # orders are simulated when paper trading, so dry_run has nothing to skip
+        self.dry_run = dry_run and self.paper_exchange is None
         self.limit_order_num_periods_limit = CONSTANTS.CONFIG_DEFAULT_LIMIT_ORDER_NUM_PERIODS_LIMIT
         if CONSTANTS.CONFIG_LIMIT_ORDER_NUM_PERIODS_LIMIT in exchange_config:
             self.limit_order_num_periods_limit = exchange_config[CONSTANTS.CONFIG_LIMIT_ORDER_NUM_PERIODS_LIMIT]
@@ -46,206 +105,499 @@ class ExchangeService:
         if CONSTANTS.CONFIG_LIMIT_ORDER_PERIOD_TIME_LIMIT in exchange_config:
             self.limit_order_period_time_limit = exchange_config[CONSTANTS.CONFIG_LIMIT_ORDER_PERIOD_TIME_LIMIT]
 
+        self.market_order_time_limit = CONSTANTS.CONFIG_DEFAULT_MARKET_ORDER_TIME_LIMIT
+        if CONSTANTS.CONFIG_MARKET_ORDER_TIME_LIMIT in exchange_config:
+            self.market_order_time_limit = exchange_config[CONSTANTS.CONFIG_MARKET_ORDER_TIME_LIMIT]
+
+        self.order_poll_initial_delay = CONSTANTS.CONFIG_DEFAULT_ORDER_POLL_INITIAL_DELAY
+        if CONSTANTS.CONFIG_ORDER_POLL_INITIAL_DELAY in exchange_config:
+            self.order_poll_initial_delay = exchange_config[CONSTANTS.CONFIG_ORDER_POLL_INITIAL_DELAY]
+
+        self.fetch_tickers_chunk_size = CONSTANTS.CONFIG_DEFAULT_FETCH_TICKERS_CHUNK_SIZE
+        if CONSTANTS.CONFIG_FETCH_TICKERS_CHUNK_SIZE in exchange_config:
+            self.fetch_tickers_chunk_size = exchange_config[CONSTANTS.CONFIG_FETCH_TICKERS_CHUNK_SIZE]
+
+        self.ticker_snapshot_max_age = CONSTANTS.CONFIG_DEFAULT_TICKER_SNAPSHOT_MAX_AGE
+        if CONSTANTS.CONFIG_TICKER_SNAPSHOT_MAX_AGE in exchange_config:
+            self.ticker_snapshot_max_age = exchange_config[CONSTANTS.CONFIG_TICKER_SNAPSHOT_MAX_AGE]
+
+        # bid/ask for the whole watchlist, refreshed once per cycle with a bulk fetch
+        self.ticker_snapshot = {}
+        self.ticker_snapshot_pairs = []
+        self.ticker_snapshot_timestamp = None
+
+        self.request_scheduler = self._create_request_scheduler(exchange_config)
+
+        max_retries = CONSTANTS.CONFIG_DEFAULT_MAX_RETRIES
+        if CONSTANTS.CONFIG_MAX_RETRIES in exchange_config:
+            max_retries = exchange_config[CONSTANTS.CONFIG_MAX_RETRIES]
+
+        retry_base_delay = CONSTANTS.CONFIG_DEFAULT_RETRY_BASE_DELAY
+        if CONSTANTS.CONFIG_RETRY_BASE_DELAY in exchange_config:
+            retry_base_delay = exchange_config[CONSTANTS.CONFIG_RETRY_BASE_DELAY]
+
+        retry_max_delay = CONSTANTS.CONFIG_DEFAULT_RETRY_MAX_DELAY
+        if CONSTANTS.CONFIG_RETRY_MAX_DELAY in exchange_config:
+            retry_max_delay = exchange_config[CONSTANTS.CONFIG_RETRY_MAX_DELAY]
+
+        self.retry_policy = RetryPolicy(max_retries, retry_base_delay, retry_max_delay)
+
+        self.circuit_failure_threshold = CONSTANTS.CONFIG_DEFAULT_CIRCUIT_FAILURE_THRESHOLD
+        if CONSTANTS.CONFIG_CIRCUIT_FAILURE_THRESHOLD in exchange_config:
+            self.circuit_failure_threshold = exchange_config[CONSTANTS.CONFIG_CIRCUIT_FAILURE_THRESHOLD]
+
+        self.circuit_reset_timeout = CONSTANTS.CONFIG_DEFAULT_CIRCUIT_RESET_TIMEOUT
+        if CONSTANTS.CONFIG_CIRCUIT_RESET_TIMEOUT in exchange_config:
+            self.circuit_reset_timeout = exchange_config[CONSTANTS.CONFIG_CIRCUIT_RESET_TIMEOUT]
+
+        # one breaker per endpoint, so a failing fetchOHLCV doesn't stop order placement
+        self.circuit_breakers: dict[str, CircuitBreaker] = {}
+        self.request_metrics = RequestMetrics()
+        self.stage_metrics = StageMetrics() if stage_metrics is None else stage_metrics
+
+    def _create_paper_exchange(self, paper_trading_config):
+        fee_rate = CONSTANTS.CONFIG_DEFAULT_PAPER_FEE_RATE
+        if CONSTANTS.CONFIG_PAPER_FEE_RATE in paper_trading_config:
+            fee_rate = paper_trading_config[CONSTANTS.CONFIG_PAPER_FEE_RATE]
+
+        slippage = CONSTANTS.CONFIG_DEFAULT_PAPER_SLIPPAGE
+        if CONSTANTS.CONFIG_PAPER_SLIPPAGE in paper_trading_config:
+            slippage = paper_trading_config[CONSTANTS.CONFIG_PAPER_SLIPPAGE]
+
+        latency = CONSTANTS.CONFIG_DEFAULT_PAPER_LATENCY
+        if CONSTANTS.CONFIG_PAPER_LATENCY in paper_trading_config:
+            latency = paper_trading_config[CONSTANTS.CONFIG_PAPER_LATENCY]
+
+        logger.info(f"paper trading enabled, fee_rate: {fee_rate}, slippage: {slippage}, latency: {latency}s")
+        return PaperExchange(self.exchange_client, fee_rate, slippage, latency, self.clock)
+
+    def _create_request_scheduler(self, exchange_config):
+        """
+        The rate defaults to the one ccxt documents for the exchange, its
+        rateLimit being the milliseconds between requests.  Without either,
+        as with test clients, requests aren't paced.
+        """
+        requests_per_second = None
+        rate_limit = getattr(self.exchange_client, "rateLimit", None)
+        if isinstance(rate_limit, (int, float)) and rate_limit > 0:
+            requests_per_second = 1000 / rate_limit
+        if CONSTANTS.CONFIG_REQUESTS_PER_SECOND in exchange_config:
+            requests_per_second = exchange_config[CONSTANTS.CONFIG_REQUESTS_PER_SECOND]
+
+        if requests_per_second is None:
+            return None
+
+        request_burst = CONSTANTS.CONFIG_DEFAULT_REQUEST_BURST
+        if CONSTANTS.CONFIG_REQUEST_BURST in exchange_config:
+            request_burst = exchange_config[CONSTANTS.CONFIG_REQUEST_BURST]
+
+        request_weights = {}
+        if CONSTANTS.CONFIG_REQUEST_WEIGHTS in exchange_config:
+            request_weights = exchange_config[CONSTANTS.CONFIG_REQUEST_WEIGHTS]
+
+        return RequestScheduler(requests_per_second, request_burst, request_weights)
+
+    def _request_count(self, exchange_client, op: str, params) -> int:
+        """
+        Number of exchange requests the op will make with exchange_client,
+        0 when it makes none itself.
+        """
+        if not exchange_client.has.get(op):
+            # fetchTickers falls back to fetchTicker calls that are paced on their own
+            return 0
+        if op == CONSTANTS.OP_FETCH_TICKERS:
+            return len(self._chunk_symbols(self._get_symbols_param(params)))
+        return 1
+
+    def schedule(self, op: str, params = {}):
+        """
+        Blocks until the op fits under the exchange's rate limit.
+        """
+        if self.request_scheduler is not None:
+            self.request_scheduler.acquire(op, self._request_count(self.exchange_client, op, params))
+
+    async def schedule_async(self, exchange_client, op: str, params = {}):
+        if self.request_scheduler is not None:
+            await self.request_scheduler.acquire_async(op, self._request_count(exchange_client, op, params))
+
+    def supports_op(self, op: str) -> bool:
+        return bool(self.exchange_client.has.get(op))
+
     def execute_op(self, ticker_pair: str, op: str, params = {}):
-        try:
-            if not self.exchange_client.has[op]:
-                logger.warn(f"{ticker_pair}: exchange does not support op: {op}")
-                return None
-                        
-            if op == CONSTANTS.OP_FETCH_TICKER:
-                ticker_info = self.exchange_client.fetch_ticker(ticker_pair)
-                if ticker_info is None or "bid" not in ticker_info or ticker_info["bid"] is None:
-                    logger.warn(f"{ticker_pair}: bid info missing from tickerInfo")
-                    return None
-                return ticker_info
-            
-            elif op == CONSTANTS.OP_FETCH_OHLCV:
-                timeframe = "1m"
-                if CONSTANTS.PARAM_TIMEFRAME in params:
-                    timeframe = params[CONSTANTS.PARAM_TIMEFRAME]
-                if CONSTANTS.PARAM_SINCE in params:
-                    since = params[CONSTANTS.PARAM_SINCE]
-                return self.exchange_client.fetch_ohlcv(ticker_pair, timeframe)
-            elif op == CONSTANTS.OP_FETCH_ORDER: 
-                if CONSTANTS.PARAM_ORDER_ID not in params or params[CONSTANTS.PARAM_ORDER_ID] is None:
-                    logger.error(f"{ticker_pair}: missing or invalid 'order_id' param is fetchOrder")
-                    return None
-                order_id = params[CONSTANTS.PARAM_ORDER_ID]
-                order = self.exchange_client.fetch_order(order_id)
-                return order
-            elif op == CONSTANTS.OP_FETCH_ORDERS:
-                return self.exchange_client.fetch_orders(ticker_pair, CONSTANTS.AUG_FIRST_TIMESTAMP_MS, CONSTANTS.NUM_ORDERS_LIMIT)
-            elif op == CONSTANTS.OP_CANCEL_ORDER:
-                 if CONSTANTS.PARAM_ORDER_ID not in params or params[CONSTANTS.PARAM_ORDER_ID] is None:
-                    logger.error(f"{ticker_pair}: missing or invalid 'order_id' param is cancelOrder")
-                    return None
-                 order_id = params[CONSTANTS.PARAM_ORDER_ID]
-                 return self.exchange_client.cancel_order(order_id, ticker_pair)
-            elif op == CONSTANTS.OP_CREATE_ORDER:
+        """
+        Waits for the op's turn under the rate limit, then runs it.  Orders
+        and cancels are served ahead of queued market data requests.
+        Transient errors on read ops are retried with backoff, and an
+        endpoint whose circuit is open is skipped without a request.
+        """
+        with self.stage_metrics.span(op, ticker_pair):
+            return self._execute_op(ticker_pair, op, params)
 
-                if CONSTANTS.PARAM_ORDER_TYPE not in params:
-                    logger.error(f"{ticker_pair}: missing 'order_type' param")
+    def _execute_op(self, ticker_pair: str, op: str, params = {}):
+        circuit_breaker = self._get_circuit_breaker(ticker_pair, op)
+        if circuit_breaker is None:
+            return None
+
+        attempt = 0
+        while True:
+            self.schedule(op, params)
+            try:
+                result = self._dispatch_op(ticker_pair, op, params)
+            except NetworkError as e:
+                delay = self._on_transient_error(ticker_pair, op, attempt, e, circuit_breaker)
+                if delay is None:
                     return None
-                order_type = params[CONSTANTS.PARAM_ORDER_TYPE]
-
-                market_order_type = "market"
-                if CONSTANTS.PARAM_MARKET_ORDER_TYPE in params:
-                    market_order_type = params[CONSTANTS.PARAM_MARKET_ORDER_TYPE]
-
-                if market_order_type == "market":
-                    if order_type == "buy":
-                        if CONSTANTS.PARAM_TOTAL_COST not in params or params[CONSTANTS.PARAM_TOTAL_COST] is None:
-                            logger.error(f"{ticker_pair}: missing or invalid 'total_cost' param for buy order")
-                            return None
-                        total_cost = params[CONSTANTS.PARAM_TOTAL_COST]
-                        return self.create_market_buy_order(ticker_pair, total_cost)
-                    if order_type == "sell":
-                        if CONSTANTS.PARAM_SHARES not in params or params[CONSTANTS.PARAM_SHARES] is None:
-                            logger.error(f"{ticker_pair}: missing or invalid 'shares' param for sell order")
-                            return None
-                        shares = params[CONSTANTS.PARAM_SHARES]
-                        return self.create_market_sell_order(ticker_pair, shares)
-                elif market_order_type == "limit":
-
-                    if CONSTANTS.PARAM_PRICE not in params or params[CONSTANTS.PARAM_PRICE] is None or CONSTANTS.PARAM_SHARES not in params or params[CONSTANTS.PARAM_SHARES] is None:
-                        logger.error(f"{ticker_pair}: invalid params for limit order, params: {params}")
-                        return None
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except (BadSymbol, AuthenticationError, IndexError, ExchangeError) as e:
+                circuit_breaker.record_success()
+                self._log_op_error(ticker_pair, op, e)
+                return None
+
+            circuit_breaker.record_success()
+            return result
+
+    def _dispatch_op(self, ticker_pair: str, op: str, params = {}):
+        if op == CONSTANTS.OP_FETCH_TICKERS and not self.supports_op(op):
+            return self._fetch_tickers_individually(params)
+
+        if not self.supports_op(op):
+            logger.warn(f"{ticker_pair}: exchange does not support op: {op}")
+            return None
+
+        if op == CONSTANTS.OP_FETCH_TICKER:
+            ticker_info = self.exchange_client.fetch_ticker(ticker_pair)
+            if ticker_info is None or "bid" not in ticker_info or ticker_info["bid"] is None:
+                logger.warn(f"{ticker_pair}: bid info missing from tickerInfo")
+                return None
+            return ticker_info
+
+        elif op == CONSTANTS.OP_FETCH_TICKERS:
+            symbols = self._get_symbols_param(params)
+            tickers = {}
+            for chunk in self._chunk_symbols(symbols):
+                tickers.update(self.exchange_client.fetch_tickers(chunk))
+            return self._filter_tickers(tickers)
 
-                    price = params[CONSTANTS.PARAM_PRICE]
+        elif op == CONSTANTS.OP_FETCH_OHLCV:
+            timeframe = "1m"
+            if CONSTANTS.PARAM_TIMEFRAME in params:
+                timeframe = params[CONSTANTS.PARAM_TIMEFRAME]
+            since = None
+            if CONSTANTS.PARAM_SINCE in params:
+                since = params[CONSTANTS.PARAM_SINCE]
+            limit = None
+            if CONSTANTS.PARAM_LIMIT in params:
+                limit = params[CONSTANTS.PARAM_LIMIT]
+            return self.exchange_client.fetch_ohlcv(ticker_pair, timeframe, since, limit)
+        elif op == CONSTANTS.OP_FETCH_ORDER: 
+            if CONSTANTS.PARAM_ORDER_ID not in params or params[CONSTANTS.PARAM_ORDER_ID] is None:
+                logger.error(f"{ticker_pair}: missing or invalid 'order_id' param is fetchOrder")
+                return None
+            order_id = params[CONSTANTS.PARAM_ORDER_ID]
+            order = self.exchange_client.fetch_order(order_id)
+            return order
+        elif op == CONSTANTS.OP_FETCH_ORDERS:
+            since = CONSTANTS.AUG_FIRST_TIMESTAMP_MS
+            if CONSTANTS.PARAM_SINCE in params:
+                since = params[CONSTANTS.PARAM_SINCE]
+            return self.exchange_client.fetch_orders(ticker_pair, since, CONSTANTS.NUM_ORDERS_LIMIT)
+        elif op == CONSTANTS.OP_FETCH_OPEN_ORDERS:
+            return self.exchange_client.fetch_open_orders(ticker_pair)
+        elif op == CONSTANTS.OP_CANCEL_ORDER:
+             if CONSTANTS.PARAM_ORDER_ID not in params or params[CONSTANTS.PARAM_ORDER_ID] is None:
+                logger.error(f"{ticker_pair}: missing or invalid 'order_id' param is cancelOrder")
+                return None
+             order_id = params[CONSTANTS.PARAM_ORDER_ID]
+             return self.exchange_client.cancel_order(order_id, ticker_pair)
+        elif op == CONSTANTS.OP_CREATE_ORDER:
+
+            if CONSTANTS.PARAM_ORDER_TYPE not in params:
+                logger.error(f"{ticker_pair}: missing 'order_type' param")
+                return None
+            order_type = params[CONSTANTS.PARAM_ORDER_TYPE]
+
+            market_order_type = "market"
+            if CONSTANTS.PARAM_MARKET_ORDER_TYPE in params:
+                market_order_type = params[CONSTANTS.PARAM_MARKET_ORDER_TYPE]
+
+            if market_order_type == "market":
+                if order_type == "buy":
+                    if CONSTANTS.PARAM_TOTAL_COST not in params or params[CONSTANTS.PARAM_TOTAL_COST] is None:
+                        logger.error(f"{ticker_pair}: missing or invalid 'total_cost' param for buy order")
+                        return None
+                    total_cost = params[CONSTANTS.PARAM_TOTAL_COST]
+                    return self.create_market_buy_order(ticker_pair, total_cost)
+                if order_type == "sell":
+                    if CONSTANTS.PARAM_SHARES not in params or params[CONSTANTS.PARAM_SHARES] is None:
+                        logger.error(f"{ticker_pair}: missing or invalid 'shares' param for sell order")
+                        return None
                     shares = params[CONSTANTS.PARAM_SHARES]
+                    return self.create_market_sell_order(ticker_pair, shares)
+            elif market_order_type == "limit":
 
-                    return self.create_order(ticker_pair, shares, market_order_type, order_type, price)
-                else:
-                    logger.error(f"{ticker_pair}: invalid market_order_type:{market_order_type}")
+                if CONSTANTS.PARAM_PRICE not in params or params[CONSTANTS.PARAM_PRICE] is None or CONSTANTS.PARAM_SHARES not in params or params[CONSTANTS.PARAM_SHARES] is None:
+                    logger.error(f"{ticker_pair}: invalid params for limit order, params: {params}")
                     return None
-            elif op == CONSTANTS.OP_FETCH_MY_TRADES:
-                return self.exchange_client.fetch_my_trades(ticker_pair, CONSTANTS.AUG_FIRST_TIMESTAMP_MS, 1000)
-            elif op == CONSTANTS.OP_FETCH_TRANSACTIONS:
-                return self.exchange_client.fetch_transactions(ticker_pair, CONSTANTS.AUG_FIRST_TIMESTAMP_MS, 1000)
+
+                price = params[CONSTANTS.PARAM_PRICE]
+                shares = params[CONSTANTS.PARAM_SHARES]
+
+                return self.create_order(ticker_pair, shares, market_order_type, order_type, price)
             else:
-                logger.error(f"{ticker_pair}: unsupported exchange operation: {op}")
+                logger.error(f"{ticker_pair}: invalid market_order_type:{market_order_type}")
                 return None
-            
-        except BadSymbol as e:
-            logger.error(f"{ticker_pair}: {op} BadSymbol error: {e}")
+        elif op == CONSTANTS.OP_FETCH_MY_TRADES:
+            return self.exchange_client.fetch_my_trades(ticker_pair, CONSTANTS.AUG_FIRST_TIMESTAMP_MS, 1000)
+        elif op == CONSTANTS.OP_FETCH_TRANSACTIONS:
+            return self.exchange_client.fetch_transactions(ticker_pair, CONSTANTS.AUG_FIRST_TIMESTAMP_MS, 1000)
+        else:
+            logger.error(f"{ticker_pair}: unsupported exchange operation: {op}")
             return None
-        except RequestTimeout as e:
-            logger.error(f"{ticker_pair}: {op} request timed out error: {e}")
+
+    async def execute_op_async(self, ticker_pair: str, op: str, params = {}):
+        """
+        Non-blocking counterpart of execute_op for the market data ops used by
+        CryptoBot.run_async.  Any other op is delegated to the sync client on
+        a worker thread so callers can await every op the same way.  Ops wait
+        for their turn under the rate limit, and between retries, on the
+        event loop, never holding a worker thread while queued.
+        """
+        with self.stage_metrics.span(op, ticker_pair):
+            return await self._execute_op_async(ticker_pair, op, params)
+
+    async def _execute_op_async(self, ticker_pair: str, op: str, params = {}):
+        circuit_breaker = self._get_circuit_breaker(ticker_pair, op)
+        if circuit_breaker is None:
             return None
-        except AuthenticationError as e:
-            logger.error(f"{ticker_pair}: {op} authentication error: {e}")
+
+        attempt = 0
+        while True:
+            try:
+                if op not in ASYNC_NATIVE_OPS:
+                    await self.schedule_async(self.exchange_client, op, params)
+                    result = await asyncio.to_thread(self._dispatch_op, ticker_pair, op, params)
+                else:
+                    exchange_client = self.get_async_exchange_client()
+                    await self.schedule_async(exchange_client, op, params)
+                    result = await self._dispatch_op_async(exchange_client, ticker_pair, op, params)
+            except NetworkError as e:
+                delay = self._on_transient_error(ticker_pair, op, attempt, e, circuit_breaker)
+                if delay is None:
+                    return None
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except (BadSymbol, AuthenticationError, IndexError, ExchangeError) as e:
+                circuit_breaker.record_success()
+                self._log_op_error(ticker_pair, op, e)
+                return None
+
+            circuit_breaker.record_success()
+            return result
+
+    async def _dispatch_op_async(self, exchange_client, ticker_pair: str, op: str, params = {}):
+        if op == CONSTANTS.OP_FETCH_TICKERS and not exchange_client.has.get(op):
+            return await asyncio.to_thread(self._fetch_tickers_individually, params)
+
+        if not exchange_client.has.get(op):
+            logger.warn(f"{ticker_pair}: exchange does not support op: {op}")
             return None
-        except NetworkError as e:
-            logger.error(f"{ticker_pair}: {op} network error: {e}") 
+
+        if op == CONSTANTS.OP_FETCH_TICKER:
+            ticker_info = await exchange_client.fetch_ticker(ticker_pair)
+            if ticker_info is None or "bid" not in ticker_info or ticker_info["bid"] is None:
+                logger.warn(f"{ticker_pair}: bid info missing from tickerInfo")
+                return None
+            return ticker_info
+
+        elif op == CONSTANTS.OP_FETCH_TICKERS:
+            symbols = self._get_symbols_param(params)
+            chunks = await asyncio.gather(*[exchange_client.fetch_tickers(chunk) for chunk in self._chunk_symbols(symbols)])
+            tickers = {}
+            for chunk in chunks:
+                tickers.update(chunk)
+            return self._filter_tickers(tickers)
+
+        elif op == CONSTANTS.OP_FETCH_OHLCV:
+            timeframe = "1m"
+            if CONSTANTS.PARAM_TIMEFRAME in params:
+                timeframe = params[CONSTANTS.PARAM_TIMEFRAME]
+            since = None
+            if CONSTANTS.PARAM_SINCE in params:
+                since = params[CONSTANTS.PARAM_SINCE]
+            limit = None
+            if CONSTANTS.PARAM_LIMIT in params:
+                limit = params[CONSTANTS.PARAM_LIMIT]
+            return await exchange_client.fetch_ohlcv(ticker_pair, timeframe, since, limit)
+
+    def _get_circuit_breaker(self, ticker_pair: str, op: str) -> CircuitBreaker:
+        """
+        The op's circuit breaker, or None if its circuit is open and the
+        call should be skipped.
+        """
+        if op not in self.circuit_breakers:
+            self.circuit_breakers[op] = CircuitBreaker(self.circuit_failure_threshold, self.circuit_reset_timeout)
+
+        circuit_breaker = self.circuit_breakers[op]
+        if not circuit_breaker.allow():
+            self.request_metrics.record(op, "rejected")
+            logger.warn(f"{ticker_pair}: {op} circuit open, skipping request")
             return None
-        except IndexError as e:
+        return circuit_breaker
+
+    def _on_transient_error(self, ticker_pair: str, op: str, attempt: int, e: NetworkError, circuit_breaker: CircuitBreaker):
+        """
+        Records the failure and returns how long to back off before retrying,
+        or None if the op shouldn't be retried.
+        """
+        if circuit_breaker.record_failure():
+            self.request_metrics.record(op, "circuit_opens")
+            logger.error(f"{op}: circuit opened after {circuit_breaker.failures} consecutive failures, pausing for {circuit_breaker.reset_timeout}s")
+
+        if circuit_breaker.opened_at is None and self.retry_policy.should_retry(op, attempt):
+            delay = self.retry_policy.delay(attempt)
+            self.request_metrics.record(op, "retries")
+            logger.warn(f"{ticker_pair}: {op} {type(e).__name__}, retry {attempt + 1} of {self.retry_policy.max_retries} in {delay:.3f}s")
+            return delay
+
+        self.request_metrics.record(op, "failures")
+        self._log_op_error(ticker_pair, op, e)
+        return None
+
+    def _log_op_error(self, ticker_pair: str, op: str, e: Exception):
+        if isinstance(e, BadSymbol):
+            logger.error(f"{ticker_pair}: {op} BadSymbol error: {e}")
+        elif isinstance(e, RequestTimeout):
+            logger.error(f"{ticker_pair}: {op} request timed out error: {e}")
+        elif isinstance(e, AuthenticationError):
+            logger.error(f"{ticker_pair}: {op} authentication error: {e}")
+        elif isinstance(e, NetworkError):
+            logger.error(f"{ticker_pair}: {op} network error: {e}")
+        elif isinstance(e, IndexError):
             logger.error(f"{ticker_pair}: {op} index error: {e}")
-            return None
-        except ExchangeError as e:
+        else:
             logger.error(f"{ticker_pair}: {op} exchange error: {e}")
-            return None
-        
+
+    def get_request_metrics(self) -> dict:
+        return self.request_metrics.summary(self.circuit_breakers)
+
+    def refresh_ticker_snapshot(self, ticker_pairs: list):
+        tickers = self.execute_op(ticker_pair="*", op=CONSTANTS.OP_FETCH_TICKERS, params={CONSTANTS.PARAM_SYMBOLS: ticker_pairs})
+        self._set_ticker_snapshot(ticker_pairs, tickers)
+
+    async def refresh_ticker_snapshot_async(self, ticker_pairs: list):
+        tickers = await self.execute_op_async(ticker_pair="*", op=CONSTANTS.OP_FETCH_TICKERS, params={CONSTANTS.PARAM_SYMBOLS: ticker_pairs})
+        self._set_ticker_snapshot(ticker_pairs, tickers)
+
+    def get_ticker_info(self, ticker_pair: str):
+        """
+        Returns the ticker_info for ticker_pair from the current snapshot.  A
+        stale snapshot is refreshed in bulk first, and a pair missing from it is
+        fetched on its own so a partial bulk response never blocks a ticker.
+        """
+        if self.is_ticker_snapshot_stale():
+            self.refresh_ticker_snapshot(self.ticker_snapshot_pairs)
+
+        if ticker_pair in self.ticker_snapshot:
+            return self.ticker_snapshot[ticker_pair]
+
+        ticker_info = self.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_TICKER)
+        if ticker_info is not None:
+            self.ticker_snapshot[ticker_pair] = ticker_info
+        return ticker_info
+
+    async def get_ticker_info_async(self, ticker_pair: str):
+        if ticker_pair in self.ticker_snapshot:
+            return self.ticker_snapshot[ticker_pair]
+
+        ticker_info = await self.execute_op_async(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_TICKER)
+        if ticker_info is not None:
+            self.ticker_snapshot[ticker_pair] = ticker_info
+        return ticker_info
+
+    def is_ticker_snapshot_stale(self) -> bool:
+        if self.ticker_snapshot_timestamp is None or len(self.ticker_snapshot_pairs) == 0:
+            return False
+
+        return time.time() - self.ticker_snapshot_timestamp > self.ticker_snapshot_max_age
+
+    def _set_ticker_snapshot(self, ticker_pairs: list, tickers):
+        self.ticker_snapshot_pairs = list(ticker_pairs)
+        self.ticker_snapshot_timestamp = time.time()
+        self.ticker_snapshot = tickers if tickers is not None else {}
+        logger.debug(f"ticker snapshot refreshed, {len(self.ticker_snapshot)} of {len(ticker_pairs)} tickers")
+
+    def _get_symbols_param(self, params):
+        if CONSTANTS.PARAM_SYMBOLS in params and params[CONSTANTS.PARAM_SYMBOLS] is not None:
+            return list(params[CONSTANTS.PARAM_SYMBOLS])
+        return []
+
+    def _chunk_symbols(self, symbols: list):
+        chunk_size = max(1, self.fetch_tickers_chunk_size)
+        return [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+
+    def _filter_tickers(self, tickers):
+        valid_tickers = {}
+        for symbol, ticker_info in tickers.items():
+            if ticker_info is None or "bid" not in ticker_info or ticker_info["bid"] is None:
+                logger.warn(f"{symbol}: bid info missing from tickerInfo")
+                continue
+            valid_tickers[symbol] = ticker_info
+        return valid_tickers
+
+    def _fetch_tickers_individually(self, params):
+        tickers = {}
+        for symbol in self._get_symbols_param(params):
+            ticker_info = self.execute_op(ticker_pair=symbol, op=CONSTANTS.OP_FETCH_TICKER)
+            if ticker_info is not None:
+                tickers[symbol] = ticker_info
+        return tickers
+
+    def get_async_exchange_client(self):
+        if self.async_exchange_client is None:
+            self.async_exchange_client = self._get_async_exchange(self.exchange_config)
+            if self.paper_exchange is not None:
+                self.async_exchange_client = AsyncPaperExchange(self.paper_exchange, self.async_exchange_client)
+        return self.async_exchange_client
+
+    async def close_async(self):
+        if self.async_exchange_client is None:
+            return
+
+        await self.async_exchange_client.close()
+        if getattr(self.async_exchange_client, "market_data", self.async_exchange_client) is ExchangeService._async_exchange:
+            ExchangeService._async_exchange = None
+        self.async_exchange_client = None
+
     def create_order(self, ticker_pair: str, shares: float, type: str, side: str, price: float = None):
+        """
+        Submits the order and returns it as acknowledged by the exchange
+        without waiting for it to fill, fills are followed by the OrderTracker.
+        """
         if self.dry_run:
             logger.info(f"{ticker_pair}: dry_run enaled, skiping create_order")
             return None
         
-        order_results = self.exchange_client.create_order(ticker_pair, type, side, shares, price)
-        order_id = order_results['info']['order_id']
-        params = {
-            "order_id": order_id
-        }
-
-        order = None
-        status = order_results['status']
-        idx = 0
-        filled = CONSTANTS.ZERO
-        while (status != 'closed'):
-            prev_filled = filled
-            
-            if idx == self.limit_order_num_periods_limit:
-
-                if order is not None:
-                    filled = Decimal(str(order["filled"]))
-
-                if filled == CONSTANTS.ZERO:
-                    logger.warn(f"{ticker_pair}: limit order not fulfilled, cancelling order")
-                    self.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_CANCEL_ORDER, params=params)
-                    return None
-
-                idx = 0
-                
-                # if filled > prev_filled:
-                #     logger.info(f"{ticker_pair}: order is still being filled, extending time")
-                #     idx = 0
-                #     continue
-
-                # logger.warn(f"{ticker_pair}: limit order not fulfilled within time limit, cancelling order")
-                # self.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_CANCEL_ORDER, params=params)
-                # logger.warn(f"{ticker_pair}: cancelled_order, last order status: {order}")
-                
-            logger.info(f"{ticker_pair}: waiting for limit_order to be fulfilled, time: {idx}")
-
-            time.sleep(self.limit_order_period_time_limit)
-            order = self.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_ORDER, params=params)
-            if (order == None):
-                logger.warn("{ticker_pair}: something went wrong fetching order_id, retrying")
-                continue
-            
-            idx += 1
-            status = order['status']
-
-        return order
+        return self.exchange_client.create_order(ticker_pair, type, side, shares, price)
     
     def create_market_buy_order(self, ticker_pair: str, amount: float):
+        """
+        Submits without waiting for the fill, like create_order.
+        """
         if self.dry_run:
             logger.info(f"{ticker_pair}: dry_run enaled, skiping create_market_buy_order")
             return None
         
-        order_results = self.exchange_client.create_market_buy_order(ticker_pair, amount)
-        order_id = order_results['info']['order_id']
-
-        params = {
-            "order_id": order_id
-        }
-
-        order = None
-        status = order_results['status']
-        num_retries = 3
-        curr_retry = 0
-        while (status != 'closed'):
-            time.sleep(1)
-            order = self.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_ORDER, params=params)
-            if (order == None):
-                if curr_retry < num_retries:
-                    curr_retry += 1
-                    continue
-                return None
-
-            status = order['status']
-
-        return order
+        return self.exchange_client.create_market_buy_order(ticker_pair, amount)
 
     def create_market_sell_order(self, ticker_pair, shares: float):
+        """
+        Submits without waiting for the fill, like create_order.
+        """
         if self.dry_run:
             logger.info(f"{ticker_pair}: dry_run enaled, skiping create_market_sell_order")
             return None
 
-        order_results = self.exchange.create_market_sell_order(ticker_pair, shares)
-        order_id = order_results['info']['order_id']
-
-        params = {
-            "order_id": order_id
-        }
-
-        order = None
-        status = order_results['status']
-        while (status != 'closed'):
-            time.sleep(1)
-            order = self.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_ORDER, params=params)
-            if (order == None):
-                return None
-
-            status = order['status']
-
-        return order
\ No newline at end of file
+        return self.exchange_client.create_market_sell_order(ticker_pair, shares)
\ No newline at end of file
@@ -0,0 +1,146 @@
+import talib
+import numpy as np
+import pandas as pd
+import utils.constants as CONSTANTS
+
+from utils.logger import logger
+from utils.candle_frame import CandleFrame, IndicatorCache
+from utils.streaming_indicators import StreamingRSI, StreamingMACD, StreamingATR, RollingWindowStats, StreamingPctChangeStats
+
+def get_indicator_cache(candles: CandleFrame) -> IndicatorCache:
+    return candles.derived
+
+
+def source_series(candles: CandleFrame, source: str = "close", scale = 1) -> np.ndarray:
+    if scale == 1:
+        return candles[source]
+
+    return get_indicator_cache(candles).get("SCALED", (scale,), source, lambda: candles[source] * scale)
+
+
+def rolling(values: np.ndarray, window: int, min_periods: int = None):
+    """
+    pandas rolling window over a column without copying it into a frame.
+    """
+    return pd.Series(values, copy=False).rolling(window, min_periods=min_periods)
+
+
+def rsi(candles: CandleFrame, timeperiod: int = 14, source: str = "close", scale = 1) -> np.ndarray:
+    return get_indicator_cache(candles).get("RSI", (timeperiod, scale), source,
+                                            lambda: talib.RSI(source_series(candles, source, scale), timeperiod=timeperiod))
+
+
+def macd(candles: CandleFrame, fastperiod: int = 12, slowperiod: int = 26, signalperiod: int = 9, source: str = "close", scale = 1):
+    """
+    Returns (macd, macd_signal, macd_hist) like talib.MACD.
+    """
+    return get_indicator_cache(candles).get("MACD", (fastperiod, slowperiod, signalperiod, scale), source,
+                                            lambda: talib.MACD(source_series(candles, source, scale),
+                                                               fastperiod=fastperiod,
+                                                               slowperiod=slowperiod,
+                                                               signalperiod=signalperiod))
+
+
+def rolling_mean(candles: CandleFrame, window: int, source: str = "close", scale = 1) -> np.ndarray:
+    return get_indicator_cache(candles).get("ROLLING_MEAN", (window, scale), source,
+                                            lambda: rolling(source_series(candles, source, scale), window).mean().to_numpy())
+
+
+def rolling_std(candles: CandleFrame, window: int, source: str = "close", scale = 1) -> np.ndarray:
+    return get_indicator_cache(candles).get("ROLLING_STD", (window, scale), source,
+                                            lambda: rolling(source_series(candles, source, scale), window).std().to_numpy())
+
+
+def pct_change_std(candles: CandleFrame, window: int, source: str = "close", scale = 1) -> np.ndarray:
+    def compute():
+        values = source_series(candles, source, scale)
+        pct_change = np.full(len(values), np.nan)
+        pct_change[1:] = values[1:] / values[:-1] - 1
+        return rolling(pct_change, window).std().to_numpy()
+
+    return get_indicator_cache(candles).get("PCT_CHANGE_STD", (window, scale), source, compute)
+
+
+def bollinger_bands(candles: CandleFrame, window: int, std_dev, source: str = "close"):
+    """
+    Returns (middle_band, upper_band, lower_band), the rolling mean and std are
+    shared with any other consumer of the same window.
+    """
+    def compute():
+        middle_band = rolling_mean(candles, window, source)
+        band_width = std_dev * rolling_std(candles, window, source)
+        return (middle_band, middle_band + band_width, middle_band - band_width)
+
+    return get_indicator_cache(candles).get("BOLLINGER_BANDS", (window, std_dev), source, compute)
+
+
+def atr(candles: CandleFrame, timeperiod: int = 14) -> np.ndarray:
+    return get_indicator_cache(candles).get("ATR", (timeperiod,), "high,low,close",
+                                            lambda: talib.ATR(candles['high'], candles['low'], candles['close'], timeperiod=timeperiod))
+
+
+def candle_value(source: str, scale = 1):
+    column_idx = CONSTANTS.OHLCV_COLUMNS.index(source)
+    return lambda candle: candle[column_idx] * scale
+
+
+def latest_rsi(candles: CandleFrame, timeperiod: int = 14, source: str = "close", scale = 1) -> float:
+    streaming = get_indicator_cache(candles).streaming
+    if streaming is None:
+        return rsi(candles, timeperiod, source, scale)[-1]
+
+    return streaming.latest("RSI", (timeperiod, source, scale), lambda: StreamingRSI(timeperiod), candle_value(source, scale))
+
+
+def latest_macd(candles: CandleFrame, fastperiod: int = 12, slowperiod: int = 26, signalperiod: int = 9, source: str = "close", scale = 1):
+    """
+    Returns the last (macd, macd_signal, macd_hist).
+    """
+    streaming = get_indicator_cache(candles).streaming
+    if streaming is None:
+        return tuple(series[-1] for series in macd(candles, fastperiod, slowperiod, signalperiod, source, scale))
+
+    return streaming.latest("MACD", (fastperiod, slowperiod, signalperiod, source, scale),
+                            lambda: StreamingMACD(fastperiod, slowperiod, signalperiod),
+                            candle_value(source, scale))
+
+
+def latest_rolling_stats(candles: CandleFrame, window: int, source: str = "close", scale = 1):
+    """
+    Returns the last (rolling mean, rolling std).
+    """
+    streaming = get_indicator_cache(candles).streaming
+    if streaming is None:
+        return (rolling_mean(candles, window, source, scale)[-1], rolling_std(candles, window, source, scale)[-1])
+
+    return streaming.latest("ROLLING_STATS", (window, source, scale), lambda: RollingWindowStats(window), candle_value(source, scale))
+
+
+def latest_pct_change_std(candles: CandleFrame, window: int, source: str = "close", scale = 1) -> float:
+    streaming = get_indicator_cache(candles).streaming
+    if streaming is None:
+        return pct_change_std(candles, window, source, scale)[-1]
+
+    (_, std) = streaming.latest("PCT_CHANGE_STATS", (window, source, scale), lambda: StreamingPctChangeStats(window), candle_value(source, scale))
+    return std
+
+
+def latest_bollinger_bands(candles: CandleFrame, window: int, std_dev, source: str = "close"):
+    """
+    Returns the last (middle_band, upper_band, lower_band).
+    """
+    (middle_band, std) = latest_rolling_stats(candles, window, source)
+    return (middle_band, middle_band + std_dev * std, middle_band - std_dev * std)
+
+
+def latest_atr(candles: CandleFrame, timeperiod: int = 14) -> float:
+    streaming = get_indicator_cache(candles).streaming
+    if streaming is None:
+        return atr(candles, timeperiod)[-1]
+
+    return streaming.latest("ATR", (timeperiod,), lambda: StreamingATR(timeperiod), lambda candle: (candle[2], candle[3], candle[4]))
+
+
+def log_cache_stats(ticker_pair: str, candles: CandleFrame):
+    cache = get_indicator_cache(candles)
+    logger.debug(f"{ticker_pair}: indicator cache hits: {cache.hits}, misses: {cache.misses}")
@@ -7,7 +7,7 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 def configureLogger(logLevel: str):
-    log_directory = "logs"
+    log_directory = os.getenv("LOG_DIRECTORY", "logs")
 
     # Ensure the directory exists
     if not os.path.exists(log_directory):
@@ -29,6 +29,72 @@ class MongoDBService:
         """
         self.db_client = self._get_client(db_url, client=client)
         self.db = self.db_client[db_name]
+        self.index_declarations = {}
+
+    def declare_index(self, collection, keys, query, unique = False):
+        """
+        Declare an index a hot query depends on, created by ensure_indexes.
+
+        :param collection: Name of the collection to index.
+        :param keys: List of (field, direction) pairs, as for create_index.
+        :param query: Description of the query the index serves, used in the report.
+        :param unique: Whether the index enforces uniqueness.
+        """
+        declarations = self.index_declarations.setdefault(collection, [])
+        for declaration in declarations:
+            if declaration["keys"] == keys:
+                declaration["queries"].append(query)
+                return
+
+        declarations.append({
+            "keys": keys,
+            "unique": unique,
+            "queries": [query]
+        })
+
+    def ensure_indexes(self):
+        """
+        Create every declared index that does not exist yet.  create_index is a
+        no-op for an existing index with the same keys, so this is safe to run
+        on every startup.
+
+        :return: Report as a list of dictionaries, one per declared index, with
+                 the collection, index name, the queries it covers and its
+                 status: 'exists', 'created' or 'failed'.
+        """
+        report = []
+        for (collection, declarations) in self.index_declarations.items():
+            existing_keys = []
+            try:
+                if self.db is None:
+                    raise OperationFailure("Database not accessible")
+
+                coll = self.db[collection]
+                existing_keys = [[tuple(key) for key in info["key"]] for info in coll.index_information().values()]
+            except PyMongoError as e:
+                print(f"An error occurred reading indexes of {collection}: {e}")
+
+            for declaration in declarations:
+                keys = [(field, direction) for (field, direction) in declaration["keys"]]
+                entry = {
+                    "collection": collection,
+                    "name": "_".join(f"{field}_{direction}" for (field, direction) in keys),
+                    "keys": keys,
+                    "queries": declaration["queries"],
+                    "status": "exists"
+                }
+
+                if keys not in existing_keys:
+                    try:
+                        entry["name"] = self.db[collection].create_index(keys, unique=declaration["unique"])
+                        entry["status"] = "created"
+                    except PyMongoError as e:
+                        print(f"An error occurred creating index {entry['name']} on {collection}: {e}")
+                        entry["status"] = "failed"
+
+                report.append(entry)
+
+        return report
 
     def query(self, collection, 
               filter_dict=None, 
@@ -86,13 +152,13 @@ class MongoDBService:
             # Handle any other PyMongo errors
             print(f"An error occurred while insert_one: {e}")
 
-    def insert_many(self, collection, documents):
+    def insert_many(self, collection, documents, ordered = True):
         try:
             if self.db is None:
                 raise OperationFailure("Database not accessible")
             
             coll = self.db[collection]
-            insert_results = coll.insert_many(documents)
+            insert_results = coll.insert_many(documents, ordered=ordered)
 
             return insert_results
         
@@ -0,0 +1,349 @@
+import os
+import json
+import time
+import asyncio
+import ccxt
+import utils.constants as CONSTANTS
+
+from datetime import datetime, timezone
+from pymongo import ASCENDING
+from utils.logger import logger
+
+def to_epoch_ms(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        # mongo hands back naive UTC datetimes
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp() * 1000)
+
+
+def from_epoch_ms(timestamp_ms: int) -> datetime:
+    return datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc)
+
+
+def candle_to_doc(ticker_pair: str, candle) -> dict:
+    return {
+        CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD: from_epoch_ms(candle[0]),
+        "open": candle[1],
+        "high": candle[2],
+        "low": candle[3],
+        "close": candle[4],
+        "volume": candle[5],
+        CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD: ticker_pair
+    }
+
+
+def ohlcv_collection(timeframe: str) -> str:
+    """
+    1m candles live in ohlcv_data, every other timeframe in its own
+    collection next to it, e.g. ohlcv_data_5m.
+    """
+    if timeframe == "1m":
+        return CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_COLLECTION
+    return f"{CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_COLLECTION}_{timeframe}"
+
+
+class OhlcvCheckpoints:
+    """
+    Backfill progress per (ticker pair, timeframe): the since of the next
+    page to fetch, kept in a JSON file that is rewritten after every page so
+    an interrupted backfill resumes where it stopped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.checkpoints = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.checkpoints = json.load(f)
+
+    def key(self, ticker_pair: str, timeframe: str) -> str:
+        return f"{ticker_pair}|{timeframe}"
+
+    def get(self, ticker_pair: str, timeframe: str) -> int:
+        return self.checkpoints.get(self.key(ticker_pair, timeframe))
+
+    def set(self, ticker_pair: str, timeframe: str, since: int):
+        self.checkpoints[self.key(ticker_pair, timeframe)] = since
+
+        # write then rename, so a crash never leaves a truncated file behind
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.checkpoints, f, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class OhlcvIngester:
+    """
+    Pulls candles from the exchange into the ohlcv_data time-series
+    collection.
+
+    Time-series collections can't hold a unique index, so duplicates are
+    filtered against one range query for the timestamps already stored in
+    each fetched page, and the rest go in with a single unordered
+    insert_many.  Every pair pages forward with since from its newest stored
+    candle (or the given start), up to max_concurrent_requests pairs at a
+    time.  The still-forming candle is never stored: it would be skipped as
+    a duplicate once it closes and keep its partial values.
+
+    With checkpoints, pairs resume from their checkpoint instead of their
+    newest stored candle, so a backfill can fill history behind candles
+    populate_ohlcv already stored.  With a page_limit, an empty page before
+    the pair's newest candle (before a listing, during an outage) is
+    skipped instead of ending the pair.
+    """
+
+    def __init__(self, mongodb_service, exchange_service, timeframe: str = "1m", max_concurrent_requests: int = CONSTANTS.CONFIG_DEFAULT_MAX_CONCURRENT_REQUESTS,
+                 page_limit: int = None, collection: str = None, checkpoints: OhlcvCheckpoints = None):
+        self.mongodb_service = mongodb_service
+        self.exchange_service = exchange_service
+        self.timeframe = timeframe
+        self.timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        self.max_concurrent_requests = max_concurrent_requests
+        self.page_limit = page_limit
+        self.collection = collection if collection is not None else ohlcv_collection(timeframe)
+        self.checkpoints = checkpoints
+
+    def ensure_collection(self):
+        collections_list = self.mongodb_service.get_collections_names()
+        if collections_list is None or self.collection in collections_list:
+            return
+
+        logger.info(f"creating {self.collection} collection")
+        indexes = [
+            [(CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD, 1)],
+            [(CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD, 1)]
+        ]
+        self.mongodb_service.create_collection(self.collection, {
+            "timeField": CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD,
+            "granularity": CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_GRANULARITY if self.timeframe_ms < 3600 * 1000 else "hours",
+            "metaField": CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD
+        },
+        indexes)
+
+    def latest_timestamp(self, ticker_pair: str) -> int:
+        """
+        Epoch ms of the newest stored candle of the pair, None if there are none.
+        """
+        time_field = CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD
+        docs = self.mongodb_service.query(self.collection,
+                                          {CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD: ticker_pair},
+                                          {"_id": 0, time_field: 1},
+                                          sort_field=time_field,
+                                          limit=1)
+        if docs is None or len(docs) == 0:
+            return None
+        return to_epoch_ms(docs[0][time_field])
+
+    def existing_timestamps(self, ticker_pair: str, start_ms: int, end_ms: int) -> set[int]:
+        time_field = CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_TIME_FIELD
+        docs = self.mongodb_service.query(self.collection, {
+            CONSTANTS.DEFAULT_MONGO_OHLCV_DATA_META_FIELD: ticker_pair,
+            time_field: {"$gte": from_epoch_ms(start_ms), "$lte": from_epoch_ms(end_ms)}
+        }, {"_id": 0, time_field: 1}, sort_field=time_field, sort_direction=ASCENDING)
+        if docs is None:
+            return None
+        return {to_epoch_ms(doc[time_field]) for doc in docs}
+
+    def store(self, ticker_pair: str, ohlcv: list) -> int:
+        """
+        Inserts the candles that aren't stored yet, returns how many were
+        inserted or None on error.
+        """
+        if len(ohlcv) == 0:
+            return 0
+
+        existing = self.existing_timestamps(ticker_pair, min(candle[0] for candle in ohlcv), max(candle[0] for candle in ohlcv))
+        if existing is None:
+            logger.error(f"{ticker_pair}: unable to read stored ohlcv")
+            return None
+
+        docs = []
+        for candle in ohlcv:
+            if candle[0] in existing:
+                continue
+            existing.add(candle[0])
+            docs.append(candle_to_doc(ticker_pair, candle))
+
+        if len(docs) == 0:
+            return 0
+        if self.mongodb_service.insert_many(self.collection, docs, ordered=False) is None:
+            logger.error(f"{ticker_pair}: unable to insert {len(docs)} candles")
+            return None
+        return len(docs)
+
+    def closed_candles(self, ohlcv: list, now_ms: int) -> list:
+        return [candle for candle in ohlcv if candle[0] + self.timeframe_ms <= now_ms]
+
+    async def fetch_page_async(self, ticker_pair: str, since: int):
+        params = {
+            CONSTANTS.PARAM_TIMEFRAME: self.timeframe,
+            CONSTANTS.PARAM_SINCE: since
+        }
+        if self.page_limit is not None:
+            params[CONSTANTS.PARAM_LIMIT] = self.page_limit
+
+        async with self.request_semaphore:
+            return await self.exchange_service.execute_op_async(ticker_pair, CONSTANTS.OP_FETCH_OHLCV, params)
+
+    async def resume_point_async(self, ticker_pair: str, since: int) -> int:
+        if self.checkpoints is not None:
+            checkpoint = self.checkpoints.get(ticker_pair, self.timeframe)
+            if checkpoint is not None and (since is None or checkpoint > since):
+                return checkpoint
+            return since
+
+        latest = await asyncio.to_thread(self.latest_timestamp, ticker_pair)
+        if latest is not None and (since is None or latest >= since):
+            return latest + self.timeframe_ms
+        return since
+
+    async def ingest_pair_async(self, ticker_pair: str, since: int = None, until: int = None) -> int:
+        """
+        Pages the pair forward from since, or from where it left off, until
+        it has caught up with the last closed candle (or until).  Returns the
+        number of candles inserted.
+        """
+        since = await self.resume_point_async(ticker_pair, since)
+
+        inserted = 0
+        newest = None
+        while until is None or since is None or since < until:
+            page = await self.fetch_page_async(ticker_pair, since)
+            if page is None:
+                logger.error(f"{ticker_pair}: error fetching {self.timeframe} ohlcv, skipping")
+                break
+
+            now = int(time.time() * 1000)
+            page = [candle for candle in page if since is None or candle[0] >= since]
+            if until is not None:
+                page = [candle for candle in page if candle[0] < until]
+            closed = self.closed_candles(page, now)
+
+            stored = await asyncio.to_thread(self.store, ticker_pair, closed)
+            if stored is None:
+                break
+            inserted += stored
+
+            if len(closed) > 0:
+                since = closed[-1][0] + self.timeframe_ms
+            elif len(page) == 0 and self.page_limit is not None and since is not None and since + self.page_limit * self.timeframe_ms < now:
+                # either a gap in the exchange's history, skipped a page at a
+                # time, or the end of it, found by fetching the latest page once
+                if newest is None:
+                    latest_page = await self.fetch_page_async(ticker_pair, None)
+                    newest = latest_page[-1][0] if latest_page else since
+                if since >= newest:
+                    break
+                since += self.page_limit * self.timeframe_ms
+            else:
+                break
+
+            if self.checkpoints is not None:
+                self.checkpoints.set(ticker_pair, self.timeframe, since)
+
+            # a page that ends in the forming candle is the last one
+            if len(closed) < len(page):
+                break
+
+        return inserted
+
+    async def ingest_async(self, ticker_pairs: list, since: int = None, until: int = None) -> dict[str, int]:
+        self.request_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        started_at = time.time()
+
+        try:
+            counts = await asyncio.gather(*[self.ingest_pair_async(ticker_pair, since, until) for ticker_pair in ticker_pairs])
+        finally:
+            # the async client is bound to this event loop
+            await self.exchange_service.close_async()
+        inserted = dict(zip(ticker_pairs, counts))
+
+        elapsed = time.time() - started_at
+        total = sum(counts)
+        logger.info(f"ingested {total} {self.timeframe} candles for {len(ticker_pairs)} ticker pairs in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} candles/s)")
+        return inserted
+
+    def ingest(self, ticker_pairs: list, since: int = None, until: int = None) -> dict[str, int]:
+        """
+        One ingestion pass over ticker_pairs, returns the candles inserted per pair.
+        """
+        return asyncio.run(self.ingest_async(ticker_pairs, since, until))
+
+
+class CsvOhlcvIngester(OhlcvIngester):
+    """
+    OhlcvIngester writing to one CSV file per pair and timeframe instead of
+    Mongo, directory/1m/ATOM-USD.csv, in the layout backtesting/main.py --data
+    reads.  Candles are only ever appended after the file's last one.
+    """
+
+    def __init__(self, directory: str, exchange_service, timeframe: str = "1m", max_concurrent_requests: int = CONSTANTS.CONFIG_DEFAULT_MAX_CONCURRENT_REQUESTS,
+                 page_limit: int = None, checkpoints: OhlcvCheckpoints = None):
+        super().__init__(None, exchange_service, timeframe, max_concurrent_requests, page_limit, checkpoints=checkpoints)
+        self.directory = os.path.join(directory, timeframe)
+
+    def path(self, ticker_pair: str) -> str:
+        return os.path.join(self.directory, f"{ticker_pair.replace('/', '-')}.csv")
+
+    def ensure_collection(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+    def latest_timestamp(self, ticker_pair: str) -> int:
+        path = self.path(ticker_pair)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 1024))
+            lines = f.read().decode().strip().splitlines()
+
+        if len(lines) == 0 or not lines[-1][0].isdigit():
+            return None
+        return int(float(lines[-1].split(",")[0]))
+
+    def store(self, ticker_pair: str, ohlcv: list) -> int:
+        latest = self.latest_timestamp(ticker_pair)
+        candles = [candle for candle in ohlcv if latest is None or candle[0] > latest]
+        if len(candles) == 0:
+            return 0
+
+        path = self.path(ticker_pair)
+        write_header = not os.path.exists(path)
+        with open(path, "a") as f:
+            if write_header:
+                f.write(",".join(CONSTANTS.OHLCV_COLUMNS) + "\n")
+            for candle in sorted(candles, key=lambda candle: candle[0]):
+                f.write(f"{int(candle[0])},{candle[1]},{candle[2]},{candle[3]},{candle[4]},{candle[5]}\n")
+        return len(candles)
+
+
+def backfill(ingesters: list[OhlcvIngester], ticker_pairs: list, since: int, until: int = None,
+             max_concurrent_requests: int = CONSTANTS.CONFIG_DEFAULT_MAX_CONCURRENT_REQUESTS) -> dict[tuple, int]:
+    """
+    Runs every ticker pair through every ingester, one per timeframe, with
+    at most max_concurrent_requests requests in flight across all of them.
+    Returns the candles inserted per (ticker pair, timeframe).
+    """
+    async def backfill_async():
+        request_semaphore = asyncio.Semaphore(max_concurrent_requests)
+        jobs = []
+        for ingester in ingesters:
+            ingester.request_semaphore = request_semaphore
+            for ticker_pair in ticker_pairs:
+                jobs.append(((ticker_pair, ingester.timeframe), ingester.ingest_pair_async(ticker_pair, since, until)))
+
+        try:
+            counts = await asyncio.gather(*[job for (_, job) in jobs])
+        finally:
+            for ingester in ingesters:
+                await ingester.exchange_service.close_async()
+        return dict(zip([key for (key, _) in jobs], counts))
+
+    started_at = time.time()
+    inserted = asyncio.run(backfill_async())
+
+    elapsed = time.time() - started_at
+    total = sum(inserted.values())
+    logger.info(f"backfilled {total} candles for {len(inserted)} ticker pair timeframes in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} candles/s)")
+    return inserted
@@ -0,0 +1,128 @@
+import os
+import numpy as np
+import utils.constants as CONSTANTS
+
+PARTITION_SUFFIX = ".npy"
+
+def partition_months(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Month of every epoch ms timestamp as YYYY-MM strings.
+    """
+    return timestamps.astype(np.int64).astype("datetime64[ms]").astype("datetime64[M]").astype(str)
+
+
+class OhlcvStore:
+    """
+    Local columnar candle store, one (n, 6) float64 .npy file per pair and
+    month in ccxt column order: root/1m/ATOM-USD/2024-01.npy.
+
+    Partitions are read memory-mapped, so a read only touches the pages of
+    the requested range and leaves them in the OS page cache for the next
+    process.  A range inside one month comes back as a read-only view of
+    the file with no copy, a longer one as a single concatenation of the
+    month views, with no per-candle Python objects either way.
+    """
+
+    def __init__(self, root: str, timeframe: str = "1m"):
+        self.root = root
+        self.timeframe = timeframe
+        self.directory = os.path.join(root, timeframe)
+
+    def pair_directory(self, ticker_pair: str) -> str:
+        return os.path.join(self.directory, ticker_pair.replace("/", "-"))
+
+    def partition_path(self, ticker_pair: str, month: str) -> str:
+        return os.path.join(self.pair_directory(ticker_pair), f"{month}{PARTITION_SUFFIX}")
+
+    def pairs(self) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name.replace("-", "/") for name in os.listdir(self.directory) if os.path.isdir(os.path.join(self.directory, name)))
+
+    def months(self, ticker_pair: str) -> list:
+        pair_directory = self.pair_directory(ticker_pair)
+        if not os.path.isdir(pair_directory):
+            return []
+        return sorted(name[:-len(PARTITION_SUFFIX)] for name in os.listdir(pair_directory) if name.endswith(PARTITION_SUFFIX))
+
+    def read_partition(self, ticker_pair: str, month: str) -> np.ndarray:
+        return np.load(self.partition_path(ticker_pair, month), mmap_mode="r")
+
+    def write(self, ticker_pair: str, ohlcv: np.ndarray) -> int:
+        """
+        Merges candles into the pair's month partitions, replacing stored
+        candles with the same timestamp.  Returns the number of new candles.
+        """
+        ohlcv = np.asarray(ohlcv, dtype=np.float64)
+        if len(ohlcv) == 0:
+            return 0
+
+        os.makedirs(self.pair_directory(ticker_pair), exist_ok=True)
+        months = partition_months(ohlcv[:, 0])
+        added = 0
+        for month in np.unique(months):
+            candles = ohlcv[months == month]
+            path = self.partition_path(ticker_pair, month)
+            stored_count = 0
+            if os.path.exists(path):
+                stored = np.load(path)
+                stored_count = len(stored)
+                # later rows win in the unique below, so new candles replace stored ones
+                candles = np.concatenate((stored, candles))
+
+            (_, last_idx) = np.unique(candles[::-1, 0], return_index=True)
+            candles = candles[len(candles) - 1 - last_idx]
+            added += len(candles) - stored_count
+
+            # write then rename, so readers never map a partial partition
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(candles))
+            os.replace(tmp_path, path)
+
+        return added
+
+    def read(self, ticker_pair: str, start_ms: int = None, end_ms: int = None) -> np.ndarray:
+        """
+        The pair's candles with start_ms <= time < end_ms, oldest first.
+        """
+        views = []
+        for month in self.months(ticker_pair):
+            partition = self.read_partition(ticker_pair, month)
+            if len(partition) == 0:
+                continue
+
+            first = 0
+            last = len(partition)
+            if start_ms is not None:
+                first = np.searchsorted(partition[:, 0], start_ms, side="left")
+            if end_ms is not None:
+                last = np.searchsorted(partition[:, 0], end_ms, side="left")
+            if first < last:
+                views.append(partition[first:last])
+
+        if len(views) == 0:
+            return np.empty((0, len(CONSTANTS.OHLCV_COLUMNS)), dtype=np.float64)
+        if len(views) == 1:
+            return views[0]
+        return np.concatenate(views)
+
+    def read_all(self, ticker_pairs: list = None, start_ms: int = None, end_ms: int = None) -> dict[str, np.ndarray]:
+        if ticker_pairs is None or len(ticker_pairs) == 0:
+            ticker_pairs = self.pairs()
+
+        ohlcv_by_pair = {}
+        for ticker_pair in ticker_pairs:
+            ohlcv = self.read(ticker_pair, start_ms, end_ms)
+            if len(ohlcv) > 0:
+                ohlcv_by_pair[ticker_pair] = ohlcv
+        return ohlcv_by_pair
+
+    def latest_timestamp(self, ticker_pair: str) -> int:
+        months = self.months(ticker_pair)
+        if len(months) == 0:
+            return None
+        partition = self.read_partition(ticker_pair, months[-1])
+        if len(partition) == 0:
+            return None
+        return int(partition[-1, 0])
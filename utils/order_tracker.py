@@ -0,0 +1,297 @@
+import asyncio
+import time
+import utils.constants as CONSTANTS
+
+from collections import deque
+from decimal import Decimal
+from utils.logger import logger
+
+ORDER_STATUS_CLOSED = "closed"
+# ccxt reports cancelled, expired and rejected orders with these statuses
+ORDER_STATUSES_CANCELED = {"canceled", "cancelled", "expired", "rejected"}
+
+ORDER_TYPE_MARKET = "market"
+LATENCY_SAMPLES = 500
+
+class PendingOrder:
+    def __init__(self, ticker_pair: str, order, on_fill, on_cancel, on_partial_fill, fill_timeout: float, poll_delay: float, submitted_at: float):
+        self.ticker_pair = ticker_pair
+        self.order = order
+        self.order_id = order["id"]
+        self.order_type = order.get("type") or ORDER_TYPE_MARKET
+        self.on_fill = on_fill
+        self.on_cancel = on_cancel
+        self.on_partial_fill = on_partial_fill
+        self.cancel_requested = False
+        self.submitted_at = submitted_at
+        self.fill_timeout = fill_timeout
+        self.deadline = self.submitted_at + fill_timeout
+        self.poll_delay = poll_delay
+        self.next_poll_at = time.time() + poll_delay
+
+    def filled(self) -> Decimal:
+        filled = self.order.get("filled")
+        if filled is None:
+            return CONSTANTS.ZERO
+        return Decimal(str(filled))
+
+
+class LatencyStats:
+    """
+    Submit to fill latency, in seconds, of the most recent fills of one order
+    type.  Fills are detected by polling, so each sample is an upper bound
+    that is at most one poll delay late.
+    """
+
+    def __init__(self, max_samples: int = LATENCY_SAMPLES):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+        self.count += 1
+
+    def summary(self) -> dict:
+        if len(self.samples) == 0:
+            return {"count": 0}
+
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean": sum(ordered) / len(ordered),
+            "p50": ordered[(len(ordered) - 1) // 2],
+            "p95": ordered[int((len(ordered) - 1) * 0.95)],
+            "max": ordered[-1]
+        }
+
+
+class OrderTracker:
+    """
+    Follows submitted orders until they fill, are cancelled, or time out,
+    without blocking the evaluation loop.
+
+    Every order is first checked initial_poll_delay seconds after it is
+    tracked, and the delay doubles after each check that finds it still open,
+    up to poll_interval, so fast market fills are seen quickly without
+    hammering the exchange for slow limit orders.  Orders that are due are
+    polled together, with one fetchOrders (or fetchOpenOrders) request per
+    ticker when the exchange supports it and fetchOrder per order otherwise.
+
+    Callbacks run from poll(), on the caller's thread or on the worker thread
+    poll_if_due_async awaits, so the bot's balance and positions are only
+    ever touched between ticker evaluations.  An order
+    still unfilled after its deadline (fill_timeout for limit orders,
+    market_fill_timeout for market orders) is cancelled; a partially filled
+    one keeps waiting, the same as the old blocking loop.  An order that ends
+    cancelled, expired or rejected after filling some of its amount goes to
+    on_partial_fill, and how a cancelled order ended is read back from the
+    exchange, since it may have filled since the last poll.  Submit to fill
+    latency is kept per order type in latency_stats.
+    """
+
+    def __init__(self, exchange_service, poll_interval: float, fill_timeout: float,
+                 market_fill_timeout: float = CONSTANTS.CONFIG_DEFAULT_MARKET_ORDER_TIME_LIMIT,
+                 initial_poll_delay: float = CONSTANTS.CONFIG_DEFAULT_ORDER_POLL_INITIAL_DELAY):
+        self.exchange_service = exchange_service
+        self.poll_interval = poll_interval
+        self.fill_timeout = fill_timeout
+        self.market_fill_timeout = market_fill_timeout
+        self.initial_poll_delay = min(initial_poll_delay, poll_interval)
+        self.pending: dict[str, PendingOrder] = {}
+        self.latency_stats: dict[str, LatencyStats] = {}
+
+    def track(self, ticker_pair: str, order, on_fill, on_cancel = None, submitted_at: float = None, on_partial_fill = None):
+        """
+        on_fill(order) is called with the closed order, on_cancel(order) with
+        the last known state of an order that will not fill, and
+        on_partial_fill(order) with an order that ended with part of its
+        amount filled, its filled and cost are what was traded.  Without
+        on_partial_fill those go to on_cancel.  submitted_at is when the order
+        was sent, it defaults to now.
+        """
+        if submitted_at is None:
+            submitted_at = time.time()
+
+        fill_timeout = self.fill_timeout
+        if order.get("type") == ORDER_TYPE_MARKET:
+            fill_timeout = self.market_fill_timeout
+
+        pending_order = PendingOrder(ticker_pair, order, on_fill, on_cancel, on_partial_fill, fill_timeout, self.initial_poll_delay, submitted_at)
+        if order["status"] == ORDER_STATUS_CLOSED:
+            self.record_fill(pending_order, time.time())
+            on_fill(order)
+            return
+
+        self.pending[pending_order.order_id] = pending_order
+        logger.info(f"{ticker_pair}: tracking order {pending_order.order_id}, pending orders: {len(self.pending)}")
+
+    def has_pending(self, ticker_pair: str) -> bool:
+        return any(pending_order.ticker_pair == ticker_pair for pending_order in self.pending.values())
+
+    def get_due_orders(self, now: float) -> list[PendingOrder]:
+        return [pending_order for pending_order in self.pending.values() if pending_order.next_poll_at <= now]
+
+    def poll_if_due(self):
+        if len(self.get_due_orders(time.time())) > 0:
+            self.poll()
+
+    async def poll_if_due_async(self):
+        # cancels, request pacing and the fill callbacks' writes all block, keep them off the event loop
+        if len(self.get_due_orders(time.time())) > 0:
+            await asyncio.to_thread(self.poll)
+
+    def poll(self):
+        """
+        Polls the orders that are due, regardless of whether poll_if_due would.
+        """
+        due_orders = self.get_due_orders(time.time())
+        self.apply_updates(self.fetch_updates(due_orders), due_orders)
+
+    def fetch_updates(self, due_orders: list[PendingOrder]) -> dict:
+        """
+        Returns the latest state of every due order that could be fetched,
+        keyed by order id.
+        """
+        pending_by_ticker: dict[str, list[PendingOrder]] = {}
+        for pending_order in due_orders:
+            pending_by_ticker.setdefault(pending_order.ticker_pair, []).append(pending_order)
+
+        updates = {}
+        for (ticker_pair, pending_orders) in pending_by_ticker.items():
+            updates.update(self.fetch_ticker_updates(ticker_pair, pending_orders))
+        return updates
+
+    def fetch_ticker_updates(self, ticker_pair: str, pending_orders: list[PendingOrder]) -> dict:
+        updates = {}
+        missing = list(pending_orders)
+
+        if self.exchange_service.supports_op(CONSTANTS.OP_FETCH_ORDERS):
+            since = int(min(pending_order.submitted_at for pending_order in pending_orders) * 1000)
+            orders = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_ORDERS, params={CONSTANTS.PARAM_SINCE: since})
+            updates.update(self.match_orders(orders, pending_orders))
+            missing = [pending_order for pending_order in pending_orders if pending_order.order_id not in updates]
+        elif self.exchange_service.supports_op(CONSTANTS.OP_FETCH_OPEN_ORDERS):
+            open_orders = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_OPEN_ORDERS)
+            if open_orders is not None:
+                updates.update(self.match_orders(open_orders, pending_orders))
+                # anything no longer open has to be fetched to learn how it ended
+                missing = [pending_order for pending_order in pending_orders if pending_order.order_id not in updates]
+
+        for pending_order in missing:
+            params = {
+                CONSTANTS.PARAM_ORDER_ID: pending_order.order_id
+            }
+            order = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_FETCH_ORDER, params=params)
+            if order is None:
+                logger.warn(f"{ticker_pair}: unable to fetch order {pending_order.order_id}, retrying next poll")
+                continue
+            updates[pending_order.order_id] = order
+
+        return updates
+
+    def match_orders(self, orders, pending_orders: list[PendingOrder]) -> dict:
+        if orders is None:
+            return {}
+
+        pending_ids = set(pending_order.order_id for pending_order in pending_orders)
+        return {order["id"]: order for order in orders if order["id"] in pending_ids}
+
+    def apply_updates(self, updates: dict, due_orders: list[PendingOrder]):
+        now = time.time()
+        for pending_order in due_orders:
+            order_id = pending_order.order_id
+            if order_id in updates:
+                pending_order.order = updates[order_id]
+
+            pending_order.poll_delay = min(pending_order.poll_delay * 2 or self.poll_interval, self.poll_interval)
+            pending_order.next_poll_at = now + pending_order.poll_delay
+
+            ticker_pair = pending_order.ticker_pair
+            if self.settle(pending_order, now):
+                continue
+
+            if pending_order.cancel_requested:
+                logger.info(f"{ticker_pair}: waiting for cancelled order {order_id} to close")
+            elif now >= pending_order.deadline:
+                if pending_order.filled() > CONSTANTS.ZERO:
+                    logger.info(f"{ticker_pair}: order {order_id} is still being filled, extending time")
+                    pending_order.deadline = now + pending_order.fill_timeout
+                    continue
+
+                logger.warn(f"{ticker_pair}: {pending_order.order_type} order not fulfilled, cancelling order")
+                cancel_result = self.exchange_service.execute_op(ticker_pair=ticker_pair, op=CONSTANTS.OP_CANCEL_ORDER, params={CONSTANTS.PARAM_ORDER_ID: order_id})
+                if cancel_result is None:
+                    # it may have filled in the meantime, the next poll will tell
+                    logger.warn(f"{ticker_pair}: failed to cancel order {order_id}, retrying next poll")
+                    continue
+
+                # the fill seen at the last poll may be stale, settle on how the order actually ended
+                pending_order.cancel_requested = True
+                final_order = self.fetch_final_order(pending_order, cancel_result)
+                if final_order is None:
+                    logger.warn(f"{ticker_pair}: cancelled order {order_id} is not closed yet, checking next poll")
+                    continue
+
+                pending_order.order = final_order
+                self.settle(pending_order, now)
+
+    def settle(self, pending_order: PendingOrder, now: float) -> bool:
+        """
+        Hands an order that has ended to its callbacks, returns False while
+        it is still open.
+        """
+        order = pending_order.order
+        order_id = pending_order.order_id
+        ticker_pair = pending_order.ticker_pair
+        if order["status"] == ORDER_STATUS_CLOSED:
+            del self.pending[order_id]
+            latency = self.record_fill(pending_order, now)
+            logger.info(f"{ticker_pair}: {pending_order.order_type} order {order_id} filled after {latency:.1f}s")
+            pending_order.on_fill(order)
+            return True
+
+        if order["status"] in ORDER_STATUSES_CANCELED:
+            del self.pending[order_id]
+            logger.warn(f"{ticker_pair}: order {order_id} ended with status: {order['status']}, filled: {pending_order.filled()}")
+            if pending_order.filled() > CONSTANTS.ZERO and pending_order.on_partial_fill is not None:
+                pending_order.on_partial_fill(order)
+            else:
+                self.notify_cancel(pending_order)
+            return True
+
+        return False
+
+    def fetch_final_order(self, pending_order: PendingOrder, cancel_result):
+        """
+        The state of a cancelled order once it has ended, from the cancel
+        response when that says how much filled, fetched otherwise.  None if
+        the exchange doesn't report it ended yet.
+        """
+        order = cancel_result
+        if not self.has_ended(order) or order.get("filled") is None:
+            params = {
+                CONSTANTS.PARAM_ORDER_ID: pending_order.order_id
+            }
+            order = self.exchange_service.execute_op(ticker_pair=pending_order.ticker_pair, op=CONSTANTS.OP_FETCH_ORDER, params=params)
+
+        if order is None or not self.has_ended(order):
+            return None
+        return order
+
+    def has_ended(self, order) -> bool:
+        status = order.get("status") if isinstance(order, dict) else None
+        return status == ORDER_STATUS_CLOSED or status in ORDER_STATUSES_CANCELED
+
+    def notify_cancel(self, pending_order: PendingOrder):
+        if pending_order.on_cancel is not None:
+            pending_order.on_cancel(pending_order.order)
+
+    def record_fill(self, pending_order: PendingOrder, filled_at: float) -> float:
+        latency = max(0.0, filled_at - pending_order.submitted_at)
+        if pending_order.order_type not in self.latency_stats:
+            self.latency_stats[pending_order.order_type] = LatencyStats()
+        self.latency_stats[pending_order.order_type].record(latency)
+        return latency
+
+    def get_latency_metrics(self) -> dict:
+        return {order_type: stats.summary() for (order_type, stats) in self.latency_stats.items()}
@@ -0,0 +1,316 @@
+import copy
+import time
+import threading
+import ccxt
+
+import utils.constants as CONSTANTS
+from ccxt import OrderNotFound, InvalidOrder
+from utils.logger import logger
+
+ORDER_STATUS_OPEN = "open"
+ORDER_STATUS_CLOSED = "closed"
+ORDER_STATUS_CANCELED = "canceled"
+
+MARKET_DATA_OPS = [CONSTANTS.OP_FETCH_TICKER, CONSTANTS.OP_FETCH_TICKERS, CONSTANTS.OP_FETCH_OHLCV]
+
+
+class PaperExchange:
+    """
+    Local matching engine standing in for a ccxt exchange client, so
+    ExchangeService runs unchanged on top of it.
+
+    Market data is served by market_data, a live ccxt client or a
+    CandleReplayFeed, and every bid/ask it returns is recorded as the
+    pair's quote.  Orders never leave the process: each pair has a book of
+    open orders that are matched against the latest quote once latency
+    seconds have passed since they were placed.  A limit buy fills when
+    the ask is at or below its price, a limit sell when the bid is at or
+    above it, at the quote moved against us by slippage but never past the
+    limit.  Market orders fill the same way with no limit.  fee_rate is
+    charged on the filled cost, and orders come back ccxt shaped, including
+    info.order_id and info.total_value_after_fees.
+
+    In async mode quotes arrive on the event loop while orders are placed
+    and polled from worker threads, so the books and quotes are only
+    touched under lock.
+    """
+
+    def __init__(self, market_data, fee_rate: float = CONSTANTS.CONFIG_DEFAULT_PAPER_FEE_RATE,
+                 slippage: float = CONSTANTS.CONFIG_DEFAULT_PAPER_SLIPPAGE, latency: float = CONSTANTS.CONFIG_DEFAULT_PAPER_LATENCY, clock=None):
+        self.market_data = market_data
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.latency = latency
+        # seconds since the epoch, replay feeds pass their own so fills follow replayed time
+        self.clock = time.time if clock is None else clock
+
+        self.rateLimit = getattr(market_data, "rateLimit", None)
+        self.options = {}
+        self.has = {op: bool(market_data.has.get(op)) for op in MARKET_DATA_OPS}
+        self.has.update({
+            CONSTANTS.OP_CREATE_ORDER: True,
+            CONSTANTS.OP_CANCEL_ORDER: True,
+            CONSTANTS.OP_FETCH_ORDER: True,
+            CONSTANTS.OP_FETCH_ORDERS: True,
+            CONSTANTS.OP_FETCH_OPEN_ORDERS: True,
+            # there's no account history to serve
+            CONSTANTS.OP_FETCH_MY_TRADES: False,
+            CONSTANTS.OP_FETCH_TRANSACTIONS: False
+        })
+
+        self.lock = threading.Lock()
+        self.quotes = {}
+        self.orders = {}
+        self.open_orders: dict[str, list] = {}
+        self.order_count = 0
+
+    def fetch_ticker(self, symbol):
+        ticker_info = self.market_data.fetch_ticker(symbol)
+        self.update_quote(symbol, ticker_info)
+        return ticker_info
+
+    def fetch_tickers(self, symbols=None):
+        tickers = self.market_data.fetch_tickers(symbols)
+        for (symbol, ticker_info) in tickers.items():
+            self.update_quote(symbol, ticker_info)
+        return tickers
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        return self.market_data.fetch_ohlcv(symbol, timeframe, since, limit)
+
+    def update_quote(self, symbol: str, ticker_info):
+        """
+        Records the pair's latest bid/ask and fills the open orders it crosses.
+        """
+        if ticker_info is None or ticker_info.get("bid") is None or ticker_info.get("ask") is None:
+            return
+        with self.lock:
+            self.quotes[symbol] = (float(ticker_info["bid"]), float(ticker_info["ask"]))
+            self.match(symbol)
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        if type == "limit" and price is None:
+            raise InvalidOrder(f"{symbol}: limit order without a price")
+
+        with self.lock:
+            self.order_count += 1
+            order_id = f"paper-{self.order_count}"
+            timestamp = int(self.clock() * 1000)
+            order = {
+                "id": order_id,
+                "clientOrderId": None,
+                "timestamp": timestamp,
+                "datetime": ccxt.Exchange.iso8601(timestamp),
+                "lastTradeTimestamp": None,
+                "symbol": symbol,
+                "type": type,
+                "side": side,
+                "price": None if price is None else float(price),
+                "average": None,
+                "amount": float(amount),
+                "filled": 0.0,
+                "remaining": float(amount),
+                "cost": 0.0,
+                "status": ORDER_STATUS_OPEN,
+                "fee": {"cost": 0.0, "rate": self.fee_rate},
+                "trades": [],
+                "info": {
+                    "order_id": order_id,
+                    "total_value_after_fees": "0"
+                }
+            }
+            if params is not None and "cost" in params:
+                order["info"]["cost"] = float(params["cost"])
+            self.orders[order_id] = order
+            self.open_orders.setdefault(symbol, []).append(order)
+            self.match(symbol)
+            return copy.deepcopy(order)
+
+    def create_market_buy_order(self, symbol, cost):
+        """
+        Market buys are placed by cost, like coinbase's, and the shares are
+        worked out when the order fills.
+        """
+        return self.create_order(symbol, "market", "buy", 0.0, params={"cost": cost})
+
+    def create_market_sell_order(self, symbol, amount):
+        return self.create_order(symbol, "market", "sell", amount)
+
+    def match(self, symbol: str):
+        """
+        Fills the pair's open orders its quote crosses, callers hold the lock.
+        """
+        if symbol not in self.quotes or len(self.open_orders.get(symbol, [])) == 0:
+            return
+
+        (bid, ask) = self.quotes[symbol]
+        placed_before = (self.clock() - self.latency) * 1000
+        still_open = []
+        for order in self.open_orders[symbol]:
+            if order["timestamp"] > placed_before:
+                still_open.append(order)
+                continue
+
+            if order["side"] == "buy":
+                fill_price = ask * (1 + self.slippage)
+                if order["price"] is not None:
+                    if ask > order["price"]:
+                        still_open.append(order)
+                        continue
+                    fill_price = min(fill_price, order["price"])
+            else:
+                fill_price = bid * (1 - self.slippage)
+                if order["price"] is not None:
+                    if bid < order["price"]:
+                        still_open.append(order)
+                        continue
+                    fill_price = max(fill_price, order["price"])
+
+            self.fill(order, fill_price)
+        self.open_orders[symbol] = still_open
+
+    def fill(self, order, fill_price: float):
+        if order["type"] == "market" and order["side"] == "buy":
+            order["amount"] = order["info"]["cost"] / fill_price
+
+        cost = order["amount"] * fill_price
+        fee = cost * self.fee_rate
+        total_value_after_fees = cost + fee if order["side"] == "buy" else cost - fee
+
+        order["filled"] = order["amount"]
+        order["remaining"] = 0.0
+        order["average"] = fill_price
+        if order["price"] is None:
+            order["price"] = fill_price
+        order["cost"] = cost
+        order["fee"]["cost"] = fee
+        order["status"] = ORDER_STATUS_CLOSED
+        order["lastTradeTimestamp"] = int(self.clock() * 1000)
+        order["info"]["total_value_after_fees"] = str(total_value_after_fees)
+        logger.debug(f"{order['symbol']}: paper {order['side']} order {order['id']} filled {order['filled']} at {fill_price}")
+
+    def fetch_order(self, order_id, symbol=None):
+        with self.lock:
+            if order_id not in self.orders:
+                raise OrderNotFound(f"paper order {order_id} not found")
+            self.match(self.orders[order_id]["symbol"])
+            return copy.deepcopy(self.orders[order_id])
+
+    def fetch_orders(self, symbol, since=None, limit=None):
+        with self.lock:
+            self.match(symbol)
+            orders = [order for order in self.orders.values() if order["symbol"] == symbol and (since is None or order["timestamp"] >= since)]
+            if limit is not None:
+                orders = orders[-limit:]
+            return copy.deepcopy(orders)
+
+    def fetch_open_orders(self, symbol, since=None, limit=None):
+        with self.lock:
+            self.match(symbol)
+            return copy.deepcopy(self.open_orders.get(symbol, []))
+
+    def cancel_order(self, order_id, symbol=None):
+        with self.lock:
+            if order_id not in self.orders:
+                raise OrderNotFound(f"paper order {order_id} not found")
+
+            order = self.orders[order_id]
+            self.match(order["symbol"])
+            if order["status"] != ORDER_STATUS_OPEN:
+                raise OrderNotFound(f"paper order {order_id} is already {order['status']}")
+
+            order["status"] = ORDER_STATUS_CANCELED
+            self.open_orders[order["symbol"]].remove(order)
+            return copy.deepcopy(order)
+
+
+class AsyncPaperExchange:
+    """
+    Async market data for a PaperExchange, from the live async ccxt client,
+    so quotes fetched by CryptoBot.run_async still reach the order books.
+    """
+
+    def __init__(self, paper_exchange: PaperExchange, market_data):
+        self.paper_exchange = paper_exchange
+        self.market_data = market_data
+        self.has = paper_exchange.has
+
+    async def fetch_ticker(self, symbol):
+        ticker_info = await self.market_data.fetch_ticker(symbol)
+        self.paper_exchange.update_quote(symbol, ticker_info)
+        return ticker_info
+
+    async def fetch_tickers(self, symbols=None):
+        tickers = await self.market_data.fetch_tickers(symbols)
+        for (symbol, ticker_info) in tickers.items():
+            self.paper_exchange.update_quote(symbol, ticker_info)
+        return tickers
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        return await self.market_data.fetch_ohlcv(symbol, timeframe, since, limit)
+
+    async def close(self):
+        await self.market_data.close()
+
+
+class CandleReplayFeed:
+    """
+    Offline market data for a PaperExchange: stored candles replayed one
+    step at a time, all pairs in lockstep, quoting every pair's latest close
+    with a symmetric spread.  now is the replayed time, pass it as the
+    PaperExchange clock so fills and latency follow the replay.
+    """
+
+    def __init__(self, ohlcv_by_pair: dict, spread: float = 0.0):
+        self.ohlcv_by_pair = {ticker_pair: [list(candle) for candle in ohlcv] for (ticker_pair, ohlcv) in ohlcv_by_pair.items()}
+        self.spread = spread
+        self.cursor = 0
+        self.has = {op: True for op in MARKET_DATA_OPS}
+
+    def __len__(self):
+        return max((len(ohlcv) for ohlcv in self.ohlcv_by_pair.values()), default=0)
+
+    def advance(self) -> bool:
+        """
+        Steps to the next candle, returns False once the feed is exhausted.
+        """
+        if self.cursor + 1 >= len(self):
+            return False
+        self.cursor += 1
+        return True
+
+    def now(self) -> float:
+        timestamps = [ohlcv[min(self.cursor, len(ohlcv) - 1)][0] for ohlcv in self.ohlcv_by_pair.values() if len(ohlcv) > 0]
+        return max(timestamps, default=0) / 1000
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        candles = self.ohlcv_by_pair.get(symbol, [])[:self.cursor + 1]
+        if since is not None:
+            candles = [candle for candle in candles if candle[0] >= since]
+            if limit is not None:
+                candles = candles[:limit]
+        elif limit is not None:
+            candles = candles[-limit:]
+        return copy.deepcopy(candles)
+
+    def fetch_ticker(self, symbol):
+        candles = self.ohlcv_by_pair.get(symbol, [])[:self.cursor + 1]
+        if len(candles) == 0:
+            raise ccxt.BadSymbol(f"{symbol}: no replayed candles")
+
+        (timestamp, close) = (int(candles[-1][0]), candles[-1][4])
+        half_spread = close * self.spread / 2
+        return {
+            "symbol": symbol,
+            "timestamp": timestamp,
+            "datetime": ccxt.Exchange.iso8601(timestamp),
+            "last": close,
+            "close": close,
+            "bid": close - half_spread,
+            "ask": close + half_spread
+        }
+
+    def fetch_tickers(self, symbols=None):
+        if symbols is None:
+            symbols = list(self.ohlcv_by_pair.keys())
+        return {symbol: self.fetch_ticker(symbol) for symbol in symbols if symbol in self.ohlcv_by_pair}
@@ -0,0 +1,170 @@
+import copy
+
+from utils.logger import logger
+from utils.position_lots import PositionLots
+
+class PositionBook:
+    """
+    Open positions kept in memory, indexed by symbol, and written through to
+    the current positions collection.
+
+    The bot is the only writer of that collection while it runs, so positions
+    are loaded once at startup instead of being queried per ticker per cycle.
+    Each symbol keeps running totals (filled, amount, fee, cost) updated in
+    O(1) on every buy and sell, so the average position is a lookup.  The
+    average matches utils.trading.calculate_avg_position: it is a copy of the
+    symbol's oldest lot with the totals and the resulting average price.  The
+    columnar PositionLots of a symbol is likewise built once per change.
+
+    Without a mongodb_service the book is purely in memory, as in backtests.
+    """
+
+    def __init__(self, mongodb_service, collection: str):
+        self.mongodb_service = mongodb_service
+        self.collection = collection
+        self.positions: dict[str, list] = {}
+        self.totals: dict[str, dict] = {}
+        self.avg_positions: dict[str, dict] = {}
+        self.lots: dict[str, PositionLots] = {}
+
+    def load(self):
+        if self.mongodb_service is None:
+            return
+
+        positions = self.mongodb_service.query(self.collection)
+        if positions is None:
+            logger.error(f"{self.collection}: unable to load open positions")
+            positions = []
+
+        self.positions = {}
+        for position in positions:
+            self.positions.setdefault(position["symbol"], []).append(position)
+
+        self.totals = {}
+        self.avg_positions = {}
+        self.lots = {}
+        for symbol in self.positions:
+            self.recalculate(symbol)
+
+        logger.info(f"{self.collection}: loaded {len(positions)} open positions for {len(self.positions)} symbols")
+
+    def get_positions(self, symbol: str) -> list:
+        return list(self.positions.get(symbol, []))
+
+    def get_avg_position(self, symbol: str):
+        """
+        Returns the average position, or None without open positions.  The
+        same dict is returned until the symbol's positions change, treat it as
+        read-only.
+        """
+        if symbol not in self.totals:
+            return None
+
+        if symbol not in self.avg_positions:
+            totals = self.totals[symbol]
+            avg_position = copy.deepcopy(self.positions[symbol][0])
+            avg_position["filled"] = totals["filled"]
+            avg_position["amount"] = totals["amount"]
+            avg_position["fee"]["cost"] = totals["fee"]
+            avg_position["cost"] = totals["cost"]
+            avg_position["price"] = totals["cost"]/totals["amount"]
+            avg_position["average"] = totals["cost"]/totals["amount"]
+            self.avg_positions[symbol] = avg_position
+
+        return self.avg_positions[symbol]
+
+    def get_lots(self, symbol: str) -> PositionLots:
+        """
+        Returns the symbol's lots in the order of get_positions, or None
+        without open positions.
+        """
+        if symbol not in self.positions:
+            return None
+
+        if symbol not in self.lots:
+            self.lots[symbol] = PositionLots(self.positions[symbol])
+        return self.lots[symbol]
+
+    def add(self, position):
+        """
+        Persists a filled buy order and adds it to the book.  A failed write is
+        logged but the position is still tracked, it exists on the exchange.
+        """
+        if self.mongodb_service is not None and self.mongodb_service.insert_one(self.collection, position) is None:
+            logger.error(f"{position['symbol']}: failed to persist position {position['id']}")
+
+        symbol = position["symbol"]
+        if symbol not in self.positions or len(self.positions[symbol]) == 0:
+            self.positions[symbol] = [position]
+            self.recalculate(symbol)
+            return
+
+        self.positions[symbol].append(position)
+        totals = self.totals[symbol]
+        totals["filled"] += position["filled"]
+        totals["amount"] += position["filled"]
+        totals["fee"] += float(position["fee"]["cost"])
+        totals["cost"] += position["cost"]
+        self.invalidate(symbol)
+
+    def remove(self, symbol: str, position_ids: list) -> int:
+        """
+        Deletes the positions from the collection and the book, returns the
+        number of documents deleted.
+        """
+        to_remove = set(position_ids)
+        positions = self.positions.get(symbol, [])
+        removed = [position for position in positions if position["id"] in to_remove]
+
+        deletion_count = len(removed)
+        if self.mongodb_service is not None:
+            delete_filter = {
+                "id": {"$in": position_ids}
+            }
+            deletion_result = self.mongodb_service.delete_many(self.collection, delete_filter)
+            deletion_count = 0
+            if deletion_result is not None:
+                deletion_count = deletion_result.deleted_count
+
+        self.positions[symbol] = [position for position in positions if position["id"] not in to_remove]
+
+        if len(removed) > 0 and positions[0]["id"] in to_remove:
+            # the oldest lot is the base of the totals, start over from the new oldest
+            self.recalculate(symbol)
+        else:
+            totals = self.totals.get(symbol)
+            for position in removed:
+                totals["filled"] -= position["filled"]
+                totals["amount"] -= position["filled"]
+                totals["fee"] -= float(position["fee"]["cost"])
+                totals["cost"] -= position["cost"]
+            self.invalidate(symbol)
+
+        return deletion_count
+
+    def invalidate(self, symbol: str):
+        self.avg_positions.pop(symbol, None)
+        self.lots.pop(symbol, None)
+
+    def recalculate(self, symbol: str):
+        self.invalidate(symbol)
+        positions = self.positions.get(symbol, [])
+        if len(positions) == 0:
+            self.positions.pop(symbol, None)
+            self.totals.pop(symbol, None)
+            return
+
+        base = positions[0]
+        fee = base["fee"]["cost"]
+        totals = {
+            "filled": base["filled"],
+            "amount": base["amount"],
+            "fee": float(fee) if fee else fee,
+            "cost": base["cost"]
+        }
+        for position in positions[1:]:
+            totals["filled"] += position["filled"]
+            totals["amount"] += position["filled"]
+            totals["fee"] += float(position["fee"]["cost"])
+            totals["cost"] += position["cost"]
+        self.totals[symbol] = totals
@@ -0,0 +1,119 @@
+import numpy as np
+
+# the DP keeps a take flag per item and grid unit, bounding its memory
+KNAPSACK_CELL_BUDGET = 1 << 24
+KNAPSACK_MAX_CELLS = 1 << 16
+# float slack when rounding onto the grid, so a deficit equal to the surplus still fits
+KNAPSACK_EPSILON = 1e-9
+
+class PositionLots:
+    """
+    Columnar view of a symbol's open lots: amount, filled, cost, fee and price
+    as float64 arrays in the same order as the positions they were built from.
+
+    Take-profit checks evaluate every lot in one vectorized pass instead of
+    building Decimals per lot.  Results are floats, Decimal rounding is left
+    to the order boundary.
+    """
+
+    def __init__(self, positions: list):
+        self.positions = positions
+        count = len(positions)
+        self.amount = np.empty(count, dtype=np.float64)
+        self.filled = np.empty(count, dtype=np.float64)
+        self.cost = np.empty(count, dtype=np.float64)
+        self.fee = np.empty(count, dtype=np.float64)
+        self.price = np.empty(count, dtype=np.float64)
+
+        for (idx, position) in enumerate(positions):
+            self.amount[idx] = position["amount"]
+            self.filled[idx] = position["filled"]
+            self.cost[idx] = position["cost"]
+            self.fee[idx] = position["fee"]["cost"] or 0.0
+            self.price[idx] = position["price"]
+
+        # fee rate from the buy side, used to estimate the sell fee
+        self.fee_rate = np.divide(self.fee, self.cost, out=np.zeros(count), where=self.cost > 0)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def profits(self, bid_price: float) -> np.ndarray:
+        """
+        Profit after the buy fee and the estimated sell fee for every lot.
+        """
+        profit = (bid_price - self.price) * self.amount
+        sell_value = bid_price * self.amount
+        return profit - self.fee - sell_value * self.fee_rate
+
+    def profit_percents(self, bid_price: float) -> np.ndarray:
+        """
+        profits as a fraction of cost.  Same formula as
+        calculate_profit_percent.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.profits(bid_price) / self.cost
+
+    def select_optimized(self, bid_price: float, take_profit_threshold: float) -> np.ndarray:
+        """
+        Returns the indices, in position order, of the set of lots that each
+        make a profit after fees, together have a blended profit percent
+        (total profit over total cost) of at least the threshold, and
+        realize the most profit.
+
+        The blended condition is sum(profit - threshold * cost) >= 0.  Every
+        lot whose own excess is non-negative adds both profit and slack, so
+        they are all taken.  Their surplus then pays for profitable lots
+        below the threshold, each costing its deficit and worth its profit:
+        a 0/1 knapsack, solved by dynamic programming with deficits
+        rounded up and the surplus down onto a grid of at most
+        KNAPSACK_MAX_CELLS units.  Rounding that way every selection meets
+        the threshold, and the profit is optimal up to one grid unit of
+        deficit per lot.  When the surplus covers every deficit they're all
+        taken without the DP.  O(n * cells).
+        """
+        profits = self.profits(bid_price)
+        excess = profits - take_profit_threshold * self.cost
+
+        profitable = profits > 0
+        qualifying = profitable & (excess >= 0)
+        surplus = excess[qualifying].sum()
+
+        below = np.flatnonzero(profitable & (excess < 0))
+        deficits = -excess[below]
+        affordable = deficits <= surplus
+        (below, deficits) = (below[affordable], deficits[affordable])
+        if deficits.sum() > surplus:
+            below = below[knapsack(deficits, profits[below], surplus)]
+
+        return np.sort(np.concatenate((np.flatnonzero(qualifying), below)))
+
+
+def knapsack(weights: np.ndarray, values: np.ndarray, capacity: float) -> np.ndarray:
+    """
+    Indices of the items with the largest total value whose total weight
+    stays within capacity, weights rounded up onto the grid and capacity
+    down.  Every value is positive.
+    """
+    cells = max(1, min(KNAPSACK_MAX_CELLS, KNAPSACK_CELL_BUDGET // len(weights)))
+    unit = capacity / cells
+    grid_weights = np.maximum(np.ceil(weights / unit - KNAPSACK_EPSILON), 0).astype(np.int64)
+
+    # best[w] is the most value within w units, take[i, w] whether item i is in it
+    best = np.zeros(cells + 1)
+    take = np.zeros((len(weights), cells + 1), dtype=bool)
+    for (idx, (weight, value)) in enumerate(zip(grid_weights, values)):
+        if weight > cells:
+            continue
+        candidate = best[:cells + 1 - weight] + value
+        improved = candidate > best[weight:]
+        take[idx, weight:] = improved
+        best[weight:] = np.where(improved, candidate, best[weight:])
+
+    chosen = []
+    remaining = cells
+    for idx in range(len(weights) - 1, -1, -1):
+        if take[idx, remaining]:
+            chosen.append(idx)
+            remaining -= grid_weights[idx]
+    return np.array(chosen[::-1], dtype=np.int64)
@@ -0,0 +1,113 @@
+import random
+import time
+
+import utils.constants as CONSTANTS
+
+# ops that only read, so repeating one after a timeout can't place or cancel
+# anything twice
+IDEMPOTENT_OPS = {
+    CONSTANTS.OP_FETCH_TICKER,
+    CONSTANTS.OP_FETCH_TICKERS,
+    CONSTANTS.OP_FETCH_OHLCV,
+    CONSTANTS.OP_FETCH_ORDER,
+    CONSTANTS.OP_FETCH_ORDERS,
+    CONSTANTS.OP_FETCH_OPEN_ORDERS,
+    CONSTANTS.OP_FETCH_MY_TRADES,
+    CONSTANTS.OP_FETCH_TRANSACTIONS
+}
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: retry n waits a random time up to
+    base_delay * 2^n, capped at max_delay, so clients that failed together
+    don't retry together.
+    """
+
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, op: str, attempt: int) -> bool:
+        return op in IDEMPOTENT_OPS and attempt < self.max_retries
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold transient failures in a row, after which
+    calls are rejected without reaching the exchange.  Once reset_timeout has
+    passed a single call is let through as a probe: success closes the
+    circuit, failure keeps it open for another reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    def state(self, now: float = None) -> str:
+        if self.opened_at is None:
+            return CIRCUIT_CLOSED
+        now = time.monotonic() if now is None else now
+        if now - self.opened_at >= self.reset_timeout:
+            return CIRCUIT_HALF_OPEN
+        return CIRCUIT_OPEN
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        state = self.state(now)
+        if state == CIRCUIT_HALF_OPEN:
+            # restart the timeout so only this call probes
+            self.opened_at = now
+            return True
+        return state == CIRCUIT_CLOSED
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> bool:
+        """
+        Returns True if this failure opened the circuit.
+        """
+        self.failures += 1
+        if self.opened_at is not None:
+            self.opened_at = time.monotonic()
+            return False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+
+class RequestMetrics:
+    """
+    Counters per op: retries made, requests that still failed after their
+    retries, calls rejected by an open circuit and times the circuit opened.
+    """
+
+    FIELDS = ["retries", "failures", "rejected", "circuit_opens"]
+
+    def __init__(self):
+        self.counters: dict[str, dict] = {}
+
+    def record(self, op: str, field: str):
+        if op not in self.counters:
+            self.counters[op] = {field: 0 for field in self.FIELDS}
+        self.counters[op][field] += 1
+
+    def summary(self, circuit_breakers: dict[str, CircuitBreaker]) -> dict:
+        summary = {}
+        for op in sorted(set(self.counters.keys()).union(circuit_breakers.keys())):
+            summary[op] = dict(self.counters.get(op, {field: 0 for field in self.FIELDS}))
+            summary[op]["circuit"] = circuit_breakers[op].state() if op in circuit_breakers else CIRCUIT_CLOSED
+        return summary
@@ -0,0 +1,132 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+import utils.constants as CONSTANTS
+
+# lower runs first, so order placement and cancellation jump the queue ahead
+# of order status polls, which go ahead of market data
+PRIORITY_ORDERS = 0
+PRIORITY_ORDER_STATUS = 1
+PRIORITY_MARKET_DATA = 2
+
+OP_PRIORITIES = {
+    CONSTANTS.OP_CREATE_ORDER: PRIORITY_ORDERS,
+    CONSTANTS.OP_CANCEL_ORDER: PRIORITY_ORDERS,
+    CONSTANTS.OP_FETCH_ORDER: PRIORITY_ORDER_STATUS,
+    CONSTANTS.OP_FETCH_ORDERS: PRIORITY_ORDER_STATUS,
+    CONSTANTS.OP_FETCH_OPEN_ORDERS: PRIORITY_ORDER_STATUS
+}
+
+# shortest sleep of a request waiting behind others, which re-checks its
+# place in the queue every time it wakes up
+MIN_POLL_INTERVAL = 0.001
+
+
+class RequestScheduler:
+    """
+    Token bucket shared by every request ExchangeService makes.  The bucket
+    refills at rate tokens per second up to burst, each request spends its
+    endpoint's weight, and waiting requests are served strictly by priority
+    and then arrival, so a queued order goes out before any market data
+    request queued ahead of it.  Sync callers block in acquire, async
+    callers await acquire_async, and both wait in the same queue.
+    """
+
+    def __init__(self, rate: float, burst: float = 1, weights: dict = None):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.weights = {} if weights is None else dict(weights)
+
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.queue = []
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+
+        self.requests = 0
+        self.wait_seconds = 0.0
+
+    def weight(self, op: str) -> float:
+        return self.weights.get(op, 1)
+
+    def priority(self, op: str) -> int:
+        return OP_PRIORITIES.get(op, PRIORITY_MARKET_DATA)
+
+    def acquire(self, op: str, requests: int = 1):
+        """
+        Blocks until the op's requests can be sent without going over the rate.
+        """
+        ticket = self._enqueue(op, requests)
+        if ticket is None:
+            return
+        start = time.monotonic()
+        try:
+            while True:
+                wait = self._try_take(ticket)
+                if wait == 0:
+                    break
+                time.sleep(wait)
+        finally:
+            self._done(ticket, start)
+
+    async def acquire_async(self, op: str, requests: int = 1):
+        ticket = self._enqueue(op, requests)
+        if ticket is None:
+            return
+        start = time.monotonic()
+        try:
+            while True:
+                wait = self._try_take(ticket)
+                if wait == 0:
+                    break
+                await asyncio.sleep(wait)
+        finally:
+            self._done(ticket, start)
+
+    def _enqueue(self, op: str, requests: int):
+        cost = self.weight(op) * requests
+        if cost <= 0:
+            return None
+
+        ticket = [self.priority(op), next(self.sequence), cost, False]
+        with self.lock:
+            heapq.heappush(self.queue, ticket)
+        return ticket
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _try_take(self, ticket) -> float:
+        """
+        Spends the ticket's tokens if it is next in line and they're
+        available, returning 0, otherwise returns how long to sleep before
+        trying again.
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            # a cost above the burst can never fit in the bucket, it goes
+            # out once the bucket is full and leaves it in debt instead
+            cost = min(ticket[2], self.burst)
+            if self.queue[0] is ticket and self.tokens >= cost:
+                heapq.heappop(self.queue)
+                self.tokens -= ticket[2]
+                ticket[3] = True
+                return 0
+
+            ahead = sum(min(queued[2], self.burst) for queued in self.queue if queued < ticket)
+            return max((ahead + cost - self.tokens) / self.rate, MIN_POLL_INTERVAL)
+
+    def _done(self, ticket, start: float):
+        with self.lock:
+            if ticket[3]:
+                self.requests += 1
+                self.wait_seconds += time.monotonic() - start
+                return
+
+            # the caller gave up (cancelled task or interrupt), drop it from the queue
+            self.queue.remove(ticket)
+            heapq.heapify(self.queue)
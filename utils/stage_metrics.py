@@ -0,0 +1,191 @@
+import json
+import time
+import threading
+
+from bisect import bisect_left
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.logger import logger
+
+# upper bounds in seconds, from a cached indicator read up to a slow exchange request
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_NAME = "crypto_bot_stage_seconds"
+NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    """
+    Prometheus style latency histogram: a count per bucket, plus the sum,
+    count and max of every observation.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q quantile, capped at the max seen.
+        """
+        rank = q * self.count
+        seen = 0
+        for (idx, bucket_count) in enumerate(self.bucket_counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count > 0:
+                if idx == len(self.buckets):
+                    return self.max
+                return min(self.buckets[idx], self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.sum / self.count * 1000 if self.count > 0 else 0.0,
+            "p50_ms": self.quantile(0.5) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "max_ms": self.max * 1000
+        }
+
+
+class Span:
+    __slots__ = ("stage_metrics", "key", "start")
+
+    def __init__(self, stage_metrics, key: tuple):
+        self.stage_metrics = stage_metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stage_metrics.observe(self.key, time.perf_counter() - self.start)
+        return False
+
+
+class StageMetrics:
+    """
+    Latency histograms for the stages of the trading loop, one per stage,
+    ticker pair and strategy.  Stages are timed with
+
+        with stage_metrics.span("frame_build", ticker_pair):
+            ...
+
+    and a disabled StageMetrics hands out a shared no-op span, so spans
+    can stay in the hot loop at the cost of a method call.  Histograms are
+    cumulative for the life of the process, read as Prometheus text by
+    render_prometheus or summarized in one JSON log line by log_if_due.
+    """
+
+    def __init__(self, enabled: bool = False, log_interval: float = None, buckets: tuple = LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.log_interval = log_interval
+        self.buckets = buckets
+        self.histograms: dict[tuple, Histogram] = {}
+        self.lock = threading.Lock()
+        self.last_logged_at = time.monotonic()
+
+    def span(self, stage: str, ticker_pair: str = None, strategy: str = None):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, (stage, ticker_pair or "", strategy or ""))
+
+    def observe(self, key: tuple, seconds: float):
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def summary(self) -> dict:
+        """
+        Per stage, then per ticker pair or strategy, the count, mean and
+        bucketed p50/p95 in milliseconds.
+        """
+        summary = {}
+        with self.lock:
+            for ((stage, ticker_pair, strategy), histogram) in sorted(self.histograms.items()):
+                label = "/".join(filter(None, [strategy, ticker_pair])) or "all"
+                summary.setdefault(stage, {})[label] = histogram.summary()
+        return summary
+
+    def log_if_due(self):
+        if not self.enabled or self.log_interval is None:
+            return
+
+        now = time.monotonic()
+        if now - self.last_logged_at < self.log_interval:
+            return
+        self.last_logged_at = now
+        logger.info(f"stage metrics: {json.dumps(self.summary(), separators=(',', ':'))}")
+
+    def render_prometheus(self) -> str:
+        lines = [
+            f"# HELP {METRIC_NAME} Latency of the trading loop's stages per ticker pair and strategy.",
+            f"# TYPE {METRIC_NAME} histogram"
+        ]
+        with self.lock:
+            for ((stage, ticker_pair, strategy), histogram) in sorted(self.histograms.items()):
+                labels = f'stage="{stage}",ticker="{ticker_pair}",strategy="{strategy}"'
+                cumulative = 0
+                for (bound, bucket_count) in zip(self.buckets, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"{METRIC_NAME}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{METRIC_NAME}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Serves StageMetrics.render_prometheus at /metrics from a daemon thread,
+    on localhost only.
+    """
+
+    def __init__(self, stage_metrics: StageMetrics, port: int, host: str = "127.0.0.1"):
+        self.stage_metrics = stage_metrics
+        self.server = ThreadingHTTPServer((host, port), self.create_handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = None
+
+    def create_handler(self):
+        stage_metrics = self.stage_metrics
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = stage_metrics.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(f"metrics endpoint: {format % args}")
+
+        return MetricsHandler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+        logger.info(f"serving stage metrics on http://{self.server.server_address[0]}:{self.port}/metrics")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -2,6 +2,7 @@ import pandas as pd
 import utils.constants as CONSTANTS
 
 from utils.trading import TradeAction
+from utils.candle_frame import CandleFrame, as_candle_frame
 from strategies.base_strategy import BaseStrategy
 from strategies.strategy_factory import strategy_factory
 
@@ -70,9 +71,10 @@ def execute_strategies(ticker_pair: str,
                         strategies: dict[int, BaseStrategy], 
                         avg_position, 
                         ticker_info, 
-                        candles_df: pd.DataFrame, 
+                        candles: CandleFrame | pd.DataFrame, 
                         strategies_overrides: dict[str, dict[str, BaseStrategy]] = None) -> TradeAction:
 
+    candles = as_candle_frame(candles)
     for priority, strategies in strategies.items():
         trade_action = TradeAction.NOOP
         for s_idx, strategy in enumerate(strategies):
@@ -83,7 +85,7 @@ def execute_strategies(ticker_pair: str,
                 if ticker_pair in strategies_overrides and curr_strat_name in strategies_overrides[ticker_pair]:
                     strategy_to_run = strategies_overrides[ticker_pair][curr_strat_name]
             
-            curr_action = strategy_to_run.eval(avg_position, candles_df, ticker_info)    
+            curr_action = strategy_to_run.eval(avg_position, candles, ticker_info)    
             logger.debug(f"{ticker_pair}: strategy: {curr_strat_name}, priority: {priority}, action: {curr_action}")
             if s_idx == 0:
                 trade_action = curr_action
@@ -2,11 +2,16 @@ import pandas as pd
 import utils.constants as CONSTANTS
 
 from utils.trading import TradeAction
+from utils.candle_frame import CandleFrame, as_candle_frame
 from strategies.base_strategy import BaseStrategy
 from strategies.strategy_factory import strategy_factory
+from utils.stage_metrics import StageMetrics
 
 from utils.logger import logger
 
+# spans of a disabled StageMetrics are no-ops, for callers that don't time strategies
+NO_STAGE_METRICS = StageMetrics()
+
 def init_strategies(config, mongodb_service=None) -> dict[int, BaseStrategy]:
     """
     Initialize strategies from config, organized by priority.
@@ -72,12 +77,99 @@ def init_strategies_overrides(config, mongodb_service=None) -> dict[str, dict[st
     return strategies_overrides
 
 
+# Priority 1 strategy alone can trigger (weight=3)
+# Two Priority 2 strategies can trigger (weight=2*2=4)
+ACTION_THRESHOLD = 3
+
+
+def priority_weight(priority: int) -> int:
+    """
+    Lower priority number = higher weight.
+    """
+    if priority == 1:
+        return 3
+    elif priority == 2:
+        return 2
+    return 1
+
+
+class ScoringPlan:
+    """
+    The strategies execute_strategies_scoring evaluates for one ticker pair,
+    overrides resolved, in the order it evaluates them: stateful strategies
+    first since they always run, then the rest cheapest first, heavier
+    weights first within the same eval_cost.  remaining_weights[idx] is the
+    weight of the strategies from idx on, the most either score can still
+    gain before evaluating them.  strategies keeps the resolved strategies
+    by priority, for the legacy all-must-agree execution.
+    """
+
+    def __init__(self, ticker_pair: str, strategies: dict[int, BaseStrategy], strategies_overrides: dict[str, dict[str, BaseStrategy]] = None):
+        pair_overrides = {}
+        if strategies_overrides is not None and ticker_pair in strategies_overrides:
+            pair_overrides = strategies_overrides[ticker_pair]
+
+        self.volatility_strategy = None
+        self.strategies: dict[int, list[BaseStrategy]] = {}
+        entries = []
+        for (priority, strategy_list) in strategies.items():
+            self.strategies[priority] = []
+            for strategy in strategy_list:
+                strategy_to_run = pair_overrides.get(strategy.name, strategy)
+                self.strategies[priority].append(strategy_to_run)
+                entries.append((strategy.name, priority, priority_weight(priority), strategy_to_run))
+                if strategy.name == "VOLATILITY_ADJUSTED" and self.volatility_strategy is None and hasattr(strategy_to_run, "get_volatility_multiplier"):
+                    self.volatility_strategy = strategy_to_run
+
+        # sorted is stable, so ties keep the config order
+        self.entries = sorted(entries, key=lambda entry: (not entry[3].stateful, entry[3].eval_cost, -entry[2]))
+
+        self.remaining_weights = [0] * (len(self.entries) + 1)
+        for idx in range(len(self.entries) - 1, -1, -1):
+            self.remaining_weights[idx] = self.remaining_weights[idx + 1] + self.entries[idx][2]
+
+    def volatility_multiplier(self, ticker_info) -> float:
+        """
+        The multiplier left by VOLATILITY_ADJUSTED's previous eval for the
+        pair, read before this cycle's eval.
+        """
+        if self.volatility_strategy is None or "symbol" not in ticker_info:
+            return 1.0
+        return float(self.volatility_strategy.get_volatility_multiplier(ticker_info["symbol"]))
+
+
+def scoring_decision(buy_weight: int, sell_weight: int, hold_lock: bool, remaining_weight: int, volatility_multiplier: float) -> TradeAction:
+    """
+    The action the scores lead to however the strategies worth
+    remaining_weight still to be evaluated vote, or None while they could
+    still change it.  With nothing remaining it's the final decision: BUY
+    (a HOLD lock doesn't block buys) or SELL at ACTION_THRESHOLD when ahead
+    of the other side, a HOLD lock turning the SELL into a HOLD.
+    """
+    max_buy_weight = buy_weight + remaining_weight
+    max_sell_weight = sell_weight + remaining_weight
+    can_buy = max_buy_weight * volatility_multiplier >= ACTION_THRESHOLD and max_buy_weight > sell_weight
+    can_sell = max_sell_weight * volatility_multiplier >= ACTION_THRESHOLD and max_sell_weight > buy_weight
+    if not can_buy and not can_sell:
+        return TradeAction.NOOP
+
+    if buy_weight * volatility_multiplier >= ACTION_THRESHOLD and buy_weight > max_sell_weight:
+        return TradeAction.BUY
+
+    # a HOLD still to come would turn the SELL into a HOLD
+    if sell_weight * volatility_multiplier >= ACTION_THRESHOLD and sell_weight > max_buy_weight and (hold_lock or remaining_weight == 0):
+        return TradeAction.HOLD if hold_lock else TradeAction.SELL
+
+    return None
+
+
 def execute_strategies_scoring(ticker_pair: str, 
                                strategies: dict[int, BaseStrategy], 
                                avg_position, 
                                ticker_info, 
-                               candles_df: pd.DataFrame, 
-                               strategies_overrides: dict[str, dict[str, BaseStrategy]] = None) -> TradeAction:
+                               candles: CandleFrame, 
+                               strategies_overrides: dict[str, dict[str, BaseStrategy]] = None,
+                               stage_metrics: StageMetrics = NO_STAGE_METRICS) -> TradeAction:
     """
     ENHANCED: Execute strategies using a scoring system instead of all-must-agree.
     
@@ -99,125 +191,119 @@ def execute_strategies_scoring(ticker_pair: str,
     - Priority 1: 3x weight (most important, like take profit)
     - Priority 2: 2x weight (technical indicators)
     - Priority 3+: 1x weight
+
+    Every weight is scaled by the volatility multiplier, so high volatility
+    (mult < 1) reduces impact and low volatility (mult > 1) increases it.
+    Strategies are evaluated in ScoringPlan order and evaluation stops as
+    soon as the remaining ones can't change the outcome, so expensive
+    indicator strategies are skipped whenever cheap ones already decided.
     """
-    
-    buy_score = 0
-    sell_score = 0
+    return execute_scoring_plan(ticker_pair, ScoringPlan(ticker_pair, strategies, strategies_overrides),
+                                avg_position, ticker_info, candles, stage_metrics)
+
+
+def execute_scoring_plan(ticker_pair: str,
+                         plan: ScoringPlan,
+                         avg_position,
+                         ticker_info,
+                         candles: CandleFrame,
+                         stage_metrics: StageMetrics = NO_STAGE_METRICS) -> TradeAction:
+    """
+    execute_strategies_scoring over a plan compiled ahead of time.
+    """
+    volatility_multiplier = plan.volatility_multiplier(ticker_info)
+    logger.debug(f"{ticker_pair}: Volatility multiplier: {volatility_multiplier}")
+
+    # scores are kept in priority weights and scaled when compared, so they don't depend on the evaluation order
+    buy_weight = 0
+    sell_weight = 0
     hold_lock = False
-    
-    # First pass: Find VolatilityAdjusted strategy to get multiplier
-    volatility_multiplier = 1.0
-    for priority, strategy_list in strategies.items():
-        for strategy in strategy_list:
-            if strategy.name == "VOLATILITY_ADJUSTED":
-                # We need to cast to VolatilityAdjusted to access specific methods if not in BaseStrategy
-                # But python is dynamic, so we can just try calling it if it exists
-                if hasattr(strategy, "get_volatility_multiplier"):
-                    # Note: We need the ticker symbol, which is in ticker_pair (e.g. BTC/USD)
-                    # get_volatility_multiplier expects just the symbol usually, or we pass the whole pair
-                    # Let's check how it was implemented. It takes 'ticker'.
-                    # In VolatilityAdjusted.eval, it uses ticker_info["symbol"]
-                    # Here we have ticker_pair. Let's assume ticker_pair is what we want or split it.
-                    # Actually, VolatilityAdjusted stores state by 'ticker'.
-                    # In eval it does: ticker = ticker_info["symbol"]
-                    # So we should pass ticker_info["symbol"]
-                    if "symbol" in ticker_info:
-                        vol_mult = strategy.get_volatility_multiplier(ticker_info["symbol"])
-                        volatility_multiplier = float(vol_mult)
-                        logger.debug(f"{ticker_pair}: Volatility multiplier: {volatility_multiplier}")
+    decision = None
+
+    for (idx, (curr_strat_name, priority, weight, strategy_to_run)) in enumerate(plan.entries):
+        if not strategy_to_run.stateful:
+            decision = scoring_decision(buy_weight, sell_weight, hold_lock, plan.remaining_weights[idx], volatility_multiplier)
+            if decision is not None:
+                logger.debug(f"{ticker_pair}: {decision} decided, skipping {len(plan.entries) - idx} strategies")
                 break
-    
-    for priority, strategy_list in strategies.items():
-        # Calculate priority weight (lower priority number = higher weight)
-        if priority == 1:
-            weight = 3
-        elif priority == 2:
-            weight = 2
-        else:
-            weight = 1
-            
-        # Apply volatility multiplier
-        # We apply it to the weight, so high volatility (mult < 1) reduces impact
-        # Low volatility (mult > 1) increases impact
-        weight = weight * volatility_multiplier
-        
-        for strategy in strategy_list:
-            curr_strat_name = strategy.name
-            strategy_to_run = strategy
-            
-            # Apply overrides if they exist
-            if strategies_overrides is not None:
-                if ticker_pair in strategies_overrides and curr_strat_name in strategies_overrides[ticker_pair]:
-                    strategy_to_run = strategies_overrides[ticker_pair][curr_strat_name]
-            
-            # Execute strategy
-            curr_action = strategy_to_run.eval(avg_position, candles_df, ticker_info)
-            
-            # Update scores based on action
-            if curr_action == TradeAction.BUY:
-                buy_score += weight
-                logger.debug(f"{ticker_pair}: {curr_strat_name} (P{priority}, W{weight:.2f}) -> BUY (+{weight:.2f})")
-            elif curr_action == TradeAction.SELL:
-                sell_score += weight
-                logger.debug(f"{ticker_pair}: {curr_strat_name} (P{priority}, W{weight:.2f}) -> SELL (+{weight:.2f})")
-            elif curr_action == TradeAction.HOLD:
-                hold_lock = True
-                logger.debug(f"{ticker_pair}: {curr_strat_name} (P{priority}) -> HOLD (lock activated)")
-            else:  # NOOP
-                logger.debug(f"{ticker_pair}: {curr_strat_name} (P{priority}) -> NOOP")
-    
+
+        # Execute strategy
+        with stage_metrics.span("strategy", ticker_pair, curr_strat_name):
+            curr_action = strategy_to_run.eval(avg_position, candles, ticker_info)
+
+        scaled_weight = weight * volatility_multiplier
+        # Update scores based on action
+        if curr_action == TradeAction.BUY:
+            buy_weight += weight
+            logger.debug(f"{ticker_pair}: {curr_strat_name} (P{priority}, W{scaled_weight:.2f}) -> BUY (+{scaled_weight:.2f})")
+        elif curr_action == TradeAction.SELL:
+            sell_weight += weight
+            logger.debug(f"{ticker_pair}: {curr_strat_name} (P{priority}, W{scaled_weight:.2f}) -> SELL (+{scaled_weight:.2f})")
+        elif curr_action == TradeAction.HOLD:
+            hold_lock = True
+            logger.debug(f"{ticker_pair}: {curr_strat_name} (P{priority}) -> HOLD (lock activated)")
+        else:  # NOOP
+            logger.debug(f"{ticker_pair}: {curr_strat_name} (P{priority}) -> NOOP")
+
+    if decision is None:
+        decision = scoring_decision(buy_weight, sell_weight, hold_lock, 0, volatility_multiplier)
+
     # Decision logic
+    buy_score = buy_weight * volatility_multiplier
+    sell_score = sell_weight * volatility_multiplier
     logger.debug(f"{ticker_pair}: Score Summary - BUY: {buy_score}, SELL: {sell_score}, HOLD_LOCK: {hold_lock}")
-    
-    # Thresholds for action (can be tuned)
-    # Priority 1 strategy alone can trigger (weight=3)
-    # Two Priority 2 strategies can trigger (weight=2*2=4)
-    action_threshold = 3
-    
-    # Check BUY signals (HOLD lock doesn't block buys!)
-    if buy_score >= action_threshold and buy_score > sell_score:
+
+    if decision == TradeAction.BUY:
         logger.info(f"{ticker_pair}: BUY signal triggered (score: {buy_score} vs sell: {sell_score})")
-        return TradeAction.BUY
-    
-    # Check SELL signals (HOLD lock DOES block sells to prevent selling at loss)
-    if sell_score >= action_threshold and sell_score > buy_score:
-        if hold_lock:
-            logger.info(f"{ticker_pair}: HOLD lock prevents SELL (sell_score: {sell_score})")
-            return TradeAction.HOLD
-        else:
-            logger.info(f"{ticker_pair}: SELL signal triggered (score: {sell_score} vs buy: {buy_score})")
-            return TradeAction.SELL
-    
-    return TradeAction.NOOP
+    elif decision == TradeAction.HOLD:
+        logger.info(f"{ticker_pair}: HOLD lock prevents SELL (sell_score: {sell_score})")
+    elif decision == TradeAction.SELL:
+        logger.info(f"{ticker_pair}: SELL signal triggered (score: {sell_score} vs buy: {buy_score})")
+
+    return decision
 
 
 def execute_strategies(ticker_pair: str, 
                         strategies: dict[int, BaseStrategy], 
                         avg_position, 
                         ticker_info, 
-                        candles_df: pd.DataFrame, 
+                        candles: CandleFrame | pd.DataFrame, 
                         strategies_overrides: dict[str, dict[str, BaseStrategy]] = None,
-                        use_scoring: bool = True) -> TradeAction:
+                        use_scoring: bool = True,
+                        stage_metrics: StageMetrics = NO_STAGE_METRICS,
+                        scoring_plan: ScoringPlan = None) -> TradeAction:
     """
     Main entry point for strategy execution.
     
     Args:
         use_scoring: If True, uses enhanced scoring system. If False, uses legacy all-must-agree.
+        stage_metrics: times each strategy's eval per ticker pair when enabled.
+        scoring_plan: the pair's precompiled plan, strategies and strategies_overrides are ignored when given.
     """
+    # every strategy reads the same read-only buffers and shares one indicator cache
+    candles = as_candle_frame(candles)
+
+    if scoring_plan is not None:
+        if use_scoring:
+            return execute_scoring_plan(ticker_pair, scoring_plan, avg_position, ticker_info, candles, stage_metrics)
+        return execute_strategies_legacy(ticker_pair, scoring_plan.strategies, avg_position,
+                                         ticker_info, candles, None, stage_metrics)
+
     if use_scoring:
         return execute_strategies_scoring(ticker_pair, strategies, avg_position, 
-                                         ticker_info, candles_df, strategies_overrides)
+                                         ticker_info, candles, strategies_overrides, stage_metrics)
     else:
         return execute_strategies_legacy(ticker_pair, strategies, avg_position,
-                                        ticker_info, candles_df, strategies_overrides)
+                                        ticker_info, candles, strategies_overrides, stage_metrics)
 
 
 def execute_strategies_legacy(ticker_pair: str, 
                               strategies: dict[int, BaseStrategy], 
                               avg_position, 
                               ticker_info, 
-                              candles_df: pd.DataFrame, 
-                              strategies_overrides: dict[str, dict[str, BaseStrategy]] = None) -> TradeAction:
+                              candles: CandleFrame, 
+                              strategies_overrides: dict[str, dict[str, BaseStrategy]] = None,
+                              stage_metrics: StageMetrics = NO_STAGE_METRICS) -> TradeAction:
     """
     LEGACY: Original all-must-agree execution logic.
     Kept for backward compatibility.
@@ -232,7 +318,8 @@ def execute_strategies_legacy(ticker_pair: str,
                 if ticker_pair in strategies_overrides and curr_strat_name in strategies_overrides[ticker_pair]:
                     strategy_to_run = strategies_overrides[ticker_pair][curr_strat_name]
             
-            curr_action = strategy_to_run.eval(avg_position, candles_df, ticker_info)    
+            with stage_metrics.span("strategy", ticker_pair, curr_strat_name):
+                curr_action = strategy_to_run.eval(avg_position, candles, ticker_info)
             logger.debug(f"{ticker_pair}: strategy: {curr_strat_name}, priority: {priority}, action: {curr_action}")
             if s_idx == 0:
                 trade_action = curr_action
@@ -0,0 +1,350 @@
+import math
+
+from abc import ABC, abstractmethod
+from collections import deque
+from itertools import islice
+
+NAN = float("nan")
+
+# TA-Lib treats anything within this distance of zero as zero (TA_IS_ZERO)
+TALIB_ZERO_EPSILON = 0.00000001
+
+class StreamingIndicator(ABC):
+    """
+    Incremental indicator with O(1) state per update.
+
+    update() consumes a closed candle value and advances the state, peek()
+    returns what the indicator would output if value were the next candle
+    without changing the state, which is how the still-forming candle is
+    evaluated every cycle.  Outputs are NaN until the lookback is filled, the
+    same as talib/pandas.
+
+    Every indicator here reproduces the seeding of its talib/pandas
+    counterpart, so fed the same series from the same first candle the outputs
+    match to within 1e-9 relative (floating point reordering only).  When the
+    state was seeded earlier than the candle window it is compared against,
+    Wilder/EMA smoothing makes the seed's influence decay geometrically, e.g.
+    (13/14)^n for a 14 period RSI, so the difference falls under 1e-9 after
+    ~280 candles.
+    """
+
+    def initial_state(self):
+        return None
+
+    @abstractmethod
+    def step(self, state, value):
+        """
+        Returns (next_state, output) for value following state.
+        """
+
+    def __init__(self):
+        self.state = self.initial_state()
+
+    def update(self, value):
+        (self.state, output) = self.step(self.state, value)
+        return output
+
+    def peek(self, value):
+        return self.step(self.state, value)[1]
+
+
+class StreamingRSI(StreamingIndicator):
+    """
+    Wilder smoothed RSI, seeded with the plain average of the first timeperiod
+    gains and losses like talib.RSI.
+    """
+
+    def __init__(self, timeperiod: int = 14):
+        self.timeperiod = timeperiod
+        super().__init__()
+
+    def initial_state(self):
+        # (prev_value, num_changes, avg_gain, avg_loss)
+        return (None, 0, 0.0, 0.0)
+
+    def step(self, state, value):
+        (prev_value, num_changes, avg_gain, avg_loss) = state
+        if prev_value is None:
+            return ((value, 0, 0.0, 0.0), NAN)
+
+        change = value - prev_value
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        num_changes += 1
+        n = self.timeperiod
+
+        if num_changes < n:
+            return ((value, num_changes, avg_gain + gain, avg_loss + loss), NAN)
+
+        if num_changes == n:
+            avg_gain = (avg_gain + gain) / n
+            avg_loss = (avg_loss + loss) / n
+        else:
+            avg_gain = ((avg_gain * (n - 1)) + gain) / n
+            avg_loss = ((avg_loss * (n - 1)) + loss) / n
+
+        total = avg_gain + avg_loss
+        rsi = 100 * (avg_gain / total) if abs(total) >= TALIB_ZERO_EPSILON else 0.0
+        return ((value, num_changes, avg_gain, avg_loss), rsi)
+
+
+class StreamingEMA(StreamingIndicator):
+    """
+    EMA with k = 2 / (period + 1), seeded with the SMA of the first period
+    values like talib.EMA.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        super().__init__()
+
+    def initial_state(self):
+        # (num_values, running_sum, ema)
+        return (0, 0.0, None)
+
+    def step(self, state, value):
+        (num_values, running_sum, ema) = state
+        num_values += 1
+
+        if num_values < self.period:
+            return ((num_values, running_sum + value, None), NAN)
+
+        if num_values == self.period:
+            ema = (running_sum + value) / self.period
+        else:
+            ema = ((value - ema) * self.k) + ema
+
+        return ((num_values, 0.0, ema), ema)
+
+
+class StreamingMACD(StreamingIndicator):
+    """
+    MACD line, signal and histogram matching talib.MACD: both EMAs produce
+    their first value on candle slowperiod - 1, the fast EMA seeded with the
+    SMA of the fastperiod closes ending there, and the signal EMA seeded with
+    the SMA of the first signalperiod MACD values.  Output is
+    (macd, macd_signal, macd_hist).
+    """
+
+    def __init__(self, fastperiod: int = 12, slowperiod: int = 26, signalperiod: int = 9):
+        self.fast_ema = StreamingEMA(fastperiod)
+        self.slow_ema = StreamingEMA(slowperiod)
+        self.signal_ema = StreamingEMA(signalperiod)
+        self.fast_offset = slowperiod - fastperiod
+        super().__init__()
+
+    def initial_state(self):
+        # (num_values, fast_state, slow_state, signal_state)
+        return (0, self.fast_ema.initial_state(), self.slow_ema.initial_state(), self.signal_ema.initial_state())
+
+    def step(self, state, value):
+        (num_values, fast_state, slow_state, signal_state) = state
+        num_values += 1
+
+        (slow_state, slow) = self.slow_ema.step(slow_state, value)
+        fast = NAN
+        if num_values > self.fast_offset:
+            (fast_state, fast) = self.fast_ema.step(fast_state, value)
+
+        if math.isnan(slow):
+            return ((num_values, fast_state, slow_state, signal_state), (NAN, NAN, NAN))
+
+        macd = fast - slow
+        (signal_state, signal) = self.signal_ema.step(signal_state, macd)
+        if math.isnan(signal):
+            return ((num_values, fast_state, slow_state, signal_state), (NAN, NAN, NAN))
+
+        return ((num_values, fast_state, slow_state, signal_state), (macd, signal, macd - signal))
+
+
+class StreamingATR(StreamingIndicator):
+    """
+    Wilder smoothed average true range over (high, low, close) tuples, seeded
+    with the SMA of the first timeperiod true ranges like talib.ATR.
+    """
+
+    def __init__(self, timeperiod: int = 14):
+        self.timeperiod = timeperiod
+        super().__init__()
+
+    def initial_state(self):
+        # (prev_close, num_ranges, atr)
+        return (None, 0, 0.0)
+
+    def step(self, state, value):
+        (high, low, close) = value
+        (prev_close, num_ranges, atr) = state
+        if prev_close is None:
+            return ((close, 0, 0.0), NAN)
+
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        num_ranges += 1
+        n = self.timeperiod
+
+        if num_ranges < n:
+            return ((close, num_ranges, atr + true_range), NAN)
+
+        if num_ranges == n:
+            atr = (atr + true_range) / n
+        else:
+            atr = ((atr * (n - 1)) + true_range) / n
+
+        return ((close, num_ranges, atr), atr)
+
+
+class RollingWindowStats:
+    """
+    Rolling mean and sample standard deviation (ddof=1, like pandas
+    rolling().std()) from running sums and sums of squares.
+
+    Values are shifted by a reference close to the window's mean before being
+    summed to avoid catastrophic cancellation on large prices, and the sums are
+    recomputed from the window every window updates so rounding drift stays
+    bounded; the amortized cost per update remains O(1).
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.reference = None
+        self.shifted_sum = 0.0
+        self.shifted_sum_squares = 0.0
+        self.updates_since_resync = 0
+
+    def update(self, value):
+        if self.reference is None:
+            self.reference = value
+
+        if len(self.values) == self.window:
+            oldest = self.values[0] - self.reference
+            self.shifted_sum -= oldest
+            self.shifted_sum_squares -= oldest * oldest
+
+        self.values.append(value)
+        shifted = value - self.reference
+        self.shifted_sum += shifted
+        self.shifted_sum_squares += shifted * shifted
+
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= self.window:
+            self.resync()
+
+        return self.stats(len(self.values), self.shifted_sum, self.shifted_sum_squares)
+
+    def peek(self, value):
+        if self.reference is None:
+            return self.stats(1, 0.0, 0.0)
+
+        num_values = len(self.values)
+        shifted_sum = self.shifted_sum
+        shifted_sum_squares = self.shifted_sum_squares
+        if num_values == self.window:
+            oldest = self.values[0] - self.reference
+            shifted_sum -= oldest
+            shifted_sum_squares -= oldest * oldest
+        else:
+            num_values += 1
+
+        shifted = value - self.reference
+        return self.stats(num_values, shifted_sum + shifted, shifted_sum_squares + shifted * shifted)
+
+    def resync(self):
+        self.reference = sum(self.values) / len(self.values)
+        self.shifted_sum = 0.0
+        self.shifted_sum_squares = 0.0
+        for value in self.values:
+            shifted = value - self.reference
+            self.shifted_sum += shifted
+            self.shifted_sum_squares += shifted * shifted
+        self.updates_since_resync = 0
+
+    def stats(self, num_values, shifted_sum, shifted_sum_squares):
+        """
+        Returns (mean, std), NaN until the window is full.
+        """
+        if num_values < self.window:
+            return (NAN, NAN)
+
+        mean = self.reference + shifted_sum / num_values
+        variance = NAN
+        if num_values > 1:
+            variance = max(0.0, (shifted_sum_squares - shifted_sum * shifted_sum / num_values) / (num_values - 1))
+        return (mean, math.sqrt(variance))
+
+
+class StreamingPctChangeStats:
+    """
+    Rolling (mean, std) of candle to candle percentage change, the streaming
+    form of series.pct_change().rolling(window).std().
+    """
+
+    def __init__(self, window: int):
+        self.window_stats = RollingWindowStats(window)
+        self.prev_value = None
+
+    def update(self, value):
+        prev_value = self.prev_value
+        self.prev_value = value
+        if prev_value is None:
+            return (NAN, NAN)
+        return self.window_stats.update(value / prev_value - 1)
+
+    def peek(self, value):
+        if self.prev_value is None:
+            return (NAN, NAN)
+        return self.window_stats.peek(value / self.prev_value - 1)
+
+
+class StreamingIndicatorEngine:
+    """
+    Streaming indicator state for one (ticker_pair, timeframe).
+
+    candles is the candle store's buffer for the key, oldest first, with the
+    still-forming candle last.  Indicators are registered lazily under
+    (name, params) the first time they are requested and warmed up once over
+    the closed candles in the buffer.  sync() then feeds each newly closed
+    candle to every registered indicator, and latest() evaluates the forming
+    candle with peek(), so keeping an indicator current costs O(1) per candle
+    instead of O(history) per eval.
+    """
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.indicators = {}
+        self.last_closed_timestamp = None
+
+    def sync(self):
+        if len(self.candles) < 2:
+            return
+
+        newly_closed = []
+        for idx in range(len(self.candles) - 2, -1, -1):
+            candle = self.candles[idx]
+            if self.last_closed_timestamp is not None and candle[0] <= self.last_closed_timestamp:
+                break
+            newly_closed.append(candle)
+
+        for candle in reversed(newly_closed):
+            for (indicator, extract) in self.indicators.values():
+                indicator.update(extract(candle))
+
+        self.last_closed_timestamp = self.candles[-2][0]
+
+    def latest(self, name: str, params: tuple, factory, extract):
+        """
+        Returns the indicator output for the forming candle.  factory builds
+        the indicator, extract maps an ohlcv candle to its input value.
+        """
+        if len(self.candles) == 0:
+            return NAN
+
+        key = (name, params)
+        if key not in self.indicators:
+            indicator = factory()
+            for candle in islice(self.candles, len(self.candles) - 1):
+                indicator.update(extract(candle))
+            self.indicators[key] = (indicator, extract)
+
+        (indicator, _) = self.indicators[key]
+        return indicator.peek(extract(self.candles[-1]))
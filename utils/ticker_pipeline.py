@@ -0,0 +1,62 @@
+import utils.constants as CONSTANTS
+
+from decimal import Decimal
+from strategies.base_strategy import BaseStrategy
+from utils.strategies_enhanced import ScoringPlan
+from utils.trading import init_take_profits_config
+
+
+class TickerPipeline:
+    """
+    Everything evaluating one ticker pair reads from the config, with the
+    pair's overrides already applied: take profit threshold and evaluation
+    type, amount per transaction, reinvestment percent, trade cooldown and
+    the ScoringPlan of its strategies.  Pipelines are compiled once, when
+    the config is (re)loaded, so the trading loop reads attributes instead
+    of probing the overrides and parsing their config for every ticker.
+    """
+
+    def __init__(self, take_profit_threshold: Decimal, take_profit_evaluation_type, amount_per_transaction: Decimal,
+                 reinvestment_percent: Decimal, trade_cooldown_period: float, scoring_plan: ScoringPlan = None):
+        self.take_profit_threshold = take_profit_threshold
+        self.take_profit_evaluation_type = take_profit_evaluation_type
+        self.amount_per_transaction = amount_per_transaction
+        self.reinvestment_percent = reinvestment_percent
+        self.trade_cooldown_period = trade_cooldown_period
+        self.scoring_plan = scoring_plan
+
+    def resolve(self, ticker_overrides: dict, scoring_plan: ScoringPlan) -> "TickerPipeline":
+        """
+        A copy of these defaults with a pair's overrides applied.
+        """
+        (take_profit_threshold, take_profit_evaluation_type) = (self.take_profit_threshold, self.take_profit_evaluation_type)
+        if CONSTANTS.CONFIG_TAKE_PROFITS in ticker_overrides:
+            (take_profit_threshold, take_profit_evaluation_type) = init_take_profits_config(ticker_overrides[CONSTANTS.CONFIG_TAKE_PROFITS])
+
+        amount_per_transaction = self.amount_per_transaction
+        if CONSTANTS.CONFIG_AMOUNT_PER_TRANSACTION in ticker_overrides:
+            amount_per_transaction = Decimal(ticker_overrides[CONSTANTS.CONFIG_AMOUNT_PER_TRANSACTION])
+
+        reinvestment_percent = self.reinvestment_percent
+        if CONSTANTS.CONFIG_REINVESTMENT_PERCENT in ticker_overrides:
+            reinvestment_percent = Decimal(ticker_overrides[CONSTANTS.CONFIG_REINVESTMENT_PERCENT])
+
+        trade_cooldown_period = self.trade_cooldown_period
+        if CONSTANTS.CONFIG_TRADE_COOLDOWN_PERIOD in ticker_overrides:
+            trade_cooldown_period = ticker_overrides[CONSTANTS.CONFIG_TRADE_COOLDOWN_PERIOD]
+
+        return TickerPipeline(take_profit_threshold, take_profit_evaluation_type, amount_per_transaction,
+                              reinvestment_percent, trade_cooldown_period, scoring_plan)
+
+
+def compile_ticker_pipelines(ticker_pairs: list, defaults: TickerPipeline, overrides: dict[str, dict[str, any]],
+                             strategies: dict[int, list[BaseStrategy]], strategies_overrides: dict[str, dict[str, BaseStrategy]] = None) -> dict[str, TickerPipeline]:
+    """
+    One pipeline per ticker pair, overrides keyed by ticker pair like
+    CryptoBot.overrides.
+    """
+    pipelines = {}
+    for ticker_pair in ticker_pairs:
+        scoring_plan = ScoringPlan(ticker_pair, strategies, strategies_overrides)
+        pipelines[ticker_pair] = defaults.resolve(overrides.get(ticker_pair, {}), scoring_plan)
+    return pipelines
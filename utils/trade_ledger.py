@@ -0,0 +1,138 @@
+import time
+import utils.constants as CONSTANTS
+
+from decimal import Decimal
+from utils.position_book import PositionBook
+from utils.stage_metrics import StageMetrics
+from utils.trading import find_profitable_trades
+from utils.logger import logger
+
+
+class TradeLedger:
+    """
+    The evaluate, buy and sell bookkeeping CryptoBot and the Backtester
+    share: take-profit selection, buy sizing against the remaining balance,
+    trade cooldowns, and the position book and balance updates when orders
+    resolve.  Placing and tracking the orders stays with the caller.
+
+    get_pipeline returns a ticker's TickerPipeline and clock the current
+    time in seconds, which is the candle time when backtesting.
+    """
+
+    def __init__(self, position_book: PositionBook, remaining_balance: Decimal, get_pipeline, clock=time.time, stage_metrics: StageMetrics = None):
+        self.position_book = position_book
+        self.remaining_balance = remaining_balance
+        self.get_pipeline = get_pipeline
+        self.clock = clock
+        self.stage_metrics = stage_metrics if stage_metrics is not None else StageMetrics()
+        self.ticker_trades_cooldown_periods = {}
+
+    def evaluate(self, ticker_pair: str, avg_position, all_positions, ticker_info, run_strategies):
+        """
+        Returns (positions_to_exit, None) when take profit fires, otherwise
+        (None, trade_action) with the trade action from run_strategies.
+        """
+        with self.stage_metrics.span("take_profit", ticker_pair):
+            positions_to_exit = self.find_exits(ticker_pair, avg_position, all_positions, ticker_info)
+        if positions_to_exit is not None:
+            return (positions_to_exit, None)
+
+        self.handle_cooldown(ticker_pair)
+        with self.stage_metrics.span("strategy_eval", ticker_pair):
+            return (None, run_strategies())
+
+    def find_exits(self, ticker_pair: str, avg_position, all_positions, ticker_info):
+        pipeline = self.get_pipeline(ticker_pair)
+        return find_profitable_trades(ticker_pair,
+                                      avg_position,
+                                      all_positions,
+                                      ticker_info,
+                                      pipeline.take_profit_threshold,
+                                      pipeline.take_profit_evaluation_type,
+                                      self.position_book.get_lots(ticker_pair))
+
+    def buy_amount(self, ticker_pair: str) -> Decimal:
+        """
+        The amount to spend on a buy, None while the ticker is cooling down
+        or the remaining balance can't cover it.
+        """
+        if self.ticker_in_cooldown(ticker_pair):
+            return None
+
+        amount = self.get_pipeline(ticker_pair).amount_per_transaction
+        if self.remaining_balance < amount:
+            logger.warn(f"{ticker_pair}: insufficient balance to place buy order, skipping")
+            return None
+
+        return amount
+
+    def reserve(self, ticker_pair: str, amount: Decimal):
+        # reserve the amount while the order works so other tickers can't spend it
+        self.remaining_balance -= amount
+        self.start_cooldown(ticker_pair)
+
+    def release(self, amount: Decimal):
+        self.remaining_balance += amount
+
+    def record_buy(self, order):
+        self.position_book.add(order)
+
+    def record_partial_buy(self, order, amount: Decimal) -> Decimal:
+        """
+        Keeps the shares a buy that reserved amount ended with and releases
+        what wasn't spent on them, which is returned.
+        """
+        # the book prices lots by amount, so the position is only the filled part of the order
+        self.position_book.add(dict(order, amount=order['filled']))
+        spent = Decimal(str(order['cost'])) + Decimal(str(order['fee']['cost']))
+        unspent = max(amount - spent, CONSTANTS.ZERO)
+        self.release(unspent)
+        return unspent
+
+    def record_sell(self, ticker_pair: str, order, positions_to_exit) -> Decimal:
+        """
+        Closes the exited positions and reinvests the ticker's share of the
+        proceeds, which are returned.
+        """
+        positions_to_delete = [position["id"] for position in positions_to_exit]
+        deletion_count = self.position_book.remove(ticker_pair, positions_to_delete)
+        if deletion_count != len(positions_to_exit):
+            logger.warn(f"{ticker_pair}: mismatch of deleted positions, deletion count: {deletion_count}, positions exited:{len(positions_to_exit)}")
+
+        to_reinvest_percent = self.get_pipeline(ticker_pair).reinvestment_percent
+
+        proceeds = Decimal(order['info']['total_value_after_fees'])
+        if to_reinvest_percent > CONSTANTS.ZERO:
+            self.remaining_balance += (proceeds * to_reinvest_percent)
+        return proceeds
+
+    def start_cooldown(self, ticker_pair: str):
+        self.ticker_trades_cooldown_periods[ticker_pair] = self.clock()
+
+    def ticker_in_cooldown(self, ticker_pair: str) -> bool:
+        if ticker_pair not in self.ticker_trades_cooldown_periods:
+            return False
+
+        last_trade_timestamp = self.ticker_trades_cooldown_periods[ticker_pair]
+        elapse_time_minutes = self.get_elapse_time_mins(last_trade_timestamp)
+
+        trade_cooldown_period = self.get_pipeline(ticker_pair).trade_cooldown_period
+        if elapse_time_minutes < trade_cooldown_period:
+            logger.info(f"{ticker_pair}: currently in cooldown, elapse {elapse_time_minutes} of {trade_cooldown_period} minutes so far")
+            return True
+
+        return False
+
+    def handle_cooldown(self, ticker_pair: str):
+        if ticker_pair not in self.ticker_trades_cooldown_periods:
+            return
+
+        last_trade_timestamp = self.ticker_trades_cooldown_periods[ticker_pair]
+        elapse_time_minutes = self.get_elapse_time_mins(last_trade_timestamp)
+
+        if elapse_time_minutes >= self.get_pipeline(ticker_pair).trade_cooldown_period:
+            logger.info(f"{ticker_pair}: resetting cooldown")
+            del self.ticker_trades_cooldown_periods[ticker_pair]
+
+    def get_elapse_time_mins(self, timestamp):
+        return (self.clock() - timestamp)/60
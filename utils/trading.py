@@ -1,10 +1,13 @@
 import copy
+import numpy as np
 
 from decimal import *
 from enum import Enum
 
+import utils.constants as CONSTANTS
 from utils.constants import QUANTIZING_DECIMAL
 from utils.logger import logger
+from utils.position_lots import PositionLots
 
 class TradeAction(Enum):
     BUY = 0,
@@ -21,6 +24,26 @@ class TakeProfitEvaluationType(Enum):
 
 FEE_MULTIPLIER = Decimal(2)
 
+def init_take_profits_config(take_profits_config):
+    """
+    Returns (take_profit_threshold, take_profit_evaluation_type) from a
+    take_profits config section, or the defaults.
+    """
+    take_profit_threshold = CONSTANTS.DEFAULT_TAKE_PROFIT_THRESHOLD
+    take_profit_evaluation_type = CONSTANTS.DEFAULT_TAKE_PROFIT_EVALUATION_TYPE
+
+    if take_profits_config is not None:
+        if CONSTANTS.CONFIG_TAKE_PROFITS_THRESHOLD_PERCENT in take_profits_config:
+            take_profit_threshold = take_profits_config[CONSTANTS.CONFIG_TAKE_PROFITS_THRESHOLD_PERCENT]
+
+        if CONSTANTS.CONFIG_TAKE_PROFITS_EVALUATION_TYPE in take_profits_config:
+            take_profit_evaluation_type = take_profits_config[CONSTANTS.CONFIG_TAKE_PROFITS_EVALUATION_TYPE]
+
+    take_profit_threshold = Decimal(take_profit_threshold/100)
+    take_profit_evaluation_type = TakeProfitEvaluationType[take_profit_evaluation_type]
+
+    return (take_profit_threshold, take_profit_evaluation_type)
+
 def round_down(num: float) -> float:
     return float(Decimal(num).quantize(QUANTIZING_DECIMAL, rounding=ROUND_DOWN))
 
@@ -82,12 +105,77 @@ def calculate_avg_position(trades):
 
     return average_trade
 
+def scale_position(position, fraction: float):
+    """
+    A copy of the position with its shares, cost and fee scaled by fraction.
+    """
+    scaled = copy.deepcopy(position)
+    scaled["filled"] = position["filled"] * fraction
+    scaled["amount"] = scaled["filled"]
+    scaled["cost"] = position["cost"] * fraction
+    scaled["fee"]["cost"] = float(position["fee"]["cost"]) * fraction
+    return scaled
+
+def split_sold_positions(positions, shares: float):
+    """
+    Splits the lots of a partially filled sell, in the order given, into the
+    lots the filled shares exited and what is left of the lot they ended in.
+    The last sold lot is cut down to the shares sold from it, the remainder
+    is None when the shares end on a lot boundary.
+    """
+    sold_positions = []
+    remaining_shares = shares
+    for position in positions:
+        if remaining_shares <= 0:
+            break
+
+        if position["filled"] <= remaining_shares:
+            sold_positions.append(position)
+            remaining_shares -= position["filled"]
+            continue
+
+        fraction = remaining_shares / position["filled"]
+        sold_positions.append(scale_position(position, fraction))
+        return (sold_positions, scale_position(position, 1 - fraction))
+
+    return (sold_positions, None)
+
+def find_profitable_lots(ticker_pair: str, all_positions, bid_price: float, take_profit_threshold: Decimal, lots: PositionLots = None):
+    if lots is None or len(lots) != len(all_positions):
+        lots = PositionLots(all_positions)
+
+    profit_pcts = lots.profit_percents(bid_price)
+    profitable_positions = []
+    for idx in np.flatnonzero(profit_pcts >= float(take_profit_threshold)):
+        position = all_positions[idx]
+        logger.info(f'{ticker_pair}: selling individual lot {position["id"]}, profit pct: {profit_pcts[idx] * 100}%')
+        profitable_positions.append(position)
+
+    return profitable_positions
+
+def find_optimized_lots(ticker_pair: str, all_positions, bid_price: float, take_profit_threshold: Decimal, lots: PositionLots = None):
+    if lots is None or len(lots) != len(all_positions):
+        lots = PositionLots(all_positions)
+
+    selected = lots.select_optimized(bid_price, float(take_profit_threshold))
+    if len(selected) == 0:
+        return []
+
+    blended_profit_pct = lots.profits(bid_price)[selected].sum() / lots.cost[selected].sum()
+    logger.info(f'{ticker_pair}: selling {len(selected)} of {len(lots)} lots, blended profit pct: {blended_profit_pct * 100}%')
+    return [all_positions[idx] for idx in selected]
+
 def find_profitable_trades(ticker_pair: str, 
                            avg_position, 
                            all_positions, 
                            ticker_info, 
                            take_profit_threshold: Decimal, 
-                           take_profit_evaluation_type: TakeProfitEvaluationType = TakeProfitEvaluationType.INDIVIDUAL_LOTS):
+                           take_profit_evaluation_type: TakeProfitEvaluationType = TakeProfitEvaluationType.INDIVIDUAL_LOTS,
+                           lots: PositionLots = None):
+    """
+    lots is the columnar form of all_positions, in the same order, built here
+    when not given.
+    """
     if not avg_position:
         return None
         
@@ -102,13 +190,7 @@ def find_profitable_trades(ticker_pair: str,
             profitable_positions = all_positions
 
     elif take_profit_evaluation_type == TakeProfitEvaluationType.INDIVIDUAL_LOTS:
-        for position in all_positions:
-            profit_pct = calculate_profit_percent(position, bid_price)
-            #logger.info(f'{ticker_pair}: lot {position["id"]}, profit pct: {profit_pct * 100}%')
-
-            if profit_pct >= take_profit_threshold:
-                logger.info(f'{ticker_pair}: selling individual lot {position["id"]}, profit pct: {profit_pct * 100}%')
-                profitable_positions.append(position)
+        profitable_positions = find_profitable_lots(ticker_pair, all_positions, bid_price, take_profit_threshold, lots)
                 
     elif take_profit_evaluation_type == TakeProfitEvaluationType.AVERAGE_THEN_INDIVIDUAL_LOTS:
         profit_pct = calculate_profit_percent(avg_position, bid_price)
@@ -117,16 +199,10 @@ def find_profitable_trades(ticker_pair: str,
             logger.info(f'{ticker_pair}: avg profits meets profit threshold')
             profitable_positions = all_positions
         else:
-            for position in all_positions:
-                profit_pct = calculate_profit_percent(position, bid_price)
-                #logger.info(f'{ticker_pair}: lot {position["id"]}, profit pct: {profit_pct * 100}%')
-
-                if profit_pct >= take_profit_threshold:
-                    logger.info(f'{ticker_pair}: selling individual lot {position["id"]}, profit pct: {profit_pct * 100}%')
-                    profitable_positions.append(position)
+            profitable_positions = find_profitable_lots(ticker_pair, all_positions, bid_price, take_profit_threshold, lots)
 
     elif take_profit_evaluation_type == TakeProfitEvaluationType.OPTIMIZED:
-        logger.warn(f'{ticker_pair}: take profit evaluation type of OPTIMIZED not supported yet')
+        profitable_positions = find_optimized_lots(ticker_pair, all_positions, bid_price, take_profit_threshold, lots)
     else:
         logger.warn(f'{ticker_pair}: unsuppored evaluation type: {take_profit_evaluation_type}')
 